@@ -1,14 +1,24 @@
 #!/usr/bin/env python3
 """Analyze the sales Excel file structure"""
 
-import openpyxl
 import sys
 
-def main():
-    wb = openpyxl.load_workbook('/tmp/saledatabase.xlsx', read_only=True, data_only=True)
-    ws = wb.active
+from import_pipeline import SALES_FILE, load_rows, require_file
+from workbook_cache import read_header
+
+def print_header(header):
+    """Column index / name listing"""
+    print(f"\nColumns ({len(header)}):")
+    for i, col in enumerate(header):
+        print(f"  {i}: {col}")
+
+def main(excel_file=SALES_FILE, header_only=False):
+    if header_only:
+        require_file(excel_file)
+        print_header(read_header(excel_file))
+        return
     
-    rows = list(ws.iter_rows(values_only=True))
+    rows = load_rows(excel_file)
     
     if len(rows) < 2:
         print("No data found")
@@ -17,9 +27,7 @@ def main():
     # First row is header
     header = rows[0]
     print(f"Total rows: {len(rows)-1}")
-    print(f"\nColumns ({len(header)}):")
-    for i, col in enumerate(header):
-        print(f"  {i}: {col}")
+    print_header(header)
     
     print(f"\n\nFirst 3 data rows:")
     for i, row in enumerate(rows[1:4]):
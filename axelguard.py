@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+AxelGuard Command Line
+One entry point for the Python importers and reports:
+
+    axelguard.py import inventory|sales|leads [--file X] [--db X] [--out X]
+    axelguard.py import inventory --dry-run [--sample N] [--seed N]
+    axelguard.py analyze [--file X] [--header-only]
+    axelguard.py report flowchart [--db X] [--out X] [--no-cache]
+    axelguard.py watch [--dir X] [--db X] [--debounce S] [--once]
+
+Only the standard library is imported up front; each subcommand imports its module
+(and openpyxl / reportlab through it) when it runs, so --help and
+analyze --header-only return immediately. Paths default to the
+AXELGUARD_* environment variables read in import_pipeline.py.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+# Standard library only; safe to import before knowing the subcommand
+import import_pipeline as config
+
+
+def load_script(filename):
+    """Import one of the tool scripts by file name (several use hyphens)"""
+    name = filename[:-3].replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, ROOT / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def cmd_import(args):
+    if args.kind == 'inventory' and args.dry_run:
+        load_script('import_excel_data.py').preview_import(
+            args.file or config.INVENTORY_FILE, args.db, args.sample, args.seed
+        )
+    elif args.dry_run:
+        sys.exit("--dry-run is only supported for inventory imports")
+    elif args.kind == 'inventory':
+        load_script('import_excel_data.py').main(args.file or config.INVENTORY_FILE, args.db)
+    elif args.kind == 'sales':
+        load_script('import-full-sales-db.py').main(
+            args.file or config.SALES_FILE, args.out or config.SALES_SQL, args.db
+        )
+    else:
+        load_script('import-leads.py').main(args.file or config.LEADS_FILE, args.out or config.LEADS_SQL)
+
+
+def cmd_analyze(args):
+    load_script('analyze-sales-excel.py').main(args.file or config.SALES_FILE, args.header_only)
+
+
+def cmd_report(args):
+    import time
+
+    flowchart = load_script('generate_flowchart.py')
+    print("🚀 Generating Device Management System Flowchart PDF...")
+    started = time.perf_counter()
+    filename, rebuilt = flowchart.create_flowchart_pdf(
+        args.out or flowchart.OUTPUT_FILE, args.db, None if args.no_cache else flowchart.CACHE_DIR
+    )
+    print(f"✅ PDF generated successfully: {filename} ({time.perf_counter() - started:.2f}s)")
+    print(f"🔁 Rebuilt sections: {', '.join(rebuilt) if rebuilt else 'none (all cached)'}")
+
+
+def cmd_watch(args):
+    import threading
+
+    watcher = load_script('watch_imports.py')
+    config.require_file(args.dir, "Watch folder")
+    config.require_file(args.db, "Database file", "Run: npm run dev first to create the database")
+    if args.once:
+        watcher.import_folder(args.dir, args.db)
+        return
+    stop_event = threading.Event()
+    try:
+        watcher.watch(args.dir, args.db, debounce=args.debounce, poll=args.poll, stop_event=stop_event)
+    except KeyboardInterrupt:
+        stop_event.set()
+    print("\n🛑 Watcher stopped")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='axelguard', description="AxelGuard data tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser('import', help="Import an Excel workbook")
+    importer.add_argument('kind', choices=['inventory', 'sales', 'leads'])
+    importer.add_argument('--file', help="Source workbook (default: AXELGUARD_<KIND>_XLSX)")
+    importer.add_argument('--db', default=config.DB_PATH,
+                          help="D1 SQLite file: inventory target, sales name lookups (default: AXELGUARD_DB_PATH)")
+    importer.add_argument('--out', help="SQL output for sales/leads (default: AXELGUARD_<KIND>_SQL)")
+    importer.add_argument('--dry-run', action='store_true',
+                          help="Inventory only: project the import from a sample, write nothing")
+    importer.add_argument('--sample', type=int, default=2000, help="Rows sampled per sheet with --dry-run")
+    importer.add_argument('--seed', type=int, help="Sampling seed (with --dry-run)")
+    importer.set_defaults(handler=cmd_import)
+
+    analyze = commands.add_parser('analyze', help="Show the sales workbook's columns and first rows")
+    analyze.add_argument('--file', help="Sales workbook (default: AXELGUARD_SALES_XLSX)")
+    analyze.add_argument('--header-only', action='store_true', help="Only read the header row")
+    analyze.set_defaults(handler=cmd_analyze)
+
+    report = commands.add_parser('report', help="Generate a report")
+    report.add_argument('name', choices=['flowchart'])
+    report.add_argument('--db', default=config.DB_PATH, help="D1 SQLite file for live counts")
+    report.add_argument('--out', help="Output PDF path")
+    report.add_argument('--no-cache', action='store_true', help="Rebuild every section")
+    report.set_defaults(handler=cmd_report)
+
+    watch = commands.add_parser('watch', help="Auto-import Inventory QC workbooks dropped into a folder")
+    watch.add_argument('--dir', default=os.environ.get('AXELGUARD_WATCH_DIR', "/home/user/uploaded_files"),
+                       help="Folder to watch (default: AXELGUARD_WATCH_DIR)")
+    watch.add_argument('--db', default=config.DB_PATH, help="D1 SQLite file")
+    watch.add_argument('--debounce', type=float, default=2.0, help="Seconds the folder must be quiet before import")
+    watch.add_argument('--poll', action='store_true', help="Poll instead of using inotify")
+    watch.add_argument('--once', action='store_true', help="Import what is in the folder now and exit")
+    watch.set_defaults(handler=cmd_watch)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
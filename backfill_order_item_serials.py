@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Order Item Serials Backfill for AxelGuard Dashboard
+Applies migration 0025 and backfills order_item_serials from the JSON arrays
+in order_items.serial_numbers / inventory_ids in batched id-range chunks,
+then reconciles order_items.scanned_count against the junction rows.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+MIGRATION_FILE = Path(__file__).resolve().parent / 'migrations' / '0025_order_item_serials.sql'
+CHUNK_SIZE = 500
+
+# Same expansion the migration's triggers use, applied to an id range
+BACKFILL_SQL = '''
+    INSERT OR IGNORE INTO order_item_serials (order_item_id, order_id, serial_number, inventory_id, position)
+    SELECT oi.id, oi.order_id, CAST(j.value AS TEXT),
+           CASE WHEN json_valid(oi.inventory_ids) THEN json_extract(oi.inventory_ids, '$[' || j.key || ']') END,
+           j.key
+    FROM order_items oi,
+         json_each(CASE WHEN json_valid(oi.serial_numbers) THEN oi.serial_numbers ELSE '[]' END) j
+    WHERE oi.id > ? AND oi.id <= ?
+      AND j.value IS NOT NULL AND CAST(j.value AS TEXT) != ''
+'''
+
+# Serials scanned without a matching inventory_ids entry are resolved by serial
+LINK_INVENTORY_SQL = '''
+    UPDATE order_item_serials
+    SET inventory_id = (
+        SELECT i.id FROM inventory i WHERE i.device_serial_no = order_item_serials.serial_number
+    )
+    WHERE inventory_id IS NULL AND order_item_id > ? AND order_item_id <= ?
+'''
+
+# order_items.scanned_count is defined as this: one junction row per scanned device
+SERIAL_COUNT_SQL = "SELECT COUNT(*) FROM order_item_serials s WHERE s.order_item_id = order_items.id"
+
+MISMATCH_SQL = '''
+    SELECT oi.id, oi.order_id, oi.product_name, COALESCE(oi.scanned_count, 0), COUNT(s.id)
+    FROM order_items oi
+    LEFT JOIN order_item_serials s ON s.order_item_id = oi.id
+    GROUP BY oi.id
+    HAVING COALESCE(oi.scanned_count, 0) != COUNT(s.id)
+    ORDER BY oi.id
+'''
+
+
+def sync_scanned_counts(conn, scope=""):
+    """
+    Set order_items.scanned_count to the item's junction-row count, the one
+    definition shared with dispatch_reconcile.py. scope is an extra WHERE
+    condition on order_items ("AND ..."); returns the number of items changed.
+    """
+    return conn.execute(f'''
+        UPDATE order_items
+        SET scanned_count = ({SERIAL_COUNT_SQL})
+        WHERE COALESCE(scanned_count, 0) != ({SERIAL_COUNT_SQL}) {scope}
+    ''').rowcount
+
+
+def apply_migration(conn):
+    """Create the junction table, indexes and sync triggers if missing"""
+    with open(MIGRATION_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+
+def backfill(conn, chunk_size=CHUNK_SIZE):
+    """Rebuild junction rows chunk by chunk; each chunk is its own short transaction"""
+    total_items = conn.execute("SELECT COUNT(*) FROM order_items").fetchone()[0]
+    last_id = 0
+    processed = 0
+    inserted = 0
+    while True:
+        ids = conn.execute(
+            "SELECT id FROM order_items WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, chunk_size)
+        ).fetchall()
+        if not ids:
+            break
+        upper = ids[-1][0]
+        with conn:
+            conn.execute(
+                "DELETE FROM order_item_serials WHERE order_item_id > ? AND order_item_id <= ?",
+                (last_id, upper)
+            )
+            inserted += conn.execute(BACKFILL_SQL, (last_id, upper)).rowcount
+            conn.execute(LINK_INVENTORY_SQL, (last_id, upper))
+        processed += len(ids)
+        last_id = upper
+        print(f"  ⏳ Backfilled {processed}/{total_items} order items ({inserted} serials)...")
+    return processed, inserted
+
+
+def verify(conn, fix_counts=False, show=10):
+    """Reconcile scanned_count against junction rows and report data problems"""
+    mismatches = conn.execute(MISMATCH_SQL).fetchall()
+    malformed = conn.execute('''
+        SELECT COUNT(*) FROM order_items
+        WHERE serial_numbers IS NOT NULL AND TRIM(serial_numbers) != ''
+          AND NOT json_valid(serial_numbers)
+    ''').fetchone()[0]
+    unmatched = conn.execute(
+        "SELECT COUNT(*) FROM order_item_serials WHERE inventory_id IS NULL"
+    ).fetchone()[0]
+    duplicates = conn.execute('''
+        SELECT COUNT(*) FROM (
+            SELECT serial_number FROM order_item_serials
+            GROUP BY serial_number HAVING COUNT(DISTINCT order_id) > 1
+        )
+    ''').fetchone()[0]
+
+    print(f"\n🔍 Verification:")
+    print(f"   • scanned_count mismatches: {len(mismatches)}")
+    for item_id, order_id, product, scanned, actual in mismatches[:show]:
+        print(f"      - item {item_id} ({order_id}, {product}): scanned_count={scanned}, serials={actual}")
+    if len(mismatches) > show:
+        print(f"      ... and {len(mismatches) - show} more")
+    print(f"   • Malformed serial_numbers JSON: {malformed}")
+    print(f"   • Serials with no inventory match: {unmatched}")
+    print(f"   • Serials attached to more than one order: {duplicates}")
+
+    if fix_counts and mismatches:
+        with conn:
+            updated = sync_scanned_counts(conn)
+        print(f"   ✅ Updated scanned_count on {updated} order items")
+    return len(mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill order_item_serials from order_items JSON arrays")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--verify-only', action='store_true', help="Skip the backfill, only reconcile")
+    parser.add_argument('--fix-counts', action='store_true',
+                        help="Set scanned_count from the junction rows where they disagree")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        print("   Run: npm run dev first to create the database")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        apply_migration(conn)
+        if not args.verify_only:
+            print("\n" + "="*60)
+            print("🔗 BACKFILLING ORDER ITEM SERIALS")
+            print("="*60)
+            started = time.perf_counter()
+            processed, inserted = backfill(conn, args.chunk_size)
+            print(f"\n✅ Backfill Complete in {time.perf_counter() - started:.2f}s:")
+            print(f"   • Order items: {processed}")
+            print(f"   • Serial rows: {inserted}")
+        mismatches = verify(conn, args.fix_counts)
+    finally:
+        conn.close()
+
+    if mismatches and not args.fix_counts:
+        print("\nℹ️  Rerun with --fix-counts to correct scanned_count")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Name Canonicalization for AxelGuard Importers
+Compiles users, products and product_categories into one matcher: a dict of
+normalized keys for exact hits, with an Aho-Corasick automaton as fallback
+for cells that merely contain a known name, model number or first name.
+Lookups are O(length of the cell). The compiled matcher is cached on disk,
+keyed by a fingerprint of the three source tables.
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import sys
+from collections import deque
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+CACHE_DIR = os.environ.get(
+    'AXELGUARD_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'axelguard')
+)
+CATALOG_MIGRATION = Path(__file__).resolve().parent / 'migrations' / '0008_products_catalog.sql'
+
+# Bump when the compiled layout or matching rules change
+MATCHER_VERSION = 1
+
+# Sales staff who appear in historical sheets but no longer have a login
+KNOWN_EMPLOYEES = ['Akash Parashar', 'Mandeep Samal', 'Smruti Ranjan Nayak', 'Divyanshu Tripathi']
+
+MIN_FALLBACK_LENGTH = 3
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+PARENTHETICAL = re.compile(r'\(([^)]*)\)')
+
+
+def normalize(text):
+    """Lowercase alphanumeric tokens joined by single spaces"""
+    return ' '.join(TOKEN_PATTERN.findall(str(text or '').lower()))
+
+
+class AhoCorasick:
+    """Multi-pattern matcher over normalized text; patterns match on whole tokens only"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [None]
+        for key, value in patterns.items():
+            node = 0
+            for ch in key:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(None)
+                node = nxt
+            self.out[node] = (len(key), value)
+
+        # Breadth-first fail links; dict_out points at the next node with an output
+        self.dict_out = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0) if self.goto[f].get(ch, 0) != child else 0
+                target = self.fail[child]
+                self.dict_out[child] = target if self.out[target] else self.dict_out[target]
+
+    def longest(self, text):
+        """Value of the longest token-aligned pattern in text; None if none or a tie between values"""
+        best_len, best = 0, set()
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            end_ok = i + 1 == len(text) or text[i + 1] == ' '
+            if not end_ok:
+                continue
+            hit = node if self.out[node] else self.dict_out[node]
+            while hit:
+                length, value = self.out[hit]
+                start = i + 1 - length
+                if start == 0 or text[start - 1] == ' ':
+                    if length > best_len:
+                        best_len, best = length, {value}
+                    elif length == best_len:
+                        best.add(value)
+                hit = self.dict_out[hit]
+        return next(iter(best)) if len(best) == 1 else None
+
+
+def _unique(pairs):
+    """key → value for keys that map to exactly one value"""
+    seen = {}
+    for key, value in pairs:
+        if key:
+            seen.setdefault(key, set()).add(value)
+    return {key: next(iter(values)) for key, values in seen.items() if len(values) == 1}
+
+
+class Canonicalizer:
+    """Compiled lookup tables; build with load_canonicalizer()"""
+
+    def __init__(self, products, categories, employees):
+        # products: [(code, name, category)], categories: [name], employees: [(canonical, aliases)]
+        self.products = {code: (name, category) for code, name, category in products}
+
+        exact = []
+        fallback = []
+        for code, name, _ in products:
+            full = normalize(name)
+            base = normalize(PARENTHETICAL.sub(' ', name))
+            exact += [(normalize(code), code), (full, code), (full.replace(' ', ''), code),
+                      (base, code), (base.replace(' ', ''), code)]
+            fallback += [(full, code), (base, code)]
+            # Model numbers in brackets, e.g. "(MR9704C)"
+            for inner in PARENTHETICAL.findall(name):
+                model = normalize(inner)
+                if any(c.isdigit() for c in model) and len(model.replace(' ', '')) >= 4:
+                    exact.append((model, code))
+                    fallback.append((model, code))
+        self.product_exact = _unique(exact)
+        self.product_fallback = AhoCorasick({k: v for k, v in _unique(fallback).items()
+                                             if len(k) >= MIN_FALLBACK_LENGTH})
+
+        self.category_exact = _unique((normalize(c), c) for c in categories)
+        self.category_exact.update(_unique((normalize(c).replace(' and ', ' '), c) for c in categories))
+
+        exact = []
+        fallback = []
+        for canonical, aliases in employees:
+            for alias in [canonical] + list(aliases):
+                key = normalize(alias)
+                exact += [(key, canonical), (key.replace(' ', ''), canonical)]
+                fallback.append((key, canonical))
+                fallback += [(token, canonical) for token in key.split() if len(token) >= MIN_FALLBACK_LENGTH]
+        self.employee_exact = _unique(exact)
+        self.employee_fallback = AhoCorasick(_unique(fallback))
+        self._memo = {}
+
+    def product(self, name, code=None):
+        """(product_code, catalog name) for a sheet cell, or (None, None)"""
+        memo_key = ('p', name, code)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        result = (None, None)
+        for candidate in (code, name):
+            key = normalize(candidate)
+            if not key:
+                continue
+            found = (self.product_exact.get(key) or self.product_exact.get(key.replace(' ', ''))
+                     or self.product_fallback.longest(key))
+            if found:
+                result = (found, self.products[found][0])
+                break
+        self._memo[memo_key] = result
+        return result
+
+    def category(self, name):
+        """Catalog category name, or None"""
+        key = normalize(name)
+        return self.category_exact.get(key) or self.category_exact.get(key.replace(' and ', ' '))
+
+    def employee(self, name, default='Unknown'):
+        """Canonical employee name; unknown non-empty names are kept as typed"""
+        if not name or not str(name).strip():
+            return default
+        memo_key = ('e', name)
+        if memo_key not in self._memo:
+            key = normalize(name)
+            self._memo[memo_key] = (self.employee_exact.get(key) or self.employee_exact.get(key.replace(' ', ''))
+                                    or self.employee_fallback.longest(key) or str(name).strip())
+        return self._memo[memo_key]
+
+
+# ========== LOADING ==========
+
+def _has_table(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+
+
+def read_sources(conn):
+    """Rows the matcher is compiled from (missing tables read as empty)"""
+    products, categories, users = [], [], []
+    if _has_table(conn, 'products'):
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(products)")}
+        if 'product_code' in columns:
+            products = conn.execute(
+                "SELECT product_code, product_name, category FROM products ORDER BY product_code"
+            ).fetchall()
+    if _has_table(conn, 'product_categories'):
+        categories = [r[0] for r in conn.execute("SELECT category_name FROM product_categories ORDER BY id")]
+    if _has_table(conn, 'users'):
+        users = conn.execute(
+            "SELECT username, full_name, employee_name FROM users WHERE COALESCE(is_active, 1) = 1 ORDER BY id"
+        ).fetchall()
+    return products, categories, users
+
+
+def catalog_from_migration():
+    """Product catalog from migration 0008 when no database is available"""
+    conn = sqlite3.connect(':memory:')
+    try:
+        with open(CATALOG_MIGRATION, 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+        return read_sources(conn)
+    finally:
+        conn.close()
+
+
+def employees_from_users(users):
+    """(canonical, aliases) per employee; users without an employee_name are logins only"""
+    employees = {name: set() for name in KNOWN_EMPLOYEES}
+    for username, full_name, employee_name in users:
+        canonical = employee_name or None
+        if not canonical:
+            continue
+        employees.setdefault(canonical, set()).update(a for a in (username, full_name) if a)
+    return [(name, sorted(aliases)) for name, aliases in employees.items()]
+
+
+def load_canonicalizer(db_path=DB_PATH, cache_dir=CACHE_DIR):
+    """Compiled Canonicalizer for the database, from the disk cache when the sources are unchanged"""
+    if db_path and Path(db_path).exists():
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            sources = read_sources(conn)
+        finally:
+            conn.close()
+    else:
+        sources = catalog_from_migration()
+    products, categories, users = sources
+
+    digest = hashlib.sha256(repr((MATCHER_VERSION, sources, KNOWN_EMPLOYEES)).encode('utf-8')).hexdigest()
+    path = Path(cache_dir) / f"canonical-{digest[:32]}.pkl" if cache_dir and not os.environ.get('AXELGUARD_NO_CACHE') else None
+    if path is not None and path.exists():
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            pass
+
+    canon = Canonicalizer(products, categories, employees_from_users(users))
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in path.parent.glob('canonical-*.pkl'):
+            stale.unlink()
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(canon, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    return canon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve product / employee / category names")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file (catalog migration if missing)")
+    parser.add_argument('--kind', choices=['product', 'employee', 'category'], default='product')
+    parser.add_argument('names', nargs='*', help="Names to resolve (default: read lines from stdin)")
+    args = parser.parse_args()
+
+    canon = load_canonicalizer(args.db)
+    names = args.names or [line.rstrip('\n') for line in sys.stdin]
+    for name in names:
+        if args.kind == 'product':
+            code, catalog_name = canon.product(name)
+            print(f"{name!r} → {code or '❌ no match'}{f'  ({catalog_name})' if catalog_name else ''}")
+        elif args.kind == 'employee':
+            print(f"{name!r} → {canon.employee(name)}")
+        else:
+            print(f"{name!r} → {canon.category(name) or '❌ no match'}")
+
+
+if __name__ == '__main__':
+    main()
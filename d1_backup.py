@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Online Backup Tool for AxelGuard Dashboard
+Copies the live D1 SQLite file with SQLite's online backup API in small
+page steps (the dev server keeps running), then stores the copy as
+compressed, content-addressed chunks: a chunk that is unchanged since an
+earlier snapshot is stored only once. Snapshots can be restored whole, as
+of a point in time, or one table at a time.
+
+Repository layout:
+    <repo>/chunks/<ab>/<sha256>    zlib-compressed chunk of the database file
+    <repo>/snapshots/<id>.json     chunk list, page size and per-table row counts
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+REPO_DIR = os.environ.get(
+    'AXELGUARD_BACKUP_DIR',
+    os.path.join(os.path.expanduser('~'), 'axelguard-backups')
+)
+CHUNK_SIZE = 64 * 1024  # a whole number of pages for every SQLite page size up to 64 KiB
+PAGES_PER_STEP = 256
+STEP_SLEEP = 0.005  # seconds between steps so writers get the lock
+COMPRESS_LEVEL = 6
+
+
+def chunk_path(repo, digest):
+    """Chunks fan out over 256 directories by hash prefix"""
+    return Path(repo) / 'chunks' / digest[:2] / digest
+
+
+def online_copy(db_path, dest_path, pages=PAGES_PER_STEP, sleep=STEP_SLEEP, progress=None):
+    """Backup API copy in steps of `pages`; restarts automatically if another connection writes"""
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    dest = sqlite3.connect(dest_path)
+    try:
+        src.backup(dest, pages=pages, sleep=sleep, progress=progress)
+        page_size = dest.execute("PRAGMA page_size").fetchone()[0]
+        tables = {}
+        for (name,) in dest.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall():
+            tables[name] = dest.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+        # Single-file copy, so the chunks alone reproduce the database
+        dest.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        dest.close()
+        src.close()
+    return page_size, tables
+
+
+def store_chunks(repo, path, chunk_size=CHUNK_SIZE):
+    """Split the copy into chunks and write the ones not already stored"""
+    digests = []
+    new_chunks = 0
+    new_bytes = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            digest = hashlib.sha256(data).hexdigest()
+            digests.append(digest)
+            target = chunk_path(repo, digest)
+            if target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            compressed = zlib.compress(data, COMPRESS_LEVEL)
+            tmp = target.with_suffix('.tmp')
+            tmp.write_bytes(compressed)
+            os.replace(tmp, target)
+            new_chunks += 1
+            new_bytes += len(compressed)
+    return digests, new_chunks, new_bytes
+
+
+def create_snapshot(db_path, repo=REPO_DIR, label=None, pages=PAGES_PER_STEP, sleep=STEP_SLEEP):
+    """Online copy → deduplicated chunks → snapshot manifest; returns the manifest"""
+    repo = Path(repo)
+    (repo / 'snapshots').mkdir(parents=True, exist_ok=True)
+    created = datetime.now(timezone.utc)
+    snapshot_id = created.strftime('%Y%m%dT%H%M%S%fZ')
+
+    fd, tmp_path = tempfile.mkstemp(prefix='snapshot-', suffix='.sqlite', dir=repo)
+    os.close(fd)
+    try:
+        page_size, tables = online_copy(db_path, tmp_path, pages, sleep)
+        size = os.path.getsize(tmp_path)
+        digests, new_chunks, new_bytes = store_chunks(repo, tmp_path)
+    finally:
+        os.remove(tmp_path)
+
+    manifest = {
+        'id': snapshot_id,
+        'created_at': created.isoformat(timespec='seconds'),
+        'label': label,
+        'source': str(db_path),
+        'page_size': page_size,
+        'size': size,
+        'chunk_size': CHUNK_SIZE,
+        'chunks': digests,
+        'new_chunks': new_chunks,
+        'new_bytes': new_bytes,
+        'tables': tables,
+    }
+    target = repo / 'snapshots' / f'{snapshot_id}.json'
+    tmp = target.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, target)
+    return manifest
+
+
+def list_snapshots(repo=REPO_DIR):
+    """Snapshot manifests, oldest first"""
+    folder = Path(repo) / 'snapshots'
+    if not folder.exists():
+        return []
+    manifests = []
+    for path in sorted(folder.glob('*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifests.append(json.load(f))
+    return manifests
+
+
+def find_snapshot(repo, snapshot_id=None, at=None):
+    """By id (prefix ok), the latest taken at or before `at`, or the latest overall"""
+    snapshots = list_snapshots(repo)
+    if snapshot_id:
+        matches = [s for s in snapshots if s['id'].startswith(snapshot_id)]
+        if len(matches) != 1:
+            raise ValueError(f"Snapshot id {snapshot_id!r} matches {len(matches)} snapshots")
+        return matches[0]
+    if at:
+        cutoff = datetime.fromisoformat(at)
+        if cutoff.tzinfo is None:
+            cutoff = cutoff.astimezone(timezone.utc)
+        snapshots = [s for s in snapshots if datetime.fromisoformat(s['created_at']) <= cutoff]
+    if not snapshots:
+        raise ValueError("No matching snapshot")
+    return snapshots[-1]
+
+
+def assemble(repo, manifest, out_path):
+    """Write the snapshot's database file from its chunks and check every hash"""
+    tmp = Path(str(out_path) + '.tmp')
+    with open(tmp, 'wb') as out:
+        for digest in manifest['chunks']:
+            data = zlib.decompress(chunk_path(repo, digest).read_bytes())
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise ValueError(f"Chunk {digest} is corrupt")
+            out.write(data)
+    os.replace(tmp, out_path)
+
+
+def restore_database(repo, manifest, out_path):
+    """Full restore to out_path (never over an existing file)"""
+    if Path(out_path).exists():
+        raise FileExistsError(f"{out_path} exists; restore to a new path and swap it in")
+    assemble(repo, manifest, out_path)
+    conn = sqlite3.connect(out_path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != 'ok':
+        raise ValueError(f"Restored database failed quick_check: {result}")
+
+
+def restore_table(repo, manifest, table, target_db):
+    """Replace one table's rows in target_db with the snapshot's, in a single transaction"""
+    if table not in manifest['tables']:
+        raise ValueError(f"Table {table!r} is not in snapshot {manifest['id']}")
+    with tempfile.TemporaryDirectory(dir=repo) as tmp_dir:
+        snapshot_db = os.path.join(tmp_dir, 'snapshot.sqlite')
+        assemble(repo, manifest, snapshot_db)
+        conn = sqlite3.connect(target_db)
+        try:
+            conn.execute("ATTACH DATABASE ? AS snap", (f"file:{snapshot_db}?mode=ro",))
+            snap_columns = [r[1] for r in conn.execute(f'PRAGMA snap.table_info("{table}")')]
+            live_columns = {r[1] for r in conn.execute(f'PRAGMA main.table_info("{table}")')}
+            if not live_columns:
+                raise ValueError(f"Table {table!r} does not exist in {target_db}")
+            columns = ', '.join(f'"{c}"' for c in snap_columns if c in live_columns)
+            with conn:
+                conn.execute(f'DELETE FROM main."{table}"')
+                restored = conn.execute(
+                    f'INSERT INTO main."{table}" ({columns}) SELECT {columns} FROM snap."{table}"'
+                ).rowcount
+            conn.execute("DETACH DATABASE snap")
+        finally:
+            conn.close()
+    return restored
+
+
+def prune(repo, keep):
+    """Drop all but the newest `keep` snapshots and delete chunks no snapshot uses"""
+    snapshots = list_snapshots(repo)
+    removed = 0
+    for manifest in snapshots[:-keep] if keep else snapshots:
+        (Path(repo) / 'snapshots' / f"{manifest['id']}.json").unlink()
+        removed += 1
+    live = {digest for manifest in list_snapshots(repo) for digest in manifest['chunks']}
+    freed = 0
+    for path in (Path(repo) / 'chunks').glob('*/*'):
+        if path.name not in live:
+            freed += path.stat().st_size
+            path.unlink()
+    return removed, freed
+
+
+def fmt_bytes(count):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f"{count:.1f} {unit}" if unit != 'B' else f"{count} B"
+        count /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online, deduplicated backups of the D1 SQLite file")
+    parser.add_argument('--repo', default=REPO_DIR, help="Backup repository directory")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('snapshot', help="Take a snapshot of the live database")
+    p.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    p.add_argument('--label', help="Free-text note stored with the snapshot")
+    p.add_argument('--pages', type=int, default=PAGES_PER_STEP, help="Pages copied per backup step")
+
+    sub.add_parser('list', help="List snapshots")
+
+    p = sub.add_parser('restore', help="Restore a whole snapshot to a new file")
+    p.add_argument('--id', help="Snapshot id or unique prefix (default: latest)")
+    p.add_argument('--at', help="Latest snapshot taken at or before this ISO time")
+    p.add_argument('--out', required=True, help="Path for the restored database")
+
+    p = sub.add_parser('restore-table', help="Replace one table's rows from a snapshot")
+    p.add_argument('table')
+    p.add_argument('--id', help="Snapshot id or unique prefix (default: latest)")
+    p.add_argument('--at', help="Latest snapshot taken at or before this ISO time")
+    p.add_argument('--db', default=DB_PATH, help="Database to restore into")
+
+    p = sub.add_parser('prune', help="Keep the newest N snapshots and drop unused chunks")
+    p.add_argument('--keep', type=int, required=True)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'snapshot':
+            if not Path(args.db).exists():
+                print(f"❌ Error: Database file not found at {args.db}")
+                sys.exit(1)
+            started = time.perf_counter()
+            manifest = create_snapshot(args.db, args.repo, args.label, args.pages)
+            print(f"\n✅ Snapshot {manifest['id']} in {time.perf_counter() - started:.2f}s:")
+            print(f"   • Database size: {fmt_bytes(manifest['size'])}")
+            print(f"   • Chunks: {len(manifest['chunks'])} ({manifest['new_chunks']} new)")
+            print(f"   • New data stored: {fmt_bytes(manifest['new_bytes'])}")
+            print(f"   • Tables: {len(manifest['tables'])}")
+
+        elif args.command == 'list':
+            snapshots = list_snapshots(args.repo)
+            print(f"📦 {len(snapshots)} snapshots in {args.repo}")
+            for manifest in snapshots:
+                label = f"  ({manifest['label']})" if manifest.get('label') else ''
+                print(f"   • {manifest['id']}  {fmt_bytes(manifest['size']):>10}  "
+                      f"+{fmt_bytes(manifest['new_bytes'])}{label}")
+
+        elif args.command == 'restore':
+            manifest = find_snapshot(args.repo, args.id, args.at)
+            started = time.perf_counter()
+            restore_database(args.repo, manifest, args.out)
+            print(f"✅ Restored snapshot {manifest['id']} to {args.out} in {time.perf_counter() - started:.2f}s")
+
+        elif args.command == 'restore-table':
+            manifest = find_snapshot(args.repo, args.id, args.at)
+            started = time.perf_counter()
+            restored = restore_table(args.repo, manifest, args.table, args.db)
+            print(f"✅ Restored {restored} rows of {args.table} from snapshot {manifest['id']} "
+                  f"in {time.perf_counter() - started:.2f}s")
+
+        elif args.command == 'prune':
+            removed, freed = prune(args.repo, args.keep)
+            print(f"✅ Removed {removed} snapshots, freed {fmt_bytes(freed)}")
+
+    except (ValueError, FileExistsError, sqlite3.Error) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
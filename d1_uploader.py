@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Concurrent D1 Uploader for AxelGuard Dashboard
+Pushes import batches (the /tmp/*.sql files written by import-full-sales-db.py
+and import-leads.py, or tables loaded locally by import_excel_data.py) to a
+D1-style HTTP query endpoint with bounded concurrency and retries. D1 does
+not deduplicate requests, so a batch whose response was lost is retried only
+when replaying it is harmless (INSERT OR IGNORE / OR REPLACE, upserts,
+DELETE); other batches are retried only when the request never reached the
+server. Also ships a local stand-in endpoint wrapping a SQLite file, with
+foreign keys enforced as on D1.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+from import_records import sql_literal
+
+# Production D1 database (see wrangler.jsonc)
+D1_DATABASE_ID = "4f8ab9fe-4b4d-4484-b86c-1abf0bdf8208"
+D1_API_BASE = "https://api.cloudflare.com/client/v4"
+
+BATCH_SIZE = 200
+CONCURRENCY = 8
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 15.0
+REQUEST_TIMEOUT = 60
+
+# HTTP statuses worth retrying; anything else in 4xx is a bad batch
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# ...of which these turn the request away before any SQL runs
+NOT_APPLIED_STATUSES = {408, 429}
+
+# Statements that leave the same result when a batch is applied twice
+REPLAY_SAFE = re.compile(
+    r'^(?:\s*--[^\n]*\n)*\s*(?:INSERT\s+OR\s+(?:IGNORE|REPLACE)\b|REPLACE\s+INTO\b|DELETE\b'
+    r'|CREATE\s+(?:UNIQUE\s+)?\w+\s+IF\s+NOT\s+EXISTS\b|DROP\s+\w+\s+IF\s+EXISTS\b'
+    r'|INSERT\b.*\bON\s+CONFLICT\b)',
+    re.IGNORECASE | re.DOTALL,
+)
+
+IDEMPOTENCY_TABLE = "_d1_idempotency_keys"
+
+
+class UploadError(Exception):
+    """Raised when a batch cannot be applied after all retries"""
+
+
+def split_statements(sql_text):
+    """Split a SQL script into statements, respecting quoted literals and comments"""
+    statements = []
+    current = []
+    quote = None
+    i = 0
+    n = len(sql_text)
+    while i < n:
+        ch = sql_text[i]
+        if quote:
+            current.append(ch)
+            if ch == quote:
+                # Doubled quote is an escaped quote inside the literal
+                if i + 1 < n and sql_text[i + 1] == quote:
+                    current.append(quote)
+                    i += 1
+                else:
+                    quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+            current.append(ch)
+        elif ch == '-' and sql_text.startswith('--', i):
+            end = sql_text.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        elif ch == ';':
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def insert_target(statement):
+    """Return the table an INSERT statement writes to, or None for other statements"""
+    words = statement.split(None, 6)
+    upper = [w.upper() for w in words[:5]]
+    if not upper or upper[0] != 'INSERT':
+        return None
+    idx = 1
+    if len(upper) > 2 and upper[1] == 'OR':
+        idx = 3
+    if len(upper) > idx and upper[idx] == 'INTO' and len(words) > idx + 1:
+        return words[idx + 1].split('(')[0].strip('"`[]').lower()
+    return None
+
+
+def plan_stages(statements, batch_size=BATCH_SIZE):
+    """
+    Group statements into ordered stages of independent batches.
+
+    Non-INSERT statements (DELETE, UPDATE, DDL) are barriers and run alone.
+    A run of INSERTs between barriers is split per target table in
+    first-appearance order, so parent rows (sales) land before child rows
+    (sale_items, payment_history). Batches inside one stage run concurrently.
+    """
+    stages = []
+    pending = {}
+
+    def flush():
+        for table_statements in pending.values():
+            batches = [
+                table_statements[i:i + batch_size]
+                for i in range(0, len(table_statements), batch_size)
+            ]
+            stages.append(batches)
+        pending.clear()
+
+    for statement in statements:
+        table = insert_target(statement)
+        if table is None:
+            flush()
+            stages.append([[statement]])
+        else:
+            pending.setdefault(table, []).append(statement)
+    flush()
+    return stages
+
+
+def batches_from_sql_file(path, batch_size=BATCH_SIZE):
+    """Plan upload stages from a SQL file written by one of the import scripts"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return plan_stages(split_statements(f.read()), batch_size)
+
+
+def dependency_order(conn, tables):
+    """tables ordered parents first, following the foreign keys among them"""
+    parents = {
+        table: {row[2] for row in conn.execute(f"PRAGMA foreign_key_list({table})")} & set(tables) - {table}
+        for table in tables
+    }
+    ordered = []
+    while len(ordered) < len(tables):
+        ready = [t for t in tables if t not in ordered and parents[t] <= set(ordered)]
+        # A foreign-key cycle keeps the given order for what is left
+        ordered.extend(ready or [t for t in tables if t not in ordered])
+    return ordered
+
+
+def batches_from_db(db_path, tables, batch_size=BATCH_SIZE, replace=True):
+    """
+    Plan upload stages that copy tables from a local SQLite file (e.g. after
+    import_excel_data.py). Old rows are deleted children first, before any
+    insert, and rows are inserted parents first, so D1's foreign keys hold
+    throughout. Inserts use INSERT OR IGNORE, which keeps them safe to retry
+    (OR REPLACE would cascade-delete child rows when a parent row is replayed).
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    statements = []
+    try:
+        tables = dependency_order(conn, tables)
+        if replace:
+            statements.extend(f"DELETE FROM {table}" for table in reversed(tables))
+        for table in tables:
+            cursor = conn.execute(f"SELECT * FROM {table} ORDER BY rowid")
+            columns = ', '.join(d[0] for d in cursor.description)
+            for row in cursor:
+                values = ', '.join(sql_literal(v) for v in row)
+                statements.append(f"INSERT OR IGNORE INTO {table} ({columns}) VALUES ({values})")
+    finally:
+        conn.close()
+    return plan_stages(statements, batch_size)
+
+
+def batch_key(stage_idx, batch_idx, statements):
+    """Stable key for a batch (journal entry, stand-in Idempotency-Key): position plus content hash"""
+    digest = hashlib.sha256()
+    digest.update(f"{stage_idx}:{batch_idx}:".encode())
+    for statement in statements:
+        digest.update(statement.encode('utf-8'))
+        digest.update(b';\n')
+    return digest.hexdigest()
+
+
+def load_journal(path):
+    """Read the set of batch keys already applied by a previous run"""
+    if not path or not Path(path).exists():
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def default_endpoint():
+    """Build the Cloudflare D1 query URL from the environment"""
+    account_id = os.environ.get('CLOUDFLARE_ACCOUNT_ID')
+    if not account_id:
+        return None
+    database_id = os.environ.get('D1_DATABASE_ID', D1_DATABASE_ID)
+    return f"{D1_API_BASE}/accounts/{account_id}/d1/database/{database_id}/query"
+
+
+def replay_safe(statements):
+    """Whether applying the batch a second time leaves the same data"""
+    return all(REPLAY_SAFE.match(statement) for statement in statements)
+
+
+async def push_batch(session, endpoint, key, statements, semaphore, max_attempts=MAX_ATTEMPTS):
+    """
+    POST one batch, retrying transient failures with exponential backoff and
+    jitter. When the server may have run the batch (timeout, dropped
+    connection, 5xx) it is only retried if replay_safe(); otherwise the
+    upload stops so a duplicate plain INSERT is never sent.
+    """
+    payload = {'sql': ';\n'.join(statements) + ';', 'params': []}
+    headers = {'Idempotency-Key': key}
+    safe = replay_safe(statements)
+    last_error = None
+    for attempt in range(1, max_attempts + 1):
+        maybe_applied = False
+        async with semaphore:
+            try:
+                async with session.post(endpoint, json=payload, headers=headers) as resp:
+                    body = await resp.json(content_type=None)
+                    if resp.status == 200 and body.get('success'):
+                        return len(statements)
+                    errors = body.get('errors') if isinstance(body, dict) else body
+                    last_error = f"HTTP {resp.status}: {errors}"
+                    if resp.status not in RETRY_STATUSES:
+                        raise UploadError(last_error)
+                    maybe_applied = resp.status not in NOT_APPLIED_STATUSES
+            except aiohttp.ClientConnectorError as e:
+                # Never connected, so nothing was sent
+                last_error = f"{type(e).__name__}: {e}"
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                last_error = f"{type(e).__name__}: {e}"
+                maybe_applied = True
+        if maybe_applied and not safe:
+            raise UploadError(
+                f"batch {key[:12]} may have been applied ({last_error}); not retried because its "
+                f"statements are not safe to replay. Check the target before resuming"
+            )
+        if attempt < max_attempts:
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempt - 1)))
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
+    raise UploadError(f"batch {key[:12]} failed after {max_attempts} attempts: {last_error}")
+
+
+async def upload(stages, endpoint, api_token=None, concurrency=CONCURRENCY,
+                 journal_path=None, max_attempts=MAX_ATTEMPTS):
+    """Push planned stages in order; batches within a stage go out concurrently"""
+    done = load_journal(journal_path)
+    headers = {'Authorization': f"Bearer {api_token}"} if api_token else {}
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    semaphore = asyncio.Semaphore(concurrency)
+    journal = open(journal_path, 'a', encoding='utf-8') if journal_path else None
+
+    pushed_statements = 0
+    pushed_batches = 0
+    skipped_batches = 0
+    try:
+        async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+            for stage_idx, batches in enumerate(stages):
+                tasks = {}
+                for batch_idx, statements in enumerate(batches):
+                    key = batch_key(stage_idx, batch_idx, statements)
+                    if key in done:
+                        skipped_batches += 1
+                        continue
+                    task = asyncio.create_task(
+                        push_batch(session, endpoint, key, statements, semaphore, max_attempts)
+                    )
+                    tasks[task] = key
+                if not tasks:
+                    continue
+                try:
+                    for task in asyncio.as_completed(tasks):
+                        pushed_statements += await task
+                        pushed_batches += 1
+                except UploadError:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+                finally:
+                    if journal:
+                        for task, key in tasks.items():
+                            if task.done() and not task.cancelled() and task.exception() is None:
+                                journal.write(key + '\n')
+                        journal.flush()
+    finally:
+        if journal:
+            journal.close()
+
+    return {
+        'statements': pushed_statements,
+        'batches': pushed_batches,
+        'skipped': skipped_batches,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Local stand-in for the D1 query endpoint
+# ---------------------------------------------------------------------------
+
+def _apply_batch(conn, sql, params, key):
+    """Run one request against the stand-in database inside a single transaction"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if key:
+            seen = conn.execute(
+                f"SELECT 1 FROM {IDEMPOTENCY_TABLE} WHERE key = ?", (key,)
+            ).fetchone()
+            if seen:
+                conn.execute("ROLLBACK")
+                return [{'results': [], 'success': True, 'meta': {'replayed': True}}]
+        results = []
+        statements = split_statements(sql)
+        for statement in statements:
+            cursor = conn.execute(statement, params if len(statements) == 1 else ())
+            rows = cursor.fetchall() if cursor.description else []
+            columns = [d[0] for d in cursor.description] if cursor.description else []
+            results.append({
+                'results': [dict(zip(columns, row)) for row in rows],
+                'success': True,
+                'meta': {'changes': conn.total_changes, 'last_row_id': cursor.lastrowid},
+            })
+        if key:
+            conn.execute(f"INSERT INTO {IDEMPOTENCY_TABLE} (key) VALUES (?)", (key,))
+        conn.execute("COMMIT")
+        return results
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def create_local_app(db_path, latency_ms=0):
+    """Build an aiohttp app that mimics the D1 /query endpoint on top of a SQLite file"""
+    from aiohttp import web
+
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA foreign_keys = ON")  # D1 enforces them
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {IDEMPOTENCY_TABLE} "
+        "(key TEXT PRIMARY KEY, applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    )
+    lock = asyncio.Lock()
+
+    async def query(request):
+        body = await request.json()
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        key = request.headers.get('Idempotency-Key')
+        async with lock:
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    None, _apply_batch, conn, body.get('sql', ''), body.get('params') or [], key
+                )
+            except sqlite3.Error as e:
+                return web.json_response(
+                    {'success': False, 'errors': [{'code': 7500, 'message': str(e)}], 'result': []},
+                    status=400,
+                )
+        return web.json_response({'success': True, 'errors': [], 'messages': [], 'result': results})
+
+    async def close_db(app):
+        conn.close()
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post('/{tail:.*}/query', query)
+    app.router.add_post('/query', query)
+    app.on_cleanup.append(close_db)
+    return app
+
+
+def serve_local(db_path, host='127.0.0.1', port=8787, latency_ms=0):
+    """Run the stand-in D1 endpoint until interrupted"""
+    from aiohttp import web
+
+    print(f"🧪 Local D1 stand-in on http://{host}:{port}/query → {db_path}")
+    web.run_app(create_local_app(db_path, latency_ms), host=host, port=port, print=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push import batches to a D1-compatible HTTP endpoint")
+    parser.add_argument('sql_files', nargs='*', help="SQL files written by the import scripts")
+    parser.add_argument('--from-db', help="Local SQLite file to copy tables from (after import_excel_data.py)")
+    parser.add_argument('--tables', default='inventory,dispatch_records,quality_check',
+                        help="Tables to copy with --from-db")
+    parser.add_argument('--endpoint', default=os.environ.get('D1_QUERY_ENDPOINT') or default_endpoint(),
+                        help="D1 query URL (default: built from CLOUDFLARE_ACCOUNT_ID)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+    parser.add_argument('--journal', help="File recording applied batch keys so reruns resume")
+    parser.add_argument('--serve', metavar='DB_PATH', help="Run the local stand-in endpoint instead")
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--latency-ms', type=int, default=0, help="Simulated round trip for --serve")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_local(args.serve, port=args.port, latency_ms=args.latency_ms)
+        return
+
+    if not args.endpoint:
+        print("❌ Error: no endpoint. Set CLOUDFLARE_ACCOUNT_ID or pass --endpoint")
+        sys.exit(1)
+
+    stages = []
+    for sql_file in args.sql_files:
+        if not Path(sql_file).exists():
+            print(f"❌ Error: SQL file not found at {sql_file}")
+            sys.exit(1)
+        stages.extend(batches_from_sql_file(sql_file, args.batch_size))
+    if args.from_db:
+        tables = [t.strip() for t in args.tables.split(',') if t.strip()]
+        stages.extend(batches_from_db(args.from_db, tables, args.batch_size))
+    if not stages:
+        print("No batches to upload")
+        return
+
+    total_batches = sum(len(batches) for batches in stages)
+    print(f"📦 Planned {total_batches} batches in {len(stages)} stages "
+          f"(concurrency {args.concurrency})")
+
+    started = time.perf_counter()
+    try:
+        summary = asyncio.run(upload(
+            stages, args.endpoint,
+            api_token=os.environ.get('CLOUDFLARE_API_TOKEN'),
+            concurrency=args.concurrency,
+            journal_path=args.journal,
+            max_attempts=args.max_attempts,
+        ))
+    except UploadError as e:
+        print(f"❌ Upload failed: {e}")
+        if args.journal:
+            print(f"   Rerun with --journal {args.journal} to resume")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Upload Complete in {elapsed:.2f}s:")
+    print(f"   • Statements: {summary['statements']}")
+    print(f"   • Batches: {summary['batches']}")
+    print(f"   • Skipped (already applied): {summary['skipped']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Dispatch Reconciliation for AxelGuard Dashboard
+Computes dispatched-vs-ordered quantities per order and product with one
+grouped query over dispatch_records plus a hash join against order_items in
+Python, recomputes orders.dispatch_status, brings order_items.scanned_count
+in line with the order_item_serials junction rows and reports the items
+whose dispatched count disagrees with scanned_count. Dispatch order ids are
+sales order ids, so dispatches for sales that have no orders row are skipped
+rather than reported; only ids found in neither orders nor sales are
+unmatched. Can be limited to the orders touched by an import.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from backfill_order_item_serials import SERIAL_COUNT_SQL, sync_scanned_counts
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+
+TOUCHED_TABLE = "temp._reconcile_orders"
+
+
+def product_key(name):
+    """Dispatch screens match inventory.model_name to order_items.product_name"""
+    return ' '.join(str(name or '').split()).casefold()
+
+
+def dispatch_status(dispatched, ordered):
+    """
+    orders.dispatch_status values from migration 0012 (Pending, Partial,
+    Completed); Completed once dispatched >= orders.total_items, the
+    comparison the Worker's grouped dispatch list makes.
+    """
+    if dispatched <= 0:
+        return 'Pending'
+    if ordered and dispatched < ordered:
+        return 'Partial'
+    return 'Completed'
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def _scope(conn, order_ids):
+    """Load the touched order ids into a temp table; returns the JOIN clause to apply"""
+    if order_ids is None:
+        return "", ""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _reconcile_orders (order_id TEXT PRIMARY KEY)")
+    conn.execute(f"DELETE FROM {TOUCHED_TABLE}")
+    conn.executemany(
+        f"INSERT OR IGNORE INTO {TOUCHED_TABLE} (order_id) VALUES (?)",
+        ((str(order_id),) for order_id in order_ids if order_id not in (None, ''))
+    )
+    return (f"JOIN {TOUCHED_TABLE} t ON t.order_id = o.order_id",
+            f"JOIN {TOUCHED_TABLE} t ON t.order_id = d.order_id")
+
+
+def reconcile_orders(conn, order_ids=None, dry_run=False):
+    """
+    Reconcile every order (order_ids=None) or only the given ones.
+
+    Returns a summary dict with counts of updated orders/items, dispatches
+    for sales without an orders row, dispatches whose order id is unknown or
+    that exceed the ordered product quantity, and the order items whose
+    dispatched count differs from scanned_count.
+    """
+    order_join, dispatch_join = _scope(conn, order_ids)
+    has_serials = _table_exists(conn, 'order_item_serials')
+
+    # Build side: orders and their items, keyed for the hash join
+    orders = {}
+    for order_id, total_items, status in conn.execute(f'''
+        SELECT o.order_id, COALESCE(o.total_items, 0), o.dispatch_status
+        FROM orders o {order_join}
+    '''):
+        orders[order_id] = {'total_items': total_items, 'status': status, 'items': []}
+
+    # scanned_count as it stands after the sync below (the junction-row count)
+    scanned_sql = f"({SERIAL_COUNT_SQL})" if has_serials else "COALESCE(order_items.scanned_count, 0)"
+    items_by_product = {}
+    for item_id, order_id, product_name, quantity, scanned in conn.execute(f'''
+        SELECT order_items.id, order_items.order_id, order_items.product_name,
+               COALESCE(order_items.quantity, 0), {scanned_sql}
+        FROM order_items
+        JOIN orders o ON o.order_id = order_items.order_id {order_join}
+        ORDER BY order_items.id
+    '''):
+        item = {'id': item_id, 'order_id': order_id, 'product': product_name,
+                'quantity': quantity, 'scanned': scanned, 'dispatched': 0}
+        orders[order_id]['items'].append(item)
+        items_by_product.setdefault((order_id, product_key(product_name)), []).append(item)
+
+    # Dispatch order ids are sales order ids (archived sales included)
+    sales_tables = [name for name in ('sales', 'sales_archive') if _table_exists(conn, name)]
+    known_sale = " OR ".join(
+        f"EXISTS (SELECT 1 FROM {name} s WHERE s.order_id = d.order_id)" for name in sales_tables
+    ) or "0"
+    # Probe side: one grouped pass over dispatch_records per order and model
+    dispatched_per_order = {}
+    sales_only = 0
+    unmatched = 0
+    unmatched_products = 0
+    for order_id, model_name, dispatched, is_sale in conn.execute(f'''
+        SELECT d.order_id, i.model_name, COUNT(*), {known_sale}
+        FROM dispatch_records d {dispatch_join}
+        LEFT JOIN inventory i ON i.id = d.inventory_id
+        WHERE d.order_id IS NOT NULL AND d.order_id != ''
+        GROUP BY d.order_id, i.model_name
+    '''):
+        if order_id not in orders:
+            if is_sale:
+                sales_only += dispatched
+            else:
+                unmatched += dispatched
+            continue
+        dispatched_per_order[order_id] = dispatched_per_order.get(order_id, 0) + dispatched
+        remaining = dispatched
+        for item in items_by_product.get((order_id, product_key(model_name)), ()):
+            take = min(remaining, max(item['quantity'] - item['dispatched'], 0))
+            item['dispatched'] += take
+            remaining -= take
+            if not remaining:
+                break
+        unmatched_products += remaining
+
+    order_updates = []
+    count_mismatches = []
+    for order_id, order in orders.items():
+        ordered = order['total_items'] or sum(item['quantity'] for item in order['items'])
+        status = dispatch_status(dispatched_per_order.get(order_id, 0), ordered)
+        if status != order['status']:
+            order_updates.append((status, order_id))
+        count_mismatches.extend(item for item in order['items'] if item['dispatched'] != item['scanned'])
+
+    # scanned_count follows the junction rows (see backfill_order_item_serials.py)
+    items_updated = 0
+    scope = f"AND order_id IN (SELECT order_id FROM {TOUCHED_TABLE})" if order_ids is not None else ""
+    if dry_run:
+        if has_serials:
+            items_updated = conn.execute(f'''
+                SELECT COUNT(*) FROM order_items
+                WHERE COALESCE(scanned_count, 0) != ({SERIAL_COUNT_SQL}) {scope}
+            ''').fetchone()[0]
+    else:
+        with conn:
+            if has_serials:
+                items_updated = sync_scanned_counts(conn, scope)
+            conn.executemany(
+                "UPDATE orders SET dispatch_status = ?, updated_at = CURRENT_TIMESTAMP WHERE order_id = ?",
+                order_updates
+            )
+
+    return {
+        'orders': len(orders),
+        'orders_updated': len(order_updates),
+        'items_updated': items_updated,
+        'sales_only_dispatches': sales_only,
+        'unmatched_order_dispatches': unmatched,
+        'unmatched_product_dispatches': unmatched_products,
+        'count_mismatches': count_mismatches,
+    }
+
+
+def print_summary(summary, dry_run=False, show=10):
+    """Print a reconciliation summary in the importers' format"""
+    verb = "Would update" if dry_run else "Updated"
+    print(f"\n✅ Dispatch Reconciliation Complete:")
+    print(f"   • Orders checked: {summary['orders']}")
+    print(f"   • {verb} dispatch_status: {summary['orders_updated']} orders")
+    print(f"   • {verb} scanned_count: {summary['items_updated']} order items")
+    print(f"   • Dispatches for sales without an orders row (skipped): {summary['sales_only_dispatches']}")
+    print(f"   • Dispatches with an unknown order id: {summary['unmatched_order_dispatches']}")
+    print(f"   • Dispatches beyond ordered product quantity: {summary['unmatched_product_dispatches']}")
+    mismatches = summary['count_mismatches']
+    print(f"   • Items where dispatches and scanned_count disagree: {len(mismatches)}")
+    for item in mismatches[:show]:
+        print(f"      - item {item['id']} ({item['order_id']}, {item['product']}): "
+              f"dispatched={item['dispatched']}, scanned_count={item['scanned']}")
+    if len(mismatches) > show:
+        print(f"      ... and {len(mismatches) - show} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile orders/order_items with dispatch_records")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--orders', help="Comma-separated order ids (default: all orders)")
+    parser.add_argument('--dry-run', action='store_true', help="Report changes without writing")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    order_ids = None
+    if args.orders:
+        order_ids = [o.strip() for o in args.orders.split(',') if o.strip()]
+
+    conn = sqlite3.connect(args.db)
+    try:
+        started = time.perf_counter()
+        summary = reconcile_orders(conn, order_ids, args.dry_run)
+        print_summary(summary, args.dry_run)
+        print(f"   • Time: {time.perf_counter() - started:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Streaming Excel Export for AxelGuard Dashboard
+Writes sales, inventory and leads reports straight from the D1 SQLite file
+into openpyxl write-only workbooks, so full-history exports run in bounded
+memory. Column layouts are the ones the import scripts read:
+  inventory → import_excel_data.py   (Inventory / Dispatch / QC Status sheets)
+  sales     → import-full-sales-db.py
+  leads     → import-leads.py
+
+The inventory workbook round-trips through import_excel_data.py: after the
+sheets' fixed columns it adds the ones the importer reads back by header
+name when present (inventory Status and Order Id; dispatch Cust Mobile,
+Cust City and Dispatched By; QC Checked By and the stored Test Results,
+empty when NULL). Row ids and created_at / updated_at are reassigned on
+import, and the leads Date column (created_at) is not read back.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+FETCH_ROWS = 2000
+
+INVENTORY_HEADERS = [
+    'S. No', 'In Date', 'Model Name', 'Device Serial No', 'Dispatch Date',
+    'Cust Code', 'Sale Date', 'Customer Name', 'Cust City', 'Cust Mobile',
+    'Dispatch Reason', 'Warranty Provide', 'Old Serial No', 'License Renew Time',
+    'User ID', 'Password', 'Account Activation Date', 'Account Expiry Date',
+    'Status', 'Order Id',
+]
+INVENTORY_DATE_COLUMNS = {1, 4, 6, 13, 16, 17}
+
+DISPATCH_HEADERS = [
+    'S. No', 'Device Serial No', 'Device Name', 'QC Status', 'Dispatch Reason',
+    'Order Id', 'Cust Code', 'Customer Name', 'Company Name', 'Dispatch Date',
+    'Courier Company', 'Dispatch Method', 'Tracking ID',
+    'Cust Mobile', 'Cust City', 'Dispatched By',
+]
+DISPATCH_DATE_COLUMNS = {9}
+
+QC_HEADERS = [
+    'S. No', 'QC Date', 'Serial Number', 'Device Type', 'Camera Quality',
+    'SD Connectivity', 'All Ch Status', 'Network Connectivity', 'GPS QC',
+    'SIM Slot QC', 'Online QC', 'Monitor QC', 'Final QC Status',
+    'IP Address Update', 'Final Remarks',
+    'Checked By', 'Test Results',
+]
+QC_DATE_COLUMNS = {1}
+
+# Labels import_excel_data.py uses when folding QC columns into test_results,
+# in the order it writes them, with the QC sheet column each one came from.
+QC_TEST_LABELS = [
+    ('Camera', 4), ('SD Card', 5), ('All Channels', 6), ('Network', 7),
+    ('GPS', 8), ('SIM Slot', 9), ('Online', 10), ('Monitor', 11), ('IP Address', 13),
+]
+
+# import-full-sales-db.py reads columns by position; None marks columns it ignores
+SALES_WIDTH = 47
+SALES_HEADERS = [None] * SALES_WIDTH
+for _idx, _name in {
+    0: 'S. No', 2: 'Order Id', 3: 'Sale Date', 4: 'Cust Code', 5: 'Employee Name',
+    6: 'Company Name', 7: 'Customer Name', 8: 'Mobile Number', 9: 'Bill Amount',
+    10: 'Amount Received', 11: 'Balance Payment', 12: 'Round Off', 13: 'With Bill',
+    43: 'Courier', 44: 'Total Sale Amount', 45: 'Payment Reference', 46: 'Remarks',
+}.items():
+    SALES_HEADERS[_idx] = _name
+SALES_PRODUCT_SLOTS = [
+    (17, 18, 19, 20),  # P1
+    (22, 23, 24, 25),  # P2
+    (27, 28, 29, 30),  # P3
+    (31, 32, 33, 34),  # P4
+    (35, 36, 37, 38),  # P5
+    (39, 40, 41, 42),  # P6
+]
+for _n, (_code, _name, _qty, _rate) in enumerate(SALES_PRODUCT_SLOTS, start=1):
+    SALES_HEADERS[_code] = f'P{_n} Code'
+    SALES_HEADERS[_name] = f'P{_n} Name'
+    SALES_HEADERS[_qty] = f'P{_n} Qty'
+    SALES_HEADERS[_rate] = f'P{_n} Rate'
+
+LEADS_HEADERS = [
+    'Cust Code', 'Date', 'Customer Name', 'Location', 'Mobile Number',
+    'Follow Up Person', 'Remarks', 'Cust Email id', 'Company Name',
+    'GST Number', 'Company Address',
+]
+
+
+def to_datetime(value):
+    """Parse a stored DATE/DATETIME string back into a datetime for Excel"""
+    if not value or isinstance(value, datetime):
+        return value or None
+    text = str(value).strip()
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text[:19], fmt)
+        except ValueError:
+            continue
+    return text
+
+
+def parse_test_results(test_results):
+    """Split an imported test_results string back into its QC sheet columns"""
+    values = {}
+    if not test_results or test_results == 'No test details':
+        return values
+    labels = dict(QC_TEST_LABELS)
+    for part in test_results.split(' | '):
+        label, sep, value = part.partition(': ')
+        if sep and label in labels:
+            values[labels[label]] = value
+    return values
+
+
+class SheetWriter:
+    """Appends rows to a write-only worksheet, styling the header and date columns"""
+
+    def __init__(self, wb, title, headers, date_columns=(), date_format='yyyy-mm-dd'):
+        self.ws = wb.create_sheet(title)
+        self.date_columns = set(date_columns)
+        self.date_format = date_format
+        self.rows = 0
+        bold = Font(bold=True)
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(self.ws, value=header)
+            cell.font = bold
+            header_cells.append(cell)
+        self.ws.append(header_cells)
+
+    def append(self, values):
+        if self.date_columns:
+            values = list(values)
+            for idx in self.date_columns:
+                value = to_datetime(values[idx])
+                if isinstance(value, datetime):
+                    cell = WriteOnlyCell(self.ws, value=value)
+                    cell.number_format = self.date_format
+                    value = cell
+                values[idx] = value
+        self.ws.append(values)
+        self.rows += 1
+
+
+def stream(conn, sql, params=()):
+    """Yield rows from a query in FETCH_ROWS chunks"""
+    cursor = conn.execute(sql, params)
+    while True:
+        chunk = cursor.fetchmany(FETCH_ROWS)
+        if not chunk:
+            return
+        yield from chunk
+
+
+def write_inventory_workbook(conn, path):
+    """Inventory / Dispatch / QC Status workbook in import_excel_data.py's layout"""
+    wb = openpyxl.Workbook(write_only=True)
+    counts = {}
+
+    sheet = SheetWriter(wb, 'Inventory', INVENTORY_HEADERS, INVENTORY_DATE_COLUMNS)
+    for row in stream(conn, '''
+        SELECT serial_number, in_date, model_name, device_serial_no, dispatch_date,
+               cust_code, sale_date, customer_name, cust_city, cust_mobile,
+               dispatch_reason, warranty_provide, old_serial_no, license_renew_time,
+               user_id, password, account_activation_date, account_expiry_date,
+               status, order_id
+        FROM inventory ORDER BY id
+    '''):
+        sheet.append(row)
+    counts['Inventory'] = sheet.rows
+
+    sheet = SheetWriter(wb, 'Dispatch', DISPATCH_HEADERS, DISPATCH_DATE_COLUMNS)
+    for row in stream(conn, '''
+        SELECT d.serial_number, d.device_serial_no, i.model_name, d.qc_status,
+               d.dispatch_reason, d.order_id, d.customer_code, d.customer_name,
+               d.company_name, d.dispatch_date, d.courier_name, d.dispatch_method,
+               d.tracking_number, d.customer_mobile, d.customer_city, d.dispatched_by
+        FROM dispatch_records d
+        LEFT JOIN inventory i ON i.id = d.inventory_id
+        ORDER BY d.id
+    '''):
+        sheet.append(row)
+    counts['Dispatch'] = sheet.rows
+
+    sheet = SheetWriter(wb, 'QC Status', QC_HEADERS, QC_DATE_COLUMNS)
+    for (s_no, check_date, serial, model, test_results, pass_fail, notes, checked_by,
+         camera, sd, all_ch, network, gps, sim, online, monitor, ip) in stream(conn, '''
+        SELECT q.serial_number, q.check_date, q.device_serial_no, i.model_name,
+               q.test_results, q.pass_fail, q.notes, q.checked_by,
+               q.camera_quality, q.sd_connect, q.all_ch_status, q.network, q.gps,
+               q.sim_slot, q.online, q.monitor, q.ip_address
+        FROM quality_check q
+        LEFT JOIN inventory i ON i.id = q.inventory_id
+        ORDER BY q.id
+    '''):
+        values = [None] * len(QC_HEADERS)
+        values[0] = s_no
+        values[1] = check_date
+        values[2] = serial
+        values[3] = model
+        for idx, value in parse_test_results(test_results).items():
+            values[idx] = value
+        # Dedicated columns (migration 0018) win over the folded test_results text
+        for idx, value in ((4, camera), (5, sd), (6, all_ch), (7, network), (8, gps),
+                           (9, sim), (10, online), (11, monitor), (13, ip)):
+            if value:
+                values[idx] = value
+        values[12] = pass_fail if pass_fail in ('Pass', 'Fail') else None
+        values[14] = notes
+        values[15] = checked_by
+        values[16] = test_results
+        sheet.append(values)
+    counts['QC Status'] = sheet.rows
+
+    wb.save(path)
+    return counts
+
+
+def write_sales_workbook(conn, path, since=None):
+    """Sales sheet in import-full-sales-db.py's positional layout (one row per order)"""
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = SheetWriter(wb, 'Sales', SALES_HEADERS, {3}, 'yyyy-mm-dd hh:mm:ss')
+
+    where = "WHERE DATE(s.sale_date) >= DATE(?)" if since else ""
+    rows = stream(conn, f'''
+        SELECT s.id, s.order_id, s.sale_date, s.customer_code, s.employee_name,
+               s.company_name, s.customer_name, s.customer_contact, s.subtotal,
+               s.amount_received, s.balance_amount, s.total_amount, s.sale_type,
+               s.courier_cost, s.payment_reference, s.remarks,
+               si.product_code, si.product_name, si.quantity, si.unit_price
+        FROM sales s
+        LEFT JOIN sale_items si ON si.order_id = s.order_id
+        {where}
+        ORDER BY s.sale_date, s.id, si.id
+    ''', (since,) if since else ())
+
+    for s_no, (_, group) in enumerate(groupby(rows, key=lambda r: r[0]), start=1):
+        items = list(group)
+        (_, order_id, sale_date, customer_code, employee_name, company_name,
+         customer_name, contact, subtotal, received, balance, total, sale_type,
+         courier, payment_ref, remarks) = items[0][:16]
+        subtotal = subtotal or 0
+        courier = courier or 0
+        values = [None] * SALES_WIDTH
+        values[0] = s_no
+        values[2] = order_id
+        values[3] = sale_date
+        values[4] = customer_code
+        values[5] = employee_name
+        values[6] = company_name
+        values[7] = customer_name
+        values[8] = contact
+        values[9] = subtotal
+        values[10] = received or 0
+        values[11] = balance or 0
+        # The importer rebuilds total = subtotal + courier + round off
+        values[12] = round((total or 0) - subtotal - courier, 2)
+        values[13] = 'Yes' if sale_type == 'With' else 'No'
+        values[43] = courier
+        values[44] = subtotal
+        values[45] = payment_ref
+        values[46] = remarks
+        products = [item[16:] for item in items if item[17]]
+        for (code_idx, name_idx, qty_idx, rate_idx), (code, name, qty, rate) in zip(
+                SALES_PRODUCT_SLOTS, products):
+            values[code_idx] = code
+            values[name_idx] = name
+            values[qty_idx] = qty
+            values[rate_idx] = rate
+        if len(products) > len(SALES_PRODUCT_SLOTS):
+            print(f"  ⚠️  {order_id}: {len(products)} items, only the first "
+                  f"{len(SALES_PRODUCT_SLOTS)} fit the sheet layout")
+        sheet.append(values)
+
+    wb.save(path)
+    return {'Sales': sheet.rows}
+
+
+def write_leads_workbook(conn, path):
+    """Leads sheet in import-leads.py's layout"""
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = SheetWriter(wb, 'Leads', LEADS_HEADERS, {1})
+    for (code, created_at, name, location, mobile, email, company, gst,
+         address) in stream(conn, '''
+        SELECT customer_code, created_at, customer_name, location, mobile_number,
+               email, company_name, gst_number, complete_address
+        FROM leads ORDER BY id
+    '''):
+        # Follow Up Person / Remarks are not stored; their cells stay empty
+        sheet.append([code, created_at, name, location, mobile, None, None,
+                      email, company, gst, address])
+    wb.save(path)
+    return {'Leads': sheet.rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream D1 data into import-compatible Excel files")
+    parser.add_argument('report', choices=['inventory', 'sales', 'leads'])
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--out', help="Output .xlsx path")
+    parser.add_argument('--current-month', action='store_true', help="Sales from the 1st of this month")
+    parser.add_argument('--since', help="Sales on or after this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    stamp = datetime.now().strftime('%Y-%m-%d')
+    out = args.out or f"{args.report.capitalize()}_{stamp}.xlsx"
+    since = args.since
+    if args.current_month:
+        since = datetime.now().strftime('%Y-%m-01')
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        if args.report == 'inventory':
+            counts = write_inventory_workbook(conn, out)
+        elif args.report == 'sales':
+            counts = write_sales_workbook(conn, out, since)
+        else:
+            counts = write_leads_workbook(conn, out)
+    finally:
+        conn.close()
+
+    print(f"✅ Exported {args.report} to {out} in {time.perf_counter() - started:.2f}s")
+    for sheet, rows in counts.items():
+        print(f"   • {sheet}: {rows} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """
 Device Management System - Complete Code Flowchart Generator
-Generates a comprehensive PDF flowchart of the entire webapp structure
+Generates a comprehensive PDF flowchart of the entire webapp structure.
+Record counts come from the live D1 SQLite file and the endpoint list is
+extracted from src/index.tsx; each section's flowables are cached by the
+hash of its inputs, so only sections whose inputs changed are rebuilt.
 """
 
 from reportlab.lib import colors
@@ -10,71 +13,373 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from reportlab.pdfgen import canvas
+import argparse
 import datetime
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import time
+from pathlib import Path
 
-def create_flowchart_pdf():
-    """Generate comprehensive flowchart PDF"""
-    
-    # Create PDF with landscape orientation for better flowchart viewing
-    filename = "/home/user/webapp/Device_Management_System_Flowchart.pdf"
-    doc = SimpleDocTemplate(
-        filename,
-        pagesize=landscape(A4),
-        rightMargin=30,
-        leftMargin=30,
-        topMargin=30,
-        bottomMargin=30
-    )
-    
-    # Container for PDF elements
-    elements = []
-    
-    # Define styles
+from integrity_audit import run_audit, integrity_pct, summarize
+
+ROOT = Path(__file__).resolve().parent
+OUTPUT_FILE = "/home/user/webapp/Device_Management_System_Flowchart.pdf"
+INDEX_TSX = ROOT / 'src' / 'index.tsx'
+MIGRATIONS_DIR = ROOT / 'migrations'
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+CACHE_DIR = os.environ.get(
+    'AXELGUARD_FLOWCHART_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'axelguard', 'flowchart')
+)
+
+# One pass over index.tsx: an optional comment line directly above each
+# route registration, then the method and path.
+ROUTE_PATTERN = re.compile(
+    r"(?:^[ \t]*//[ \t]*(?P<comment>[^\n]*)\n)?"
+    r"^[ \t]*app\.(?P<method>get|post|put|delete|patch)\(\s*['\"`](?P<path>[^'\"`]+)['\"`]",
+    re.MULTILINE
+)
+
+DB_SCHEMA = [
+    ['Table', 'Key Columns', 'Purpose'],
+    ['inventory', 'serial_no (PK), model_name, status, purchase_date', 'Device inventory management'],
+    ['dispatch_records', 'id (PK), order_id (FK), device_serial_no, dispatch_date', 'Track dispatched devices'],
+    ['orders', 'order_id (PK), customer_name, total_items, order_date', 'Customer orders'],
+    ['order_items', 'id (PK), order_id (FK), product_name, quantity', 'Order line items'],
+    ['sales', 'order_id (PK), customer_name, total_amount, sale_date', 'Sales invoices'],
+    ['sale_items', 'id (PK), order_id (FK), product_name, quantity, price', 'Sale line items'],
+    ['quality_check', 'id (PK), device_serial_no, pass_fail, test_results (JSON)', 'QC records'],
+    ['tracking_details', 'id (PK), order_id (FK), courier_partner, tracking_id', 'Courier tracking']
+]
+
+RELATIONSHIPS_HEADER = ['Relationship', 'Foreign Key', 'Integrity']
+
+INVENTORY_FLOW = [
+    ['Step', 'Action', 'API Call', 'Result'],
+    ['1', 'User uploads Excel file', 'POST /api/inventory/bulk', 'Devices added to inventory table'],
+    ['2', 'System validates data', 'Check duplicates, format', 'Skip duplicates, log errors'],
+    ['3', 'Insert to database', 'INSERT INTO inventory', 'Records created with status "In Stock"'],
+    ['4', 'Display in UI', 'GET /api/inventory', 'Show all devices in table'],
+    ['5', 'User can edit/delete', 'PUT/DELETE /api/inventory/:serial', 'Update or remove records']
+]
+
+ORDER_FLOW = [
+    ['Step', 'Action', 'API Call', 'Database Impact'],
+    ['1', 'Create order', 'POST /api/orders', 'orders + order_items tables'],
+    ['2', 'Select order for dispatch', 'GET /api/orders/:orderId', 'Fetch order details'],
+    ['3', 'Scan devices', 'GET /api/inventory/:serial', 'Check device availability'],
+    ['4', 'Match products', 'Compare model_name with product_name', 'Validate device matches order'],
+    ['5', 'Complete dispatch', 'POST /api/dispatch', 'dispatch_records created, inventory.status = "Dispatched"'],
+    ['6', 'Update order status', 'Compare dispatched vs total_items', 'Status: Completed/Pending'],
+    ['7', 'Add tracking', 'POST /api/tracking-details', 'tracking_details record created']
+]
+
+QC_FLOW = [
+    ['Step', 'Action', 'Tests Performed', 'Result Storage'],
+    ['1', 'Scan device serial', 'GET /api/inventory/:serial', 'Fetch device info'],
+    ['2', 'Perform QC tests', 'Camera, SD, Network, GPS, SIM, Online', 'Test results (JSON)'],
+    ['3', 'Record results', 'POST /api/quality-check', 'quality_check table'],
+    ['4', 'Pass/Fail status', 'Determine overall status', 'pass_fail field'],
+    ['5', 'View QC history', 'GET /api/quality-check/:serial', 'Display all QC records']
+]
+
+FRONTEND = [
+    ['Component', 'Modal/Page', 'Key Functions', 'User Actions'],
+    ['Dashboard', 'Main Page', 'Display stats, navigation', 'View overview, navigate sections'],
+    ['Inventory Modal', 'addInventoryModal', 'displayInventoryData(), editInventory()', 'Add, edit, delete devices'],
+    ['Bulk Upload', 'uploadInventoryModal', 'handleFileUpload(), uploadInventory()', 'Import Excel, process data'],
+    ['Orders Modal', 'addOrderModal', 'displayOrders(), editOrder()', 'Create, edit, delete orders'],
+    ['Dispatch Modal', 'dispatchModal', 'scanDevice(), displayOrderProducts()', 'Scan devices, dispatch items'],
+    ['QC Modal', 'qcModal', 'performQC(), displayQCRecords()', 'Run tests, view QC history'],
+    ['Sales Modal', 'salesModal', 'createSale(), viewSaleDetails()', 'Create invoices, view sales'],
+    ['Tracking Modal', 'trackingDetailsModal', 'submitTrackingDetails(), displayTrackingRecords()', 'Add tracking, view courier info'],
+    ['Sale Details', 'saleDetailsModal', 'viewTrackingSaleDetails()', 'View order details (nested modal)']
+]
+
+JS_FUNCTIONS = [
+    ['Category', 'Functions', 'Purpose'],
+    ['Inventory', 'displayInventoryData(), addInventory(), editInventory(), deleteInventory()', 'CRUD operations for inventory'],
+    ['Orders', 'displayOrders(), addOrder(), editOrder(), deleteOrder()', 'Order management'],
+    ['Dispatch', 'openDispatchModal(), scanDevice(), completeDispatch(), displayScannedDevices()', 'Device dispatch process'],
+    ['QC', 'openQCModal(), performQC(), displayQCRecords()', 'Quality control testing'],
+    ['Sales', 'createSale(), viewSaleDetails(), editSale(), deleteSale()', 'Sales invoice management'],
+    ['Tracking', 'submitTrackingDetails(), displayTrackingRecords(), deleteTrackingRecord()', 'Courier tracking'],
+    ['Modals', 'openModal(), closeModal(), viewTrackingSaleDetails()', 'Modal window management'],
+    ['Utilities', 'formatDate(), calculateWeight(), exportToExcel()', 'Helper functions']
+]
+
+FEATURES = [
+    ['Feature', 'Implementation Details', 'Technical Notes'],
+    ['Nested Modals', 'Sale details (z-index: 10001) opens on top of tracking modal (z-index: 10000)', 'Preserves user context, prevents losing place'],
+    ['Device Scanning', 'Matches by model_name/product_name comparison, not serial numbers', 'Real-time remaining count updates'],
+    ['Dispatch Status', 'Compares dispatched_items vs total_items from orders table', 'Shows "Completed" (green) or "Pending" (yellow)'],
+    ['Weight Calculation', 'Fetches sale_items, looks up product catalog, multiplies weight × quantity', 'Async calculation for tracking report'],
+    ['Bulk Upload', 'Excel import with duplicate detection, error handling', 'Skips duplicates, logs errors'],
+    ['Export Excel', 'Generates Excel file with all inventory data', 'Uses XLSX library'],
+    ['QC JSON Storage', 'Stores test results as JSON in test_results field', 'Flexible schema for various tests'],
+    ['Tracking Integration', 'Links to sales table, fetches courier_cost/total_amount', 'Shows actual price in report'],
+    ['Product Matching', 'Warns when scanned device not in order', 'Yellow warning banner displayed'],
+    ['Status Colors', 'Green (complete), Yellow (pending), Red (failed)', 'Visual feedback for users']
+]
+
+COMPLETE_FLOW = [
+    ['Layer', 'Component', 'Flow', 'Next Step'],
+    ['Frontend', 'User Interface', 'User interacts with modals/forms', '→ JavaScript Event'],
+    ['JavaScript', 'Event Handler', 'Capture user action (click, submit, scan)', '→ API Call'],
+    ['API Layer', 'Axios HTTP Request', 'Send request to backend endpoint', '→ Hono Route'],
+    ['Backend', 'Hono Route Handler', 'Process request, validate data', '→ Database Query'],
+    ['Database', 'D1 SQLite Query', 'Execute SQL (SELECT, INSERT, UPDATE, DELETE)', '→ Return Results'],
+    ['Backend', 'Response Formatting', 'Format data as JSON response', '→ Send to Frontend'],
+    ['JavaScript', 'Response Handler', 'Process API response, handle errors', '→ Update UI'],
+    ['Frontend', 'UI Update', 'Refresh table, close modal, show success', '→ User Sees Result']
+]
+
+DISPATCH_EXAMPLE = [
+    ['#', 'Action', 'Code Location', 'Result'],
+    ['1', 'User clicks "Dispatch" button', 'openDispatchModal(orderId)', 'Modal opens, loads order'],
+    ['2', 'Fetch order details', 'GET /api/orders/:orderId', 'selectedOrder populated'],
+    ['3', 'Display products to dispatch', 'displayOrderProducts()', 'Shows product list with remaining count'],
+    ['4', 'User scans device barcode', 'scanDevice()', 'Input field captures serial number'],
+    ['5', 'Fetch device from inventory', 'GET /api/inventory/:serial', 'Device data retrieved'],
+    ['6', 'Match with order products', 'Compare model_name === product_name', 'Validates device matches order'],
+    ['7', 'Add to scanned list', 'scannedDevices.push()', 'Device added, UI updates'],
+    ['8', 'Update remaining count', 'quantity - scannedForThisProduct', 'Shows decreasing count'],
+    ['9', 'Complete dispatch', 'POST /api/dispatch', 'Creates dispatch_records'],
+    ['10', 'Update inventory status', 'UPDATE inventory SET status="Dispatched"', 'Device marked as dispatched'],
+    ['11', 'Recalculate order status', 'Compare dispatched vs total_items', 'Status: Completed/Pending'],
+    ['12', 'Refresh UI', 'displayOrders(), closeModal()', 'User sees updated data']
+]
+
+ARCHITECTURE = [
+    ['Component', 'Technology', 'Details'],
+    ['Backend Framework', 'Hono v4.0', 'Lightweight web framework for Cloudflare Workers'],
+    ['Runtime', 'Cloudflare Workers', 'Edge runtime with global distribution'],
+    ['Database', 'Cloudflare D1', 'SQLite-based distributed database, --local mode for dev'],
+    ['Frontend Framework', 'Vanilla JavaScript', 'No framework, direct DOM manipulation'],
+    ['CSS Framework', 'TailwindCSS (CDN)', 'Utility-first CSS via CDN'],
+    ['HTTP Client', 'Axios (CDN)', 'Promise-based HTTP requests'],
+    ['Icons', 'Font Awesome 6', 'Icon library via CDN'],
+    ['Build Tool', 'Vite', 'Fast build tool with HMR'],
+    ['Development Server', 'Wrangler Pages Dev', 'Local development with D1 --local'],
+    ['Process Manager', 'PM2', 'Service management in sandbox'],
+    ['Deployment', 'Cloudflare Pages', 'Edge deployment with global CDN']
+]
+
+RECENT_CHANGES = [
+    ['Feature', 'Problem Solved', 'Implementation', 'Status'],
+    ['Tracking Details', 'No courier tracking system', 'New table, API endpoints, split-screen modal', '✅ Complete'],
+    ['Nested Modals', 'Sale details closed tracking modal', 'Z-index layering (10001 over 10000)', '✅ Complete'],
+    ['Weight Column', 'No weight in tracking report', 'Async calculation from sale_items × catalog', '✅ Complete'],
+    ['Device Scanning', 'Count not decreasing', 'Fixed matching: model_name === product_name', '✅ Complete'],
+    ['Remaining Count', 'Confusing display', 'Added "X Remaining" badge with color coding', '✅ Complete'],
+    ['Notes Column', 'JSON data visible', 'Removed Notes column from table', '✅ Complete'],
+    ['Record Deletion', 'Unwanted records 1816-1820', 'DELETE FROM dispatch_records WHERE...', '✅ Complete'],
+    ['Dispatch Status', 'All showing "Pending"', 'Fixed: compare dispatched vs total_items', '✅ Complete'],
+    ['Order ID Links', 'Not clickable', 'Made clickable, shows read-only sale details', '✅ Complete']
+]
+
+
+# ========== INPUTS ==========
+
+def live_counts(db_path):
+    """Row counts for the report tables plus the inventory status split, in one query"""
+    tables = [row[0] for row in DB_SCHEMA[1:]]
+    if not db_path or not Path(db_path).exists():
+        return {}
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        present = [t for t in tables if t in existing]
+        parts = [f"(SELECT COUNT(*) FROM {t}) AS {t}" for t in present]
+        if 'inventory' in existing:
+            parts.append("(SELECT COUNT(*) FROM inventory WHERE status = 'Dispatched') AS inventory_dispatched")
+            parts.append("(SELECT COUNT(*) FROM inventory WHERE status = 'In Stock') AS inventory_in_stock")
+        if not parts:
+            return {}
+        cursor = conn.execute("SELECT " + ", ".join(parts))
+        names = [d[0] for d in cursor.description]
+        return dict(zip(names, cursor.fetchone()))
+    finally:
+        conn.close()
+
+
+def extract_routes(source_path):
+    """(METHOD, path, description) for every app.<method>() route in index.tsx"""
+    if not Path(source_path).exists():
+        return []
+    text = Path(source_path).read_text(encoding='utf-8')
+    return [
+        (m.group('method').upper(), m.group('path'), (m.group('comment') or '').strip())
+        for m in ROUTE_PATTERN.finditer(text)
+    ]
+
+
+def source_stats(source_path, migrations_dir):
+    """Line count of index.tsx and number of migration files"""
+    lines = 0
+    if Path(source_path).exists():
+        with open(source_path, 'rb') as f:
+            lines = sum(1 for _ in f)
+    return {
+        'index_lines': lines,
+        'migrations': len(list(Path(migrations_dir).glob('*.sql'))),
+    }
+
+
+def live_integrity(db_path):
+    """Orphan counts per relationship from integrity_audit, in report-ready form"""
+    if not db_path or not Path(db_path).exists():
+        return {}
+    results, placeholders = run_audit(db_path, save=False)
+    audited = [r for r in results if 'skipped' not in r]
+    summary = summarize(audited)
+    return {
+        'relationships': [
+            [r['label'], r['fk'], f"{'✅' if not r['orphans'] else '⚠️'} {integrity_pct(r):.1f}%"
+             + (f" ({r['orphans']:,} orphans)" if r['orphans'] else '')]
+            for r in audited
+        ],
+        'checks': summary['checks'],
+        'orphans': summary['orphans'],
+        'integrity': summary['integrity'],
+        'placeholders': placeholders,
+    }
+
+
+def fmt_count(counts, table):
+    """Thousands-separated count, or n/a when the table (or DB) is missing"""
+    value = counts.get(table)
+    return f"{value:,}" if value is not None else 'n/a'
+
+
+def pct(part, whole):
+    return f"{part / whole * 100:.1f}%" if whole else '0.0%'
+
+
+def integrity_text(integrity):
+    return f"{integrity['integrity']:.1f}%" if integrity else 'n/a'
+
+
+def orphan_text(integrity):
+    if not integrity:
+        return 'n/a'
+    if not integrity['orphans']:
+        return 'No orphans'
+    return f"{integrity['orphans']:,} orphaned record{'s' if integrity['orphans'] != 1 else ''}"
+
+
+def integrity_status(integrity):
+    if not integrity:
+        return 'n/a'
+    return '✅ Excellent' if not integrity['orphans'] else '⚠️ Needs attention'
+
+
+# ========== STYLES ==========
+
+_STYLES = None
+
+
+def get_styles():
+    """Paragraph styles shared by every section (built once per process)"""
+    global _STYLES
+    if _STYLES is not None:
+        return _STYLES
     styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1e40af'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#059669'),
-        spaceAfter=12,
-        spaceBefore=20,
-        fontName='Helvetica-Bold'
-    )
-    
-    subheading_style = ParagraphStyle(
-        'CustomSubHeading',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#dc2626'),
-        spaceAfter=8,
-        spaceBefore=12,
-        fontName='Helvetica-Bold'
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=9,
-        spaceAfter=6
-    )
-    
-    # Title Page
+    _STYLES = {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1e40af'),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=colors.HexColor('#059669'),
+            spaceAfter=12,
+            spaceBefore=20,
+            fontName='Helvetica-Bold'
+        ),
+        'subheading': ParagraphStyle(
+            'CustomSubHeading',
+            parent=styles['Heading3'],
+            fontSize=12,
+            textColor=colors.HexColor('#dc2626'),
+            spaceAfter=8,
+            spaceBefore=12,
+            fontName='Helvetica-Bold'
+        ),
+        'normal': ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=9,
+            spaceAfter=6
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        ),
+    }
+    return _STYLES
+
+
+def _color(value):
+    return colors.white if value == 'white' else colors.HexColor(value)
+
+
+def styled_table(data, col_widths, header_color, stripes, font_size=8,
+                 header_font_size=None, valign='MIDDLE', center_first=False):
+    """Table with the report's standard look: colored header row, grid and striped body"""
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header_color)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ]
+    if center_first:
+        commands.append(('ALIGN', (0, 0), (0, -1), 'CENTER'))
+        commands.append(('ALIGN', (1, 0), (-1, -1), 'LEFT'))
+    else:
+        commands.append(('ALIGN', (0, 0), (-1, -1), 'LEFT'))
+    commands.append(('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'))
+    if header_font_size:
+        commands.append(('FONTSIZE', (0, 0), (-1, 0), header_font_size))
+        commands.append(('FONTSIZE', (0, 1), (-1, -1), font_size))
+    else:
+        commands.append(('FONTSIZE', (0, 0), (-1, -1), font_size))
+    commands += [
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), valign),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [_color(c) for c in stripes]),
+    ]
+    table = Table(data, colWidths=[w * inch for w in col_widths], repeatRows=1)
+    table.setStyle(TableStyle(commands))
+    return table
+
+
+# ========== SECTIONS ==========
+
+def section_title(ctx, s):
+    elements = []
     elements.append(Spacer(1, 1*inch))
-    elements.append(Paragraph("📱 Device Management System", title_style))
-    elements.append(Paragraph("Complete Code Architecture & Flow Diagram", heading_style))
+    elements.append(Paragraph("📱 Device Management System", s['title']))
+    elements.append(Paragraph("Complete Code Architecture & Flow Diagram", s['heading']))
     elements.append(Spacer(1, 0.3*inch))
-    
+
     # Project Info Table
     project_info = [
         ['Project Name:', 'Device Management System (webapp)'],
@@ -82,9 +387,9 @@ def create_flowchart_pdf():
         ['Database:', 'Cloudflare D1 (SQLite-based)'],
         ['Frontend:', 'HTML5 + TailwindCSS + Axios + CDN Libraries'],
         ['Architecture:', 'Single-File Full-Stack Application'],
-        ['Generated Date:', datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
+        ['Generated Date:', ctx['generated_at']]
     ]
-    
+
     project_table = Table(project_info, colWidths=[2*inch, 4.5*inch])
     project_table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#dbeafe')),
@@ -99,399 +404,110 @@ def create_flowchart_pdf():
         ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
     ]))
     elements.append(project_table)
-    
     elements.append(PageBreak())
-    
-    # ========== DATABASE SCHEMA ==========
-    elements.append(Paragraph("1. DATABASE SCHEMA (8 Tables)", heading_style))
-    
-    db_schema = [
-        ['Table', 'Key Columns', 'Purpose', 'Records'],
-        ['inventory', 'serial_no (PK), model_name, status, purchase_date', 'Device inventory management', '6,357'],
-        ['dispatch_records', 'id (PK), order_id (FK), device_serial_no, dispatch_date', 'Track dispatched devices', '1,810'],
-        ['orders', 'order_id (PK), customer_name, total_items, order_date', 'Customer orders', '66'],
-        ['order_items', 'id (PK), order_id (FK), product_name, quantity', 'Order line items', '149'],
-        ['sales', 'order_id (PK), customer_name, total_amount, sale_date', 'Sales invoices', '1'],
-        ['sale_items', 'id (PK), order_id (FK), product_name, quantity, price', 'Sale line items', '5'],
-        ['quality_check', 'id (PK), device_serial_no, pass_fail, test_results (JSON)', 'QC records', '2,081'],
-        ['tracking_details', 'id (PK), order_id (FK), courier_partner, tracking_id', 'Courier tracking', '1']
-    ]
-    
-    schema_table = Table(db_schema, colWidths=[1.5*inch, 2.5*inch, 2*inch, 0.8*inch])
-    schema_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
-    ]))
-    elements.append(schema_table)
+    return elements
+
+
+def section_schema(ctx, s):
+    counts = ctx['counts']
+    rows = [DB_SCHEMA[0] + ['Records']] + [row + [fmt_count(counts, row[0])] for row in DB_SCHEMA[1:]]
+    elements = [Paragraph(f"1. DATABASE SCHEMA ({len(rows) - 1} Tables)", s['heading'])]
+    elements.append(styled_table(rows, [1.5, 2.5, 2, 0.8], '#1e40af', ['white', '#f3f4f6'],
+                                 font_size=8, header_font_size=9, valign='TOP'))
     elements.append(Spacer(1, 0.2*inch))
-    
+
     # Database Relationships
-    elements.append(Paragraph("Database Relationships:", subheading_style))
-    relationships = [
-        ['Relationship', 'Foreign Key', 'Integrity'],
-        ['orders → order_items', 'order_items.order_id → orders.order_id', '✅ 100%'],
-        ['orders → dispatch_records', 'dispatch_records.order_id → orders.order_id', '✅ 99.9%'],
-        ['sales → sale_items', 'sale_items.order_id → sales.order_id', '✅ 100%'],
-        ['sales → tracking_details', 'tracking_details.order_id → sales.order_id', '✅ 100%'],
-        ['inventory → dispatch_records', 'dispatch_records.device_serial_no → inventory.serial_no', '✅ Active'],
-        ['inventory → quality_check', 'quality_check.device_serial_no → inventory.serial_no', '✅ Active']
-    ]
-    
-    rel_table = Table(relationships, colWidths=[2*inch, 3*inch, 1*inch])
-    rel_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#059669')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#d1fae5'), colors.white])
-    ]))
-    elements.append(rel_table)
-    
+    elements.append(Paragraph("Database Relationships:", s['subheading']))
+    relationships = ctx['integrity'].get('relationships') or [['n/a', 'database not available', 'n/a']]
+    elements.append(styled_table([RELATIONSHIPS_HEADER] + relationships, [1.8, 3.4, 1.4], '#059669',
+                                 ['#d1fae5', 'white']))
     elements.append(PageBreak())
-    
-    # ========== API ENDPOINTS ==========
-    elements.append(Paragraph("2. API ENDPOINTS (40+ Routes)", heading_style))
-    
-    api_endpoints = [
-        ['Method', 'Endpoint', 'Function', 'Purpose'],
-        ['GET', '/', 'Main Dashboard', 'Render main HTML interface'],
-        ['POST', '/api/inventory', 'Add Inventory', 'Add new device to inventory'],
-        ['GET', '/api/inventory', 'Get Inventory', 'Fetch all inventory records'],
-        ['GET', '/api/inventory/:serial', 'Get Device', 'Get single device details'],
-        ['PUT', '/api/inventory/:serial', 'Update Device', 'Update device information'],
-        ['DELETE', '/api/inventory/:serial', 'Delete Device', 'Remove device from inventory'],
-        ['POST', '/api/inventory/bulk', 'Bulk Import', 'Import multiple devices from Excel'],
-        ['GET', '/api/inventory/export', 'Export Excel', 'Export inventory to Excel'],
-        ['POST', '/api/orders', 'Create Order', 'Create new customer order'],
-        ['GET', '/api/orders', 'Get Orders', 'Fetch all orders with items'],
-        ['GET', '/api/orders/:orderId', 'Get Order', 'Get specific order details'],
-        ['PUT', '/api/orders/:orderId', 'Update Order', 'Update order information'],
-        ['DELETE', '/api/orders/:orderId', 'Delete Order', 'Remove order and items'],
-        ['POST', '/api/dispatch', 'Create Dispatch', 'Dispatch devices for order'],
-        ['GET', '/api/dispatch', 'Get Dispatches', 'Fetch all dispatch records'],
-        ['GET', '/api/dispatch/order/:orderId', 'Order Dispatches', 'Get dispatches for order'],
-        ['PUT', '/api/dispatch/:id', 'Update Dispatch', 'Update dispatch tracking'],
-        ['DELETE', '/api/dispatch/:id', 'Delete Dispatch', 'Remove dispatch record'],
-        ['POST', '/api/quality-check', 'Add QC Record', 'Add quality check record'],
-        ['GET', '/api/quality-check', 'Get QC Records', 'Fetch all QC records'],
-        ['GET', '/api/quality-check/:serial', 'Get Device QC', 'Get QC for specific device'],
-        ['POST', '/api/sales', 'Create Sale', 'Create sales invoice'],
-        ['GET', '/api/sales', 'Get Sales', 'Fetch all sales records'],
-        ['GET', '/api/sales/order/:orderId', 'Get Sale', 'Get sale by order ID'],
-        ['GET', '/api/sales/:orderId/items', 'Get Sale Items', 'Get items for sale'],
-        ['PUT', '/api/sales/:orderId', 'Update Sale', 'Update sale information'],
-        ['DELETE', '/api/sales/:orderId', 'Delete Sale', 'Remove sale record'],
-        ['POST', '/api/tracking-details', 'Add Tracking', 'Add courier tracking info'],
-        ['GET', '/api/tracking-details', 'Get Tracking', 'Fetch tracking records'],
-        ['PUT', '/api/tracking-details/:id', 'Update Tracking', 'Update tracking info'],
-        ['DELETE', '/api/tracking-details/:id', 'Delete Tracking', 'Remove tracking record'],
-        ['GET', '/api/dashboard/stats', 'Dashboard Stats', 'Get system statistics'],
-        ['GET', '/api/reports/inventory', 'Inventory Report', 'Generate inventory report'],
-        ['GET', '/api/reports/dispatch', 'Dispatch Report', 'Generate dispatch report']
-    ]
-    
-    api_table = Table(api_endpoints, colWidths=[0.8*inch, 2*inch, 1.5*inch, 2.5*inch])
-    api_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7c3aed')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 8),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#faf5ff')])
-    ]))
-    elements.append(api_table)
-    
+    return elements
+
+
+def section_api(ctx, s):
+    routes = ctx['routes']
+    cell = ParagraphStyle('ApiCell', parent=s['normal'], fontSize=7, leading=8, spaceAfter=0)
+    rows = [['Method', 'Endpoint', 'Description']]
+    rows += [[method, Paragraph(path, cell), Paragraph(description, cell)]
+             for method, path, description in routes]
+    elements = [Paragraph(f"2. API ENDPOINTS ({len(routes)} Routes)", s['heading'])]
+    elements.append(styled_table(rows, [0.8, 3.2, 3.5], '#7c3aed', ['white', '#faf5ff'],
+                                 font_size=7, header_font_size=8))
     elements.append(PageBreak())
-    
-    # ========== MAIN WORKFLOWS ==========
-    elements.append(Paragraph("3. MAIN WORKFLOW PROCESSES", heading_style))
-    
+    return elements
+
+
+def section_workflows(ctx, s):
+    elements = [Paragraph("3. MAIN WORKFLOW PROCESSES", s['heading'])]
+
     # Workflow 1: Inventory Management
-    elements.append(Paragraph("3.1 Inventory Management Flow", subheading_style))
-    inventory_flow = [
-        ['Step', 'Action', 'API Call', 'Result'],
-        ['1', 'User uploads Excel file', 'POST /api/inventory/bulk', 'Devices added to inventory table'],
-        ['2', 'System validates data', 'Check duplicates, format', 'Skip duplicates, log errors'],
-        ['3', 'Insert to database', 'INSERT INTO inventory', 'Records created with status "In Stock"'],
-        ['4', 'Display in UI', 'GET /api/inventory', 'Show all devices in table'],
-        ['5', 'User can edit/delete', 'PUT/DELETE /api/inventory/:serial', 'Update or remove records']
-    ]
-    
-    inv_table = Table(inventory_flow, colWidths=[0.5*inch, 2*inch, 2*inch, 2.5*inch])
-    inv_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f59e0b')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-        ('ALIGN', (1, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#fef3c7'), colors.white])
-    ]))
-    elements.append(inv_table)
+    elements.append(Paragraph("3.1 Inventory Management Flow", s['subheading']))
+    elements.append(styled_table(INVENTORY_FLOW, [0.5, 2, 2, 2.5], '#f59e0b', ['#fef3c7', 'white'],
+                                 center_first=True))
     elements.append(Spacer(1, 0.2*inch))
-    
+
     # Workflow 2: Order to Dispatch
-    elements.append(Paragraph("3.2 Order to Dispatch Flow", subheading_style))
-    order_flow = [
-        ['Step', 'Action', 'API Call', 'Database Impact'],
-        ['1', 'Create order', 'POST /api/orders', 'orders + order_items tables'],
-        ['2', 'Select order for dispatch', 'GET /api/orders/:orderId', 'Fetch order details'],
-        ['3', 'Scan devices', 'GET /api/inventory/:serial', 'Check device availability'],
-        ['4', 'Match products', 'Compare model_name with product_name', 'Validate device matches order'],
-        ['5', 'Complete dispatch', 'POST /api/dispatch', 'dispatch_records created, inventory.status = "Dispatched"'],
-        ['6', 'Update order status', 'Compare dispatched vs total_items', 'Status: Completed/Pending'],
-        ['7', 'Add tracking', 'POST /api/tracking-details', 'tracking_details record created']
-    ]
-    
-    order_table = Table(order_flow, colWidths=[0.5*inch, 1.8*inch, 2*inch, 2.5*inch])
-    order_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#dc2626')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-        ('ALIGN', (1, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#fee2e2'), colors.white])
-    ]))
-    elements.append(order_table)
+    elements.append(Paragraph("3.2 Order to Dispatch Flow", s['subheading']))
+    elements.append(styled_table(ORDER_FLOW, [0.5, 1.8, 2, 2.5], '#dc2626', ['#fee2e2', 'white'],
+                                 font_size=7, center_first=True))
     elements.append(Spacer(1, 0.2*inch))
-    
+
     # Workflow 3: Quality Check
-    elements.append(Paragraph("3.3 Quality Check Flow", subheading_style))
-    qc_flow = [
-        ['Step', 'Action', 'Tests Performed', 'Result Storage'],
-        ['1', 'Scan device serial', 'GET /api/inventory/:serial', 'Fetch device info'],
-        ['2', 'Perform QC tests', 'Camera, SD, Network, GPS, SIM, Online', 'Test results (JSON)'],
-        ['3', 'Record results', 'POST /api/quality-check', 'quality_check table'],
-        ['4', 'Pass/Fail status', 'Determine overall status', 'pass_fail field'],
-        ['5', 'View QC history', 'GET /api/quality-check/:serial', 'Display all QC records']
-    ]
-    
-    qc_table = Table(qc_flow, colWidths=[0.5*inch, 1.8*inch, 2.5*inch, 2*inch])
-    qc_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#10b981')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-        ('ALIGN', (1, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#d1fae5'), colors.white])
-    ]))
-    elements.append(qc_table)
-    
+    elements.append(Paragraph("3.3 Quality Check Flow", s['subheading']))
+    elements.append(styled_table(QC_FLOW, [0.5, 1.8, 2.5, 2], '#10b981', ['#d1fae5', 'white'],
+                                 center_first=True))
     elements.append(PageBreak())
-    
-    # ========== FRONTEND COMPONENTS ==========
-    elements.append(Paragraph("4. FRONTEND COMPONENTS", heading_style))
-    
-    frontend = [
-        ['Component', 'Modal/Page', 'Key Functions', 'User Actions'],
-        ['Dashboard', 'Main Page', 'Display stats, navigation', 'View overview, navigate sections'],
-        ['Inventory Modal', 'addInventoryModal', 'displayInventoryData(), editInventory()', 'Add, edit, delete devices'],
-        ['Bulk Upload', 'uploadInventoryModal', 'handleFileUpload(), uploadInventory()', 'Import Excel, process data'],
-        ['Orders Modal', 'addOrderModal', 'displayOrders(), editOrder()', 'Create, edit, delete orders'],
-        ['Dispatch Modal', 'dispatchModal', 'scanDevice(), displayOrderProducts()', 'Scan devices, dispatch items'],
-        ['QC Modal', 'qcModal', 'performQC(), displayQCRecords()', 'Run tests, view QC history'],
-        ['Sales Modal', 'salesModal', 'createSale(), viewSaleDetails()', 'Create invoices, view sales'],
-        ['Tracking Modal', 'trackingDetailsModal', 'submitTrackingDetails(), displayTrackingRecords()', 'Add tracking, view courier info'],
-        ['Sale Details', 'saleDetailsModal', 'viewTrackingSaleDetails()', 'View order details (nested modal)']
-    ]
-    
-    frontend_table = Table(frontend, colWidths=[1.5*inch, 1.5*inch, 2*inch, 2*inch])
-    frontend_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6366f1')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#e0e7ff')])
-    ]))
-    elements.append(frontend_table)
+    return elements
+
+
+def section_frontend(ctx, s):
+    elements = [Paragraph("4. FRONTEND COMPONENTS", s['heading'])]
+    elements.append(styled_table(FRONTEND, [1.5, 1.5, 2, 2], '#6366f1', ['white', '#e0e7ff'],
+                                 font_size=7, valign='TOP'))
     elements.append(Spacer(1, 0.2*inch))
-    
+
     # JavaScript Functions
-    elements.append(Paragraph("Key JavaScript Functions:", subheading_style))
-    js_functions = [
-        ['Category', 'Functions', 'Purpose'],
-        ['Inventory', 'displayInventoryData(), addInventory(), editInventory(), deleteInventory()', 'CRUD operations for inventory'],
-        ['Orders', 'displayOrders(), addOrder(), editOrder(), deleteOrder()', 'Order management'],
-        ['Dispatch', 'openDispatchModal(), scanDevice(), completeDispatch(), displayScannedDevices()', 'Device dispatch process'],
-        ['QC', 'openQCModal(), performQC(), displayQCRecords()', 'Quality control testing'],
-        ['Sales', 'createSale(), viewSaleDetails(), editSale(), deleteSale()', 'Sales invoice management'],
-        ['Tracking', 'submitTrackingDetails(), displayTrackingRecords(), deleteTrackingRecord()', 'Courier tracking'],
-        ['Modals', 'openModal(), closeModal(), viewTrackingSaleDetails()', 'Modal window management'],
-        ['Utilities', 'formatDate(), calculateWeight(), exportToExcel()', 'Helper functions']
-    ]
-    
-    js_table = Table(js_functions, colWidths=[1.3*inch, 3*inch, 2.5*inch])
-    js_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8b5cf6')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#f5f3ff'), colors.white])
-    ]))
-    elements.append(js_table)
-    
+    elements.append(Paragraph("Key JavaScript Functions:", s['subheading']))
+    elements.append(styled_table(JS_FUNCTIONS, [1.3, 3, 2.5], '#8b5cf6', ['#f5f3ff', 'white'],
+                                 font_size=7, valign='TOP'))
     elements.append(PageBreak())
-    
-    # ========== KEY FEATURES ==========
-    elements.append(Paragraph("5. KEY FEATURES & IMPLEMENTATIONS", heading_style))
-    
-    features = [
-        ['Feature', 'Implementation Details', 'Technical Notes'],
-        ['Nested Modals', 'Sale details (z-index: 10001) opens on top of tracking modal (z-index: 10000)', 'Preserves user context, prevents losing place'],
-        ['Device Scanning', 'Matches by model_name/product_name comparison, not serial numbers', 'Real-time remaining count updates'],
-        ['Dispatch Status', 'Compares dispatched_items vs total_items from orders table', 'Shows "Completed" (green) or "Pending" (yellow)'],
-        ['Weight Calculation', 'Fetches sale_items, looks up product catalog, multiplies weight × quantity', 'Async calculation for tracking report'],
-        ['Bulk Upload', 'Excel import with duplicate detection, error handling', 'Skips duplicates, logs errors'],
-        ['Export Excel', 'Generates Excel file with all inventory data', 'Uses XLSX library'],
-        ['QC JSON Storage', 'Stores test results as JSON in test_results field', 'Flexible schema for various tests'],
-        ['Tracking Integration', 'Links to sales table, fetches courier_cost/total_amount', 'Shows actual price in report'],
-        ['Product Matching', 'Warns when scanned device not in order', 'Yellow warning banner displayed'],
-        ['Status Colors', 'Green (complete), Yellow (pending), Red (failed)', 'Visual feedback for users']
-    ]
-    
-    features_table = Table(features, colWidths=[1.5*inch, 3*inch, 2.3*inch])
-    features_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ec4899')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#fce7f3')])
-    ]))
-    elements.append(features_table)
-    
+    return elements
+
+
+def section_features(ctx, s):
+    elements = [Paragraph("5. KEY FEATURES & IMPLEMENTATIONS", s['heading'])]
+    elements.append(styled_table(FEATURES, [1.5, 3, 2.3], '#ec4899', ['white', '#fce7f3'],
+                                 font_size=7, valign='TOP'))
     elements.append(PageBreak())
-    
-    # ========== COMPLETE FLOW DIAGRAM ==========
-    elements.append(Paragraph("6. COMPLETE APPLICATION FLOW", heading_style))
-    
-    complete_flow = [
-        ['Layer', 'Component', 'Flow', 'Next Step'],
-        ['Frontend', 'User Interface', 'User interacts with modals/forms', '→ JavaScript Event'],
-        ['JavaScript', 'Event Handler', 'Capture user action (click, submit, scan)', '→ API Call'],
-        ['API Layer', 'Axios HTTP Request', 'Send request to backend endpoint', '→ Hono Route'],
-        ['Backend', 'Hono Route Handler', 'Process request, validate data', '→ Database Query'],
-        ['Database', 'D1 SQLite Query', 'Execute SQL (SELECT, INSERT, UPDATE, DELETE)', '→ Return Results'],
-        ['Backend', 'Response Formatting', 'Format data as JSON response', '→ Send to Frontend'],
-        ['JavaScript', 'Response Handler', 'Process API response, handle errors', '→ Update UI'],
-        ['Frontend', 'UI Update', 'Refresh table, close modal, show success', '→ User Sees Result']
-    ]
-    
-    flow_table = Table(complete_flow, colWidths=[1.2*inch, 1.5*inch, 2.5*inch, 1.6*inch])
-    flow_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0891b2')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#cffafe'), colors.white])
-    ]))
-    elements.append(flow_table)
+    return elements
+
+
+def section_flow(ctx, s):
+    elements = [Paragraph("6. COMPLETE APPLICATION FLOW", s['heading'])]
+    elements.append(styled_table(COMPLETE_FLOW, [1.2, 1.5, 2.5, 1.6], '#0891b2', ['#cffafe', 'white']))
     elements.append(Spacer(1, 0.2*inch))
-    
+
     # Data Flow Example
-    elements.append(Paragraph("Example: Complete Dispatch Flow", subheading_style))
-    dispatch_example = [
-        ['#', 'Action', 'Code Location', 'Result'],
-        ['1', 'User clicks "Dispatch" button', 'openDispatchModal(orderId)', 'Modal opens, loads order'],
-        ['2', 'Fetch order details', 'GET /api/orders/:orderId', 'selectedOrder populated'],
-        ['3', 'Display products to dispatch', 'displayOrderProducts()', 'Shows product list with remaining count'],
-        ['4', 'User scans device barcode', 'scanDevice()', 'Input field captures serial number'],
-        ['5', 'Fetch device from inventory', 'GET /api/inventory/:serial', 'Device data retrieved'],
-        ['6', 'Match with order products', 'Compare model_name === product_name', 'Validates device matches order'],
-        ['7', 'Add to scanned list', 'scannedDevices.push()', 'Device added, UI updates'],
-        ['8', 'Update remaining count', 'quantity - scannedForThisProduct', 'Shows decreasing count'],
-        ['9', 'Complete dispatch', 'POST /api/dispatch', 'Creates dispatch_records'],
-        ['10', 'Update inventory status', 'UPDATE inventory SET status="Dispatched"', 'Device marked as dispatched'],
-        ['11', 'Recalculate order status', 'Compare dispatched vs total_items', 'Status: Completed/Pending'],
-        ['12', 'Refresh UI', 'displayOrders(), closeModal()', 'User sees updated data']
-    ]
-    
-    example_table = Table(dispatch_example, colWidths=[0.4*inch, 2*inch, 2.2*inch, 2.2*inch])
-    example_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#065f46')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-        ('ALIGN', (1, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#d1fae5')])
-    ]))
-    elements.append(example_table)
-    
+    elements.append(Paragraph("Example: Complete Dispatch Flow", s['subheading']))
+    elements.append(styled_table(DISPATCH_EXAMPLE, [0.4, 2, 2.2, 2.2], '#065f46', ['white', '#d1fae5'],
+                                 font_size=7, valign='TOP', center_first=True))
     elements.append(PageBreak())
-    
-    # ========== TECHNICAL ARCHITECTURE ==========
-    elements.append(Paragraph("7. TECHNICAL ARCHITECTURE", heading_style))
-    
-    architecture = [
-        ['Component', 'Technology', 'Details'],
-        ['Backend Framework', 'Hono v4.0', 'Lightweight web framework for Cloudflare Workers'],
-        ['Runtime', 'Cloudflare Workers', 'Edge runtime with global distribution'],
-        ['Database', 'Cloudflare D1', 'SQLite-based distributed database, --local mode for dev'],
-        ['Frontend Framework', 'Vanilla JavaScript', 'No framework, direct DOM manipulation'],
-        ['CSS Framework', 'TailwindCSS (CDN)', 'Utility-first CSS via CDN'],
-        ['HTTP Client', 'Axios (CDN)', 'Promise-based HTTP requests'],
-        ['Icons', 'Font Awesome 6', 'Icon library via CDN'],
-        ['Build Tool', 'Vite', 'Fast build tool with HMR'],
-        ['Development Server', 'Wrangler Pages Dev', 'Local development with D1 --local'],
-        ['Process Manager', 'PM2', 'Service management in sandbox'],
-        ['Deployment', 'Cloudflare Pages', 'Edge deployment with global CDN']
-    ]
-    
-    arch_table = Table(architecture, colWidths=[2*inch, 2*inch, 3*inch])
-    arch_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7c2d12')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#fed7aa')])
-    ]))
-    elements.append(arch_table)
+    return elements
+
+
+def section_architecture(ctx, s):
+    stats = ctx['source_stats']
+    elements = [Paragraph("7. TECHNICAL ARCHITECTURE", s['heading'])]
+    elements.append(styled_table(ARCHITECTURE, [2, 2, 3], '#7c2d12', ['white', '#fed7aa'], font_size=9))
     elements.append(Spacer(1, 0.2*inch))
-    
+
     # File Structure
-    elements.append(Paragraph("Project File Structure:", subheading_style))
+    elements.append(Paragraph("Project File Structure:", s['subheading']))
     file_structure = [
         ['File/Folder', 'Purpose', 'Lines of Code'],
-        ['src/index.tsx', 'Main application file (backend + frontend HTML)', '~11,000'],
-        ['migrations/', 'Database migration SQL files', '16 files'],
+        ['src/index.tsx', 'Main application file (backend + frontend HTML)', f"{stats['index_lines']:,}"],
+        ['migrations/', 'Database migration SQL files', f"{stats['migrations']} files"],
         ['public/', 'Static assets (if any)', '-'],
         ['wrangler.jsonc', 'Cloudflare configuration', '~30'],
         ['package.json', 'Dependencies and scripts', '~50'],
@@ -499,94 +515,61 @@ def create_flowchart_pdf():
         ['vite.config.ts', 'Vite build configuration', '~15'],
         ['.gitignore', 'Git ignore patterns', '~20']
     ]
-    
-    file_table = Table(file_structure, colWidths=[2*inch, 3.5*inch, 1.3*inch])
-    file_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4338ca')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#e0e7ff'), colors.white])
-    ]))
-    elements.append(file_table)
-    
+    elements.append(styled_table(file_structure, [2, 3.5, 1.3], '#4338ca', ['#e0e7ff', 'white']))
     elements.append(PageBreak())
-    
-    # ========== RECENT CHANGES ==========
-    elements.append(Paragraph("8. RECENT FEATURE IMPLEMENTATIONS", heading_style))
-    
-    recent_changes = [
-        ['Feature', 'Problem Solved', 'Implementation', 'Status'],
-        ['Tracking Details', 'No courier tracking system', 'New table, API endpoints, split-screen modal', '✅ Complete'],
-        ['Nested Modals', 'Sale details closed tracking modal', 'Z-index layering (10001 over 10000)', '✅ Complete'],
-        ['Weight Column', 'No weight in tracking report', 'Async calculation from sale_items × catalog', '✅ Complete'],
-        ['Device Scanning', 'Count not decreasing', 'Fixed matching: model_name === product_name', '✅ Complete'],
-        ['Remaining Count', 'Confusing display', 'Added "X Remaining" badge with color coding', '✅ Complete'],
-        ['Notes Column', 'JSON data visible', 'Removed Notes column from table', '✅ Complete'],
-        ['Record Deletion', 'Unwanted records 1816-1820', 'DELETE FROM dispatch_records WHERE...', '✅ Complete'],
-        ['Dispatch Status', 'All showing "Pending"', 'Fixed: compare dispatched vs total_items', '✅ Complete'],
-        ['Order ID Links', 'Not clickable', 'Made clickable, shows read-only sale details', '✅ Complete']
-    ]
-    
-    changes_table = Table(recent_changes, colWidths=[1.5*inch, 2*inch, 2.3*inch, 1*inch])
-    changes_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#16a34a')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#dcfce7')])
-    ]))
-    elements.append(changes_table)
+    return elements
+
+
+def section_changes(ctx, s):
+    counts = ctx['counts']
+    elements = [Paragraph("8. RECENT FEATURE IMPLEMENTATIONS", s['heading'])]
+    elements.append(styled_table(RECENT_CHANGES, [1.5, 2, 2.3, 1], '#16a34a', ['white', '#dcfce7'],
+                                 font_size=7, valign='TOP'))
     elements.append(Spacer(1, 0.2*inch))
-    
+
     # System Statistics
-    elements.append(Paragraph("Current System Statistics:", subheading_style))
+    total = counts.get('inventory') or 0
+    dispatched = counts.get('inventory_dispatched') or 0
+    in_stock = counts.get('inventory_in_stock') or 0
+    elements.append(Paragraph("Current System Statistics:", s['subheading']))
     stats = [
         ['Metric', 'Value', 'Status'],
-        ['Total Devices in Inventory', '6,357', '✅ Active'],
-        ['Devices Dispatched', '5,554 (87.4%)', '✅ Healthy'],
-        ['Devices In Stock', '803 (12.6%)', '✅ Available'],
-        ['Total Orders', '66', '✅ Processing'],
-        ['Total Dispatches', '1,810', '✅ Completed'],
-        ['Quality Check Records', '2,081', '✅ Tracked'],
-        ['Sales Invoices', '1', '✅ Active'],
-        ['Tracking Records', '1', '✅ Active'],
-        ['Database Integrity', '99.9%', '✅ Excellent'],
-        ['Foreign Key Sync', '100% (except 1 orphan)', '✅ Strong']
+        ['Total Devices in Inventory', fmt_count(counts, 'inventory'), '✅ Active'],
+        ['Devices Dispatched', f"{dispatched:,} ({pct(dispatched, total)})", '✅ Healthy'],
+        ['Devices In Stock', f"{in_stock:,} ({pct(in_stock, total)})", '✅ Available'],
+        ['Total Orders', fmt_count(counts, 'orders'), '✅ Processing'],
+        ['Total Dispatches', fmt_count(counts, 'dispatch_records'), '✅ Completed'],
+        ['Quality Check Records', fmt_count(counts, 'quality_check'), '✅ Tracked'],
+        ['Sales Invoices', fmt_count(counts, 'sales'), '✅ Active'],
+        ['Tracking Records', fmt_count(counts, 'tracking_details'), '✅ Active'],
+        ['Database Integrity', integrity_text(ctx['integrity']), integrity_status(ctx['integrity'])],
+        ['Foreign Key Sync', orphan_text(ctx['integrity']), integrity_status(ctx['integrity'])],
+        ['Placeholder Inventory Rows', f"{ctx['integrity'].get('placeholders', 0):,}", '✅ None'
+         if not ctx['integrity'].get('placeholders') else '⚠️ Review']
     ]
-    
-    stats_table = Table(stats, colWidths=[2.5*inch, 2.5*inch, 1.8*inch])
-    stats_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0369a1')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#e0f2fe'), colors.white])
-    ]))
-    elements.append(stats_table)
-    
+    elements.append(styled_table(stats, [2.5, 2.5, 1.8], '#0369a1', ['#e0f2fe', 'white'], font_size=9))
     elements.append(PageBreak())
-    
-    # ========== SUMMARY ==========
-    elements.append(Paragraph("9. SYSTEM SUMMARY", heading_style))
-    
-    summary_text = """
+    return elements
+
+
+def section_summary(ctx, s):
+    counts = ctx['counts']
+    stats = ctx['source_stats']
+    total = counts.get('inventory') or 0
+    dispatched = counts.get('inventory_dispatched') or 0
+    table_count = len(DB_SCHEMA) - 1
+    total_records = sum(counts.get(row[0]) or 0 for row in DB_SCHEMA[1:])
+    route_count = len(ctx['routes'])
+
+    elements = [Paragraph("9. SYSTEM SUMMARY", s['heading'])]
+    summary_text = f"""
     <b>Device Management System - Complete Architecture Overview</b><br/><br/>
-    
-    This is a comprehensive device inventory, order, dispatch, and tracking management system built with modern edge-first architecture. 
+
+    This is a comprehensive device inventory, order, dispatch, and tracking management system built with modern edge-first architecture.
     The application handles the complete lifecycle of device management from procurement to dispatch.<br/><br/>
-    
+
     <b>Core Capabilities:</b><br/>
-    • Inventory Management: Track 6,357+ devices with serial numbers, models, purchase dates<br/>
+    • Inventory Management: Track {total:,} devices with serial numbers, models, purchase dates<br/>
     • Order Management: Create and manage customer orders with multiple items<br/>
     • Dispatch System: Scan and dispatch devices, real-time remaining count tracking<br/>
     • Quality Control: Comprehensive QC testing with JSON-based test results<br/>
@@ -594,67 +577,160 @@ def create_flowchart_pdf():
     • Courier Tracking: Track shipments with courier partner, mode, and tracking IDs<br/>
     • Excel Integration: Import/export inventory data via Excel files<br/>
     • Nested Modals: Advanced UI with stacked modals for contextual information<br/><br/>
-    
+
     <b>Technical Highlights:</b><br/>
-    • Single-file full-stack architecture (~11,000 lines)<br/>
+    • Single-file full-stack architecture ({stats['index_lines']:,} lines)<br/>
     • Edge-first deployment on Cloudflare Workers/Pages<br/>
     • SQLite-based D1 database with --local development mode<br/>
     • Real-time device scanning with product matching<br/>
     • Async weight calculations from product catalog<br/>
     • Dynamic status updates (Completed/Pending)<br/>
-    • 99.9% database integrity with proper foreign key relationships<br/><br/>
-    
+    • {integrity_text(ctx['integrity'])} database integrity across {ctx['integrity'].get('checks', 0)} audited relationships<br/><br/>
+
     <b>Data Flow Summary:</b><br/>
-    User Interface → JavaScript Event → Axios API Call → Hono Route Handler → D1 Database Query → 
+    User Interface → JavaScript Event → Axios API Call → Hono Route Handler → D1 Database Query →
     JSON Response → UI Update → User Sees Result<br/><br/>
-    
+
     <b>Performance Metrics:</b><br/>
-    • 8 Database Tables with 8,000+ total records<br/>
-    • 40+ API Endpoints for CRUD operations<br/>
+    • {table_count} Database Tables with {total_records:,} total records<br/>
+    • {route_count} API Endpoints for CRUD operations<br/>
     • 10+ Modal Windows for user interactions<br/>
-    • 100% Foreign Key Synchronization (except 1 orphaned record)<br/>
-    • 87.4% Dispatch Rate (5,554/6,357 devices)<br/><br/>
-    
+    • Foreign Key Synchronization: {orphan_text(ctx['integrity'])}<br/>
+    • {pct(dispatched, total)} Dispatch Rate ({dispatched:,}/{total:,} devices)<br/><br/>
+
     <b>Recent Enhancements:</b><br/>
     • Tracking Details: Complete courier management with weight calculation<br/>
     • Nested Modals: Sale details open on top of tracking modal<br/>
     • Device Scanning: Fixed product matching and remaining count display<br/>
     • Dispatch Status: Corrected status calculation logic<br/>
     • UI Improvements: Removed unnecessary columns, added color coding<br/><br/>
-    
-    <b>System Health: ✅ EXCELLENT (99.9%)</b>
+
+    <b>System Health: {integrity_status(ctx['integrity'])} ({integrity_text(ctx['integrity'])})</b>
     """
-    
-    summary_para = Paragraph(summary_text, normal_style)
-    elements.append(summary_para)
-    
+    elements.append(Paragraph(summary_text, s['normal']))
     elements.append(Spacer(1, 0.3*inch))
-    
+
     # Footer
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.grey,
-        alignment=TA_CENTER
-    )
-    
     footer_text = f"""
     <b>Device Management System - Complete Code Flowchart</b><br/>
-    Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>
+    Generated on: {ctx['generated_at']}<br/>
     Technology Stack: Hono + Cloudflare Workers + D1 Database<br/>
-    Total Database Records: 16,515 | API Endpoints: 40+ | Frontend Components: 10+
+    Total Database Records: {total_records:,} | API Endpoints: {route_count} | Frontend Components: 10+
     """
-    
-    elements.append(Paragraph(footer_text, footer_style))
-    
+    elements.append(Paragraph(footer_text, s['footer']))
+    return elements
+
+
+# (name, builder, context keys the section depends on)
+SECTIONS = [
+    ('title', section_title, ('generated_at',)),
+    ('schema', section_schema, ('counts', 'integrity')),
+    ('api', section_api, ('routes',)),
+    ('workflows', section_workflows, ()),
+    ('frontend', section_frontend, ()),
+    ('features', section_features, ()),
+    ('flow', section_flow, ()),
+    ('architecture', section_architecture, ('source_stats',)),
+    ('changes', section_changes, ('counts', 'integrity')),
+    ('summary', section_summary, ('counts', 'integrity', 'routes', 'source_stats', 'generated_at')),
+]
+
+
+# ========== SECTION CACHE ==========
+
+_CODE_HASH = None
+_MEMORY_CACHE = {}
+
+
+def code_hash():
+    """Hash of this file, so editing any section invalidates cached flowables"""
+    global _CODE_HASH
+    if _CODE_HASH is None:
+        _CODE_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+    return _CODE_HASH
+
+
+def section_key(name, ctx, keys):
+    payload = json.dumps({k: ctx[k] for k in keys}, sort_keys=True, default=str)
+    return hashlib.sha256(f"{code_hash()}:{name}:{payload}".encode('utf-8')).hexdigest()
+
+
+def cached_section(name, builder, ctx, keys, cache_dir):
+    """Return (flowables, rebuilt) for a section, rebuilding only when its inputs changed"""
+    key = section_key(name, ctx, keys)
+    blob = _MEMORY_CACHE.get(key)
+    path = Path(cache_dir) / f"{name}-{key[:32]}.pkl" if cache_dir else None
+    if blob is None and path is not None and path.exists():
+        blob = path.read_bytes()
+        _MEMORY_CACHE[key] = blob
+    if blob is not None:
+        try:
+            # Fresh copies every time: doc.build() mutates flowables while laying out
+            return pickle.loads(blob), False
+        except Exception:
+            _MEMORY_CACHE.pop(key, None)
+
+    flowables = builder(ctx, get_styles())
+    blob = pickle.dumps(flowables, protocol=pickle.HIGHEST_PROTOCOL)
+    _MEMORY_CACHE[key] = blob
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in path.parent.glob(f"{name}-*.pkl"):
+            stale.unlink()
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+    return pickle.loads(blob), True
+
+
+def build_context(db_path=DB_PATH, source_path=INDEX_TSX, migrations_dir=MIGRATIONS_DIR):
+    """Gather every live input the sections depend on"""
+    return {
+        'generated_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'counts': live_counts(db_path),
+        'integrity': live_integrity(db_path),
+        'routes': extract_routes(source_path),
+        'source_stats': source_stats(source_path, migrations_dir),
+    }
+
+
+def create_flowchart_pdf(filename=OUTPUT_FILE, db_path=DB_PATH, cache_dir=CACHE_DIR):
+    """Generate comprehensive flowchart PDF; returns (filename, rebuilt section names)"""
+
+    # Create PDF with landscape orientation for better flowchart viewing
+    doc = SimpleDocTemplate(
+        filename,
+        pagesize=landscape(A4),
+        rightMargin=30,
+        leftMargin=30,
+        topMargin=30,
+        bottomMargin=30
+    )
+
+    ctx = build_context(db_path)
+    elements = []
+    rebuilt = []
+    for name, builder, keys in SECTIONS:
+        flowables, was_rebuilt = cached_section(name, builder, ctx, keys, cache_dir)
+        elements.extend(flowables)
+        if was_rebuilt:
+            rebuilt.append(name)
+
     # Build PDF
     doc.build(elements)
-    
-    return filename
+
+    return filename, rebuilt
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the Device Management System flowchart PDF")
+    parser.add_argument('--out', default=OUTPUT_FILE, help="Output PDF path")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file for live record counts")
+    parser.add_argument('--no-cache', action='store_true', help="Rebuild every section")
+    args = parser.parse_args()
+
     print("🚀 Generating Device Management System Flowchart PDF...")
-    filename = create_flowchart_pdf()
-    print(f"✅ PDF generated successfully: {filename}")
+    started = time.perf_counter()
+    filename, rebuilt = create_flowchart_pdf(args.out, args.db, None if args.no_cache else CACHE_DIR)
+    print(f"✅ PDF generated successfully: {filename} ({time.perf_counter() - started:.2f}s)")
+    print(f"🔁 Rebuilt sections: {', '.join(rebuilt) if rebuilt else 'none (all cached)'}")
     print(f"📄 File size: {os.path.getsize(filename) / 1024:.2f} KB")
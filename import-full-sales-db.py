@@ -1,16 +1,18 @@
 #!/usr/bin/env python3
 """Import full sales database, preserving October 2025 data"""
 
-import openpyxl
 import sys
 from datetime import datetime
 
+from canonical import load_canonicalizer
+from import_pipeline import DB_PATH, SALES_FILE, SALES_SQL, run_sql_import
+from import_records import PaymentRecord, SaleItemRecord, SaleRecord
+
 def clean_value(val):
     """Clean cell value"""
     if val is None:
         return ''
-    val_str = str(val).strip()
-    return val_str.replace("'", "''")
+    return str(val).strip()
 
 def parse_amount(val):
     """Parse currency amount"""
@@ -44,38 +46,14 @@ def parse_date(val):
         pass
     return None
 
-def map_employee_name(name):
-    """Map employee names"""
-    if not name:
-        return 'Unknown'
-    name_str = str(name).strip()
-    if 'Akash' in name_str or 'akash' in name_str:
-        return 'Akash Parashar'
-    if 'Mandeep' in name_str or 'mandeep' in name_str:
-        return 'Mandeep Samal'
-    if 'Smruti' in name_str or 'smruti' in name_str:
-        return 'Smruti Ranjan Nayak'
-    if 'Divyanshu' in name_str or 'divyanshu' in name_str:
-        return 'Divyanshu Tripathi'
-    return name_str
-
-def main():
-    wb = openpyxl.load_workbook('/tmp/saledatabase.xlsx', read_only=True, data_only=True)
-    ws = wb.active
-    
-    rows = list(ws.iter_rows(values_only=True))
-    
-    if len(rows) < 2:
-        print("No data found")
-        return
-    
-    header = rows[0]
+def build_statements(rows, canon):
+    """Statements and sale / item / payment records for the sales sheet rows (header first)"""
     print(f"Processing {len(rows)-1} sales records...")
     
     # SQL to delete old sales (before October 2025)
     delete_sql = "DELETE FROM sales WHERE sale_date < '2025-10-01';\n"
     delete_sql += "DELETE FROM sale_items WHERE order_id NOT IN (SELECT order_id FROM sales);\n"
-    delete_sql += "DELETE FROM payment_history WHERE order_id NOT IN (SELECT order_id FROM sales);\n\n"
+    delete_sql += "DELETE FROM payment_history WHERE order_id NOT IN (SELECT order_id FROM sales);\n"
     
     sql_statements = [delete_sql]
     imported = 0
@@ -101,7 +79,7 @@ def main():
             continue
         
         customer_code = clean_value(row[4])
-        employee_name = map_employee_name(row[5])
+        employee_name = clean_value(canon.employee(row[5]))
         company_name = clean_value(row[6])
         customer_name = clean_value(row[7])
         mobile_number = clean_value(row[8])
@@ -134,22 +112,14 @@ def main():
         payment_ref = clean_value(row[45])
         
         # Insert sale
-        sale_sql = f"""INSERT OR IGNORE INTO sales (
-  order_id, customer_code, customer_name, company_name, customer_contact,
-  sale_date, employee_name, sale_type, courier_cost, amount_received, 
-  balance_amount, remarks, subtotal, gst_amount, total_amount, 
-  account_received, payment_reference
-) VALUES (
-  '{order_id}', '{customer_code}', '{customer_name}', '{company_name}', '{mobile_number}',
-  '{sale_date}', '{employee_name}', '{sale_type}', {courier}, {amount_received},
-  {balance_payment}, '{remarks}', {subtotal}, {gst_amount}, {total_amount},
-  'IDFC', '{payment_ref}'
-);
-"""
-        sql_statements.append(sale_sql)
+        sql_statements.append(SaleRecord(
+            order_id, customer_code, customer_name, company_name, mobile_number,
+            sale_date, employee_name, sale_type, courier, amount_received,
+            balance_payment, remarks, subtotal, gst_amount, total_amount,
+            payment_reference=payment_ref,
+        ))
         
         # Parse products (P1-P6)
-        products = []
         product_configs = [
             (17, 18, 19, 20),  # P1
             (22, 23, 24, 25),  # P2
@@ -166,36 +136,27 @@ def main():
                 unit_price = parse_amount(row[rate_idx]) if len(row) > rate_idx else 0
                 
                 if product_name and quantity > 0 and unit_price > 0:
-                    products.append({
-                        'name': product_name,
-                        'quantity': quantity,
-                        'price': unit_price
-                    })
-        
-        # Insert sale items
-        for product in products:
-            item_sql = f"""INSERT INTO sale_items (order_id, product_name, quantity, unit_price)
-VALUES ('{order_id}', '{product['name']}', {product['quantity']}, {product['price']});
-"""
-            sql_statements.append(item_sql)
+                    sheet_code = row[code_idx] if len(row) > code_idx else None
+                    product_code, _ = canon.product(row[name_idx], sheet_code)
+                    sql_statements.append(SaleItemRecord(
+                        order_id, product_code or None, product_name, quantity, unit_price
+                    ))
         
         # Insert payment history if amount received
         if amount_received > 0:
-            payment_sql = f"""INSERT INTO payment_history (order_id, payment_date, amount, account_received, payment_reference)
-VALUES ('{order_id}', '{sale_date}', {amount_received}, 'IDFC', '{payment_ref}');
-"""
-            sql_statements.append(payment_sql)
+            sql_statements.append(PaymentRecord(
+                order_id, sale_date, amount_received, payment_reference=payment_ref
+            ))
         
         imported += 1
     
-    # Write SQL to file
-    with open('/tmp/import-full-sales-db.sql', 'w', encoding='utf-8') as f:
-        f.write(''.join(sql_statements))
-    
     print(f'\nProcessed: {imported} sales')
     print(f'Skipped: {skipped} (October 2025 or invalid)')
-    print(f'SQL written to /tmp/import-full-sales-db.sql')
-    print(f'Total SQL statements: {len(sql_statements)}')
+    return sql_statements
+
+def main(excel_file=SALES_FILE, out_file=SALES_SQL, db_path=DB_PATH):
+    canon = load_canonicalizer(db_path)
+    run_sql_import(excel_file, lambda rows: build_statements(rows, canon), out_file)
 
 if __name__ == '__main__':
     main()
@@ -1,29 +1,19 @@
 #!/usr/bin/env python3
 """Import leads data from Excel to production database"""
 
-import openpyxl
 import sys
 
+from import_pipeline import LEADS_FILE, LEADS_SQL, run_sql_import
+from import_records import LeadRecord
+
 def clean_value(val):
-    """Clean cell value - convert to string and escape quotes"""
+    """Clean cell value - convert to string (quotes are escaped when the SQL is written)"""
     if val is None:
         return ''
-    val_str = str(val).strip()
-    # Escape single quotes for SQL
-    return val_str.replace("'", "''")
+    return str(val).strip()
 
-def main():
-    # Open Excel file
-    wb = openpyxl.load_workbook('/tmp/leads.xlsx', read_only=True, data_only=True)
-    ws = wb.active
-    
-    # Get all rows
-    rows = list(ws.iter_rows(values_only=True))
-    
-    if len(rows) < 2:
-        print("No data found in Excel file")
-        return
-    
+def build_statements(rows):
+    """LeadRecords for the leads sheet rows (header first)"""
     # First row is header
     header = rows[0]
     print(f"Found {len(rows)-1} lead records")
@@ -72,32 +62,17 @@ def main():
             count += 1
             customer_code = f'LEAD{count:04d}'
         
-        # Build SQL statement
-        sql = f"""INSERT OR IGNORE INTO leads (
-  customer_code, customer_name, mobile_number, alternate_mobile, location,
-  company_name, gst_number, email, complete_address, status
-) VALUES (
-  '{customer_code}',
-  '{customer_name}',
-  '{mobile_number}',
-  '{alternate_mobile}',
-  '{location}',
-  '{company_name}',
-  '{gst_number}',
-  '{email}',
-  '{complete_address}',
-  '{status if status else 'New'}'
-);"""
-        sql_statements.append(sql)
+        sql_statements.append(LeadRecord(
+            customer_code, customer_name, mobile_number, alternate_mobile, location,
+            company_name, gst_number, email, complete_address, status
+        ))
         count += 1
     
-    # Write SQL to file
-    with open('/tmp/import-leads.sql', 'w', encoding='utf-8') as f:
-        f.write('\n'.join(sql_statements))
-    
     print(f'Parsed {count} lead records')
-    print(f'SQL statements written to /tmp/import-leads.sql')
-    print(f'Total SQL statements: {len(sql_statements)}')
+    return sql_statements
+
+def main(excel_file=LEADS_FILE, out_file=LEADS_SQL):
+    run_sql_import(excel_file, build_statements, out_file)
 
 if __name__ == '__main__':
     try:
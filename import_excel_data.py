@@ -4,15 +4,68 @@ Excel Data Import Script for AxelGuard Dashboard
 Imports data from 3 sheets: Dispatch, QC Status, and Inventory
 """
 
-import openpyxl
+import argparse
+import math
+import random
 import sqlite3
 import sys
+import time
+from collections import Counter
 from datetime import datetime
-from pathlib import Path
 
-# Database path (local D1 database)
-DB_PATH = "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
-EXCEL_FILE = "/home/user/uploaded_files/Inventory QC.xlsx"
+from dispatch_reconcile import reconcile_orders, print_summary
+from import_pipeline import DB_PATH, INVENTORY_FILE as EXCEL_FILE, load_sheets, require_file
+from import_records import DispatchRecord, InventoryRecord, QCRecord
+from renewal_queue import refresh_due_queue, print_refresh_summary
+from workbook_cache import iter_sheet_rows
+
+DEFAULT_SAMPLE = 2000
+
+# Sheet columns in order (the importers read them by position)
+INVENTORY_COLUMNS = [
+    's_no', 'in_date', 'model_name', 'device_serial_no', 'dispatch_date', 'cust_code',
+    'sale_date', 'customer_name', 'cust_city', 'cust_mobile', 'dispatch_reason', 'warranty_provide',
+    'old_serial_no', 'license_renew_time', 'user_id', 'password', 'account_activation_date', 'account_expiry_date',
+]
+DISPATCH_COLUMNS = [
+    's_no', 'device_serial_no', 'device_name', 'qc_status', 'dispatch_reason', 'order_id', 'cust_code',
+    'customer_name', 'company_name', 'dispatch_date', 'courier_company', 'dispatch_method', 'tracking_id',
+]
+QC_COLUMNS = [
+    's_no', 'qc_date', 'serial_number', 'device_type', 'camera_quality', 'sd_connectivity', 'all_ch_status',
+    'network_connectivity', 'gps_qc', 'sim_slot_qc', 'online_qc', 'monitor_qc', 'final_qc_status',
+    'ip_address_update', 'final_remarks',
+]
+DATE_COLUMNS = {
+    'in_date', 'dispatch_date', 'sale_date', 'license_renew_time',
+    'account_activation_date', 'account_expiry_date', 'qc_date',
+}
+# Columns after the fixed layout that excel_export.py writes so an export
+# re-imports unchanged; read by header name when a sheet has them
+OPTIONAL_COLUMNS = {
+    'Inventory': [('Status', 'status'), ('Order Id', 'order_id')],
+    'Dispatch': [('Cust Mobile', 'customer_mobile'), ('Cust City', 'customer_city'),
+                 ('Dispatched By', 'dispatched_by')],
+    'QC Status': [('Checked By', 'checked_by'), ('Test Results', 'test_results')],
+}
+QC_TEST_LABELS = [
+    ('camera_quality', 'Camera'), ('sd_connectivity', 'SD Card'), ('all_ch_status', 'All Channels'),
+    ('network_connectivity', 'Network'), ('gps_qc', 'GPS'), ('sim_slot_qc', 'SIM Slot'),
+    ('online_qc', 'Online'), ('monitor_qc', 'Monitor'), ('ip_address_update', 'IP Address'),
+]
+
+# Placeholder devices for dispatch / QC rows whose serial is not in the Inventory sheet
+PLACEHOLDER_DISPATCHED = '''
+    INSERT INTO inventory (
+        device_serial_no, model_name, status,
+        dispatch_date, customer_name, cust_code
+    ) VALUES (?, ?, 'Dispatched', ?, ?, ?)
+'''
+PLACEHOLDER_QC = '''
+    INSERT INTO inventory (
+        device_serial_no, model_name, status
+    ) VALUES (?, ?, 'Quality Check')
+'''
 
 def format_date(value):
     """Convert Excel date to SQLite date format"""
@@ -36,13 +89,87 @@ def clean_value(value):
         return value.strip() if value.strip() else None
     return value
 
-def import_inventory_sheet(wb, conn):
+def sheet_columns(header, columns, optional=()):
+    """Column name per position: the fixed layout, then any optional (label, name) found in the header after it"""
+    labels = [str(label).strip().casefold() if label is not None else '' for label in header]
+    names = list(columns)
+    for label, name in optional:
+        if label.casefold() in labels[len(columns):]:
+            idx = labels.index(label.casefold(), len(columns))
+            names += [None] * (idx + 1 - len(names))
+            names[idx] = name
+    return names
+
+def read_row(row, columns):
+    """Cleaned {column: value} for one sheet row; date columns as YYYY-MM-DD, missing cells as None"""
+    if len(row) < len(columns):
+        row = tuple(row) + (None,) * (len(columns) - len(row))
+    return {name: format_date(row[i]) if name in DATE_COLUMNS else clean_value(row[i])
+            for i, name in enumerate(columns) if name}
+
+def inventory_record(row, columns=INVENTORY_COLUMNS):
+    """InventoryRecord for an Inventory row, or None when it has no serial number"""
+    r = read_row(row, columns)
+    if not r['device_serial_no']:
+        return None
+    # Status follows dispatch_date unless the sheet has a Status column
+    status = r.get('status') or ('Dispatched' if r['dispatch_date'] else 'In Stock')
+    return InventoryRecord(*(r[name] for name in INVENTORY_COLUMNS), status=status, order_id=r.get('order_id'))
+
+def dispatch_record(row, columns=DISPATCH_COLUMNS):
+    """DispatchRecord for a Dispatch row, or None when it has no serial number or dispatch date"""
+    r = read_row(row, columns)
+    if not r['device_serial_no'] or not r['dispatch_date']:
+        return None
+    return DispatchRecord(
+        serial_number=r['s_no'], device_serial_no=str(r['device_serial_no']), dispatch_date=r['dispatch_date'],
+        customer_name=r['customer_name'], customer_code=r['cust_code'], dispatch_reason=r['dispatch_reason'],
+        courier_name=r['courier_company'], tracking_number=r['tracking_id'], order_id=r['order_id'],
+        qc_status=r['qc_status'], dispatch_method=r['dispatch_method'], company_name=r['company_name'],
+        customer_mobile=r.get('customer_mobile'), customer_city=r.get('customer_city'),
+        dispatched_by=r.get('dispatched_by'), device_name=r['device_name'],
+    )
+
+def qc_record(row, columns=QC_COLUMNS):
+    """QCRecord for a QC Status row with pass_fail and test_results filled in, or None when it has no serial number"""
+    r = read_row(row, columns)
+    if not r['serial_number']:
+        return None
+    
+    # Determine final status
+    final_qc_status = r['final_qc_status']
+    if final_qc_status and 'pass' in final_qc_status.lower():
+        pass_fail = 'Pass'
+    elif final_qc_status and 'fail' in final_qc_status.lower():
+        pass_fail = 'Fail'
+    else:
+        pass_fail = 'Pending'
+    
+    # Build detailed test results (a Test Results column is taken as stored, empty meaning NULL)
+    if 'test_results' in r:
+        test_results = r['test_results']
+    else:
+        test_results_parts = [f"{label}: {r[name]}" for name, label in QC_TEST_LABELS if r[name]]
+        test_results = " | ".join(test_results_parts) if test_results_parts else "No test details"
+    return QCRecord(
+        serial_number=r['s_no'], device_serial_no=str(r['serial_number']), check_date=r['qc_date'],
+        checked_by=r.get('checked_by'), test_results=test_results, pass_fail=pass_fail, notes=r['final_remarks'],
+        device_type=r['device_type'],
+    )
+
+def linked_values(record, inventory_id):
+    """INSERT values for a dispatch / QC record once it is linked to its inventory row"""
+    record.inventory_id = inventory_id
+    return record.values()
+
+def import_inventory_sheet(sheets, conn):
     """Import data from Inventory sheet"""
     print("\n" + "="*60)
     print("📦 IMPORTING INVENTORY DATA")
     print("="*60)
     
-    ws = wb['Inventory']
+    rows = sheets['Inventory']
+    columns = sheet_columns(rows[0] if rows else (), INVENTORY_COLUMNS, OPTIONAL_COLUMNS['Inventory'])
     cursor = conn.cursor()
     
     # Clear existing data
@@ -54,56 +181,18 @@ def import_inventory_sheet(wb, conn):
     error_count = 0
     skip_count = 0
     
-    for row_idx in range(2, ws.max_row + 1):
-        row = ws[row_idx]
+    for row_idx, row in enumerate(rows[1:], start=2):
         
-        # Extract data
-        s_no = clean_value(row[0].value)
-        in_date = format_date(row[1].value)
-        model_name = clean_value(row[2].value)
-        device_serial_no = clean_value(row[3].value)
-        dispatch_date = format_date(row[4].value)
-        cust_code = clean_value(row[5].value)
-        sale_date = format_date(row[6].value)
-        customer_name = clean_value(row[7].value)
-        cust_city = clean_value(row[8].value)
-        cust_mobile = clean_value(row[9].value)
-        dispatch_reason = clean_value(row[10].value)
-        warranty_provide = clean_value(row[11].value)
-        old_serial_no = clean_value(row[12].value)
-        license_renew_time = format_date(row[13].value)
-        user_id = clean_value(row[14].value)
-        password = clean_value(row[15].value)
-        account_activation_date = format_date(row[16].value)
-        account_expiry_date = format_date(row[17].value)
+        record = inventory_record(row, columns)
         
         # Skip if no serial number
-        if not device_serial_no:
+        if record is None:
             skip_count += 1
             continue
-        
-        # Determine status based on dispatch_date
-        if dispatch_date:
-            status = 'Dispatched'
-        else:
-            status = 'In Stock'
+        device_serial_no = record.device_serial_no
         
         try:
-            cursor.execute('''
-                INSERT INTO inventory (
-                    serial_number, in_date, model_name, device_serial_no,
-                    dispatch_date, cust_code, sale_date, customer_name,
-                    cust_city, cust_mobile, dispatch_reason, warranty_provide,
-                    old_serial_no, license_renew_time, user_id, password,
-                    account_activation_date, account_expiry_date, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                s_no, in_date, model_name, device_serial_no,
-                dispatch_date, cust_code, sale_date, customer_name,
-                cust_city, cust_mobile, dispatch_reason, warranty_provide,
-                old_serial_no, license_renew_time, user_id, password,
-                account_activation_date, account_expiry_date, status
-            ))
+            cursor.execute(InventoryRecord.INSERT, record.values())
             success_count += 1
             
             if success_count % 500 == 0:
@@ -127,15 +216,21 @@ def import_inventory_sheet(wb, conn):
     
     return success_count
 
-def import_dispatch_sheet(wb, conn):
-    """Import data from Dispatch sheet"""
+def import_dispatch_sheet(sheets, conn, touched_orders=None):
+    """Import data from Dispatch sheet; collects affected order ids into touched_orders"""
     print("\n" + "="*60)
     print("🚚 IMPORTING DISPATCH DATA")
     print("="*60)
     
-    ws = wb['Dispatch']
+    rows = sheets['Dispatch']
+    columns = sheet_columns(rows[0] if rows else (), DISPATCH_COLUMNS, OPTIONAL_COLUMNS['Dispatch'])
     cursor = conn.cursor()
     
+    # Orders losing their dispatches also need reconciling
+    if touched_orders is not None:
+        cursor.execute("SELECT DISTINCT order_id FROM dispatch_records WHERE order_id IS NOT NULL")
+        touched_orders.update(str(order_id) for (order_id,) in cursor.fetchall())
+    
     # Clear existing dispatch records
     cursor.execute("DELETE FROM dispatch_records")
     conn.commit()
@@ -145,45 +240,29 @@ def import_dispatch_sheet(wb, conn):
     error_count = 0
     skip_count = 0
     
-    for row_idx in range(2, ws.max_row + 1):
-        row = ws[row_idx]
+    for row_idx, row in enumerate(rows[1:], start=2):
         
-        # Extract data
-        s_no = clean_value(row[0].value)
-        device_serial_no = clean_value(row[1].value)
-        device_name = clean_value(row[2].value)
-        qc_status = clean_value(row[3].value) or 'Pending'
-        dispatch_reason = clean_value(row[4].value)
-        order_id = clean_value(row[5].value)
-        cust_code = clean_value(row[6].value)
-        customer_name = clean_value(row[7].value)
-        company_name = clean_value(row[8].value)
-        dispatch_date = format_date(row[9].value)
-        courier_company = clean_value(row[10].value)
-        dispatch_method = clean_value(row[11].value)
-        tracking_id = clean_value(row[12].value)
+        r = dispatch_record(row, columns)
         
         # Skip if no serial number or dispatch date
-        if not device_serial_no or not dispatch_date:
+        if r is None:
             skip_count += 1
             continue
         
         # Find inventory_id for this serial number
         cursor.execute(
             "SELECT id FROM inventory WHERE device_serial_no = ?",
-            (str(device_serial_no),)
+            (r.device_serial_no,)
         )
         result = cursor.fetchone()
         
         if not result:
             # Create inventory record if doesn't exist
             try:
-                cursor.execute('''
-                    INSERT INTO inventory (
-                        device_serial_no, model_name, status,
-                        dispatch_date, customer_name, cust_code
-                    ) VALUES (?, ?, 'Dispatched', ?, ?, ?)
-                ''', (str(device_serial_no), device_name or 'Unknown', dispatch_date, customer_name, cust_code))
+                cursor.execute(PLACEHOLDER_DISPATCHED, (
+                    r.device_serial_no, r.device_name or 'Unknown', r.dispatch_date,
+                    r.customer_name, r.customer_code
+                ))
                 inventory_id = cursor.lastrowid
             except:
                 skip_count += 1
@@ -192,20 +271,10 @@ def import_dispatch_sheet(wb, conn):
             inventory_id = result[0]
         
         try:
-            cursor.execute('''
-                INSERT INTO dispatch_records (
-                    serial_number, inventory_id, device_serial_no, dispatch_date,
-                    customer_name, customer_code, dispatch_reason, courier_name,
-                    tracking_number, dispatched_by, order_id, qc_status,
-                    dispatch_method, company_name
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                s_no, inventory_id, str(device_serial_no), dispatch_date,
-                customer_name or 'Unknown', cust_code, dispatch_reason,
-                courier_company, tracking_id, 'System Import', order_id,
-                qc_status, dispatch_method, company_name
-            ))
+            cursor.execute(DispatchRecord.INSERT, linked_values(r, inventory_id))
             success_count += 1
+            if touched_orders is not None and r.order_id:
+                touched_orders.add(str(r.order_id))
             
             if success_count % 500 == 0:
                 print(f"  ⏳ Processed {success_count} dispatch records...")
@@ -224,13 +293,14 @@ def import_dispatch_sheet(wb, conn):
     
     return success_count
 
-def import_qc_sheet(wb, conn):
+def import_qc_sheet(sheets, conn):
     """Import data from QC Status sheet"""
     print("\n" + "="*60)
     print("✅ IMPORTING QC STATUS DATA")
     print("="*60)
     
-    ws = wb['QC Status']
+    rows = sheets['QC Status']
+    columns = sheet_columns(rows[0] if rows else (), QC_COLUMNS, OPTIONAL_COLUMNS['QC Status'])
     cursor = conn.cursor()
     
     # Clear existing QC records
@@ -242,46 +312,26 @@ def import_qc_sheet(wb, conn):
     error_count = 0
     skip_count = 0
     
-    for row_idx in range(2, ws.max_row + 1):
-        row = ws[row_idx]
+    for row_idx, row in enumerate(rows[1:], start=2):
         
-        # Extract data
-        s_no = clean_value(row[0].value)
-        qc_date = format_date(row[1].value)
-        serial_number = clean_value(row[2].value)
-        device_type = clean_value(row[3].value)
-        camera_quality = clean_value(row[4].value)
-        sd_connectivity = clean_value(row[5].value)
-        all_ch_status = clean_value(row[6].value)
-        network_connectivity = clean_value(row[7].value)
-        gps_qc = clean_value(row[8].value)
-        sim_slot_qc = clean_value(row[9].value)
-        online_qc = clean_value(row[10].value)
-        monitor_qc = clean_value(row[11].value)
-        final_qc_status = clean_value(row[12].value)
-        ip_address_update = clean_value(row[13].value)
-        final_remarks = clean_value(row[14].value)
+        r = qc_record(row, columns)
         
         # Skip if no serial number
-        if not serial_number:
+        if r is None:
             skip_count += 1
             continue
         
         # Find inventory_id
         cursor.execute(
             "SELECT id FROM inventory WHERE device_serial_no = ?",
-            (str(serial_number),)
+            (r.device_serial_no,)
         )
         result = cursor.fetchone()
         
         if not result:
             # Create inventory record if doesn't exist
             try:
-                cursor.execute('''
-                    INSERT INTO inventory (
-                        device_serial_no, model_name, status
-                    ) VALUES (?, ?, 'Quality Check')
-                ''', (str(serial_number), device_type or 'Unknown'))
+                cursor.execute(PLACEHOLDER_QC, (r.device_serial_no, r.device_type or 'Unknown'))
                 inventory_id = cursor.lastrowid
             except:
                 skip_count += 1
@@ -289,48 +339,8 @@ def import_qc_sheet(wb, conn):
         else:
             inventory_id = result[0]
         
-        # Determine final status
-        if final_qc_status and 'pass' in final_qc_status.lower():
-            qc_status = 'Pass'
-        elif final_qc_status and 'fail' in final_qc_status.lower():
-            qc_status = 'Fail'
-        else:
-            qc_status = 'Pending'
-        
-        # Build detailed test results
-        test_results_parts = []
-        if camera_quality:
-            test_results_parts.append(f"Camera: {camera_quality}")
-        if sd_connectivity:
-            test_results_parts.append(f"SD Card: {sd_connectivity}")
-        if all_ch_status:
-            test_results_parts.append(f"All Channels: {all_ch_status}")
-        if network_connectivity:
-            test_results_parts.append(f"Network: {network_connectivity}")
-        if gps_qc:
-            test_results_parts.append(f"GPS: {gps_qc}")
-        if sim_slot_qc:
-            test_results_parts.append(f"SIM Slot: {sim_slot_qc}")
-        if online_qc:
-            test_results_parts.append(f"Online: {online_qc}")
-        if monitor_qc:
-            test_results_parts.append(f"Monitor: {monitor_qc}")
-        if ip_address_update:
-            test_results_parts.append(f"IP Address: {ip_address_update}")
-        
-        test_results = " | ".join(test_results_parts) if test_results_parts else "No test details"
-        
         try:
-            cursor.execute('''
-                INSERT INTO quality_check (
-                    serial_number, inventory_id, device_serial_no, check_date,
-                    checked_by, test_results, pass_fail, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                s_no, inventory_id, str(serial_number),
-                qc_date or datetime.now().strftime('%Y-%m-%d'),
-                'System Import', test_results, qc_status, final_remarks
-            ))
+            cursor.execute(QCRecord.INSERT, linked_values(r, inventory_id))
             success_count += 1
             
             if success_count % 500 == 0:
@@ -350,36 +360,247 @@ def import_qc_sheet(wb, conn):
     
     return success_count
 
-def main():
+def reservoir_scan(rows, sample_size, rng, key):
+    """
+    One pass over a sheet's data rows: (row count, uniform sample of
+    (row_idx, row), {key(row): first row_idx}) -- rows with a None key are
+    left out of the index
+    """
+    sample, first, count = [], {}, 0
+    for row_idx, row in enumerate(rows, start=2):
+        count += 1
+        if count <= sample_size:
+            sample.append((row_idx, row))
+        else:
+            slot = rng.randrange(count)
+            if slot < sample_size:
+                sample[slot] = (row_idx, row)
+        k = key(row)
+        if k is not None and k not in first:
+            first[k] = row_idx
+    sample.sort(key=lambda item: item[0])
+    return count, sample, first
+
+def _serial_key(serial_column, date_column=None):
+    """Index key for reservoir_scan: the serial as the importers look it up, None for rows they skip"""
+    def key(row):
+        serial = clean_value(row[serial_column])
+        if not serial or (date_column is not None and not format_date(row[date_column])):
+            return None
+        return str(serial)
+    return key
+
+def _scratch_schema(ro):
+    """In-memory copy of the inventory / dispatch / QC tables and indexes (no triggers)"""
+    scratch = sqlite3.connect(':memory:')
+    for (sql,) in ro.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE tbl_name IN ('inventory', 'dispatch_records', 'quality_check')
+          AND type IN ('table', 'index') AND sql IS NOT NULL
+        ORDER BY type = 'index'
+    '''):
+        scratch.execute(sql)
+    return scratch
+
+def _try(scratch, statements):
+    """Run the importer's statements in a savepoint that is rolled back; None or the error text"""
+    scratch.execute("SAVEPOINT preview")
+    try:
+        last_id = 1
+        for sql, params in statements:
+            params = params(last_id) if callable(params) else params
+            last_id = scratch.execute(sql, params).lastrowid
+        return None
+    except Exception as e:
+        return str(e)
+    finally:
+        scratch.execute("ROLLBACK TO preview")
+        scratch.execute("RELEASE preview")
+
+def _unparsed_dates(row, columns, counts):
+    """Count date cells that hold something format_date() cannot read"""
+    for i, name in enumerate(columns):
+        if name in DATE_COLUMNS and row[i] not in (None, '') and format_date(row[i]) is None:
+            counts[name] += 1
+
+def projection(count, sample_size, total):
+    """Sample count scaled to the sheet: (estimate, 95% margin)"""
+    if not sample_size:
+        return 0, 0
+    share = count / sample_size
+    if sample_size >= total:
+        return count, 0
+    margin = 1.96 * math.sqrt(share * (1 - share) / sample_size * (total - sample_size) / (total - 1)) * total
+    return round(share * total), round(margin)
+
+def preview_import(excel_file=None, db_path=None, sample_size=DEFAULT_SAMPLE, seed=None):
+    """
+    Run a uniform sample of each sheet's rows through the importers' row
+    logic against a read-only connection and project the outcome for the
+    whole file. Nothing is written.
+
+    Each sheet is streamed once: the sample is drawn with reservoir
+    sampling while the serials the importers match on are indexed, so
+    duplicate, matched and placeholder decisions for sampled rows are the
+    ones the full import would make. Sampled rows are inserted into an
+    in-memory copy of the live schema (and rolled back) to surface
+    constraint errors.
+    """
+    excel_file = excel_file or EXCEL_FILE
+    db_path = db_path or DB_PATH
+    require_file(excel_file)
+    require_file(db_path, "Database file", "Run: npm run dev first to create the database")
+    started = time.perf_counter()
+    rng = random.Random(seed)
+
+    ro = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        scratch = _scratch_schema(ro)
+        scans = {}
+        headers = {}
+        layouts = {}
+        for sheet, columns, key in (
+            ('Inventory', INVENTORY_COLUMNS, _serial_key(3)),
+            ('Dispatch', DISPATCH_COLUMNS, _serial_key(1, 9)),
+            ('QC Status', QC_COLUMNS, _serial_key(2)),
+        ):
+            rows = iter_sheet_rows(excel_file, sheet)
+            headers[sheet] = next(rows, ())
+            layouts[sheet] = sheet_columns(headers[sheet], columns, OPTIONAL_COLUMNS[sheet])
+            scans[sheet] = reservoir_scan(rows, sample_size, rng, key)
+        inventory_first = scans['Inventory'][2]
+        dispatch_first = scans['Dispatch'][2]
+        qc_first = scans['QC Status'][2]
+
+        outcomes = {sheet: Counter() for sheet in scans}
+        unparsed = {sheet: Counter() for sheet in scans}
+        existing = 0
+
+        for row_idx, row in scans['Inventory'][1]:
+            _unparsed_dates(row, layouts['Inventory'], unparsed['Inventory'])
+            record = inventory_record(row, layouts['Inventory'])
+            if record is None:
+                outcomes['Inventory']['skipped (no serial number)'] += 1
+                continue
+            serial = str(record.device_serial_no)
+            values = record.values()
+            statements = [(InventoryRecord.INSERT, values)]
+            if inventory_first[serial] < row_idx:
+                statements.append((InventoryRecord.INSERT, values))  # an earlier row holds this serial
+            error = _try(scratch, statements)
+            outcomes['Inventory'][f"error: {error}" if error else 'inserted'] += 1
+            existing += ro.execute("SELECT 1 FROM inventory WHERE device_serial_no = ?", (serial,)).fetchone() is not None
+
+        for row_idx, row in scans['Dispatch'][1]:
+            _unparsed_dates(row, layouts['Dispatch'], unparsed['Dispatch'])
+            r = dispatch_record(row, layouts['Dispatch'])
+            if r is None:
+                outcomes['Dispatch']['skipped (no serial number or dispatch date)'] += 1
+                continue
+            serial = r.device_serial_no
+            statements = [(DispatchRecord.INSERT, lambda inventory_id: linked_values(r, inventory_id))]
+            placeholder = serial not in inventory_first and dispatch_first[serial] == row_idx
+            if placeholder:
+                statements.insert(0, (PLACEHOLDER_DISPATCHED, (
+                    serial, r.device_name or 'Unknown', r.dispatch_date, r.customer_name, r.customer_code)))
+            error = _try(scratch, statements)
+            outcome = f"error: {error}" if error else 'inserted'
+            if placeholder and not error:
+                outcome += ' with a placeholder device'
+            elif serial not in inventory_first and not error:
+                outcome += ' (device from an earlier placeholder)'
+            outcomes['Dispatch'][outcome] += 1
+
+        for row_idx, row in scans['QC Status'][1]:
+            _unparsed_dates(row, layouts['QC Status'], unparsed['QC Status'])
+            r = qc_record(row, layouts['QC Status'])
+            if r is None:
+                outcomes['QC Status']['skipped (no serial number)'] += 1
+                continue
+            serial = r.device_serial_no
+            known = serial in inventory_first or serial in dispatch_first
+            placeholder = not known and qc_first[serial] == row_idx
+            statements = [(QCRecord.INSERT, lambda inventory_id: linked_values(r, inventory_id))]
+            if placeholder:
+                statements.insert(0, (PLACEHOLDER_QC, (serial, r.device_type or 'Unknown')))
+            error = _try(scratch, statements)
+            outcome = f"error: {error}" if error else 'inserted'
+            if placeholder and not error:
+                outcome += ' with a placeholder device'
+            elif not known and not error:
+                outcome += ' (device from an earlier placeholder)'
+            outcomes['QC Status'][outcome] += 1
+
+        current = {table: ro.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                   for table in ('inventory', 'dispatch_records', 'quality_check')}
+    finally:
+        ro.close()
+
+    print("\n" + "="*60)
+    print("🔍 IMPORT PREVIEW (dry run, nothing written)")
+    print("="*60)
+    print(f"   • File: {excel_file}")
+    print(f"   • Database (read-only): {db_path}")
+    print(f"   • Current rows replaced by a full import: inventory {current['inventory']:,}, "
+          f"dispatch_records {current['dispatch_records']:,}, quality_check {current['quality_check']:,}")
+
+    for sheet, columns in layouts.items():
+        total, sample, _ = scans[sheet]
+        n = len(sample)
+        print(f"\n📄 {sheet}: {total:,} rows, {n:,} sampled")
+        mapping = ', '.join(f"{headers[sheet][i] if i < len(headers[sheet]) else '(missing)'} → {name}"
+                            for i, name in enumerate(columns) if name)
+        print(f"   • Columns: {mapping}")
+        for outcome, count in sorted(outcomes[sheet].items(), key=lambda item: -item[1]):
+            estimate, margin = projection(count, n, total)
+            print(f"   • {'Projected ' + outcome:<60} ~{estimate:,}" + (f" (±{margin:,})" if margin else ''))
+        for column, count in unparsed[sheet].most_common():
+            estimate, margin = projection(count, n, total)
+            stored = "today's date" if column == 'qc_date' else 'NULL'
+            print(f"   • ⚠️  Unreadable {column} dates (stored as {stored}): ~{estimate:,}" + (f" (±{margin:,})" if margin else ''))
+        if sheet == 'Inventory' and n:
+            inserted = sum(c for o, c in outcomes[sheet].items() if o == 'inserted')
+            if inserted:
+                print(f"   • Serials already in the database: {existing / inserted:.0%} of sampled inserts")
+
+    print(f"\n   • Time: {time.perf_counter() - started:.1f}s")
+    return {'rows': {sheet: scan[0] for sheet, scan in scans.items()}, 'outcomes': outcomes, 'unparsed': unparsed}
+
+def main(excel_file=None, db_path=None):
+    excel_file = excel_file or EXCEL_FILE
+    db_path = db_path or DB_PATH
     print("\n" + "="*60)
     print("🚀 STARTING EXCEL DATA IMPORT")
     print("="*60)
     
     # Check if files exist
-    if not Path(EXCEL_FILE).exists():
-        print(f"❌ Error: Excel file not found at {EXCEL_FILE}")
-        sys.exit(1)
-    
-    if not Path(DB_PATH).exists():
-        print(f"❌ Error: Database file not found at {DB_PATH}")
-        print("   Run: npm run dev first to create the database")
-        sys.exit(1)
+    require_file(excel_file)
+    require_file(db_path, "Database file", "Run: npm run dev first to create the database")
     
     # Load Excel file
     print(f"\n📂 Loading Excel file...")
-    wb = openpyxl.load_workbook(EXCEL_FILE, data_only=True)
-    print(f"✅ Loaded {len(wb.sheetnames)} sheets: {wb.sheetnames}")
+    sheets = load_sheets(excel_file)['sheets']
     
     # Connect to database
     print(f"\n🔌 Connecting to database...")
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     print(f"✅ Connected to local D1 database")
     
     try:
         # Import data in sequence
-        total_inventory = import_inventory_sheet(wb, conn)
-        total_dispatch = import_dispatch_sheet(wb, conn)
-        total_qc = import_qc_sheet(wb, conn)
+        total_inventory = import_inventory_sheet(sheets, conn)
+        touched_orders = set()
+        total_dispatch = import_dispatch_sheet(sheets, conn, touched_orders)
+        total_qc = import_qc_sheet(sheets, conn)
+        
+        # Bring orders.dispatch_status / order_items.scanned_count in line
+        print("\n" + "="*60)
+        print(f"🔄 RECONCILING {len(touched_orders)} ORDERS WITH DISPATCHES")
+        print("="*60)
+        print_summary(reconcile_orders(conn, touched_orders))
+        
+        # Keep the renewal/warranty due-queue in step with the new inventory
+        print_refresh_summary(refresh_due_queue(conn))
         
         # Summary
         print("\n" + "="*60)
@@ -404,8 +625,17 @@ def main():
         sys.exit(1)
     finally:
         conn.close()
-        wb.close()
         print("\n🔒 Database connection closed")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Import the Inventory / Dispatch / QC Status workbook into the local D1 database")
+    parser.add_argument('--file', default=EXCEL_FILE, help="Source workbook (default: AXELGUARD_INVENTORY_XLSX)")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file (default: AXELGUARD_DB_PATH)")
+    parser.add_argument('--dry-run', action='store_true', help="Preview a sample against a read-only connection; write nothing")
+    parser.add_argument('--sample', type=int, default=DEFAULT_SAMPLE, help="Rows sampled per sheet with --dry-run")
+    parser.add_argument('--seed', type=int, help="Sampling seed (with --dry-run)")
+    args = parser.parse_args()
+    if args.dry_run:
+        preview_import(args.file, args.db, args.sample, args.seed)
+    else:
+        main(args.file, args.db)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Shared Import Pipeline for AxelGuard importers
+Every importer runs the same steps: check the source workbook, load its rows
+through the parse cache, convert them, then write a SQL file for wrangler /
+d1_uploader.py (or, for the inventory workbook, write to the local D1 file).
+Only the conversion step differs per importer.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from workbook_cache import load_workbook_rows
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+
+# Source workbooks and SQL outputs (flags on the axelguard CLI take precedence)
+INVENTORY_FILE = os.environ.get('AXELGUARD_INVENTORY_XLSX', "/home/user/uploaded_files/Inventory QC.xlsx")
+SALES_FILE = os.environ.get('AXELGUARD_SALES_XLSX', "/tmp/saledatabase.xlsx")
+LEADS_FILE = os.environ.get('AXELGUARD_LEADS_XLSX', "/tmp/leads.xlsx")
+SALES_SQL = os.environ.get('AXELGUARD_SALES_SQL', "/tmp/import-full-sales-db.sql")
+LEADS_SQL = os.environ.get('AXELGUARD_LEADS_SQL', "/tmp/import-leads.sql")
+
+
+def require_file(path, label="Excel file", hint=None):
+    """Exit with the importers' error message when path is missing"""
+    if not Path(path).exists():
+        print(f"❌ Error: {label} not found at {path}")
+        if hint:
+            print(f"   {hint}")
+        sys.exit(1)
+
+
+def load_sheets(path, verbose=True):
+    """Every sheet of the workbook as row tuples (header row included), via the parse cache"""
+    require_file(path)
+    workbook = load_workbook_rows(path)
+    if verbose:
+        source = "parse cache" if workbook['cached'] else "openpyxl"
+        print(f"✅ Loaded {len(workbook['sheets'])} sheets from {source}: {list(workbook['sheets'])}")
+    return workbook
+
+
+def load_rows(path, sheet_name=None):
+    """Rows of one sheet (the active sheet by default)"""
+    workbook = load_sheets(path, verbose=False)
+    return workbook['sheets'][sheet_name or workbook['active']]
+
+
+def write_sql(statements, out_path, separator='\n'):
+    """
+    Write generated statements atomically and report where they went.
+    Statements are SQL strings or import_records rows, rendered one at a
+    time as they are written.
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for i, statement in enumerate(statements):
+            if i:
+                f.write(separator)
+            f.write(statement if isinstance(statement, str) else statement.sql())
+    os.replace(tmp, out_path)
+    print(f'SQL written to {out_path}')
+    print(f'Total SQL statements: {len(statements)}')
+
+
+def run_sql_import(source, convert, out_path, separator='\n'):
+    """
+    Load the source sheet, convert its rows to SQL statements and write
+    them to out_path.
+
+    convert(rows) returns the statement list (SQL strings or
+    import_records rows) and prints its own counts.
+    """
+    rows = load_rows(source)
+    if len(rows) < 2:
+        print("No data found in Excel file")
+        return []
+    statements = convert(rows)
+    write_sql(statements, out_path, separator)
+    return statements
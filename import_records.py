@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Row Records for AxelGuard Importers
+One slotted class per target table (inventory, dispatch_records,
+quality_check, sales, sale_items, payment_history, leads). A record holds
+one row's values as attributes instead of a dict or loose locals, which
+keeps per-row memory small when an importer stages a whole sheet, and
+converts straight to the INSERT parameter tuple (values()) or, for the
+SQL-file importers, to a literal INSERT statement (sql()).
+"""
+
+from datetime import date
+from operator import attrgetter
+
+
+def sql_literal(value):
+    """Render a Python value as an inline SQLite literal"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, bytes):
+        return "X'" + value.hex() + "'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class Record:
+    """
+    Base for the row records. Subclasses set table, columns (INSERT order)
+    and optionally extra (importer-only fields that are not inserted),
+    verb and defaults: {column: value or callable} used when the column is
+    empty at insert time. Fields can be given positionally in slot order
+    or by name; unset fields are None.
+    """
+
+    __slots__ = ()
+    table = None
+    columns = ()
+    extra = ()
+    verb = 'INSERT'
+    defaults = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._row = attrgetter(*cls.columns)
+        cls._defaults = [(cls.columns.index(name), default) for name, default in cls.defaults.items()]
+        cls.INSERT = (f"{cls.verb} INTO {cls.table} ({', '.join(cls.columns)}) "
+                      f"VALUES ({', '.join('?' * len(cls.columns))})")
+
+    def __init__(self, *values, **fields):
+        values += (None,) * (len(self.__slots__) - len(values))
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, fields.pop(name, value))
+        if fields:
+            raise TypeError(f"{type(self).__name__} has no field {', '.join(fields)}")
+
+    def values(self):
+        """Parameters for cls.INSERT (execute / executemany), defaults applied"""
+        row = self._row(self)
+        if not self._defaults:
+            return row
+        row = list(row)
+        for index, default in self._defaults:
+            if not row[index]:
+                row[index] = default() if callable(default) else default
+        return tuple(row)
+
+    def sql(self):
+        """The INSERT as a literal SQL statement"""
+        return (f"{self.verb} INTO {self.table} ({', '.join(self.columns)}) "
+                f"VALUES ({', '.join(map(sql_literal, self.values()))});")
+
+
+class InventoryRecord(Record):
+    """inventory row from the Inventory sheet"""
+
+    columns = (
+        'serial_number', 'in_date', 'model_name', 'device_serial_no', 'dispatch_date', 'cust_code',
+        'sale_date', 'customer_name', 'cust_city', 'cust_mobile', 'dispatch_reason', 'warranty_provide',
+        'old_serial_no', 'license_renew_time', 'user_id', 'password', 'account_activation_date',
+        'account_expiry_date', 'status', 'order_id',
+    )
+    __slots__ = columns
+    table = 'inventory'
+
+
+class DispatchRecord(Record):
+    """dispatch_records row; device_name names the placeholder device for unknown serials"""
+
+    columns = (
+        'serial_number', 'inventory_id', 'device_serial_no', 'dispatch_date', 'customer_name', 'customer_code',
+        'dispatch_reason', 'courier_name', 'tracking_number', 'dispatched_by', 'order_id', 'qc_status',
+        'dispatch_method', 'company_name', 'customer_mobile', 'customer_city',
+    )
+    extra = ('device_name',)
+    __slots__ = columns + extra
+    table = 'dispatch_records'
+    defaults = {'customer_name': 'Unknown', 'dispatched_by': 'System Import', 'qc_status': 'Pending'}
+
+
+class QCRecord(Record):
+    """quality_check row; device_type names the placeholder device for unknown serials"""
+
+    columns = (
+        'serial_number', 'inventory_id', 'device_serial_no', 'check_date', 'checked_by', 'test_results',
+        'pass_fail', 'notes',
+    )
+    extra = ('device_type',)
+    __slots__ = columns + extra
+    table = 'quality_check'
+    defaults = {'check_date': lambda: date.today().isoformat(), 'checked_by': 'System Import'}
+
+
+class SaleRecord(Record):
+    """sales row from the sales sheet"""
+
+    columns = (
+        'order_id', 'customer_code', 'customer_name', 'company_name', 'customer_contact', 'sale_date',
+        'employee_name', 'sale_type', 'courier_cost', 'amount_received', 'balance_amount', 'remarks',
+        'subtotal', 'gst_amount', 'total_amount', 'account_received', 'payment_reference',
+    )
+    __slots__ = columns
+    table = 'sales'
+    verb = 'INSERT OR IGNORE'
+    defaults = {'account_received': 'IDFC'}
+
+
+class SaleItemRecord(Record):
+    """sale_items row (one of a sale's P1-P6 product columns)"""
+
+    columns = ('order_id', 'product_code', 'product_name', 'quantity', 'unit_price')
+    __slots__ = columns
+    table = 'sale_items'
+
+
+class PaymentRecord(Record):
+    """payment_history row for the amount received with a sale"""
+
+    columns = ('order_id', 'payment_date', 'amount', 'account_received', 'payment_reference')
+    __slots__ = columns
+    table = 'payment_history'
+    defaults = {'account_received': 'IDFC'}
+
+
+class LeadRecord(Record):
+    """leads row from the leads sheet"""
+
+    columns = (
+        'customer_code', 'customer_name', 'mobile_number', 'alternate_mobile', 'location', 'company_name',
+        'gst_number', 'email', 'complete_address', 'status',
+    )
+    __slots__ = columns
+    table = 'leads'
+    verb = 'INSERT OR IGNORE'
+    defaults = {'status': 'New'}
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Index Advisor for AxelGuard Dashboard
+Pulls every SQL string passed to .prepare(...) in src/index.tsx (including
+queries assembled with `let query = ...; query += ...`), runs EXPLAIN QUERY
+PLAN for each against an in-memory copy of a migrated D1 file, and flags
+full scans of large tables and temp B-trees for ORDER BY / GROUP BY.
+
+For each flagged statement it derives composite candidates (equality
+columns first, then one range or ordering column; expression indexes for
+DATE(col) predicates; a covering variant when the statement reads few
+columns), creates each candidate on the copy, and keeps the ones that
+change the plan and make the statement faster, with before/after timings.
+The database file itself is never modified.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+SOURCE_FILE = Path(__file__).resolve().parent / 'src' / 'index.tsx'
+
+PREPARE = re.compile(r'\.prepare\(\s*')
+ROUTE = re.compile(r"app\.(get|post|put|delete|patch)\(\s*['\"`]([^'\"`]+)")
+IDENT = re.compile(r'[A-Za-z_$][\w$]*')
+HOLE = '\x00'  # stands in for a ${...} interpolation until it is resolved
+
+SQL_KEYWORDS = {
+    'where', 'on', 'left', 'right', 'inner', 'outer', 'cross', 'join', 'group', 'order',
+    'limit', 'set', 'using', 'union', 'values', 'select', 'having', 'natural', 'as',
+    'and', 'or', 'not', 'null', 'is', 'in', 'case', 'when', 'then', 'else', 'end',
+    'default', 'returning', 'offset', 'asc', 'desc', 'distinct', 'by', 'like', 'between',
+}
+TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.I)
+PREDICATE = re.compile(
+    r'(?P<lhs>\b(?:DATE|LOWER|UPPER)\(\s*(?:\w+\.)?\w+\s*\)|(?:\b\w+\.)?\b[A-Za-z_]\w*)\s*'
+    r'(?P<op>==|=|!=|<>|>=|<=|>|<|\bIN\b|\bLIKE\b|\bBETWEEN\b|\bIS\b)\s*'
+    r'(?P<rhs>(?:\b\w+\.)?\b[A-Za-z_]\w*|\'[^\']*\')?', re.I)
+ORDERING = re.compile(r'\b(ORDER|GROUP)\s+BY\s+(.*?)(?=\bLIMIT\b|\bHAVING\b|\bORDER\b|\bUNION\b|\)|$)', re.I | re.S)
+CASE_EXPR = re.compile(r'\bCASE\b.*?\bEND\b', re.I | re.S)
+SET_CLAUSE = re.compile(r'\bSET\b.*?(?=\bWHERE\b|$)', re.I | re.S)
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS (\w+))?(?: USING INDEX \w+)?$')  # covering-index scans are fine
+TEMP_BTREE = re.compile(r'USE TEMP B-TREE FOR (.+)$')
+
+MAX_COVERING_COLUMNS = 5
+MIN_SAVING_MS = 0.05  # below this a "speedup" is timer noise
+
+EQUALITY_OPS = {'=', '==', 'in', 'is'}
+RANGE_OPS = {'>=', '<=', '>', '<', 'between'}
+
+
+# ----- extraction -----
+
+def read_literal(src, i):
+    """Parse the JS string literal starting at src[i]; returns (text, end, dynamic)"""
+    quote = src[i]
+    i += 1
+    out = []
+    dynamic = False
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            out.append(' ' if src[i + 1] in 'nrt' else src[i + 1])
+            i += 2
+            continue
+        if ch == quote:
+            return ''.join(out), i + 1, dynamic
+        if quote == '`' and src.startswith('${', i):
+            depth, j = 1, i + 2
+            while j < len(src) and depth:
+                depth += {'{': 1, '}': -1}.get(src[j], 0)
+                j += 1
+            out.append(HOLE)
+            dynamic = True
+            i = j
+            continue
+        out.append(ch)
+        i += 1
+    raise ValueError("unterminated string literal")
+
+
+def resolve_variable(src, name, pos, window=6000):
+    """Text of `let/const name = '...'` plus every `name += '...'` before pos"""
+    start = max(0, pos - window)
+    declarations = list(re.finditer(rf'\b(?:let|const|var)\s+{re.escape(name)}\s*=\s*(?=[`\'"])', src[start:pos]))
+    if not declarations:
+        return None
+    decl = declarations[-1]
+    text, end, dynamic = read_literal(src, start + decl.end())
+    parts = [text]
+    for append in re.finditer(rf'\b{re.escape(name)}\s*\+=\s*(?=[`\'"])', src[end:pos]):
+        piece, _, piece_dynamic = read_literal(src, end + append.end())
+        parts.append(' ' + piece)
+        dynamic = dynamic or piece_dynamic
+    return ''.join(parts), True, dynamic or len(parts) > 1
+
+
+def fill_holes(sql):
+    """Interpolations in value position become placeholders, the rest (clauses, columns) drop out"""
+    out = []
+    for i, piece in enumerate(sql.split(HOLE)):
+        if i:
+            before = ''.join(out).rstrip()
+            value_slot = before.endswith(('(', ',', '=', '<', '>')) or re.search(r'\b(LIMIT|OFFSET)$', before, re.I)
+            out.append('?' if value_slot else '')
+        out.append(piece)
+    return ''.join(out)
+
+
+def extract_statements(source_path):
+    """One record per prepare() call: line, route, sql, how it was found"""
+    src = Path(source_path).read_text(encoding='utf-8')
+    routes = [(m.start(), f"{m.group(1).upper()} {m.group(2)}") for m in ROUTE.finditer(src)]
+    statements = []
+    for match in PREPARE.finditer(src):
+        pos = match.end()
+        line = src.count('\n', 0, pos) + 1
+        route = next((label for start, label in reversed(routes) if start < pos), None)
+        record = {'line': line, 'route': route, 'sql': None, 'dynamic': False, 'variable': False}
+        try:
+            if src[pos] in '`\'"':
+                text, _, dynamic = read_literal(src, pos)
+                record.update(sql=text, dynamic=dynamic)
+            else:
+                name = IDENT.match(src, pos)
+                resolved = resolve_variable(src, name.group(0), match.start()) if name else None
+                if resolved:
+                    record.update(sql=resolved[0], variable=True, dynamic=resolved[2])
+        except (ValueError, IndexError):
+            pass
+        if record['sql'] is not None:
+            record['sql'] = ' '.join(fill_holes(record['sql']).split())
+        statements.append(record)
+    return statements
+
+
+def group_statements(records):
+    """Distinct SQL texts with all their call sites"""
+    grouped = {}
+    for record in records:
+        if record['sql'] is None:
+            continue
+        entry = grouped.setdefault(record['sql'], dict(record, sites=[]))
+        entry['sites'].append((record['line'], record['route']))
+    return list(grouped.values())
+
+
+# ----- analysis helpers -----
+
+def working_copy(db_path):
+    """In-memory copy of the database so candidate indexes never touch the file"""
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn = sqlite3.connect(':memory:', isolation_level=None)
+    source.backup(conn)
+    source.close()
+    return conn
+
+
+def placeholders(sql):
+    """Offsets of ? placeholders outside string literals"""
+    positions, quoted = [], False
+    for i, ch in enumerate(sql):
+        if ch == "'":
+            quoted = not quoted
+        elif ch == '?' and not quoted:
+            positions.append(i)
+    return positions
+
+
+class Schema:
+    """Tables, columns, existing indexes and row counts of the working copy"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.tables = {name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")}
+        self.columns = {t: [r[1] for r in conn.execute(f'PRAGMA table_info("{t}")')] for t in self.tables}
+        self.rows = {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in self.tables}
+        self._samples = {}
+
+    def existing_prefixes(self, table):
+        """Leading column lists of the table's current indexes"""
+        prefixes = []
+        for index in self.conn.execute(f'PRAGMA index_list("{table}")').fetchall():
+            cols = [r[2] for r in self.conn.execute(f'PRAGMA index_info("{index[1]}")')]
+            prefixes.append(cols)
+        return prefixes
+
+    def sample(self, table, column, kind):
+        """Realistic bind value: most common value for equality; for range bounds the 90th
+        percentile / max, since dashboard windows (this month, last 30 days) are recent"""
+        key = (table, column, kind)
+        if key not in self._samples:
+            q = f'"{column}"'
+            if kind == 'low':
+                sql = f'SELECT {q} FROM "{table}" WHERE {q} IS NOT NULL ORDER BY {q} LIMIT 1 OFFSET (SELECT COUNT({q}) * 9 / 10 FROM "{table}")'
+            elif kind == 'high':
+                sql = f'SELECT MAX({q}) FROM "{table}"'
+            else:
+                sql = f'SELECT {q} FROM "{table}" WHERE {q} IS NOT NULL GROUP BY {q} ORDER BY COUNT(*) DESC LIMIT 1'
+            row = self.conn.execute(sql).fetchone()
+            self._samples[key] = row[0] if row else None
+        return self._samples[key]
+
+
+class Query:
+    """Table aliases, predicate terms and ordering columns of one statement"""
+
+    def __init__(self, sql, schema):
+        self.sql = sql
+        self.schema = schema
+        self.aliases = {}
+        self.order = []
+        for m in TABLE_REF.finditer(sql):
+            table, alias = m.group(1), m.group(2)
+            if table not in schema.tables:
+                continue
+            self.aliases.setdefault(table, table)
+            if alias and alias.lower() not in SQL_KEYWORDS:
+                self.aliases[alias] = table
+            if table not in self.order:
+                self.order.append(table)
+        self.terms = self._terms()
+        self.ordering = self._ordering()
+
+    def resolve(self, ref):
+        """(table, column) for `alias.col` or an unqualified column of one of the statement's tables"""
+        if '.' in ref:
+            alias, column = ref.split('.', 1)
+            table = self.aliases.get(alias)
+            return (table, column) if table and column in self.schema.columns[table] else None
+        for table in self.order:
+            if ref in self.schema.columns[table]:
+                return table, ref
+        return None
+
+    def resolve_term(self, text):
+        """(table, index term) where the term is a column or a DATE()/LOWER()/UPPER() expression"""
+        func = re.match(r'(\w+)\(\s*([\w.]+)\s*\)', text)
+        resolved = self.resolve(func.group(2) if func else text)
+        if not resolved:
+            return None
+        table, column = resolved
+        return table, (f"{func.group(1).upper()}({column})" if func else column)
+
+    def _terms(self):
+        """[(table, term, 'eq'|'range')] in statement order"""
+        body = SET_CLAUSE.sub(' ', CASE_EXPR.sub(' ', self.sql))
+        terms = []
+        for m in PREDICATE.finditer(body):
+            if m.group('lhs').lower() in SQL_KEYWORDS:
+                continue
+            op = m.group('op').lower()
+            rhs = m.group('rhs') or ''
+            if op in EQUALITY_OPS:
+                kind = 'eq'
+            elif op in RANGE_OPS:
+                kind = 'range'
+            elif op == 'like' and rhs.startswith("'") and not rhs.startswith("'%"):
+                kind = 'range'
+            else:
+                continue
+            left = self.resolve_term(m.group('lhs'))
+            if left:
+                terms.append((left[0], left[1], kind))
+            if kind == 'eq' and rhs and not rhs.startswith("'") and rhs.lower() not in SQL_KEYWORDS:
+                right = self.resolve_term(rhs)  # join predicate: the other side can be probed too
+                if right:
+                    terms.append((right[0], right[1], 'eq'))
+        return terms
+
+    def _ordering(self):
+        """[(table, column)] from ORDER BY / GROUP BY"""
+        cols = []
+        for m in ORDERING.finditer(self.sql):
+            for part in m.group(2).split(','):
+                ref = re.sub(r'\s+(ASC|DESC)\s*$', '', part.strip(), flags=re.I)
+                resolved = self.resolve(ref) if re.fullmatch(r'(\w+\.)?\w+', ref) else None
+                if resolved:
+                    cols.append(resolved)
+        return cols
+
+    def referenced_columns(self, table):
+        """Columns of table the statement touches, or None when it selects *"""
+        if re.search(r'(^|[\s,(])(\w+\.)?\*', self.sql.split(' FROM ')[0]):
+            return None
+        aliases = {a for a, t in self.aliases.items() if t == table}
+        cols = set()
+        for m in re.finditer(r'\b(?:(\w+)\.)?([A-Za-z_]\w*)\b', self.sql):
+            alias, name = m.group(1), m.group(2)
+            if name in self.schema.columns[table] and (alias is None or alias in aliases):
+                cols.add(name)
+        return cols
+
+    def parameter_slots(self):
+        """Per placeholder: ('limit'|'offset', None), (kind, (table, column)) or (None, None) when unmapped"""
+        slots = []
+        for pos in placeholders(self.sql):
+            before = self.sql[:pos]
+            if re.search(r'\bLIMIT\s*$', before, re.I):
+                slots.append(('limit', None))
+                continue
+            if re.search(r'\bOFFSET\s*$', before, re.I):
+                slots.append(('offset', None))
+                continue
+            upper = re.search(r'((?:\w+\.)?\w+)\s*\)?\s*BETWEEN\s+\S+\s+AND\s*(?:\w+\(\s*)?$', before, re.I)
+            m = upper or re.search(
+                r'((?:\w+\.)?\w+)\s*\)?\s*(==|=|>=|<=|>|<|LIKE|BETWEEN|IN\s*\((?:\s*\?\s*,)*)\s*(?:\w+\(\s*)?$',
+                before, re.I)
+            resolved = self.resolve(m.group(1)) if m else None
+            if not resolved:
+                slots.append((None, None))
+                continue
+            op = 'between-high' if upper else m.group(2).lower()
+            kind = 'low' if op in ('>=', '>', 'between') else 'high' if op in ('<=', '<', 'between-high') else 'eq'
+            slots.append((kind, resolved))
+        return slots
+
+    def bind_values(self):
+        """Sample parameters for each placeholder, mapped from the column it is compared with"""
+        values = []
+        for kind, column in self.parameter_slots():
+            if kind == 'limit':
+                values.append(50)
+            elif kind == 'offset':
+                values.append(0)
+            else:
+                values.append(self.schema.sample(column[0], column[1], kind) if column else None)
+        return values
+
+
+# ----- plans, candidates, timings -----
+
+def query_plan(conn, sql, params):
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def plan_problems(plan, query, min_rows):
+    """Full scans of tables with at least min_rows rows and temp B-trees"""
+    problems = []
+    for detail in plan:
+        scan = FULL_SCAN.match(detail)
+        if scan:
+            table = query.aliases.get(scan.group(2) or scan.group(1), scan.group(1))
+            if query.schema.rows.get(table, 0) >= min_rows:
+                problems.append(('scan', table, detail))
+            continue
+        temp = TEMP_BTREE.search(detail)
+        if temp and max((query.schema.rows[t] for t in query.order), default=0) >= min_rows:
+            problems.append(('temp', temp.group(1), detail))
+    return problems
+
+
+def sargability_hints(sql):
+    """Predicates no index can serve, worth rewriting instead"""
+    hints = []
+    if re.search(r"LIKE\s+'%'\s*\|\|", sql, re.I):
+        hints.append("LIKE '%' || col || '%' comparison: scans every row; match on the exact key instead")
+    elif re.search(r"LIKE\s+'%", sql, re.I):
+        hints.append("leading-wildcard LIKE: no index can serve it")
+    if re.search(r'\bOR\b', sql, re.I) and re.search(r'\bON\s*\(', sql, re.I):
+        hints.append("OR inside a join condition: split into UNION ALL or join on one key")
+    return hints
+
+
+def index_name(table, terms, covering=0):
+    """idx_<table>_<key columns>, with a _cover suffix instead of listing the carried columns"""
+    key = terms[:len(terms) - covering]
+    slug = '_'.join(re.sub(r'\W+', '_', t.lower()).strip('_') for t in key)
+    return f"idx_{table}_{slug}" + ('_cover' if covering else '')
+
+
+def candidate_indexes(query, problems):
+    """[(table, terms, carried column count)] worth trying for a flagged statement"""
+    tables = [t for kind, t, _ in problems if kind == 'scan']
+    if any(kind == 'temp' for kind, _, _ in problems):
+        tables += [t for t, _ in query.ordering] or query.order[:1]
+    candidates = []
+    for table in dict.fromkeys(tables):
+        eq = list(dict.fromkeys(term for t, term, kind in query.terms if t == table and kind == 'eq'))[:3]
+        ranges = [term for t, term, kind in query.terms if t == table and kind == 'range' and term not in eq]
+        order = [c for t, c in query.ordering if t == table and c not in eq]
+        shapes = []
+        if ranges:
+            shapes.append(eq + ranges[:1])
+        if order:
+            shapes.append(eq + list(dict.fromkeys(order)))
+            if ranges:
+                shapes.append(eq + list(dict.fromkeys(order)) + ranges[:1])  # group, then range within it
+        if eq and not shapes:
+            shapes.append(eq)
+        existing = query.schema.existing_prefixes(table)
+        for shape in shapes:
+            if any(prefix[:len(shape)] == shape for prefix in existing):
+                continue
+            candidates.append((table, tuple(shape), 0))
+            cols = query.referenced_columns(table)
+            carried = sorted(cols - set(shape)) if cols else []
+            if carried and len(shape) + len(carried) <= MAX_COVERING_COLUMNS:
+                candidates.append((table, tuple(shape) + tuple(carried), len(carried)))
+    return candidates
+
+
+def time_statement(conn, sql, params, repeat):
+    """Median wall time in ms; writes run inside a savepoint that is rolled back"""
+    samples = []
+    for _ in range(repeat):
+        conn.execute('SAVEPOINT advisor')
+        try:
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        finally:
+            conn.execute('ROLLBACK TO advisor')
+            conn.execute('RELEASE advisor')
+        if sum(samples) > 250:
+            break
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def advise(conn, statements, min_rows=500, repeat=5, min_gain=20, verbose=False):
+    """Plan every statement, try candidates for the flagged ones; returns (findings, proposals, stats)"""
+    schema = Schema(conn)
+    stats = {'analyzed': 0, 'failed': 0, 'flagged': 0, 'failures': []}
+    findings = []
+    for statement in statements:
+        query = Query(statement['sql'], schema)
+        params = query.bind_values()
+        try:
+            plan = query_plan(conn, statement['sql'], [None] * len(params))
+        except sqlite3.Error as e:
+            stats['failed'] += 1
+            stats['failures'].append((statement['sites'][0][0], str(e)))
+            continue
+        stats['analyzed'] += 1
+        problems = plan_problems(plan, query, min_rows)
+        if verbose:
+            print(f"   line {statement['sites'][0][0]}: {'; '.join(plan) or '(no plan)'}")
+        if not problems:
+            continue
+        stats['flagged'] += 1
+        try:
+            before = time_statement(conn, statement['sql'], params, repeat)
+        except sqlite3.Error:
+            before = None
+        findings.append({'statement': statement, 'query': query, 'params': params, 'plan': plan,
+                         'problems': problems, 'hints': sargability_hints(statement['sql']),
+                         'before_ms': before, 'options': []})
+
+    # Try each distinct candidate once, against every statement that suggested it
+    by_candidate = {}
+    for finding in findings:
+        for candidate in candidate_indexes(finding['query'], finding['problems']):
+            by_candidate.setdefault(candidate, []).append(finding)
+    names = set()
+    for (table, terms, covering), users in by_candidate.items():
+        name = base = index_name(table, terms, covering)
+        while name in names:
+            name = f"{base}_{len(names)}"
+        names.add(name)
+        column_list = ', '.join(t if '(' in t else f'"{t}"' for t in terms)
+        try:
+            conn.execute(f'CREATE INDEX "{name}" ON "{table}"({column_list})')
+        except sqlite3.Error:
+            continue
+        try:
+            for finding in users:
+                sql = finding['statement']['sql']
+                plan = query_plan(conn, sql, [None] * len(finding['params']))
+                if name not in ' '.join(plan):
+                    continue
+                after_problems = plan_problems(plan, finding['query'], min_rows)
+                before = finding['before_ms']
+                if before is None:
+                    # Writes that failed with sample values: judge by the plan alone
+                    if len(after_problems) >= len(finding['problems']):
+                        continue
+                    after = None
+                else:
+                    after = time_statement(conn, sql, finding['params'], repeat)
+                    if before - after < max(MIN_SAVING_MS, before * min_gain / 100):
+                        continue
+                finding['options'].append({'table': table, 'terms': terms, 'name': name,
+                                           'plan': plan, 'after_ms': after,
+                                           'remaining': len(after_problems)})
+        finally:
+            conn.execute(f'DROP INDEX "{name}"')
+
+    # Greedy cover: repeatedly take the index saving the most across the statements it helps,
+    # then merge proposals that are a prefix of a longer one on the same table
+    proposals = {}
+    remaining = [f for f in findings if f['options']]
+    while remaining:
+        gains = {}
+        for finding in remaining:
+            for option in finding['options']:
+                saved = (finding['before_ms'] or 0) - (option['after_ms'] or 0)
+                total, count = gains.get((option['table'], option['terms']), (0.0, 0))
+                gains[(option['table'], option['terms'])] = (total + saved, count + 1)
+        chosen = max(gains, key=gains.get)
+        left = []
+        for finding in remaining:
+            option = next((o for o in finding['options'] if (o['table'], o['terms']) == chosen), None)
+            if option is None:
+                left.append(finding)
+                continue
+            finding['best'] = option
+            proposal = proposals.setdefault(chosen, {
+                'table': option['table'], 'terms': option['terms'], 'name': option['name'],
+                'statements': 0, 'before_ms': 0.0, 'after_ms': 0.0})
+            proposal['statements'] += 1
+            proposal['before_ms'] += finding['before_ms'] or 0
+            proposal['after_ms'] += option['after_ms'] or 0
+        remaining = left
+    for key, proposal in list(proposals.items()):
+        longer = [p for k, p in proposals.items() if k != key and k[0] == key[0]
+                  and len(k[1]) > len(key[1]) and k[1][:len(key[1])] == key[1]]
+        if longer:
+            target = longer[0]
+            target['statements'] += proposal['statements']
+            target['before_ms'] += proposal['before_ms']
+            target['after_ms'] += proposal['after_ms']
+            del proposals[key]
+    ranked = sorted(proposals.values(), key=lambda p: p['before_ms'] - p['after_ms'], reverse=True)
+    return findings, ranked, stats
+
+
+def create_statement(proposal):
+    column_list = ', '.join(proposal['terms'])
+    return f"CREATE INDEX IF NOT EXISTS {proposal['name']} ON {proposal['table']}({column_list});"
+
+
+def fmt_ms(value):
+    return f"{value:.2f} ms" if value is not None else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest composite/covering indexes for the SQL issued by src/index.tsx")
+    parser.add_argument('--db', default=DB_PATH, help="Migrated D1 SQLite file (read only; analysis runs on a copy)")
+    parser.add_argument('--source', default=str(SOURCE_FILE), help="Worker source to extract prepare() SQL from")
+    parser.add_argument('--min-rows', type=int, default=500, help="Ignore full scans of tables smaller than this")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing runs per statement (median is reported)")
+    parser.add_argument('--min-gain', type=float, default=20, help="Keep an index only if it saves at least this percent")
+    parser.add_argument('--sql-out', help="Write the proposed CREATE INDEX statements to this file")
+    parser.add_argument('--json', action='store_true', help="Print findings and proposals as JSON")
+    parser.add_argument('--verbose', action='store_true', help="Print the plan of every statement")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+    if not Path(args.source).exists():
+        print(f"❌ Error: Source file not found at {args.source}")
+        sys.exit(1)
+
+    records = extract_statements(args.source)
+    statements = group_statements(records)
+    conn = working_copy(args.db)
+    try:
+        findings, proposals, stats = advise(conn, statements, args.min_rows, args.repeat, args.min_gain, args.verbose)
+    finally:
+        conn.close()
+
+    if args.sql_out:
+        tmp = Path(args.sql_out).with_suffix('.tmp')
+        lines = ["-- Indexes proposed by index_advisor.py", ""]
+        for p in proposals:
+            lines.append(f"-- {p['statements']} statement(s): {p['before_ms']:.2f} ms -> {p['after_ms']:.2f} ms")
+            lines.append(create_statement(p))
+        tmp.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        os.replace(tmp, args.sql_out)
+
+    if args.json:
+        print(json.dumps({
+            'stats': {k: v for k, v in stats.items() if k != 'failures'},
+            'findings': [{
+                'sites': f['statement']['sites'], 'sql': f['statement']['sql'], 'plan': f['plan'],
+                'problems': [p[2] for p in f['problems']], 'hints': f['hints'], 'before_ms': f['before_ms'],
+                'best': {'index': create_statement(f['best']), 'after_ms': f['best']['after_ms']} if 'best' in f else None,
+            } for f in findings],
+            'proposals': [dict(p, sql=create_statement(p)) for p in proposals],
+        }, indent=2, default=str))
+        return
+
+    unresolved = sum(1 for r in records if r['sql'] is None)
+    print("\n" + "="*60)
+    print("🔍 INDEX ADVISOR")
+    print("="*60)
+    print(f"   • prepare() calls: {len(records)} ({len(statements)} distinct SQL, "
+          f"{sum(1 for r in records if r['variable'])} built in variables, {unresolved} not resolvable)")
+    print(f"   • Planned: {stats['analyzed']}, failed against this schema: {stats['failed']}")
+    print(f"   • Flagged (full scan of ≥{args.min_rows} rows or temp B-tree): {stats['flagged']}")
+
+    print(f"\n📋 Flagged statements (slowest first):")
+    for f in sorted(findings, key=lambda f: f['before_ms'] or 0, reverse=True):
+        line, route = f['statement']['sites'][0]
+        extra = f" +{len(f['statement']['sites']) - 1} more" if len(f['statement']['sites']) > 1 else ''
+        print(f"\n   line {line}{extra} {route or ''}  [{fmt_ms(f['before_ms'])}]")
+        print(f"      {f['statement']['sql'][:150]}")
+        for _, _, detail in f['problems']:
+            print(f"      ⚠️  {detail}")
+        for hint in f['hints']:
+            print(f"      ✏️  {hint}")
+        if 'best' in f:
+            print(f"      → {create_statement(f['best'])}  {fmt_ms(f['before_ms'])} → {fmt_ms(f['best']['after_ms'])}")
+
+    print(f"\n💡 Proposed indexes (by time saved on this copy):")
+    if not proposals:
+        print("   • None; every flagged plan is as good as the candidates tried")
+    for p in proposals:
+        print(f"   • {create_statement(p)}")
+        print(f"       {p['statements']} statement(s): {p['before_ms']:.2f} ms → {p['after_ms']:.2f} ms")
+
+    if stats['failures'] and args.verbose:
+        print(f"\n❌ Statements that did not prepare:")
+        for line, error in stats['failures']:
+            print(f"   • line {line}: {error}")
+    if args.sql_out:
+        print(f"\n✅ Wrote {len(proposals)} statement(s) to {args.sql_out}")
+
+
+if __name__ == '__main__':
+    main()
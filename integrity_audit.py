@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Referential Integrity Audit for AxelGuard Dashboard
+Counts orphaned child rows for every foreign-key style relationship with an
+index-backed anti-join (NOT EXISTS against the parent key), running the
+checks concurrently on read-only connections. Incremental mode re-checks
+only child rows added or changed since the last audit, plus rows that were
+orphaned last time; a relationship falls back to a full check when its
+parent table lost rows.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+STATE_DIR = os.environ.get(
+    'AXELGUARD_AUDIT_STATE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'axelguard', 'integrity')
+)
+SAMPLE_SIZE = 5
+
+# (name, relationship label, child table, child column, parent table(s), parent column)
+# A tuple of parents means the key may point at any of them.
+CHECKS = [
+    ('order_items.order_id', 'orders → order_items', 'order_items', 'order_id', 'orders', 'order_id'),
+    # The dashboard stores sales order ids here; order-workflow ids are accepted too
+    ('dispatch_records.order_id', 'sales/orders → dispatch_records', 'dispatch_records', 'order_id',
+     ('sales', 'orders'), 'order_id'),
+    ('sale_items.sale_id', 'sales → sale_items', 'sale_items', 'sale_id', 'sales', 'id'),
+    ('sale_items.order_id', 'sales → sale_items', 'sale_items', 'order_id', 'sales', 'order_id'),
+    ('payment_history.sale_id', 'sales → payment_history', 'payment_history', 'sale_id', 'sales', 'id'),
+    ('payment_history.order_id', 'sales → payment_history', 'payment_history', 'order_id', 'sales', 'order_id'),
+    ('tracking_details.order_id', 'sales → tracking_details', 'tracking_details', 'order_id', 'sales', 'order_id'),
+    ('dispatch_records.inventory_id', 'inventory → dispatch_records', 'dispatch_records', 'inventory_id', 'inventory', 'id'),
+    ('quality_check.inventory_id', 'inventory → quality_check', 'quality_check', 'inventory_id', 'inventory', 'id'),
+]
+
+# The Excel importers create these when a dispatch/QC serial has no inventory row
+PLACEHOLDER_SQL = '''
+    SELECT COUNT(*) FROM inventory i
+    WHERE i.model_name = 'Unknown'
+      AND (EXISTS (SELECT 1 FROM dispatch_records d WHERE d.inventory_id = i.id)
+           OR EXISTS (SELECT 1 FROM quality_check q WHERE q.inventory_id = i.id))
+'''
+
+
+def connect_ro(db_path):
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+
+
+def state_path(db_path, state_dir=STATE_DIR):
+    """One state file per database path"""
+    digest = hashlib.sha256(str(Path(db_path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return Path(state_dir) / f"{digest}.json"
+
+
+def load_state(db_path, state_dir=STATE_DIR):
+    path = state_path(db_path, state_dir)
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(db_path, state, state_dir=STATE_DIR):
+    path = state_path(db_path, state_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def orphan_condition(child_col, parents, parent_col):
+    """
+    Anti-join predicate on alias c; NULL / empty keys are optional links, not orphans.
+
+    parents lists every table whose rows count as parents: the parent
+    itself, any alternative parent and their archive tables (migration 0027).
+    """
+    condition = f"c.{child_col} IS NOT NULL AND c.{child_col} != ''"
+    for i, parent in enumerate(parents):
+        condition += f" AND NOT EXISTS (SELECT 1 FROM {parent} p{i} WHERE p{i}.{parent_col} = c.{child_col})"
+    return condition
+
+
+def uses_index(conn, child, child_col, parents, parent_col):
+    """Whether the parent probes are index/rowid searches rather than scans"""
+    plan = conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT 1 FROM {child} c WHERE {orphan_condition(child_col, parents, parent_col)}"
+    ).fetchall()
+    return not any(row[-1].startswith('SCAN') and f' {name} ' in f' {row[-1]} '
+                   for row in plan for name in parents)
+
+
+def run_check(db_path, check, previous=None):
+    """Run one relationship check on its own read-only connection"""
+    name, label, child, child_col, parent, parent_col = check
+    conn = connect_ro(db_path)
+    try:
+        tables = {n for (n,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        declared = parent if isinstance(parent, tuple) else (parent,)
+        if child not in tables or not any(p in tables for p in declared):
+            return {'name': name, 'label': label, 'skipped': 'table missing'}
+        child_cols = {r[1] for r in conn.execute(f"PRAGMA table_info({child})")}
+
+        def has_key(table):
+            return table in tables and parent_col in {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+        parents = [table for p in declared for table in (p, f"{p}_archive") if has_key(table)]
+        if child_col not in child_cols or not parents:
+            return {'name': name, 'label': label, 'skipped': 'column missing'}
+
+        condition = orphan_condition(child_col, parents, parent_col)
+        child_rows, child_max = conn.execute(f"SELECT COUNT(*), MAX(rowid) FROM {child}").fetchone()
+        child_max = child_max or 0
+        parent_rows, parent_max = {}, {}
+        for table in parents:
+            parent_rows[table], parent_max[table] = conn.execute(f"SELECT COUNT(*), MAX(rowid) FROM {table}").fetchone()
+            parent_max[table] = parent_max[table] or 0
+
+        mode = 'full'
+        if (previous and 'orphan_ids' in previous and isinstance(previous.get('parent_rows'), dict)
+                and set(previous['parent_rows']) == set(parents)):
+            # Parent deletions can orphan old children; only a full pass sees those
+            intact = True
+            for table in parents:
+                added = conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE rowid > ?", (previous['parent_max'][table],)
+                ).fetchone()[0]
+                intact = intact and previous['parent_rows'][table] + added == parent_rows[table]
+            if intact and child_max >= previous['child_max']:
+                mode = 'incremental'
+
+        if mode == 'full':
+            orphan_ids = [r[0] for r in conn.execute(f"SELECT c.rowid FROM {child} c WHERE {condition}")]
+            checked = child_rows
+        else:
+            changed = "c.rowid > ?"
+            params = [previous['child_max']]
+            if 'updated_at' in child_cols and previous.get('audited_at'):
+                changed += " OR c.updated_at > ?"
+                params.append(previous['audited_at'])
+            candidates = conn.execute(
+                f"SELECT c.rowid, ({condition}) "
+                f"FROM {child} c WHERE {changed}", params
+            ).fetchall()
+            recheck = previous['orphan_ids']
+            still = set()
+            for start in range(0, len(recheck), 500):
+                batch = recheck[start:start + 500]
+                still.update(r[0] for r in conn.execute(
+                    f"SELECT c.rowid FROM {child} c WHERE c.rowid IN ({','.join('?' * len(batch))}) AND {condition}",
+                    batch
+                ))
+            for rowid, orphaned in candidates:
+                if orphaned:
+                    still.add(rowid)
+                else:
+                    still.discard(rowid)
+            orphan_ids = sorted(still)
+            checked = len(candidates) + len(recheck)
+
+        samples = []
+        if orphan_ids:
+            ids = orphan_ids[:SAMPLE_SIZE]
+            samples = [r[0] for r in conn.execute(
+                f"SELECT c.{child_col} FROM {child} c WHERE c.rowid IN ({','.join('?' * len(ids))})", ids
+            )]
+        linked = conn.execute(
+            f"SELECT COUNT(*) FROM {child} c WHERE c.{child_col} IS NOT NULL AND c.{child_col} != ''"
+        ).fetchone()[0]
+
+        return {
+            'name': name,
+            'label': label,
+            'child': child,
+            'parent': parent,
+            'fk': f"{child}.{child_col} → {' / '.join(f'{p}.{parent_col}' for p in declared)}",
+            'mode': mode,
+            'indexed': uses_index(conn, child, child_col, parents, parent_col),
+            'child_rows': child_rows,
+            'linked': linked,
+            'checked': checked,
+            'orphans': len(orphan_ids),
+            'samples': samples,
+            'orphan_ids': orphan_ids,
+            'child_max': child_max,
+            'parent_rows': parent_rows,
+            'parent_max': parent_max,
+        }
+    finally:
+        conn.close()
+
+
+def integrity_pct(result):
+    """Share of linked child rows whose parent exists"""
+    if not result.get('linked'):
+        return 100.0
+    return 100.0 * (result['linked'] - result['orphans']) / result['linked']
+
+
+def run_audit(db_path, incremental=False, workers=None, state_dir=STATE_DIR, save=True):
+    """
+    Run every check concurrently; returns (results, placeholders).
+
+    With incremental=True the previous audit's state is used to limit the
+    work; the new state is saved either way unless save=False (reports
+    that only read the figures).
+    """
+    audit_started = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    state = load_state(db_path, state_dir) if incremental else {}
+    with ThreadPoolExecutor(max_workers=workers or len(CHECKS)) as pool:
+        futures = [pool.submit(run_check, db_path, check, state.get(check[0])) for check in CHECKS]
+        results = [f.result() for f in futures]
+
+    conn = connect_ro(db_path)
+    try:
+        has_inventory = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('inventory', 'dispatch_records', 'quality_check')"
+        ).fetchone()[0] == 3
+        placeholders = conn.execute(PLACEHOLDER_SQL).fetchone()[0] if has_inventory else 0
+    finally:
+        conn.close()
+
+    if not save:
+        return results, placeholders
+    new_state = {}
+    for result in results:
+        if 'skipped' in result:
+            continue
+        new_state[result['name']] = {
+            'orphan_ids': result['orphan_ids'],
+            'child_max': result['child_max'],
+            'parent_rows': result['parent_rows'],
+            'parent_max': result['parent_max'],
+            'audited_at': audit_started,
+        }
+    save_state(db_path, new_state, state_dir)
+    return results, placeholders
+
+
+def summarize(results):
+    """Overall figures for reports: linked rows, orphans and integrity percentage"""
+    audited = [r for r in results if 'skipped' not in r]
+    linked = sum(r['linked'] for r in audited)
+    orphans = sum(r['orphans'] for r in audited)
+    return {
+        'checks': len(audited),
+        'linked': linked,
+        'orphans': orphans,
+        'integrity': 100.0 if not linked else 100.0 * (linked - orphans) / linked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit referential integrity of the D1 database")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only check rows changed since the last audit")
+    parser.add_argument('--workers', type=int, help="Concurrent connections (default: one per check)")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    results, placeholders = run_audit(args.db, args.incremental, args.workers)
+    elapsed = time.perf_counter() - started
+    summary = summarize(results)
+
+    if args.json:
+        print(json.dumps({
+            'results': [{k: v for k, v in r.items() if k != 'orphan_ids'} for r in results],
+            'placeholder_inventory': placeholders,
+            'summary': summary,
+        }, indent=2, default=str))
+        return
+
+    print("\n" + "="*60)
+    print("🔍 REFERENTIAL INTEGRITY AUDIT")
+    print("="*60)
+    for result in results:
+        if 'skipped' in result:
+            print(f"   ⏭️  {result['name']}: skipped ({result['skipped']})")
+            continue
+        icon = '✅' if not result['orphans'] else '⚠️ '
+        index_note = '' if result['indexed'] else '  (parent lookup not indexed!)'
+        print(f"   {icon} {result['fk']}: {result['orphans']} orphans / {result['linked']} linked "
+              f"({integrity_pct(result):.2f}%) [{result['mode']}, {result['checked']} checked]{index_note}")
+        if result['samples']:
+            print(f"      e.g. {', '.join(str(s) for s in result['samples'])}")
+    print(f"\n   • Placeholder 'Unknown' inventory rows referenced by dispatch/QC: {placeholders}")
+    print(f"   • Overall integrity: {summary['integrity']:.2f}% ({summary['orphans']} orphans in {summary['linked']} links)")
+    print(f"   • Time: {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
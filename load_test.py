@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+HTTP Load Generator for the AxelGuard Dashboard API
+Logs in through /api/auth/login (the session cookie is reused for every
+request) and drives a weighted mix of dashboard, sales, inventory and
+report endpoints at a fixed target rate on a pooled aiohttp session, e.g.
+against `npm run dev:sandbox` / pm2 (ecosystem.config.cjs) on port 3000.
+
+Requests are sent open-loop on a fixed schedule. Latency is measured from
+each request's scheduled send time, so a saturated server shows up as
+growing latency instead of a quietly lower request rate (no coordinated
+omission). Latencies go into log-bucketed HDR-style histograms with 1%
+relative precision. Several --rps stages in one run step the load up to
+find where the Worker saturates.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+from collections import Counter
+from pathlib import Path
+from urllib.parse import quote
+
+import aiohttp
+
+# Database path (local D1 database), used only to pick realistic ids for templated paths
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+BASE_URL = os.environ.get('AXELGUARD_BASE_URL', 'http://127.0.0.1:3000')
+LOAD_USER = os.environ.get('AXELGUARD_LOAD_USER', 'admin')
+LOAD_PASSWORD = os.environ.get('AXELGUARD_LOAD_PASSWORD', 'admin123')
+
+REQUEST_TIMEOUT = 30
+SAMPLE_SIZE = 200
+PERCENTILES = (50, 90, 99, 99.9)
+SATURATED_RATE = 0.9  # achieved / target below this means the server could not keep up
+
+# (weight, path) per mix; {name} placeholders are filled from SAMPLE_QUERIES
+ENDPOINT_MIXES = {
+    'dashboard': [
+        (5, '/api/dashboard/summary'),
+        (3, '/api/sales/current-month'),
+        (2, '/api/sales/monthly-total'),
+        (2, '/api/inventory/stats'),
+        (1, '/api/quality-check/stats'),
+        (1, '/api/renewals/due?days=30'),
+    ],
+    'sales': [
+        (4, '/api/sales'),
+        (3, '/api/sales/order/{order_id}'),
+        (2, '/api/sales/balance-payments'),
+        (2, '/api/customer-details/basic/{customer_code}'),
+        (1, '/api/customer-details/ledger/{customer_code}'),
+        (1, '/api/leads'),
+    ],
+    'inventory': [
+        (4, '/api/inventory/search?serial={serial}'),
+        (3, '/api/inventory/{serial}'),
+        (2, '/api/devices/{serial}/validate'),
+        (2, '/api/inventory?status=In%20Stock'),
+        (1, '/api/inventory/model-wise'),
+        (1, '/api/inventory/activity'),
+        (1, '/api/dispatch/summary'),
+    ],
+    'reports': [
+        (3, '/api/reports/summary'),
+        (2, '/api/reports/employee-comparison'),
+        (2, '/api/reports/product-analysis'),
+        (1, '/api/reports/customer-analysis'),
+        (1, '/api/reports/balance-payment-summary'),
+        (1, '/api/reports/incentives'),
+    ],
+}
+SAMPLE_QUERIES = {
+    'order_id': "SELECT order_id FROM sales WHERE order_id IS NOT NULL ORDER BY RANDOM() LIMIT ?",
+    'customer_code': "SELECT customer_code FROM sales WHERE customer_code IS NOT NULL ORDER BY RANDOM() LIMIT ?",
+    'serial': "SELECT device_serial_no FROM inventory ORDER BY RANDOM() LIMIT ?",
+}
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram: fixed relative precision, memory independent of request count"""
+
+    def __init__(self, precision=0.01):
+        self.log_base = math.log1p(precision)
+        self.counts = Counter()
+        self.total = 0
+        self.min = None
+        self.max = 0.0
+        self.sum = 0.0
+
+    def record(self, ms):
+        self.counts[math.floor(math.log(max(ms, 1e-3)) / self.log_base)] += 1
+        self.total += 1
+        self.sum += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = max(self.max, ms)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def value_at(self, pct):
+        """Upper edge of the bucket holding the pct-th percentile (never above the true max)"""
+        if not self.total:
+            return None
+        target = max(1, math.ceil(self.total * pct / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(math.exp((bucket + 1) * self.log_base), self.max)
+        return self.max
+
+    def summary(self):
+        result = {f"p{p:g}": self.value_at(p) for p in PERCENTILES}
+        result.update(count=self.total, min=self.min, max=self.max if self.total else None,
+                      mean=self.sum / self.total if self.total else None)
+        return result
+
+
+class EndpointStats:
+    """Histogram, error count and status breakdown for one endpoint in one stage"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.statuses = Counter()
+
+    def record(self, ms, status, ok):
+        self.latency.record(ms)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+
+def parse_mix(spec):
+    """'dashboard=4,sales=2' → [(weight, path)] with group weights spread over each group's endpoints"""
+    groups = {}
+    for part in spec.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in ENDPOINT_MIXES:
+            raise ValueError(f"unknown mix {name!r} (choose from {', '.join(ENDPOINT_MIXES)})")
+        groups[name] = float(weight or 1)
+    endpoints = []
+    for name, group_weight in groups.items():
+        total = sum(w for w, _ in ENDPOINT_MIXES[name])
+        endpoints.extend((group_weight * w / total, path) for w, path in ENDPOINT_MIXES[name])
+    return endpoints
+
+
+def load_samples(db_path):
+    """Ids for templated paths, read from the local D1 file; empty when it is not available"""
+    if not db_path or not Path(db_path).exists():
+        return {}
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        samples = {}
+        for name, sql in SAMPLE_QUERIES.items():
+            try:
+                values = [row[0] for row in conn.execute(sql, (SAMPLE_SIZE,))]
+            except sqlite3.Error:
+                values = []
+            if values:
+                samples[name] = values
+        return samples
+    finally:
+        conn.close()
+
+
+def resolvable(path, samples):
+    return all(name in samples for name in SAMPLE_QUERIES if '{' + name + '}' in path)
+
+
+def fill_path(path, samples, rng):
+    for name, values in samples.items():
+        token = '{' + name + '}'
+        if token in path:
+            path = path.replace(token, quote(str(rng.choice(values)), safe=''))
+    return path
+
+
+async def login(session, base_url, username, password):
+    """POST /api/auth/login; the session cookie lands in the session's cookie jar"""
+    async with session.post(f"{base_url}/api/auth/login", json={'username': username, 'password': password}) as resp:
+        body = await resp.json(content_type=None)
+        if resp.status != 200 or not body.get('success'):
+            raise RuntimeError(f"login failed (HTTP {resp.status}): {body.get('error') if isinstance(body, dict) else body}")
+        return body['data']
+
+
+async def fire(session, base_url, template, path, intended, stats):
+    """One request; latency counts from the scheduled send time"""
+    loop = asyncio.get_running_loop()
+    try:
+        async with session.get(base_url + path) as resp:
+            await resp.read()
+            status, ok = resp.status, resp.status < 400
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        status, ok = type(e).__name__, False
+    stats.setdefault(template, EndpointStats()).record((loop.time() - intended) * 1000, status, ok)
+
+
+async def run_stage(session, base_url, endpoints, samples, rps, duration, rng, poisson=False):
+    """Send requests on schedule for duration seconds, then wait for stragglers"""
+    loop = asyncio.get_running_loop()
+    weights = [w for w, _ in endpoints]
+    stats = {}
+    pending = set()
+    start = loop.time()
+    intended = start
+    sent = 0
+    while intended - start < duration:
+        delay = intended - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        template = rng.choices(endpoints, weights)[0][1]
+        task = asyncio.create_task(fire(session, base_url, template, fill_path(template, samples, rng), intended, stats))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        sent += 1
+        intended += rng.expovariate(rps) if poisson else 1 / rps
+    if pending:
+        await asyncio.gather(*pending)
+    return {'target_rps': rps, 'sent': sent, 'elapsed': loop.time() - start, 'endpoints': stats}
+
+
+async def run_load(base_url, endpoints, samples, stages, duration, connections, username, password,
+                   seed=1, poisson=False):
+    rng = random.Random(seed)
+    jar = aiohttp.CookieJar(unsafe=True)  # allow the cookie for 127.0.0.1 / localhost
+    connector = aiohttp.TCPConnector(limit=connections)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(cookie_jar=jar, connector=connector, timeout=timeout) as session:
+        user = await login(session, base_url, username, password)
+        results = []
+        for rps in stages:
+            results.append(await run_stage(session, base_url, endpoints, samples, rps, duration, rng, poisson))
+        return user, results
+
+
+def stage_totals(stage):
+    overall = LatencyHistogram()
+    errors = 0
+    for endpoint in stage['endpoints'].values():
+        overall.merge(endpoint.latency)
+        errors += endpoint.errors
+    completed = overall.total
+    return overall, errors, completed / stage['elapsed'] if stage['elapsed'] else 0
+
+
+def fmt_ms(value):
+    return f"{value:8.1f}" if value is not None else f"{'-':>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the dashboard API at a target request rate and report latency histograms")
+    parser.add_argument('--url', default=BASE_URL, help="Base URL of the running Worker (wrangler pages dev)")
+    parser.add_argument('--user', default=LOAD_USER, help="Login username")
+    parser.add_argument('--password', default=LOAD_PASSWORD, help="Login password")
+    parser.add_argument('--mix', default='dashboard=1,sales=1,inventory=1,reports=1',
+                        help=f"Endpoint groups and weights ({', '.join(ENDPOINT_MIXES)})")
+    parser.add_argument('--rps', default='10', help="Target requests/second; comma-separated values run as successive stages")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds per stage")
+    parser.add_argument('--connections', type=int, default=32, help="Connection pool size")
+    parser.add_argument('--poisson', action='store_true', help="Exponential inter-arrival times instead of a fixed interval")
+    parser.add_argument('--db', default=DB_PATH, help="Local D1 file to draw order ids / serials / customer codes from")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help="Print per-stage, per-endpoint histograms as JSON")
+    args = parser.parse_args()
+
+    try:
+        endpoints = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    samples = load_samples(args.db)
+    skipped = [path for _, path in endpoints if not resolvable(path, samples)]
+    endpoints = [(w, path) for w, path in endpoints if resolvable(path, samples)]
+    stages = [float(r) for r in args.rps.split(',') if r.strip()]
+
+    try:
+        user, results = asyncio.run(run_load(
+            args.url.rstrip('/'), endpoints, samples, stages, args.duration, args.connections,
+            args.user, args.password, args.seed, args.poisson,
+        ))
+    except (aiohttp.ClientError, OSError, RuntimeError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps([{
+            'target_rps': stage['target_rps'], 'sent': stage['sent'], 'elapsed': stage['elapsed'],
+            'endpoints': {path: dict(s.latency.summary(), errors=s.errors, statuses={str(k): v for k, v in s.statuses.items()})
+                          for path, s in stage['endpoints'].items()},
+        } for stage in results], indent=2))
+        return
+
+    print("\n" + "="*60)
+    print(f"🚦 LOAD TEST: {args.url} as {user.get('username')} ({len(endpoints)} endpoints, {args.duration:g}s per stage)")
+    print("="*60)
+    if skipped:
+        print(f"   • Skipped (no local D1 file for ids): {', '.join(skipped)}")
+
+    baseline_p99 = None
+    for stage in results:
+        overall, errors, achieved = stage_totals(stage)
+        p99 = overall.value_at(99)
+        baseline_p99 = baseline_p99 or p99
+        saturated = achieved < stage['target_rps'] * SATURATED_RATE or (
+            p99 and baseline_p99 and p99 > 10 * baseline_p99)
+        print(f"\n📈 {stage['target_rps']:g} rps target → {achieved:.1f} rps completed, "
+              f"{errors / overall.total * 100 if overall.total else 0:.1f}% errors, "
+              f"p50 {fmt_ms(overall.value_at(50)).strip()} ms, p99 {fmt_ms(p99).strip()} ms"
+              + ("  ⚠️  saturated" if saturated else ""))
+        print(f"   {'endpoint':<46} {'count':>6} {'err%':>6} " + ' '.join(f"{'p' + format(p, 'g'):>8}" for p in PERCENTILES) + f" {'max':>8}")
+        ranked = sorted(stage['endpoints'].items(), key=lambda item: item[1].latency.value_at(99) or 0, reverse=True)
+        for path, s in ranked:
+            count = s.latency.total
+            print(f"   {path[:46]:<46} {count:>6} {s.errors / count * 100 if count else 0:>6.1f} "
+                  + ' '.join(fmt_ms(s.latency.value_at(p)) for p in PERCENTILES) + f" {fmt_ms(s.latency.max)}")
+            failures = {k: v for k, v in s.statuses.items() if not (isinstance(k, int) and k < 400)}
+            if failures:
+                print(f"      ❌ {', '.join(f'{k}: {v}' for k, v in failures.items())}")
+
+
+if __name__ == '__main__':
+    main()
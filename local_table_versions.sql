@@ -0,0 +1,269 @@
+-- Per-table change counters (local D1 files only)
+-- Every insert, update or delete on the report tables bumps that table's
+-- row in table_versions, whichever client made the change (wrangler dev,
+-- Excel importers, archive tool). query_cache.py compares these versions to
+-- decide whether a memoized report query result is still current.
+-- Not a migration: the row triggers would double every production D1
+-- write. Install with `python3 sales_report.py --track-versions`.
+
+CREATE TABLE IF NOT EXISTS table_versions (
+  table_name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO table_versions (table_name) VALUES
+  ('sales'),
+  ('sale_items'),
+  ('payment_history'),
+  ('sales_archive'),
+  ('sale_items_archive'),
+  ('payment_history_archive'),
+  ('sales_archive_monthly'),
+  ('sales_archive_products'),
+  ('leads'),
+  ('inventory'),
+  ('dispatch_records'),
+  ('quality_check'),
+  ('orders'),
+  ('order_items'),
+  ('quotations'),
+  ('products'),
+  ('tracking_details');
+
+-- sales
+CREATE TRIGGER IF NOT EXISTS trg_sales_version_insert AFTER INSERT ON sales
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_version_update AFTER UPDATE ON sales
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_version_delete AFTER DELETE ON sales
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales';
+END;
+
+-- sale_items
+CREATE TRIGGER IF NOT EXISTS trg_sale_items_version_insert AFTER INSERT ON sale_items
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sale_items';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sale_items_version_update AFTER UPDATE ON sale_items
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sale_items';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sale_items_version_delete AFTER DELETE ON sale_items
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sale_items';
+END;
+
+-- payment_history
+CREATE TRIGGER IF NOT EXISTS trg_payment_history_version_insert AFTER INSERT ON payment_history
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'payment_history';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_payment_history_version_update AFTER UPDATE ON payment_history
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'payment_history';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_payment_history_version_delete AFTER DELETE ON payment_history
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'payment_history';
+END;
+
+-- sales_archive
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_version_insert AFTER INSERT ON sales_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_version_update AFTER UPDATE ON sales_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_version_delete AFTER DELETE ON sales_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive';
+END;
+
+-- sale_items_archive
+CREATE TRIGGER IF NOT EXISTS trg_sale_items_archive_version_insert AFTER INSERT ON sale_items_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sale_items_archive';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sale_items_archive_version_update AFTER UPDATE ON sale_items_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sale_items_archive';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sale_items_archive_version_delete AFTER DELETE ON sale_items_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sale_items_archive';
+END;
+
+-- payment_history_archive
+CREATE TRIGGER IF NOT EXISTS trg_payment_history_archive_version_insert AFTER INSERT ON payment_history_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'payment_history_archive';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_payment_history_archive_version_update AFTER UPDATE ON payment_history_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'payment_history_archive';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_payment_history_archive_version_delete AFTER DELETE ON payment_history_archive
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'payment_history_archive';
+END;
+
+-- sales_archive_monthly
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_monthly_version_insert AFTER INSERT ON sales_archive_monthly
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive_monthly';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_monthly_version_update AFTER UPDATE ON sales_archive_monthly
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive_monthly';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_monthly_version_delete AFTER DELETE ON sales_archive_monthly
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive_monthly';
+END;
+
+-- sales_archive_products
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_products_version_insert AFTER INSERT ON sales_archive_products
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive_products';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_products_version_update AFTER UPDATE ON sales_archive_products
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive_products';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_archive_products_version_delete AFTER DELETE ON sales_archive_products
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'sales_archive_products';
+END;
+
+-- leads
+CREATE TRIGGER IF NOT EXISTS trg_leads_version_insert AFTER INSERT ON leads
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'leads';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_leads_version_update AFTER UPDATE ON leads
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'leads';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_leads_version_delete AFTER DELETE ON leads
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'leads';
+END;
+
+-- inventory
+CREATE TRIGGER IF NOT EXISTS trg_inventory_version_insert AFTER INSERT ON inventory
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'inventory';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_inventory_version_update AFTER UPDATE ON inventory
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'inventory';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_inventory_version_delete AFTER DELETE ON inventory
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'inventory';
+END;
+
+-- dispatch_records
+CREATE TRIGGER IF NOT EXISTS trg_dispatch_records_version_insert AFTER INSERT ON dispatch_records
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'dispatch_records';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_dispatch_records_version_update AFTER UPDATE ON dispatch_records
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'dispatch_records';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_dispatch_records_version_delete AFTER DELETE ON dispatch_records
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'dispatch_records';
+END;
+
+-- quality_check
+CREATE TRIGGER IF NOT EXISTS trg_quality_check_version_insert AFTER INSERT ON quality_check
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'quality_check';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_quality_check_version_update AFTER UPDATE ON quality_check
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'quality_check';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_quality_check_version_delete AFTER DELETE ON quality_check
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'quality_check';
+END;
+
+-- orders
+CREATE TRIGGER IF NOT EXISTS trg_orders_version_insert AFTER INSERT ON orders
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'orders';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_orders_version_update AFTER UPDATE ON orders
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'orders';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_orders_version_delete AFTER DELETE ON orders
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'orders';
+END;
+
+-- order_items
+CREATE TRIGGER IF NOT EXISTS trg_order_items_version_insert AFTER INSERT ON order_items
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'order_items';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_order_items_version_update AFTER UPDATE ON order_items
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'order_items';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_order_items_version_delete AFTER DELETE ON order_items
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'order_items';
+END;
+
+-- quotations
+CREATE TRIGGER IF NOT EXISTS trg_quotations_version_insert AFTER INSERT ON quotations
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'quotations';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_quotations_version_update AFTER UPDATE ON quotations
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'quotations';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_quotations_version_delete AFTER DELETE ON quotations
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'quotations';
+END;
+
+-- products
+CREATE TRIGGER IF NOT EXISTS trg_products_version_insert AFTER INSERT ON products
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'products';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_products_version_update AFTER UPDATE ON products
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'products';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_products_version_delete AFTER DELETE ON products
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'products';
+END;
+
+-- tracking_details
+CREATE TRIGGER IF NOT EXISTS trg_tracking_details_version_insert AFTER INSERT ON tracking_details
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'tracking_details';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tracking_details_version_update AFTER UPDATE ON tracking_details
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'tracking_details';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tracking_details_version_delete AFTER DELETE ON tracking_details
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE table_name = 'tracking_details';
+END;
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Migration Runner for the D1 database
+Applies migrations/*.sql to a local D1 SQLite file in a deterministic order
+and records them in wrangler's d1_migrations table, so `wrangler d1
+migrations apply` and this runner agree on what has been applied.
+
+  • Order: file name, as wrangler sorts it, except that a file can declare
+    `-- depends: <migration>` for another file it needs. Several numbers
+    are used twice (0002, 0003, 0004, 0005, 0006, 0008, 0018, 0019), and
+    some later data fixes reused an early number.
+  • Checksums: a SHA-256 of each file's statements (comments and whitespace
+    ignored) is stored in migration_checksums. `verify` reports files edited
+    after they were applied.
+  • Data migrations: an UPDATE or DELETE that would scan a large table runs
+    in rowid-range batches, each in its own short transaction, so other
+    writers get the lock between batches. Progress is checkpointed per
+    batch, and an interrupted run resumes where it stopped. Every other
+    migration runs as a single transaction.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+MIGRATIONS_DIR = Path(__file__).resolve().parent / 'migrations'
+
+BATCH_SIZE = 5000          # rowids per batch
+BATCH_THRESHOLD = 20000    # tables with fewer rowids than this are updated in one statement
+
+DEPENDS = re.compile(r'^--\s*depends:\s*(.+)$', re.M | re.I)
+COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+LEADING_COMMENTS = re.compile(r'^(\s*(--[^\n]*|/\*.*?\*/))+\s*', re.S)
+DATA_STATEMENT = re.compile(r'^\s*(UPDATE|DELETE\s+FROM)\s+(?:OR\s+\w+\s+)?"?(\w+)"?(?:\s|$)', re.I)
+NOT_BATCHABLE = re.compile(r'\b(ORDER\s+BY|LIMIT|RETURNING|FROM)\b', re.I)
+
+TRACKING_SQL = '''
+    CREATE TABLE IF NOT EXISTS d1_migrations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE,
+        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS migration_checksums (
+        name TEXT PRIMARY KEY,
+        checksum TEXT NOT NULL,
+        recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        duration_ms INTEGER,
+        batched_statements INTEGER DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS migration_progress (
+        name TEXT PRIMARY KEY,
+        statement_index INTEGER NOT NULL,
+        last_rowid INTEGER
+    );
+'''
+
+
+class MigrationError(Exception):
+    """Raised when a migration fails or the migration set is inconsistent"""
+
+
+def split_statements(sql):
+    """Statements of a script; triggers (BEGIN ... END;) stay whole"""
+    statements, buffer = [], ''
+    for piece in sql.split(';'):
+        buffer += piece + ';'
+        if sqlite3.complete_statement(buffer):
+            if COMMENTS.sub('', buffer).strip(' \t\r\n;'):
+                statements.append(buffer.strip())
+            buffer = ''
+    return statements
+
+
+def checksum(statements):
+    """SHA-256 of the statements with comments and whitespace normalized"""
+    digest = hashlib.sha256()
+    for statement in statements:
+        digest.update(' '.join(COMMENTS.sub(' ', statement).split()).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class Migration:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.name = self.path.name
+        self.text = self.path.read_text(encoding='utf-8')
+        self.statements = split_statements(self.text)
+        self.checksum = checksum(self.statements)
+        self.depends = [d.strip().removesuffix('.sql') for m in DEPENDS.finditer(self.text) for d in m.group(1).split(',')]
+
+    @property
+    def stem(self):
+        return self.path.stem
+
+
+def load_migrations(migrations_dir=MIGRATIONS_DIR):
+    """Migrations in apply order: by file name, each moved after the files it depends on"""
+    migrations = {m.stem: m for m in (Migration(p) for p in sorted(Path(migrations_dir).glob('*.sql')))}
+    ordered, placed, visiting = [], set(), set()
+
+    def place(migration):
+        if migration.stem in placed:
+            return
+        if migration.stem in visiting:
+            raise MigrationError(f"dependency cycle through {migration.name}")
+        visiting.add(migration.stem)
+        for dependency in migration.depends:
+            if dependency not in migrations:
+                raise MigrationError(f"{migration.name} depends on unknown migration {dependency}")
+            place(migrations[dependency])
+        visiting.discard(migration.stem)
+        placed.add(migration.stem)
+        ordered.append(migration)
+
+    for migration in migrations.values():
+        place(migration)
+    return ordered
+
+
+def duplicate_numbers(migrations):
+    """{number: [file, ...]} for numeric prefixes used by more than one file"""
+    by_number = {}
+    for migration in migrations:
+        by_number.setdefault(migration.name.split('_', 1)[0], []).append(migration.name)
+    return {number: names for number, names in sorted(by_number.items()) if len(names) > 1}
+
+
+def ensure_tracking(conn):
+    conn.executescript(TRACKING_SQL)
+
+
+def applied_migrations(conn):
+    """{name: recorded checksum or None} (None: applied by wrangler, not yet checksummed)"""
+    checksums = dict(conn.execute("SELECT name, checksum FROM migration_checksums"))
+    return {name: checksums.get(name) for (name,) in conn.execute("SELECT name FROM d1_migrations ORDER BY id")}
+
+
+# ----- batching -----
+
+def top_level_where(statement):
+    """Offset of the WHERE keyword outside parentheses and string literals, or None"""
+    depth, quoted, found = 0, False, None
+    for match in re.finditer(r"'|\(|\)|\bWHERE\b", statement, re.I):
+        token = match.group(0)
+        if token == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0:
+            found = match.start()
+    return found
+
+
+def batch_plan(conn, statement, threshold=BATCH_THRESHOLD):
+    """(table, rewritten statement with a rowid range, min rowid, max rowid) when worth batching, else None"""
+    body = LEADING_COMMENTS.sub('', statement).rstrip().rstrip(';')
+    match = DATA_STATEMENT.match(body)
+    if not match:
+        return None
+    table = match.group(2)
+    where = top_level_where(body)
+    if NOT_BATCHABLE.search(re.sub(r'\(.*\)', '', body[match.end():], flags=re.S)):
+        return None  # UPDATE ... FROM, ORDER BY, LIMIT or RETURNING: not a plain filter over rowids
+    if len(re.findall(rf'\b{re.escape(table)}\b', body, re.I)) > 1:
+        return None  # the statement reads its own table; batches could see a half-updated table
+    try:
+        low, high = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{table}"').fetchone()
+        plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + body)]
+    except sqlite3.Error:
+        return None  # WITHOUT ROWID table, or a statement that will fail anyway
+    if low is None or high - low + 1 < threshold:
+        return None
+    if where is not None and not any(detail.startswith('SCAN') for detail in plan):
+        return None  # an index narrows it already; one statement is quick
+    if where is None:
+        rewritten = f"{body} WHERE rowid BETWEEN ? AND ?"
+    else:
+        rewritten = f"{body[:where]}WHERE ({body[where + 5:].strip()}) AND rowid BETWEEN ? AND ?"
+    return table, rewritten, low, high
+
+
+# ----- applying -----
+
+def record(conn, migration, started, batched):
+    conn.execute("INSERT OR IGNORE INTO d1_migrations (name) VALUES (?)", (migration.name,))
+    conn.execute(
+        "INSERT OR REPLACE INTO migration_checksums (name, checksum, duration_ms, batched_statements) VALUES (?, ?, ?, ?)",
+        (migration.name, migration.checksum, int((time.perf_counter() - started) * 1000), batched))
+    conn.execute("DELETE FROM migration_progress WHERE name = ?", (migration.name,))
+
+
+def apply_migration(conn, migration, batch_size=BATCH_SIZE, threshold=BATCH_THRESHOLD, pause=0.0, progress=None):
+    """Apply one migration; returns the number of statements that ran in batches"""
+    started = time.perf_counter()
+    resume = conn.execute("SELECT statement_index, last_rowid FROM migration_progress WHERE name = ?",
+                          (migration.name,)).fetchone()
+    plans = {i: batch_plan(conn, s, threshold) for i, s in enumerate(migration.statements)} if not resume else None
+
+    if not resume and not any(plans.values()):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in migration.statements:
+                conn.execute(statement)
+            record(conn, migration, started, 0)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK")
+            raise MigrationError(f"{migration.name}: {e}") from e
+        return 0
+
+    # Statement by statement, large data statements in rowid batches, checkpointing as it goes
+    first, last_rowid = resume if resume else (0, None)
+    batched = 0
+    for index, statement in enumerate(migration.statements):
+        if index < first:
+            continue
+        plan = batch_plan(conn, statement, threshold) if plans is None else plans[index]
+        try:
+            if not plan:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(statement)
+                conn.execute("INSERT OR REPLACE INTO migration_progress (name, statement_index, last_rowid) VALUES (?, ?, NULL)",
+                             (migration.name, index + 1))
+                conn.execute("COMMIT")
+                continue
+            batched += 1
+            table, rewritten, low, high = plan
+            start = last_rowid + 1 if (index == first and last_rowid is not None) else low
+            changed = 0
+            while start <= high:
+                end = start + batch_size - 1
+                conn.execute("BEGIN IMMEDIATE")
+                changed += conn.execute(rewritten, (start, end)).rowcount
+                conn.execute("INSERT OR REPLACE INTO migration_progress (name, statement_index, last_rowid) VALUES (?, ?, ?)",
+                             (migration.name, index, min(end, high)))
+                conn.execute("COMMIT")
+                if progress:
+                    progress(migration, index, table, (min(end, high) - low + 1) / (high - low + 1), changed)
+                start = end + 1
+                if pause:
+                    time.sleep(pause)
+            conn.execute("INSERT OR REPLACE INTO migration_progress (name, statement_index, last_rowid) VALUES (?, ?, NULL)",
+                         (migration.name, index + 1))
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise MigrationError(f"{migration.name} (statement {index + 1}): {e}") from e
+
+    conn.execute("BEGIN IMMEDIATE")
+    record(conn, migration, started, batched)
+    conn.execute("COMMIT")
+    return batched
+
+
+def pending_migrations(conn, migrations):
+    applied = applied_migrations(conn)
+    return [m for m in migrations if m.name not in applied]
+
+
+def adopt_checksums(conn, migrations):
+    """Record checksums for migrations wrangler applied before this runner was used"""
+    applied = applied_migrations(conn)
+    adopted = [(m.name, m.checksum) for m in migrations if m.name in applied and applied[m.name] is None]
+    if adopted:
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO migration_checksums (name, checksum) VALUES (?, ?)", adopted)
+    return len(adopted)
+
+
+def verify(conn, migrations):
+    """[(name, problem)] for applied files whose checksum changed or that no longer exist"""
+    applied = applied_migrations(conn)
+    by_name = {m.name: m for m in migrations}
+    problems = []
+    for name, recorded in applied.items():
+        if name not in by_name:
+            problems.append((name, 'applied but the file is missing'))
+        elif recorded and recorded != by_name[name].checksum:
+            problems.append((name, 'file changed after it was applied'))
+    return problems
+
+
+def migrate(conn, migrations_dir=MIGRATIONS_DIR, target=None, batch_size=BATCH_SIZE,
+            threshold=BATCH_THRESHOLD, pause=0.0, progress=None):
+    """Apply pending migrations in order (up to and including target); returns the applied names"""
+    conn.isolation_level = None
+    ensure_tracking(conn)
+    migrations = load_migrations(migrations_dir)
+    adopt_checksums(conn, migrations)
+    applied = []
+    for migration in pending_migrations(conn, migrations):
+        apply_migration(conn, migration, batch_size, threshold, pause, progress)
+        applied.append(migration.name)
+        if target and migration.stem == target.removesuffix('.sql'):
+            break
+    return applied
+
+
+def print_progress(migration, index, table, fraction, changed):
+    print(f"\r   • {migration.name} [statement {index + 1}/{len(migration.statements)}] {table}: "
+          f"{fraction * 100:5.1f}% ({changed:,} rows changed)", end='' if fraction < 1 else '\n', flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply migrations/ to a local D1 SQLite file")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--dir', default=str(MIGRATIONS_DIR), help="Migrations directory")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('status', help="List applied and pending migrations")
+    up = sub.add_parser('up', help="Apply pending migrations")
+    up.add_argument('--to', help="Stop after this migration")
+    up.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Rowids per batch for large data statements")
+    up.add_argument('--batch-threshold', type=int, default=BATCH_THRESHOLD, help="Batch tables with at least this many rowids")
+    up.add_argument('--pause-ms', type=float, default=0, help="Sleep between batches so other writers get the lock")
+    up.add_argument('--create', action='store_true', help="Create the database file if it does not exist")
+    sub.add_parser('verify', help="Check applied migrations against their recorded checksums")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists() and not (args.command == 'up' and args.create):
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        migrations = load_migrations(args.dir)
+        if args.command == 'up':
+            started = time.perf_counter()
+            applied = migrate(conn, args.dir, args.to, args.batch_size, args.batch_threshold,
+                              args.pause_ms / 1000, print_progress)
+            print(f"\n✅ Migrations Complete in {time.perf_counter() - started:.2f}s:")
+            print(f"   • Applied: {len(applied)}" + (f" ({', '.join(applied)})" if applied else ''))
+            return
+
+        ensure_tracking(conn)
+        if args.command == 'verify':
+            adopted = adopt_checksums(conn, migrations)
+            problems = verify(conn, migrations)
+            if adopted:
+                print(f"   • Recorded checksums for {adopted} migration(s) applied by wrangler")
+            for name, problem in problems:
+                print(f"   ⚠️  {name}: {problem}")
+            print(f"{'❌' if problems else '✅'} {len(problems)} problem(s)")
+            sys.exit(1 if problems else 0)
+
+        applied = applied_migrations(conn)
+        in_progress = dict(conn.execute("SELECT name, statement_index FROM migration_progress"))
+        print("\n" + "="*60)
+        print(f"🗂️  MIGRATIONS: {len(applied)} applied, {len(migrations) - len([m for m in migrations if m.name in applied])} pending")
+        print("="*60)
+        for migration in migrations:
+            state = '✅' if migration.name in applied else '⏸️ ' if migration.name in in_progress else '⬜'
+            note = f"  (depends: {', '.join(migration.depends)})" if migration.depends else ''
+            if migration.name in in_progress:
+                note += f"  (interrupted at statement {in_progress[migration.name] + 1})"
+            print(f"   {state} {migration.name}{note}")
+        for number, names in duplicate_numbers(migrations).items():
+            print(f"   • Number {number} is used by {', '.join(names)}")
+    except MigrationError as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 -- Add qc_result column to inventory table
+-- depends: 0011_inventory_management
 -- Migration: 0002_add_qc_result
 -- Date: 2026-01-23
 -- Purpose: Enable QC Pass/Fail tracking in inventory
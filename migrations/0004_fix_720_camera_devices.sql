@@ -1,4 +1,5 @@
 -- Migration: Fix 720 Heavy Duty Bullet Camera devices
+-- depends: 0011_inventory_management
 -- Step 1: Update model name for all AXGBR devices
 -- Step 2: Keep AXGBR serial numbers as-is (since changing them would require complex mapping)
 -- 
@@ -1,4 +1,5 @@
 -- Migration: Clean up old/historical 720 Heavy Duty Bullet Camera devices
+-- depends: 0011_inventory_management
 -- Keep only the new AXGBZ devices added on 2026-01-23
 -- Change old AXGBR devices back to their original model name (to hide from reports)
 
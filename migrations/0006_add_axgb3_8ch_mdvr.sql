@@ -1,4 +1,5 @@
 -- Migration: Add AXGB3 8CH HDD MDVR product
+-- depends: 0008_products_catalog
 -- Product code: AXGB3
 -- Product name: 8CH HDD MDVR
 -- Category: MDVR
@@ -0,0 +1,51 @@
+-- Order item serials junction table
+-- Normalizes order_items.serial_numbers / inventory_ids (JSON arrays) into one
+-- row per scanned device so order-to-device lookups are indexed joins.
+-- Existing rows are backfilled by backfill_order_item_serials.py; the triggers
+-- below keep the table in sync with every later write to order_items.
+
+CREATE TABLE IF NOT EXISTS order_item_serials (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  order_item_id INTEGER NOT NULL,
+  order_id TEXT NOT NULL,
+  serial_number TEXT NOT NULL,
+  inventory_id INTEGER,
+  position INTEGER NOT NULL DEFAULT 0, -- index in the original JSON array
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (order_item_id, serial_number),
+  FOREIGN KEY (order_item_id) REFERENCES order_items(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_order_item_serials_serial ON order_item_serials(serial_number);
+CREATE INDEX IF NOT EXISTS idx_order_item_serials_order_id ON order_item_serials(order_id);
+CREATE INDEX IF NOT EXISTS idx_order_item_serials_inventory ON order_item_serials(inventory_id);
+
+-- Keep the junction rows in sync with the JSON columns
+CREATE TRIGGER IF NOT EXISTS trg_order_item_serials_insert
+AFTER INSERT ON order_items
+BEGIN
+  INSERT OR IGNORE INTO order_item_serials (order_item_id, order_id, serial_number, inventory_id, position)
+  SELECT NEW.id, NEW.order_id, CAST(j.value AS TEXT),
+         CASE WHEN json_valid(NEW.inventory_ids) THEN json_extract(NEW.inventory_ids, '$[' || j.key || ']') END,
+         j.key
+  FROM json_each(CASE WHEN json_valid(NEW.serial_numbers) THEN NEW.serial_numbers ELSE '[]' END) j
+  WHERE j.value IS NOT NULL AND CAST(j.value AS TEXT) != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_item_serials_update
+AFTER UPDATE OF serial_numbers, inventory_ids, order_id ON order_items
+BEGIN
+  DELETE FROM order_item_serials WHERE order_item_id = OLD.id;
+  INSERT OR IGNORE INTO order_item_serials (order_item_id, order_id, serial_number, inventory_id, position)
+  SELECT NEW.id, NEW.order_id, CAST(j.value AS TEXT),
+         CASE WHEN json_valid(NEW.inventory_ids) THEN json_extract(NEW.inventory_ids, '$[' || j.key || ']') END,
+         j.key
+  FROM json_each(CASE WHEN json_valid(NEW.serial_numbers) THEN NEW.serial_numbers ELSE '[]' END) j
+  WHERE j.value IS NOT NULL AND CAST(j.value AS TEXT) != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_item_serials_delete
+AFTER DELETE ON order_items
+BEGIN
+  DELETE FROM order_item_serials WHERE order_item_id = OLD.id;
+END;
@@ -0,0 +1,34 @@
+-- Renewal / warranty due-queue
+-- One row per device and due type (warranty end, account expiry, license
+-- renewal) with the due date precomputed and bucketed by ISO week, so
+-- "due in the next N days" is an index range read instead of a date
+-- computation over all of inventory. Maintained by renewal_queue.py.
+
+CREATE TABLE IF NOT EXISTS renewal_due_queue (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  device_serial_no TEXT NOT NULL,
+  due_type TEXT NOT NULL CHECK(due_type IN ('warranty', 'account_expiry', 'license_renewal')),
+  due_date DATE NOT NULL,
+  week_start DATE NOT NULL, -- Monday of the due_date's week
+  model_name TEXT,
+  customer_name TEXT,
+  cust_code TEXT,
+  order_id TEXT,
+  warranty_months INTEGER, -- parsed from inventory.warranty_provide (warranty rows only)
+  fingerprint TEXT NOT NULL, -- hash of the inventory fields the row was computed from
+  refreshed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (device_serial_no, due_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_renewal_due_queue_due_date ON renewal_due_queue(due_date, due_type);
+CREATE INDEX IF NOT EXISTS idx_renewal_due_queue_week ON renewal_due_queue(week_start, due_type);
+CREATE INDEX IF NOT EXISTS idx_renewal_due_queue_cust_code ON renewal_due_queue(cust_code);
+
+-- Source snapshot the queue was last refreshed from (single row)
+CREATE TABLE IF NOT EXISTS renewal_due_queue_state (
+  id INTEGER PRIMARY KEY CHECK(id = 1),
+  inventory_rows INTEGER NOT NULL,
+  inventory_max_id INTEGER,
+  inventory_max_updated_at DATETIME,
+  refreshed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,110 @@
+-- Hot/cold sales tiering
+-- Fully paid sales older than a cutoff are moved out of sales / sale_items /
+-- payment_history into the *_archive tables below by sales_archive.py, so
+-- dashboard queries (current month, balance payments) only scan open and
+-- recent orders. Monthly per-employee and per-product totals of everything
+-- archived are kept pre-aggregated, and the *_all views union both tiers
+-- so archived orders stay findable by order_id.
+
+CREATE TABLE IF NOT EXISTS sales_archive (
+  id INTEGER PRIMARY KEY, -- original sales.id
+  order_id TEXT UNIQUE NOT NULL,
+  customer_code TEXT,
+  customer_contact TEXT,
+  sale_date DATE NOT NULL,
+  employee_name TEXT NOT NULL,
+  sale_type TEXT NOT NULL,
+  courier_cost REAL DEFAULT 0,
+  amount_received REAL DEFAULT 0,
+  account_received TEXT,
+  payment_reference TEXT,
+  remarks TEXT,
+  subtotal REAL NOT NULL DEFAULT 0,
+  gst_amount REAL NOT NULL DEFAULT 0,
+  total_amount REAL NOT NULL DEFAULT 0,
+  balance_amount REAL NOT NULL DEFAULT 0,
+  created_at DATETIME,
+  updated_at DATETIME,
+  customer_name TEXT,
+  company_name TEXT,
+  archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS sale_items_archive (
+  id INTEGER PRIMARY KEY, -- original sale_items.id
+  sale_id INTEGER NOT NULL,
+  product_name TEXT NOT NULL,
+  quantity INTEGER NOT NULL DEFAULT 1,
+  unit_price REAL NOT NULL,
+  total_price REAL NOT NULL,
+  order_id TEXT,
+  product_code TEXT
+);
+
+CREATE TABLE IF NOT EXISTS payment_history_archive (
+  id INTEGER PRIMARY KEY, -- original payment_history.id
+  sale_id INTEGER NOT NULL,
+  order_id TEXT NOT NULL,
+  payment_date DATE NOT NULL,
+  amount REAL NOT NULL,
+  payment_reference TEXT,
+  created_at DATETIME,
+  account_received TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_sales_archive_date ON sales_archive(sale_date);
+CREATE INDEX IF NOT EXISTS idx_sales_archive_customer ON sales_archive(customer_code);
+CREATE INDEX IF NOT EXISTS idx_sale_items_archive_order ON sale_items_archive(order_id);
+CREATE INDEX IF NOT EXISTS idx_sale_items_archive_sale ON sale_items_archive(sale_id);
+CREATE INDEX IF NOT EXISTS idx_payment_history_archive_order ON payment_history_archive(order_id);
+
+-- Totals of archived sales per month (YYYY-MM) and employee
+CREATE TABLE IF NOT EXISTS sales_archive_monthly (
+  month TEXT NOT NULL,
+  employee_name TEXT NOT NULL,
+  sale_count INTEGER NOT NULL DEFAULT 0,
+  with_bill_count INTEGER NOT NULL DEFAULT 0,
+  subtotal REAL NOT NULL DEFAULT 0,
+  gst_amount REAL NOT NULL DEFAULT 0,
+  courier_cost REAL NOT NULL DEFAULT 0,
+  total_amount REAL NOT NULL DEFAULT 0,
+  amount_received REAL NOT NULL DEFAULT 0,
+  PRIMARY KEY (month, employee_name)
+);
+
+-- Totals of archived sale items per month and product
+CREATE TABLE IF NOT EXISTS sales_archive_products (
+  month TEXT NOT NULL,
+  product_key TEXT NOT NULL, -- product_code, or the item's product_name when it has none
+  product_code TEXT,
+  product_name TEXT NOT NULL,
+  quantity REAL NOT NULL DEFAULT 0,
+  revenue REAL NOT NULL DEFAULT 0,
+  PRIMARY KEY (month, product_key)
+);
+
+DROP VIEW IF EXISTS sales_all;
+CREATE VIEW sales_all AS
+  SELECT id, order_id, customer_code, customer_contact, sale_date, employee_name, sale_type,
+         courier_cost, amount_received, account_received, payment_reference, remarks,
+         subtotal, gst_amount, total_amount, balance_amount, created_at, updated_at,
+         customer_name, company_name, 'hot' AS tier
+  FROM sales
+  UNION ALL
+  SELECT id, order_id, customer_code, customer_contact, sale_date, employee_name, sale_type,
+         courier_cost, amount_received, account_received, payment_reference, remarks,
+         subtotal, gst_amount, total_amount, balance_amount, created_at, updated_at,
+         customer_name, company_name, 'archive' AS tier
+  FROM sales_archive;
+
+DROP VIEW IF EXISTS sale_items_all;
+CREATE VIEW sale_items_all AS
+  SELECT id, sale_id, product_name, quantity, unit_price, total_price, order_id, product_code FROM sale_items
+  UNION ALL
+  SELECT id, sale_id, product_name, quantity, unit_price, total_price, order_id, product_code FROM sale_items_archive;
+
+DROP VIEW IF EXISTS payment_history_all;
+CREATE VIEW payment_history_all AS
+  SELECT id, sale_id, order_id, payment_date, amount, payment_reference, created_at, account_received FROM payment_history
+  UNION ALL
+  SELECT id, sale_id, order_id, payment_date, amount, payment_reference, created_at, account_received FROM payment_history_archive;
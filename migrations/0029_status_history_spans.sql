@@ -0,0 +1,74 @@
+-- Compacted inventory status history
+-- status_history.py folds inventory_status_history into one span per stay
+-- in a status (entered_at → left_at) and per-model transition totals, from
+-- a high-water mark so each run only reads rows added since the last one.
+-- Raw rows past the retention window move to the archive table (or are
+-- pruned); inventory_status_history_all unions both.
+
+CREATE TABLE IF NOT EXISTS inventory_status_spans (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  inventory_id INTEGER NOT NULL,
+  device_serial_no TEXT NOT NULL,
+  model_name TEXT,
+  status TEXT NOT NULL,
+  entered_at DATETIME NOT NULL,
+  left_at DATETIME, -- NULL while the device is still in this status
+  next_status TEXT,
+  duration_hours REAL,
+  events INTEGER NOT NULL DEFAULT 1, -- history rows that kept the device in this status
+  entered_history_id INTEGER, -- NULL: span starts at the device's created_at
+  left_history_id INTEGER
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_status_spans_open ON inventory_status_spans(inventory_id) WHERE left_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_status_spans_device ON inventory_status_spans(inventory_id, entered_at);
+CREATE INDEX IF NOT EXISTS idx_status_spans_status ON inventory_status_spans(status, model_name, entered_at);
+
+-- Time spent in from_status before moving to to_status, per model
+CREATE TABLE IF NOT EXISTS inventory_status_transitions (
+  model_name TEXT NOT NULL,
+  from_status TEXT NOT NULL,
+  to_status TEXT NOT NULL,
+  transitions INTEGER NOT NULL DEFAULT 0,
+  total_hours REAL NOT NULL DEFAULT 0,
+  min_hours REAL,
+  max_hours REAL,
+  within_1h INTEGER NOT NULL DEFAULT 0,
+  within_1d INTEGER NOT NULL DEFAULT 0,
+  within_7d INTEGER NOT NULL DEFAULT 0,
+  within_30d INTEGER NOT NULL DEFAULT 0,
+  over_30d INTEGER NOT NULL DEFAULT 0,
+  last_at DATETIME,
+  PRIMARY KEY (model_name, from_status, to_status)
+);
+
+CREATE TABLE IF NOT EXISTS inventory_status_history_archive (
+  id INTEGER PRIMARY KEY, -- original inventory_status_history.id
+  inventory_id INTEGER NOT NULL,
+  device_serial_no TEXT NOT NULL,
+  old_status TEXT,
+  new_status TEXT,
+  changed_by TEXT,
+  change_reason TEXT,
+  changed_at DATETIME,
+  archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_status_history_archive_device ON inventory_status_history_archive(inventory_id);
+
+-- Last inventory_status_history.id folded into the spans
+CREATE TABLE IF NOT EXISTS status_history_compaction (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  last_history_id INTEGER NOT NULL DEFAULT 0,
+  last_run_at DATETIME
+);
+
+INSERT OR IGNORE INTO status_history_compaction (id) VALUES (1);
+
+DROP VIEW IF EXISTS inventory_status_history_all;
+CREATE VIEW inventory_status_history_all AS
+  SELECT id, inventory_id, device_serial_no, old_status, new_status, changed_by, change_reason, changed_at, 'hot' AS tier
+  FROM inventory_status_history
+  UNION ALL
+  SELECT id, inventory_id, device_serial_no, old_status, new_status, changed_by, change_reason, changed_at, 'archive' AS tier
+  FROM inventory_status_history_archive;
@@ -0,0 +1,29 @@
+-- Latest courier status per tracking_details row
+-- Written by tracking_sync.py, which polls the courier APIs. Rows are keyed
+-- by tracking_details.id and remember the tracking_id they were checked
+-- with, so editing a shipment's tracking number makes it due again.
+-- Delivered shipments are not polled again.
+
+CREATE TABLE IF NOT EXISTS tracking_status (
+  tracking_detail_id INTEGER PRIMARY KEY,
+  courier_partner TEXT NOT NULL,
+  tracking_id TEXT NOT NULL,
+  status TEXT, -- Booked, In Transit, Out for Delivery, Delivered, Returned, Exception
+  raw_status TEXT, -- the courier's own wording
+  location TEXT,
+  status_at DATETIME, -- when the courier recorded the status
+  delivered INTEGER NOT NULL DEFAULT 0,
+  checked_at DATETIME,
+  error TEXT, -- last failed check, cleared by a successful one
+  failures INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_tracking_status_due ON tracking_status(delivered, checked_at);
+CREATE INDEX IF NOT EXISTS idx_tracking_status_status ON tracking_status(status);
+
+DROP VIEW IF EXISTS tracking_details_status;
+CREATE VIEW tracking_details_status AS
+  SELECT td.*, ts.status AS current_status, ts.raw_status, ts.location AS current_location,
+         ts.status_at, ts.checked_at AS status_checked_at, ts.error AS status_error
+  FROM tracking_details td
+  LEFT JOIN tracking_status ts ON ts.tracking_detail_id = td.id AND ts.tracking_id = td.tracking_id;
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Parquet Snapshot Exporter for AxelGuard Dashboard
+Reads the local (or backed-up) D1 SQLite file in chunks and writes
+Hive-partitioned Parquet files for offline analytics:
+sales / sale_items / quality_check / dispatch_records by month, inventory by model.
+
+Later runs are incremental. Tables with updated_at (sales, inventory) get
+the rows changed since the previous export appended as new parts, plus a
+tombstone row (_deleted = true) for every exported id that no longer
+exists; readers keep the latest _exported_at per id and drop tombstones.
+Tables without updated_at (sale_items, quality_check, dispatch_records) are
+edited in place by the Worker, and sale items are re-inserted with new ids
+when a sale is edited, so they are compared partition by partition and
+every partition whose rows changed is rewritten whole.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+OUTPUT_DIR = "/home/user/webapp/exports/parquet"
+STATE_FILE = "_export_state.json"
+CHUNK_ROWS = 5000
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# table -> how to partition it and which column marks changed rows.
+# 'partition' is a SQL expression evaluated per row; 'watermark' is compared
+# together with id so rows sharing a timestamp are never skipped. Tables
+# without a watermark are re-snapshotted per partition.
+EXPORTS = {
+    'sales': {
+        'partition': ('month', "substr(t.sale_date, 1, 7)"),
+        'watermark': 'updated_at',
+    },
+    'sale_items': {
+        'partition': ('month', "(SELECT substr(s.sale_date, 1, 7) FROM sales s WHERE s.order_id = t.order_id)"),
+        'watermark': None,  # no timestamp column; edits delete and re-insert items
+    },
+    'inventory': {
+        'partition': ('model', "t.model_name"),
+        'watermark': 'updated_at',
+    },
+    'quality_check': {
+        'partition': ('month', "substr(t.check_date, 1, 7)"),
+        'watermark': None,  # created_at only; QC results are edited in place
+    },
+    'dispatch_records': {
+        'partition': ('month', "substr(t.dispatch_date, 1, 7)"),
+        'watermark': None,  # created_at only; tracking details are edited in place
+    },
+}
+
+EXPORTED_AT_COLUMN = '_exported_at'
+DELETED_COLUMN = '_deleted'
+
+
+def arrow_type(declared):
+    """Map a SQLite declared column type to an Arrow type (SQLite affinity rules)"""
+    declared = (declared or '').upper()
+    if 'INT' in declared:
+        return pa.int64()
+    if any(t in declared for t in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    return pa.string()
+
+
+def table_schema(conn, table):
+    """Arrow schema for a table, plus the export timestamp and tombstone columns"""
+    columns = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    fields = [pa.field(name, arrow_type(declared)) for _, name, declared, *_ in columns]
+    fields.append(pa.field(EXPORTED_AT_COLUMN, pa.string()))
+    fields.append(pa.field(DELETED_COLUMN, pa.bool_()))
+    return pa.schema(fields)
+
+
+def coerce(value, type_):
+    """Coerce loosely typed SQLite values into the column's Arrow type"""
+    if value is None:
+        return None
+    try:
+        if pa.types.is_integer(type_):
+            return int(value)
+        if pa.types.is_floating(type_):
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def partition_dir(root, table, key, value):
+    """Hive-style directory for one partition value"""
+    name = NULL_PARTITION if value in (None, '') else quote(str(value), safe='')
+    return Path(root) / table / f"{key}={name}"
+
+
+def load_state(root):
+    """Per-table high-water marks from the previous export"""
+    path = Path(root) / STATE_FILE
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(root, state):
+    """Atomically persist the high-water marks"""
+    path = Path(root) / STATE_FILE
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class PartitionWriters:
+    """
+    One open ParquetWriter per partition directory, all named after the run.
+    replace lists partition directories whose older parts are removed once
+    the run's parts are closed.
+    """
+
+    def __init__(self, root, table, key, schema, run_stamp):
+        self.root = root
+        self.table = table
+        self.key = key
+        self.schema = schema
+        self.run_stamp = run_stamp
+        self.writers = {}
+        self.replace = set()
+
+    def write(self, directory, columns):
+        writer = self.writers.get(directory)
+        if writer is None:
+            directory.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(directory / f"part-{self.run_stamp}.parquet", self.schema,
+                                      compression='zstd')
+            self.writers[directory] = writer
+        writer.write_table(pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+def table_query(table, names, where="", order="t.id"):
+    """SELECT of the exported columns plus the partition value (second to last) and watermark (last)"""
+    config = EXPORTS[table]
+    watermark = config['watermark']
+    select_list = ', '.join(f"t.{name}" for name in names)
+    tracked = f"COALESCE(t.{watermark}, '')" if watermark else "NULL"
+    return (f"SELECT {select_list}, {config['partition'][1]}, {tracked} FROM {table} t "
+            f"{where} ORDER BY {order}")
+
+
+def write_rows(writers, rows, types, exported_at, deleted=False):
+    """Append rows (grouped by partition value) to their partition writers"""
+    groups = {}
+    for row in rows:
+        directory = partition_dir(writers.root, writers.table, writers.key, row[-2])
+        groups.setdefault(directory, []).append(row)
+    for directory, group in groups.items():
+        columns = [
+            pa.array([coerce(row[i], type_) for row in group], type=type_)
+            for i, type_ in enumerate(types)
+        ]
+        columns.append(pa.array([exported_at] * len(group), type=pa.string()))
+        columns.append(pa.array([deleted] * len(group), type=pa.bool_()))
+        writers.write(directory, columns)
+
+
+def exported_ids(root, table):
+    """{id: partition directory} of ids whose latest exported row is not a tombstone"""
+    latest = {}
+    for path in (Path(root) / table).glob('*/part-*.parquet'):
+        wanted = [c for c in ('id', EXPORTED_AT_COLUMN, DELETED_COLUMN) if c in pq.read_schema(path).names]
+        data = pq.read_table(path, columns=wanted).to_pydict()
+        deleted = data.get(DELETED_COLUMN) or [False] * len(data['id'])
+        for row_id, at, gone in zip(data['id'], data[EXPORTED_AT_COLUMN], deleted):
+            if row_id not in latest or at >= latest[row_id][0]:
+                latest[row_id] = (at, bool(gone), path.parent)
+    return {row_id: directory for row_id, (_, gone, directory) in latest.items() if not gone}
+
+
+def export_changes(conn, table, root, state, writers, types, exported_at, chunk_rows, full=False):
+    """
+    Append rows changed since the watermark, then tombstones for exported ids
+    that are gone from the table; returns (rows, deleted)
+    """
+    watermark = EXPORTS[table]['watermark']
+    names = writers.schema.names[:-2]
+    table_state = {} if full else state.get(table, {})
+    where = ""
+    params = ()
+    if table_state:
+        where = (f"WHERE COALESCE(t.{watermark}, '') > ? "
+                 f"OR (COALESCE(t.{watermark}, '') = ? AND t.id > ?)")
+        params = (table_state['watermark'], table_state['watermark'], table_state['last_id'])
+
+    deleted = 0
+    if table_state:
+        live = set(row_id for (row_id,) in conn.execute(f"SELECT id FROM {table}"))
+        gone = {}
+        for row_id, directory in exported_ids(root, table).items():
+            if row_id not in live:
+                gone.setdefault(directory, []).append(row_id)
+        id_idx = names.index('id')
+        for directory, ids in gone.items():
+            tombstones = [pa.array(ids if i == id_idx else [None] * len(ids), type=type_)
+                          for i, type_ in enumerate(types)]
+            tombstones.append(pa.array([exported_at] * len(ids), type=pa.string()))
+            tombstones.append(pa.array([True] * len(ids), type=pa.bool_()))
+            writers.write(directory, tombstones)
+            deleted += len(ids)
+
+    written = 0
+    last = None
+    cursor = conn.execute(table_query(table, names, where, f"COALESCE(t.{watermark}, ''), t.id"), params)
+    while True:
+        chunk = cursor.fetchmany(chunk_rows)
+        if not chunk:
+            break
+        write_rows(writers, chunk, types, exported_at)
+        written += len(chunk)
+        last = chunk[-1]
+
+    if last is not None:
+        state[table] = {'watermark': last[-1], 'last_id': last[names.index('id')]}
+    elif full:
+        state.pop(table, None)
+    return written, deleted
+
+
+def export_partitions(conn, table, root, state, writers, types, exported_at, chunk_rows, full=False):
+    """
+    Rewrite every partition whose rows differ from the previous export (all of
+    them with full=True) and drop partitions that no longer have rows;
+    returns (rows, deleted partitions)
+    """
+    names = writers.schema.names[:-2]
+    sql = table_query(table, names)
+
+    # Pass 1: content hash per partition
+    digests = {}
+    cursor = conn.execute(sql)
+    while True:
+        chunk = cursor.fetchmany(chunk_rows)
+        if not chunk:
+            break
+        for row in chunk:
+            directory = partition_dir(root, table, writers.key, row[-2])
+            digest = digests.get(directory)
+            if digest is None:
+                digest = digests[directory] = hashlib.sha256()
+            digest.update(repr(row[:-1]).encode('utf-8'))
+    hashes = {directory.name: digest.hexdigest() for directory, digest in digests.items()}
+
+    previous = {} if full else state.get(table, {}).get('partitions', {})
+    existing = {path.parent for path in (Path(root) / table).glob('*/part-*.parquet')}
+    changed = {directory for directory in digests
+               if directory not in existing or previous.get(directory.name) != hashes[directory.name]}
+
+    # Pass 2: write the changed partitions whole
+    written = 0
+    cursor = conn.execute(sql)
+    while True:
+        chunk = cursor.fetchmany(chunk_rows)
+        if not chunk:
+            break
+        rows = [row for row in chunk if partition_dir(root, table, writers.key, row[-2]) in changed]
+        if rows:
+            write_rows(writers, rows, types, exported_at)
+            written += len(rows)
+
+    writers.replace = changed | (existing - set(digests))
+    state[table] = {'partitions': hashes}
+    return written, len(existing - set(digests))
+
+
+def export_table(conn, table, root, state, full=False, chunk_rows=CHUNK_ROWS):
+    """Export one table; returns (rows written, partitions written, tombstones or dropped partitions)"""
+    key = EXPORTS[table]['partition'][0]
+    schema = table_schema(conn, table)
+    types = [schema.field(name).type for name in schema.names[:-2]]
+    run_stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    exported_at = datetime.now().isoformat()
+    writers = PartitionWriters(root, table, key, schema, run_stamp)
+    export = export_changes if EXPORTS[table]['watermark'] else export_partitions
+    try:
+        written, removed = export(conn, table, root, state, writers, types, exported_at, chunk_rows, full)
+    finally:
+        writers.close()
+
+    current = f"part-{run_stamp}.parquet"
+    for directory in writers.replace:
+        for old in directory.glob('part-*.parquet'):
+            if old.name != current:
+                old.unlink()
+    return written, len(writers.writers), removed
+
+
+def export_snapshot(db_path, root, tables=None, full=False, chunk_rows=CHUNK_ROWS):
+    """Export tables; with full=True existing partitions for those tables are replaced"""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    state = load_state(root)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    summary = {}
+    try:
+        # One read transaction so every table comes from the same snapshot
+        conn.execute("BEGIN")
+        for table in tables or EXPORTS:
+            if full:
+                for old in (root / table).glob('*/part-*.parquet'):
+                    old.unlink()
+            summary[table] = export_table(conn, table, root, state, full, chunk_rows)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    save_state(root, state)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export D1 tables to partitioned Parquet")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file (local or a backup copy)")
+    parser.add_argument('--out', default=OUTPUT_DIR, help="Output directory")
+    parser.add_argument('--tables', default=','.join(EXPORTS), help="Comma-separated tables")
+    parser.add_argument('--full', action='store_true', help="Rewrite instead of appending changes")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+    tables = [t.strip() for t in args.tables.split(',') if t.strip()]
+    unknown = [t for t in tables if t not in EXPORTS]
+    if unknown:
+        print(f"❌ Error: unsupported tables: {', '.join(unknown)}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    summary = export_snapshot(args.db, args.out, tables, args.full, args.chunk_rows)
+    mode = "Full" if args.full else "Incremental"
+    print(f"\n✅ {mode} Parquet export complete in {time.perf_counter() - started:.2f}s → {args.out}")
+    for table, (rows, partitions, removed) in summary.items():
+        if EXPORTS[table]['watermark']:
+            print(f"   • {table}: {rows} rows across {partitions} partitions, {removed} deleted ids")
+        else:
+            print(f"   • {table}: {rows} rows in {partitions} rewritten partitions, {removed} dropped")
+    print(f"\nℹ️  sales / inventory: keep the latest {EXPORTED_AT_COLUMN} per id and drop rows "
+          f"where {DELETED_COLUMN} is true. Other tables are current as written.")
+
+
+if __name__ == '__main__':
+    main()
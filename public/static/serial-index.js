@@ -0,0 +1,237 @@
+// Local serial-number index for the dispatch scanner.
+// Loads /static/serial-index.bin (built by serial_index.py) and answers exact
+// and partial serial lookups, with each device's status and latest QC result,
+// without a server round trip. Entries are sorted by their ASCII-uppercased
+// bytes: search() is case-insensitive, lookup() matches the stored serial
+// exactly (as the server does). The layout is documented at the top of
+// serial_index.py.
+(function () {
+    const MAGIC = 'AGSI';
+    const FORMAT_VERSION = 3;
+    const decoder = new TextDecoder();
+    const encoder = new TextEncoder();
+
+    function SerialIndex(buffer) {
+        const view = new DataView(buffer);
+        const bytes = new Uint8Array(buffer);
+        if (decoder.decode(bytes.subarray(0, 4)) !== MAGIC) {
+            throw new Error('Not a serial index file');
+        }
+        this.format = view.getUint16(4, true);
+        if (this.format !== FORMAT_VERSION) {
+            throw new Error('Unsupported serial index format ' + this.format);
+        }
+        this.blockSize = view.getUint16(6, true);
+        this.count = view.getUint32(8, true);
+        const blockCount = view.getUint32(12, true);
+        this.version = Array.from(bytes.subarray(16, 24), b => b.toString(16).padStart(2, '0')).join('');
+
+        this.bytes = bytes;
+        this.pos = 24;
+        this.statuses = [];
+        const statusCount = bytes[this.pos++];
+        for (let i = 0; i < statusCount; i++) this.statuses.push(this.readString());
+        this.qcResults = [];
+        const qcCount = bytes[this.pos++];
+        for (let i = 0; i < qcCount; i++) this.qcResults.push(this.readString());
+        this.models = [];
+        const modelCount = this.readVarint();
+        for (let i = 0; i < modelCount; i++) this.models.push(this.readString());
+
+        this.offsets = new Uint32Array(blockCount);
+        for (let i = 0; i < blockCount; i++) {
+            this.offsets[i] = view.getUint32(this.pos + i * 4, true);
+        }
+        this.dataStart = this.pos + blockCount * 4;
+
+        // Block heads are stored whole, so they can be binary searched directly
+        this.heads = [];
+        for (let i = 0; i < blockCount; i++) {
+            this.pos = this.dataStart + this.offsets[i];
+            this.heads.push(this.readBytes(this.readVarint()));
+        }
+        this.all = null;
+    }
+
+    SerialIndex.prototype.readVarint = function () {
+        let value = 0, shift = 0, byte;
+        do {
+            byte = this.bytes[this.pos++];
+            value += (byte & 0x7f) * Math.pow(2, shift);
+            shift += 7;
+        } while (byte & 0x80);
+        return value;
+    };
+
+    SerialIndex.prototype.readBytes = function (length) {
+        const out = this.bytes.subarray(this.pos, this.pos + length);
+        this.pos += length;
+        return out;
+    };
+
+    SerialIndex.prototype.readString = function () {
+        return decoder.decode(this.readBytes(this.readVarint()));
+    };
+
+    // Decode every entry of one block into {serial, status, qc, model}
+    SerialIndex.prototype.decodeBlock = function (block) {
+        const entries = [];
+        const end = Math.min(this.blockSize, this.count - block * this.blockSize);
+        let previous = new Uint8Array(0);
+        this.pos = this.dataStart + this.offsets[block];
+        for (let i = 0; i < end; i++) {
+            let serial;
+            if (i === 0) {
+                serial = this.readBytes(this.readVarint());
+            } else {
+                const shared = this.readVarint();
+                const suffix = this.readBytes(this.readVarint());
+                serial = new Uint8Array(shared + suffix.length);
+                serial.set(previous.subarray(0, shared));
+                serial.set(suffix, shared);
+            }
+            const status = this.statuses[this.bytes[this.pos++]];
+            const qc = this.qcResults[this.bytes[this.pos++]];
+            const model = this.models[this.readVarint()];
+            entries.push({ serial: decoder.decode(serial), status: status, qc: qc, model: model, key: serial });
+            previous = serial;
+        }
+        return entries;
+    };
+
+    function compareBytes(a, b) {
+        const n = Math.min(a.length, b.length);
+        for (let i = 0; i < n; i++) {
+            if (a[i] !== b[i]) return a[i] - b[i];
+        }
+        return a.length - b.length;
+    }
+
+    // ASCII uppercase, the same folding serial_index.py sorts by (bytes.upper())
+    function foldByte(byte) {
+        return byte >= 97 && byte <= 122 ? byte - 32 : byte;
+    }
+
+    function foldBytes(bytes) {
+        return bytes.map(foldByte);
+    }
+
+    function foldText(text) {
+        return text.replace(/[a-z]+/g, letters => letters.toUpperCase());
+    }
+
+    // Compare a stored key with an already folded key, in index order
+    function compareFolded(key, folded) {
+        const n = Math.min(key.length, folded.length);
+        for (let i = 0; i < n; i++) {
+            const byte = foldByte(key[i]);
+            if (byte !== folded[i]) return byte - folded[i];
+        }
+        return key.length - folded.length;
+    }
+
+    function hasFoldedPrefix(key, prefix) {
+        if (key.length < prefix.length) return false;
+        for (let i = 0; i < prefix.length; i++) {
+            if (foldByte(key[i]) !== prefix[i]) return false;
+        }
+        return true;
+    }
+
+    function result(entry) {
+        return { serial: entry.serial, status: entry.status, qc: entry.qc, model: entry.model };
+    }
+
+    // Last block whose head sorts before the folded key (0 when none does);
+    // entries equal to the key after folding can end the previous block
+    SerialIndex.prototype.firstBlock = function (folded) {
+        let lo = 0, hi = this.heads.length - 1, found = 0;
+        while (lo <= hi) {
+            const mid = (lo + hi) >> 1;
+            if (compareFolded(this.heads[mid], folded) < 0) {
+                found = mid;
+                lo = mid + 1;
+            } else {
+                hi = mid - 1;
+            }
+        }
+        return found;
+    };
+
+    // Exact lookup: {serial, status, qc, model} or null
+    SerialIndex.prototype.lookup = function (serial) {
+        const key = encoder.encode(String(serial).trim());
+        const folded = foldBytes(key);
+        for (let block = this.firstBlock(folded); block < this.heads.length; block++) {
+            for (const entry of this.decodeBlock(block)) {
+                const cmp = compareFolded(entry.key, folded);
+                if (cmp > 0) return null;
+                if (cmp === 0 && compareBytes(entry.key, key) === 0) return result(entry);
+            }
+        }
+        return null;
+    };
+
+    // Partial search, case-insensitive: prefix matches come from one block range,
+    // otherwise a substring scan over every serial
+    SerialIndex.prototype.search = function (fragment, limit) {
+        limit = limit || 50;
+        const text = foldText(String(fragment).trim());
+        if (!text || !this.heads.length) return [];
+        const results = [];
+        const prefix = encoder.encode(text);
+        scan:
+        for (let block = this.firstBlock(prefix); block < this.heads.length; block++) {
+            for (const entry of this.decodeBlock(block)) {
+                if (hasFoldedPrefix(entry.key, prefix)) {
+                    results.push(result(entry));
+                    if (results.length >= limit) return results;
+                } else if (compareFolded(entry.key, prefix) > 0) {
+                    break scan;
+                }
+            }
+        }
+        if (results.length) return results;
+
+        if (!this.all) {
+            this.all = [];
+            for (let block = 0; block < this.heads.length; block++) {
+                for (const entry of this.decodeBlock(block)) {
+                    this.all.push(Object.assign(result(entry), { folded: foldText(entry.serial) }));
+                }
+            }
+        }
+        for (const entry of this.all) {
+            if (entry.folded.indexOf(text) !== -1) {
+                results.push(result(entry));
+                if (results.length >= limit) break;
+            }
+        }
+        return results;
+    };
+
+    // Fetch the manifest (never cached) and the versioned index file
+    async function loadSerialIndex() {
+        const manifestResponse = await fetch('/static/serial-index.json', { cache: 'no-store' });
+        if (!manifestResponse.ok) throw new Error('Serial index not available');
+        const manifest = await manifestResponse.json();
+        const indexResponse = await fetch(manifest.url);
+        if (!indexResponse.ok) throw new Error('Serial index not available');
+        const index = new SerialIndex(await indexResponse.arrayBuffer());
+        if (index.version !== manifest.version) throw new Error('Serial index version mismatch');
+        return index;
+    }
+
+    let loading = null;
+    window.SerialIndex = SerialIndex;
+    window.getSerialIndex = function () {
+        if (!loading) {
+            loading = loadSerialIndex().catch(error => {
+                console.warn('Serial index unavailable, scanner will use the server:', error.message);
+                loading = null;
+                return null;
+            });
+        }
+        return loading;
+    };
+})();
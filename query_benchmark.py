@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Query Workload Benchmark for AxelGuard Dashboard
+Replays the SQL behind each /api route against synthetic databases at
+several scale factors and reports p50/p95/p99 latency per route and scale.
+
+Routes and their statements come from src/index.tsx, the same app.<method>()
+routes the flowchart's API section lists, extracted with index_advisor. One
+simulated request runs every statement of the route in source order.
+Placeholders are bound to values drawn from the data: popular customers
+and orders come up as often as they occur, and date bounds fall in recent
+windows. Databases are generated by synthetic_data.py and kept in the cache
+directory, so later runs reuse them. Write routes only run with
+--include-writes, inside a savepoint that is rolled back.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from index_advisor import SOURCE_FILE, Query, Schema, extract_statements
+from synthetic_data import generate_database
+
+CACHE_DIR = os.environ.get(
+    'AXELGUARD_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'axelguard')
+)
+POOL_SIZE = 500
+RECENT_WINDOW = (0.75, 0.97)  # quantiles lower date bounds are drawn from
+
+
+def route_workload(source_path=SOURCE_FILE, methods=('GET',), prefixes=None):
+    """route → [distinct SQL in source order]"""
+    workload = {}
+    for record in extract_statements(source_path):
+        if record['sql'] is None or not record['route']:
+            continue
+        method, path = record['route'].split(' ', 1)
+        if method not in methods or (prefixes and not path.startswith(tuple(prefixes))):
+            continue
+        statements = workload.setdefault(record['route'], [])
+        if record['sql'] not in statements:
+            statements.append(record['sql'])
+    return workload
+
+
+class ParamSampler:
+    """Bind values drawn from the data, so repeated requests hit different rows"""
+
+    def __init__(self, conn, seed=7):
+        self.conn = conn
+        self.rng = random.Random(seed)
+        self.pools = {}
+
+    def pool(self, table, column, kind):
+        key = (table, column, kind)
+        if key not in self.pools:
+            q = f'"{column}"'
+            rows = [r[0] for r in self.conn.execute(
+                f'SELECT {q} FROM "{table}" WHERE {q} IS NOT NULL ORDER BY RANDOM() LIMIT {POOL_SIZE}')]
+            if kind == 'low' and rows:
+                rows.sort()
+                rows = rows[int(len(rows) * RECENT_WINDOW[0]):max(int(len(rows) * RECENT_WINDOW[1]), 1)]
+            elif kind == 'high' and rows:
+                rows = [max(rows)]
+            self.pools[key] = rows or [None]
+        return self.pools[key]
+
+    def values(self, slots):
+        values = []
+        for kind, column in slots:
+            if kind == 'limit':
+                values.append(50)
+            elif kind == 'offset':
+                values.append(0)
+            elif column is None:
+                values.append(None)
+            else:
+                values.append(self.rng.choice(self.pool(column[0], column[1], kind)))
+        return values
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not samples:
+        return None
+    rank = max(1, -(-len(samples) * pct // 100))
+    return samples[int(rank) - 1]
+
+
+def bench_route(conn, statements, sampler, requests, max_seconds, timeout):
+    """Latency samples (ms) for one route; statements that fail on this schema are dropped,
+    and a request running past timeout seconds is interrupted and ends the route"""
+    usable = []
+    errors = []
+    for query in statements:
+        try:
+            conn.execute('EXPLAIN ' + query.sql, [None] * len(query.slots))
+            usable.append(query)
+        except sqlite3.Error as e:
+            errors.append(str(e))
+    if not usable:
+        return [], errors
+
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for n in range(requests + 1):
+        params = [sampler.values(query.slots) for query in usable]
+        started = time.perf_counter()
+        cutoff = started + timeout
+        conn.set_progress_handler(lambda: time.perf_counter() > cutoff, 10000)
+        conn.execute('SAVEPOINT bench')
+        try:
+            for query, values in zip(usable, params):
+                conn.execute(query.sql, values).fetchall()
+            elapsed = (time.perf_counter() - started) * 1000
+        except sqlite3.Error as e:
+            errors.append(f"timed out after {timeout:g}s" if 'interrupted' in str(e) else str(e))
+            elapsed = None
+        finally:
+            conn.set_progress_handler(None, 0)
+            conn.execute('ROLLBACK TO bench')
+            conn.execute('RELEASE bench')
+        if errors and errors[-1].startswith('timed out'):
+            break
+        if n and elapsed is not None:  # the first request only warms the page cache
+            samples.append(elapsed)
+        if time.perf_counter() > deadline:
+            break
+    samples.sort()
+    return samples, errors
+
+
+def run_benchmark(db_path, workload, requests=100, max_seconds=5.0, timeout=10.0, progress=None):
+    """{route: {'p50', 'p95', 'p99', 'requests', 'errors'}} for one database"""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        schema = Schema(conn)
+        sampler = ParamSampler(conn)
+        results = {}
+        for route, sqls in workload.items():
+            queries = []
+            for sql in sqls:
+                query = Query(sql, schema)
+                query.slots = query.parameter_slots()
+                queries.append(query)
+            samples, errors = bench_route(conn, queries, sampler, requests, max_seconds, timeout)
+            results[route] = {
+                'p50': percentile(samples, 50), 'p95': percentile(samples, 95), 'p99': percentile(samples, 99),
+                'requests': len(samples), 'errors': len(errors), 'error': errors[-1] if errors else None,
+                'timed_out': any(e.startswith('timed out') for e in errors),
+            }
+            if progress:
+                progress(route, results[route])
+        return results
+    finally:
+        conn.close()
+
+
+def scaled_database(scale, seed, work_dir, rebuild=False):
+    """Path of the generated database for a scale factor, building it when missing"""
+    path = Path(work_dir) / f"bench-x{scale:g}-seed{seed}.sqlite"
+    if rebuild or not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        counts, _ = generate_database(path, scale, seed)
+        print(f"   • Generated x{scale:g}: {counts.get('inventory', 0):,} devices, "
+              f"{counts.get('sales', 0):,} sales in {time.perf_counter() - started:.1f}s → {path}")
+    return path
+
+
+def fmt_ms(value):
+    return f"{value:8.2f}" if value is not None else f"{'n/a':>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the SQL behind each /api route at scaled data volumes")
+    parser.add_argument('--scales', default='1,10', help="Comma-separated multiples of today's volumes (e.g. 1,10,100)")
+    parser.add_argument('--db', help="Benchmark this existing database instead of generated ones")
+    parser.add_argument('--seed', type=int, default=42, help="Synthetic data seed")
+    parser.add_argument('--work-dir', default=os.path.join(CACHE_DIR, 'bench'), help="Where generated databases are kept")
+    parser.add_argument('--rebuild', action='store_true', help="Regenerate the databases even if they exist")
+    parser.add_argument('--source', default=str(SOURCE_FILE), help="Worker source to extract routes from")
+    parser.add_argument('--routes', help="Only routes whose path starts with one of these (comma-separated)")
+    parser.add_argument('--include-writes', action='store_true', help="Also replay POST/PUT/DELETE routes (rolled back)")
+    parser.add_argument('--requests', type=int, default=100, help="Simulated requests per route and scale")
+    parser.add_argument('--max-seconds', type=float, default=5.0, help="Time cap per route and scale")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Interrupt a single request after this many seconds")
+    parser.add_argument('--top', type=int, default=30, help="Routes to print (slowest p95 at the largest scale)")
+    parser.add_argument('--json', action='store_true', help="Print all results as JSON")
+    args = parser.parse_args()
+
+    if not Path(args.source).exists():
+        print(f"❌ Error: Source file not found at {args.source}")
+        sys.exit(1)
+    if args.db and not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    methods = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH') if args.include_writes else ('GET',)
+    prefixes = [p.strip() for p in args.routes.split(',')] if args.routes else None
+    workload = route_workload(args.source, methods, prefixes)
+    if not workload:
+        print("❌ Error: No routes with SQL matched")
+        sys.exit(1)
+
+    if args.db:
+        databases = [('db', Path(args.db))]
+    else:
+        scales = [float(s) for s in args.scales.split(',') if s.strip()]
+        databases = [(f"x{s:g}", scaled_database(s, args.seed, args.work_dir, args.rebuild)) for s in scales]
+
+    results = {}
+    for label, path in databases:
+        started = time.perf_counter()
+        results[label] = run_benchmark(path, workload, args.requests, args.max_seconds, args.timeout)
+        if not args.json:
+            print(f"   • Replayed {len(workload)} routes on {label} in {time.perf_counter() - started:.1f}s")
+
+    if args.json:
+        print(json.dumps({'routes': {route: {label: results[label][route] for label, _ in databases}
+                                     for route in workload}}, indent=2))
+        return
+
+    labels = [label for label, _ in databases]
+    largest = labels[-1]
+    ranked = sorted(workload, key=lambda r: (results[largest][r]['timed_out'], results[largest][r]['p95'] or 0),
+                    reverse=True)
+
+    print("\n" + "="*60)
+    print(f"⏱️  QUERY WORKLOAD BENCHMARK ({len(workload)} routes, {args.requests} requests each)")
+    print("="*60)
+    header = '   '.join(f"{label + ' p50':>8} {'p95':>8} {'p99':>8}" for label in labels)
+    print(f"   {'route':<48} {header}")
+    for route in ranked[:args.top]:
+        cells = '   '.join(
+            f"{'> ' + format(args.timeout, 'g') + ' s timeout':>26}" if results[label][route]['timed_out']
+            else ' '.join(fmt_ms(results[label][route][p]) for p in ('p50', 'p95', 'p99'))
+            for label in labels)
+        growth = ''
+        first, last = results[labels[0]][route]['p95'], results[largest][route]['p95']
+        if len(labels) > 1 and first and last and not results[largest][route]['timed_out']:
+            growth = f"  ×{last / first:.1f}"
+        print(f"   {route[:48]:<48} {cells}{growth}")
+
+    failing = {route: results[label][route]['error'] for label in labels for route in workload
+               if results[label][route]['errors'] and not results[label][route]['timed_out']}
+    if failing:
+        print(f"\n⚠️  Routes with statements that do not run on this schema:")
+        for route, error in failing.items():
+            print(f"   • {route}: {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Report Query Cache for AxelGuard Python tools
+Memoizes SELECT results keyed on normalized SQL plus parameters. The tables
+a statement reads are found once with the SQLite authorizer (views resolve
+to their base tables), and an entry stays valid while those tables'
+versions are unchanged:
+
+  • with local_table_versions.sql installed, the per-table counters in
+    table_versions (kept by triggers, so wrangler dev and importer writes
+    are both seen); it is local-only, not a D1 migration;
+  • otherwise PRAGMA data_version plus this connection's total_changes,
+    which invalidates on any write to the file.
+
+Entries are evicted least-recently-used once their estimated size passes
+the memory cap. With table_versions present, the cache can be saved to
+disk so repeated report runs start warm.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR = os.environ.get(
+    'AXELGUARD_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'axelguard')
+)
+DEFAULT_MAX_BYTES = int(float(os.environ.get('AXELGUARD_QUERY_CACHE_MB', '64')) * 1024 * 1024)
+
+# Bump when the entry layout changes; persisted caches from older versions are ignored
+CACHE_VERSION = 1
+
+VERSION_TABLE_FILE = Path(__file__).resolve().parent / 'local_table_versions.sql'
+
+COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Strip comments, collapse whitespace and the trailing semicolon"""
+    return WHITESPACE.sub(' ', COMMENTS.sub(' ', sql)).strip().rstrip(';').strip()
+
+
+def estimate_size(rows):
+    """Approximate memory held by a result (list of row tuples)"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row:
+            size += sys.getsizeof(value)
+    return size
+
+
+def install_version_table(db_path):
+    """Add table_versions and its triggers to a local D1 file (never to production)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        with open(VERSION_TABLE_FILE, 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+    finally:
+        conn.close()
+
+
+class QueryCache:
+    """Memoized read queries over one sqlite3 connection"""
+
+    def __init__(self, conn, max_bytes=DEFAULT_MAX_BYTES, persist=False, db_path=None):
+        self.conn = conn
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key → (tokens, rows, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._deps = {}
+        self._versions = None
+        self._version_stamp = None
+        self.tracked = self._has_version_table()
+        self.persist_path = None
+        if persist and self.tracked and db_path:
+            digest = hashlib.sha256(str(Path(db_path).resolve()).encode('utf-8')).hexdigest()[:16]
+            self.persist_path = Path(CACHE_DIR) / f"query-cache-{digest}.pkl"
+            self._load()
+
+    # ----- invalidation -----
+
+    def _has_version_table(self):
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'table_versions'"
+        ).fetchone() is not None
+
+    def _stamp(self):
+        """Changes whenever anything (another connection or this one) wrote to the file"""
+        return (self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes)
+
+    def versions(self):
+        """table → version, re-read only when the file changed since the last read"""
+        stamp = self._stamp()
+        if self._versions is None or stamp != self._version_stamp:
+            if self.tracked:
+                self._versions = dict(self.conn.execute("SELECT table_name, version FROM table_versions"))
+            else:
+                self._versions = {}
+            self._version_stamp = stamp
+        return self._versions
+
+    def dependencies(self, sql, params):
+        """Tables the statement reads (memoized per SQL text)"""
+        if sql not in self._deps:
+            tables = set()
+
+            def authorizer(action, arg1, arg2, db_name, source):
+                if action == sqlite3.SQLITE_READ and arg1 and not arg1.startswith('sqlite_'):
+                    tables.add(arg1)
+                return sqlite3.SQLITE_OK
+
+            self.conn.set_authorizer(authorizer)
+            try:
+                self.conn.execute('EXPLAIN ' + sql, params)
+            finally:
+                self.conn.set_authorizer(None)
+            self._deps[sql] = tuple(sorted(tables))
+        return self._deps[sql]
+
+    def _tokens(self, tables):
+        """Validity token per dependency; untracked tables fall back to the file-wide stamp"""
+        versions = self.versions()
+        stamp = self._version_stamp
+        if not tables:
+            return (('*', stamp),)  # e.g. sqlite_master lookups
+        return tuple((t, versions[t]) if t in versions else (t, stamp) for t in tables)
+
+    # ----- lookups -----
+
+    def query(self, sql, params=()):
+        """Rows (tuple of tuples) for a read-only statement, from the cache when current"""
+        sql = normalize_sql(sql)
+        params = tuple(params)
+        key = (sql, params)
+        tokens = self._tokens(self.dependencies(sql, params))
+
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == tokens:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        rows = tuple(self.conn.execute(sql, params).fetchall())
+        if entry is not None:
+            del self.entries[key]
+            self.bytes -= entry[2]
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return rows  # would flush everything else; not worth keeping
+        self.entries[key] = (tokens, rows, size)
+        self.entries.move_to_end(key)
+        self.bytes += size
+        self._evict()
+        return rows
+
+    def query_one(self, sql, params=()):
+        rows = self.query(sql, params)
+        return rows[0] if rows else None
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self.entries:
+            _, (_, _, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits,
+                'misses': self.misses, 'tracked': self.tracked}
+
+    # ----- persistence (table_versions only: its tokens are meaningful across processes) -----
+
+    def _load(self):
+        try:
+            with open(self.persist_path, 'rb') as f:
+                saved = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return
+        if saved.get('version') != CACHE_VERSION:
+            return
+        for key, (tokens, rows, size) in saved['entries']:
+            self.entries[key] = (tokens, rows, size)
+            self.bytes += size
+        self._evict()
+
+    def save(self):
+        """Write entries whose tokens are all table versions to disk"""
+        if not self.persist_path:
+            return
+        durable = [(key, entry) for key, entry in self.entries.items()
+                   if all(isinstance(token, int) for _, token in entry[0])]
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.persist_path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'entries': durable}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.persist_path)
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Quotation PDF Renderer for AxelGuard Dashboard
+Renders quotations from the quotations table to PDF with the reportlab
+styles of generate_flowchart.py, in the layout of the dashboard's quotation
+preview. Quotations are spread over a process pool; each worker loads the
+logo, fonts and styles once, and quotations whose content hash matches the
+last render are skipped.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from generate_flowchart import get_styles, styled_table
+
+ROOT = Path(__file__).resolve().parent
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+OUT_DIR = ROOT / 'exports' / 'quotations'
+LOGO_PATH = ROOT / 'public' / 'static' / 'axelguard-logo.png'
+MANIFEST_FILE = '_manifest.json'
+
+# Bump when the layout changes so every quotation is re-rendered
+RENDERER_VERSION = 1
+
+# A TTF with the rupee sign; Helvetica has no glyph for it
+FONT_CANDIDATES = [
+    os.environ.get('AXELGUARD_PDF_FONT', ''),
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+]
+
+# Same palette as the quotation preview's theme picker
+THEME_COLORS = {
+    'blue': {'primary': '#3B82F6', 'secondary': '#1E40AF', 'light': '#EFF6FF'},
+    'green': {'primary': '#10B981', 'secondary': '#047857', 'light': '#ECFDF5'},
+    'purple': {'primary': '#8B5CF6', 'secondary': '#6D28D9', 'light': '#F5F3FF'},
+    'orange': {'primary': '#F97316', 'secondary': '#C2410C', 'light': '#FFF7ED'},
+    'red': {'primary': '#EF4444', 'secondary': '#B91C1C', 'light': '#FEF2F2'},
+}
+
+COMPANY = {
+    'name': 'AxelGuard',
+    'address': 'Office No 210, PC Chamber, Sector 66, Noida, Uttar Pradesh, 201301',
+    'gstin': '09FSEPP6050C1ZQ',
+    'state': '09 - Uttar Pradesh',
+    'phone': '+91 8755311835',
+    'email': 'info@axel-guard.com',
+}
+BANK_DETAILS = [
+    ('Bank Name', 'IDFC FIRST BANK LTD, NOIDA-SIXTEEN BRANCH'),
+    ('Bank Account No.', '10188344828'),
+    ('Bank IFSC code', 'IDFB0020158'),
+    ("Account holder's name", 'RealTrack Technology'),
+]
+DEFAULT_TERMS = ("This quotation is valid for 30 days from the date of issue.\n"
+                 "Payment terms: 100% advance or as mutually agreed.\n"
+                 "Prices are subject to change without prior notice.")
+DEFAULT_HSN = '85219090'
+
+# Bookkeeping columns that don't change what the PDF shows
+NON_CONTENT_COLUMNS = {'id', 'updated_at', 'sent_at', 'sent_by', 'status'}
+
+
+# ========== PER-WORKER ASSETS ==========
+
+_ASSETS = None
+
+
+def load_assets(logo_path=LOGO_PATH):
+    """Fonts, logo and paragraph styles; loaded once per process and reused for every quotation"""
+    global _ASSETS
+    if _ASSETS is not None:
+        return _ASSETS
+
+    font, bold_font, currency = 'Helvetica', 'Helvetica-Bold', 'Rs. '
+    for candidate in FONT_CANDIDATES:
+        if candidate and os.path.exists(candidate):
+            pdfmetrics.registerFont(TTFont('QuotationSans', candidate))
+            bold = candidate.replace('.ttf', '-Bold.ttf')
+            if os.path.exists(bold):
+                pdfmetrics.registerFont(TTFont('QuotationSans-Bold', bold))
+                bold_font = 'QuotationSans-Bold'
+            else:
+                bold_font = 'QuotationSans'
+            font, currency = 'QuotationSans', '₹'
+            break
+
+    logo = None
+    if logo_path and os.path.exists(logo_path):
+        with open(logo_path, 'rb') as f:
+            logo_bytes = f.read()
+        reader = ImageReader(logo_path)
+        width, height = reader.getSize()
+        logo = {'bytes': logo_bytes, 'aspect': height / float(width)}
+
+    base = get_styles()
+    styles = {
+        'normal': ParagraphStyle('QuotationNormal', parent=base['normal'], fontName=font, fontSize=9, leading=12),
+        'small': ParagraphStyle('QuotationSmall', parent=base['normal'], fontName=font, fontSize=8, leading=10),
+        'center': ParagraphStyle('QuotationCenter', parent=base['normal'], fontName=font, fontSize=8, alignment=1),
+        'right': ParagraphStyle('QuotationRight', parent=base['normal'], fontName=font, fontSize=9, alignment=TA_RIGHT),
+        'heading': ParagraphStyle('QuotationHeading', parent=base['normal'], fontName=bold_font,
+                                  fontSize=10, spaceBefore=6, spaceAfter=4),
+        'footer': ParagraphStyle('QuotationFooter', parent=base['footer'], fontName=font),
+    }
+    for theme, palette in THEME_COLORS.items():
+        styles[f'title-{theme}'] = ParagraphStyle(
+            f'QuotationTitle-{theme}', parent=base['title'], fontName=bold_font, fontSize=20,
+            spaceAfter=4, textColor=colors.HexColor(palette['primary'])
+        )
+        styles[f'accent-{theme}'] = ParagraphStyle(
+            f'QuotationAccent-{theme}', parent=base['normal'], fontName=bold_font, fontSize=9,
+            alignment=1, spaceAfter=2, textColor=colors.HexColor(palette['secondary'])
+        )
+
+    _ASSETS = {'font': font, 'bold_font': bold_font, 'currency': currency, 'logo': logo, 'styles': styles}
+    return _ASSETS
+
+
+def _init_worker(logo_path):
+    load_assets(logo_path)
+
+
+# ========== CONTENT ==========
+
+def quotation_items(quotation):
+    """Items JSON as stored by /api/quotations; tolerates a malformed column"""
+    try:
+        items = json.loads(quotation.get('items') or '[]')
+    except (TypeError, ValueError):
+        return []
+    return items if isinstance(items, list) else []
+
+
+def content_hash(quotation, logo_digest=''):
+    """Hash of everything the rendered PDF depends on"""
+    content = {k: v for k, v in quotation.items() if k not in NON_CONTENT_COLUMNS}
+    payload = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(f"{RENDERER_VERSION}:{logo_digest}:{payload}".encode('utf-8')).hexdigest()
+
+
+def pdf_filename(quotation):
+    """Same naming as the dashboard's Download PDF button"""
+    party = quotation.get('company_name') or quotation.get('customer_name') or ''
+    return f"Quotation_{quotation['quotation_number']}_{re.sub(r'[^a-zA-Z0-9]', '_', party)}.pdf"
+
+
+def number_to_words(num):
+    """Indian numbering (Lakh/Crore), as in the quotation preview"""
+    ones = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine']
+    tens = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
+    teens = ['Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 'Sixteen',
+             'Seventeen', 'Eighteen', 'Nineteen']
+    if num == 0:
+        return 'Zero'
+    if num < 10:
+        return ones[num]
+    if num < 20:
+        return teens[num - 10]
+    if num < 100:
+        return (tens[num // 10] + ' ' + ones[num % 10]).strip()
+    if num < 1000:
+        rest = number_to_words(num % 100) if num % 100 else ''
+        return (ones[num // 100] + ' Hundred ' + rest).strip()
+    for divisor, name in ((10000000, 'Crore'), (100000, 'Lakh'), (1000, 'Thousand')):
+        if num >= divisor:
+            rest = number_to_words(num % divisor) if num % divisor else ''
+            return (number_to_words(num // divisor) + f' {name} ' + rest).strip()
+
+
+def money(value, currency):
+    """Indian digit grouping, like toLocaleString('en-IN')"""
+    value = float(value or 0)
+    whole, fraction = f"{abs(value):.2f}".split('.')
+    if len(whole) > 3:
+        head, tail = whole[:-3], whole[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        if head:
+            groups.insert(0, head)
+        whole = ','.join(groups + [tail])
+    amount = whole if fraction == '00' else f"{whole}.{fraction}"
+    return f"{'-' if value < 0 else ''}{currency}{amount}"
+
+
+def build_story(quotation, assets):
+    """Flowables for one quotation, mirroring the dashboard preview"""
+    s = assets['styles']
+    currency = assets['currency']
+    text = {k: escape(v) if isinstance(v, str) else v for k, v in quotation.items()}  # safe for Paragraph markup
+    theme = quotation.get('theme') if quotation.get('theme') in THEME_COLORS else 'blue'
+    palette = THEME_COLORS[theme]
+    story = []
+
+    logo = assets['logo']
+    logo_cell = Image(io.BytesIO(logo['bytes']), width=1.6 * inch, height=1.6 * inch * logo['aspect']) if logo else ''
+    contact = Paragraph(f"{COMPANY['phone']}<br/>{COMPANY['email']}", s['right'])
+    header = Table([[logo_cell, contact]], colWidths=[3.5 * inch, 3.5 * inch])
+    header.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor(palette['primary'])),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]))
+    story.append(header)
+    story.append(Spacer(1, 0.15 * inch))
+
+    story.append(Paragraph(COMPANY['name'], s[f'title-{theme}']))
+    story.append(Paragraph(COMPANY['address'], s['center']))
+    story.append(Paragraph(f"GSTIN: {COMPANY['gstin']}", s[f'accent-{theme}']))
+    story.append(Paragraph(f"State: {COMPANY['state']}", s[f'accent-{theme}']))
+    story.append(Spacer(1, 0.15 * inch))
+
+    story.append(Paragraph(f"Quotation No.: <b>{text['quotation_number']}</b> &nbsp;&nbsp; "
+                           f"Date: {str(text.get('created_at') or '')[:10]}", s['normal']))
+    story.append(Paragraph("Estimate For:", s['heading']))
+    story.append(Paragraph(f"<b>{text.get('company_name') or text.get('customer_name') or ''}</b>", s['normal']))
+    if text.get('customer_address'):
+        story.append(Paragraph(text['customer_address'], s['normal']))
+    if text.get('gst_registered_address'):
+        story.append(Paragraph(f"<b>GST Address:</b> {text['gst_registered_address']}", s['normal']))
+
+    left = [f"<b>Contact No.:</b> {text.get('customer_contact') or ''}"]
+    if text.get('gst_number'):
+        left.append(f"<b>GST No.:</b> {text['gst_number']}")
+    right = [f"<b>Concern Person Name:</b> {text.get('concern_person_name') or ''}",
+             f"<b>Concern Person Mobile:</b> {text.get('concern_person_contact') or ''}"]
+    details = Table([[Paragraph('<br/>'.join(left), s['normal']), Paragraph('<br/>'.join(right), s['normal'])]],
+                    colWidths=[3.5 * inch, 3.5 * inch])
+    details.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP'), ('LEFTPADDING', (0, 0), (-1, -1), 0)]))
+    story.append(details)
+    story.append(Spacer(1, 0.15 * inch))
+
+    rows = [['#', 'Item name', 'HSN/ SAC', 'Qty', 'Rate', 'Amount']]
+    for index, item in enumerate(quotation_items(quotation), start=1):
+        rows.append([
+            str(index),
+            Paragraph(escape(str(item.get('product_name') or '')), s['small']),
+            item.get('hsn_sac') or DEFAULT_HSN,
+            str(item.get('quantity') or 0),
+            money(item.get('unit_price'), currency),
+            money(item.get('amount'), currency),
+        ])
+    item_count = len(rows)
+    totals = [('Subtotal', quotation.get('subtotal'))]
+    if (quotation.get('courier_cost') or 0) > 0:
+        totals.append((f"Courier Charges ({quotation.get('courier_partner') or 'Standard'})", quotation['courier_cost']))
+    if (quotation.get('gst_amount') or 0) > 0:
+        totals.append(('GST (18%)', quotation['gst_amount']))
+    totals.append(('Total Amount', quotation.get('total_amount')))
+    for label, value in totals:
+        rows.append([label, '', '', '', '', money(value, currency)])
+
+    table = styled_table(rows, [0.35, 3.0, 0.9, 0.5, 1.1, 1.15], palette['secondary'],
+                         ['white', palette['light']], font_size=8, center_first=True)
+    table.setStyle(TableStyle([
+        ('FONTNAME', (0, 1), (-1, -1), assets['font']),
+        ('ALIGN', (3, 1), (3, -1), 'CENTER'),
+        ('ALIGN', (4, 0), (5, -1), 'RIGHT'),
+        *[cmd for r in range(item_count, len(rows)) for cmd in (
+            ('SPAN', (0, r), (4, r)),
+            ('ALIGN', (0, r), (4, r), 'RIGHT'),
+            ('BACKGROUND', (0, r), (-1, r), colors.white),
+        )],
+        ('FONTNAME', (0, len(rows) - 1), (-1, len(rows) - 1), assets['bold_font']),
+        ('TEXTCOLOR', (0, len(rows) - 1), (-1, len(rows) - 1), colors.HexColor(palette['primary'])),
+        ('BACKGROUND', (0, len(rows) - 1), (-1, len(rows) - 1), colors.HexColor(palette['light'])),
+    ]))
+    story.append(table)
+    story.append(Spacer(1, 0.2 * inch))
+
+    story.append(Paragraph("Pay To:", s['heading']))
+    for label, value in BANK_DETAILS:
+        story.append(Paragraph(f"<b>{label}:</b> {value}", s['normal']))
+    story.append(Spacer(1, 0.1 * inch))
+
+    story.append(Paragraph("Estimate Amount In Words", s['heading']))
+    words = number_to_words(int(float(quotation.get('total_amount') or 0))) + ' Rupees only'
+    story.append(Paragraph(f"<b>{words}</b>", s['normal']))
+    story.append(Spacer(1, 0.1 * inch))
+
+    story.append(Paragraph("Terms And Conditions:", s['heading']))
+    terms = (text.get('terms_conditions') or escape(DEFAULT_TERMS)).replace('\n', '<br/>')
+    story.append(Paragraph(terms, s['small']))
+    if text.get('notes'):
+        story.append(Paragraph(f"<b>Notes:</b> {text['notes']}", s['small']))
+    story.append(Spacer(1, 0.3 * inch))
+
+    story.append(Paragraph("Thank you for your business!", s['footer']))
+    story.append(Paragraph(f"RealTrack Technology | Email: info.realtrack@gmail.com | Phone: {COMPANY['phone']}",
+                           s['footer']))
+    return story
+
+
+def render_quotation(job):
+    """Worker entry point: (quotation dict, output path) → (number, path, error)"""
+    quotation, path = job
+    try:
+        assets = load_assets()
+        tmp_path = path + '.tmp'
+        doc = SimpleDocTemplate(tmp_path, pagesize=A4, topMargin=0.5 * inch, bottomMargin=0.5 * inch,
+                                leftMargin=0.6 * inch, rightMargin=0.6 * inch,
+                                title=f"Quotation {quotation['quotation_number']}", author=COMPANY['name'])
+        doc.build(build_story(quotation, assets))
+        os.replace(tmp_path, path)
+        return quotation['quotation_number'], path, None
+    except Exception as e:
+        return quotation['quotation_number'], path, str(e)
+
+
+# ========== BATCH ==========
+
+def load_quotations(db_path, numbers=None, status=None, since=None):
+    """Quotation rows as dicts (read-only connection)"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        sql = "SELECT * FROM quotations WHERE 1=1"
+        params = []
+        if numbers:
+            sql += f" AND quotation_number IN ({','.join('?' * len(numbers))})"
+            params.extend(numbers)
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        if since:
+            sql += " AND DATE(created_at) >= DATE(?)"
+            params.append(since)
+        return [dict(row) for row in conn.execute(sql + " ORDER BY id", params)]
+    finally:
+        conn.close()
+
+
+def render_batch(quotations, out_dir=OUT_DIR, workers=None, force=False, logo_path=LOGO_PATH):
+    """Render changed quotations across a process pool; returns (rendered, skipped, errors)"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_FILE
+    manifest = {}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    logo_digest = ''
+    if logo_path and os.path.exists(logo_path):
+        with open(logo_path, 'rb') as f:
+            logo_digest = hashlib.sha256(f.read()).hexdigest()
+
+    jobs = []
+    hashes = {}
+    skipped = 0
+    for quotation in quotations:
+        number = quotation['quotation_number']
+        digest = content_hash(quotation, logo_digest)
+        path = str(out_dir / pdf_filename(quotation))
+        entry = manifest.get(number)
+        if not force and entry and entry['hash'] == digest and os.path.exists(entry['file']):
+            skipped += 1
+            continue
+        hashes[number] = digest
+        jobs.append((quotation, path))
+
+    rendered = 0
+    errors = []
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(logo_path,)) as pool:
+            for number, path, error in pool.map(render_quotation, jobs, chunksize=chunksize):
+                if error:
+                    errors.append((number, error))
+                    continue
+                old = manifest.get(number)
+                if old and old['file'] != path and os.path.exists(old['file']):
+                    os.remove(old['file'])
+                manifest[number] = {'hash': hashes[number], 'file': path}
+                rendered += 1
+
+        tmp_path = manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+    return rendered, skipped, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render quotation PDFs from the quotations table")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--out-dir', default=str(OUT_DIR))
+    parser.add_argument('--numbers', help="Comma-separated quotation numbers (default: all)")
+    parser.add_argument('--status', help="Only quotations with this status (draft, sent, ...)")
+    parser.add_argument('--since', help="Only quotations created on or after YYYY-MM-DD")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Re-render even if content is unchanged")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    numbers = [n.strip() for n in args.numbers.split(',') if n.strip()] if args.numbers else None
+    quotations = load_quotations(args.db, numbers, args.status, args.since)
+    print(f"📄 {len(quotations)} quotations selected")
+
+    started = time.perf_counter()
+    rendered, skipped, errors = render_batch(quotations, args.out_dir, args.workers, args.force)
+    print(f"\n✅ Quotation PDFs Complete in {time.perf_counter() - started:.2f}s:")
+    print(f"   • Rendered: {rendered}")
+    print(f"   • Unchanged (skipped): {skipped}")
+    print(f"   • Errors: {len(errors)}")
+    for number, error in errors[:5]:
+        print(f"      - {number}: {error}")
+    print(f"   • Output: {args.out_dir}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Renewal / Warranty Due-Queue for AxelGuard Dashboard
+Parses inventory.warranty_provide durations, computes warranty end dates and
+keeps the renewal_due_queue table (migration 0026) in step with inventory.
+Refreshes are incremental: unchanged inventory is skipped outright and only
+devices whose source fields changed are rewritten.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+MIGRATION_FILE = Path(__file__).resolve().parent / 'migrations' / '0026_renewal_due_queue.sql'
+
+# Devices without a warranty_provide value get the dashboard's default ("One Year")
+DEFAULT_WARRANTY_MONTHS = 12
+
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'eighteen': 18, 'twenty four': 24, 'half': 0.5,
+}
+UNIT_MONTHS = {'y': 12, 'yr': 12, 'yrs': 12, 'year': 12, 'years': 12,
+               'm': 1, 'mo': 1, 'mon': 1, 'month': 1, 'months': 1, 'mnth': 1, 'mnths': 1}
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*([a-z]+)')
+NO_WARRANTY = {'no', 'none', 'nil', 'na', 'n/a', '0', 'no warranty', 'without warranty'}
+
+SOURCE_QUERY = '''
+    SELECT device_serial_no, dispatch_date, sale_date, warranty_provide,
+           account_expiry_date, license_renew_time,
+           model_name, customer_name, cust_code, order_id
+    FROM inventory
+    WHERE device_serial_no IS NOT NULL AND TRIM(device_serial_no) != ''
+'''
+
+_warranty_cache = {}
+
+
+def parse_warranty_months(text):
+    """'12 Month', '1 Year', 'Two Years', '18M' → months; None when unparseable or no warranty"""
+    if text is None:
+        return DEFAULT_WARRANTY_MONTHS
+    if text in _warranty_cache:
+        return _warranty_cache[text]
+
+    normalized = ' '.join(str(text).lower().replace('-', ' ').split())
+    months = None
+    if not normalized:
+        months = DEFAULT_WARRANTY_MONTHS
+    elif normalized in NO_WARRANTY:
+        months = None
+    else:
+        for word, number in sorted(NUMBER_WORDS.items(), key=lambda item: -len(item[0])):
+            normalized = re.sub(rf'\b{word}\b', str(number), normalized)
+        total = 0
+        for amount, unit in DURATION_PATTERN.findall(normalized):
+            if unit in UNIT_MONTHS:
+                total += float(amount) * UNIT_MONTHS[unit]
+        if total:
+            months = int(round(total))
+        elif re.fullmatch(r'\d+', normalized):
+            months = int(normalized)  # bare number, recorded in months
+    _warranty_cache[text] = months
+    return months
+
+
+def parse_date(value):
+    """D1 dates are ISO text (optionally with a time); also accepts dd/mm/yyyy"""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    except ValueError:
+        pass
+    for fmt in ('%d/%m/%Y', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def add_months(start, months):
+    """Calendar month arithmetic, clamping to the last day of the month"""
+    month_index = start.month - 1 + months
+    year = start.year + month_index // 12
+    month = month_index % 12 + 1
+    next_month = date(year + (month == 12), month % 12 + 1, 1)
+    return date(year, month, min(start.day, (next_month - timedelta(days=1)).day))
+
+
+def week_start(day):
+    """Monday of the day's ISO week"""
+    return day - timedelta(days=day.weekday())
+
+
+def fingerprint(row):
+    """Hash of the inventory fields the queue rows for a device depend on"""
+    return hashlib.sha1('\x1f'.join('' if v is None else str(v) for v in row).encode('utf-8')).hexdigest()
+
+
+def due_entries(row):
+    """Queue rows (due_type, due_date, warranty_months) for one inventory row"""
+    (_, dispatch_date, sale_date, warranty_provide,
+     account_expiry_date, license_renew_time, *_rest) = row
+    entries = []
+    start = parse_date(dispatch_date) or parse_date(sale_date)
+    if start:
+        months = parse_warranty_months(warranty_provide)
+        if months:
+            entries.append(('warranty', add_months(start, months), months))
+    expiry = parse_date(account_expiry_date)
+    if expiry:
+        entries.append(('account_expiry', expiry, None))
+    renewal = parse_date(license_renew_time)
+    if renewal:
+        entries.append(('license_renewal', renewal, None))
+    return entries
+
+
+def apply_migration(conn):
+    """Create the queue tables if missing"""
+    with open(MIGRATION_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+
+def source_snapshot(conn):
+    """Cheap summary of inventory used to skip refreshes when nothing changed"""
+    return conn.execute(
+        "SELECT COUNT(*), MAX(id), MAX(updated_at) FROM inventory"
+    ).fetchone()
+
+
+def refresh_due_queue(conn, full=False):
+    """
+    Bring renewal_due_queue up to date with inventory.
+
+    Returns a summary dict; 'skipped' is True when inventory is unchanged
+    since the last refresh. full=True rebuilds every row.
+    """
+    apply_migration(conn)
+    snapshot = source_snapshot(conn)
+    state = conn.execute(
+        "SELECT inventory_rows, inventory_max_id, inventory_max_updated_at FROM renewal_due_queue_state WHERE id = 1"
+    ).fetchone()
+    if not full and state is not None and tuple(state) == tuple(snapshot):
+        return {'skipped': True, 'devices': 0, 'upserted': 0, 'deleted': 0}
+
+    # Fingerprints per device already in the queue (all due types share one)
+    existing = {}
+    for serial, due_type, digest in conn.execute(
+        "SELECT device_serial_no, due_type, fingerprint FROM renewal_due_queue"
+    ):
+        existing.setdefault(serial, {})[due_type] = digest
+
+    upserts = []
+    deletes = []
+    seen = set()
+    for row in conn.execute(SOURCE_QUERY):
+        serial = str(row[0]).strip()
+        if serial in seen:
+            continue
+        seen.add(serial)
+        current = fingerprint(row)
+        stored = existing.get(serial, {})
+        if not full and stored and all(digest == current for digest in stored.values()):
+            continue
+        model_name, customer_name, cust_code, order_id = row[6:10]
+        entries = due_entries(row)
+        for due_type, due_date, months in entries:
+            upserts.append((
+                serial, due_type, due_date.isoformat(), week_start(due_date).isoformat(),
+                model_name, customer_name, cust_code, order_id, months, current
+            ))
+        kept = {due_type for due_type, _, _ in entries}
+        deletes.extend((serial, due_type) for due_type in stored if due_type not in kept)
+
+    # Devices that left inventory
+    for serial, stored in existing.items():
+        if serial not in seen:
+            deletes.extend((serial, due_type) for due_type in stored)
+
+    with conn:
+        if full:
+            conn.execute("DELETE FROM renewal_due_queue")
+            deletes = []
+        conn.executemany(
+            "DELETE FROM renewal_due_queue WHERE device_serial_no = ? AND due_type = ?", deletes
+        )
+        conn.executemany('''
+            INSERT INTO renewal_due_queue (
+                device_serial_no, due_type, due_date, week_start,
+                model_name, customer_name, cust_code, order_id, warranty_months, fingerprint
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(device_serial_no, due_type) DO UPDATE SET
+                due_date = excluded.due_date,
+                week_start = excluded.week_start,
+                model_name = excluded.model_name,
+                customer_name = excluded.customer_name,
+                cust_code = excluded.cust_code,
+                order_id = excluded.order_id,
+                warranty_months = excluded.warranty_months,
+                fingerprint = excluded.fingerprint,
+                refreshed_at = CURRENT_TIMESTAMP
+        ''', upserts)
+        conn.execute('''
+            INSERT INTO renewal_due_queue_state (id, inventory_rows, inventory_max_id, inventory_max_updated_at, refreshed_at)
+            VALUES (1, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(id) DO UPDATE SET
+                inventory_rows = excluded.inventory_rows,
+                inventory_max_id = excluded.inventory_max_id,
+                inventory_max_updated_at = excluded.inventory_max_updated_at,
+                refreshed_at = excluded.refreshed_at
+        ''', snapshot)
+
+    return {'skipped': False, 'devices': len(seen), 'upserted': len(upserts), 'deleted': len(deletes)}
+
+
+def due_within(conn, days, due_type=None, today=None):
+    """Queue rows due between today and today + days (overdue rows excluded)"""
+    today = today or date.today()
+    sql = '''
+        SELECT due_date, due_type, device_serial_no, model_name, customer_name, cust_code
+        FROM renewal_due_queue
+        WHERE due_date BETWEEN ? AND ?
+    '''
+    params = [today.isoformat(), (today + timedelta(days=days)).isoformat()]
+    if due_type:
+        sql += " AND due_type = ?"
+        params.append(due_type)
+    return conn.execute(sql + " ORDER BY due_date, device_serial_no", params).fetchall()
+
+
+def weekly_counts(conn, weeks, today=None):
+    """Due counts per week bucket and type for the next N weeks"""
+    first = week_start(today or date.today())
+    return conn.execute('''
+        SELECT week_start, due_type, COUNT(*)
+        FROM renewal_due_queue
+        WHERE week_start BETWEEN ? AND ?
+        GROUP BY week_start, due_type
+        ORDER BY week_start, due_type
+    ''', (first.isoformat(), (first + timedelta(weeks=weeks - 1)).isoformat())).fetchall()
+
+
+def print_refresh_summary(summary):
+    """Print a refresh summary in the importers' format"""
+    if summary['skipped']:
+        print("\n✅ Renewal due-queue already current (inventory unchanged)")
+        return
+    print(f"\n✅ Renewal Due-Queue Refreshed:")
+    print(f"   • Devices scanned: {summary['devices']}")
+    print(f"   • Rows written: {summary['upserted']}")
+    print(f"   • Rows removed: {summary['deleted']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the renewal/warranty due-queue")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--full', action='store_true', help="Rebuild every queue row")
+    parser.add_argument('--due-within', type=int, metavar='DAYS', help="List devices due in the next DAYS days")
+    parser.add_argument('--type', choices=['warranty', 'account_expiry', 'license_renewal'],
+                        help="Limit --due-within to one due type")
+    parser.add_argument('--weeks', type=int, default=8, help="Weekly buckets to summarize")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        started = time.perf_counter()
+        summary = refresh_due_queue(conn, args.full)
+        print_refresh_summary(summary)
+        print(f"   • Time: {time.perf_counter() - started:.2f}s")
+
+        print(f"\n📅 Due per week (next {args.weeks} weeks):")
+        for week, due_type, count in weekly_counts(conn, args.weeks):
+            print(f"   • Week of {week}: {count} {due_type}")
+
+        if args.due_within is not None:
+            rows = due_within(conn, args.due_within, args.type)
+            print(f"\n⏰ Due in the next {args.due_within} days: {len(rows)}")
+            for due_date, due_type, serial, model, customer, cust_code in rows[:50]:
+                print(f"   • {due_date}  {due_type:<16} {serial}  {model or '-'}  {customer or '-'} ({cust_code or '-'})")
+            if len(rows) > 50:
+                print(f"   ... and {len(rows) - 50} more")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Sales Archive (hot/cold tiering) for AxelGuard Dashboard
+Moves fully paid sales older than a cutoff, with their sale_items and
+payment_history rows, out of the live tables into the archive tables from
+migration 0027 (or into a separate SQLite file). Archived totals are folded
+into monthly per-employee and per-product summary rows as they move, so
+reports over old months never read the detail rows. The sales_all /
+sale_items_all / payment_history_all views keep orders in the archive
+tables findable; orders moved to a separate --archive-db file are outside
+those views, so the dashboard Worker cannot see them (use --find/--restore).
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+MIGRATION_FILE = Path(__file__).resolve().parent / 'migrations' / '0027_sales_archive.sql'
+
+DEFAULT_KEEP_MONTHS = 12
+BATCH_SIZE = 500
+
+# Live table → archive table; children are moved before their sales rows
+TIERS = [
+    ('sale_items', 'sale_items_archive'),
+    ('payment_history', 'payment_history_archive'),
+    ('sales', 'sales_archive'),
+]
+
+# Fully paid; balances are REAL, so allow for rounding noise
+PAID = "ROUND(COALESCE(balance_amount, 0), 2) <= 0"
+
+
+def apply_migration(conn):
+    """Create the archive tables, summaries and views if missing"""
+    with open(MIGRATION_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+
+def cutoff_for(keep_months, today=None):
+    """First day of the month keep_months before today's month"""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - keep_months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def shared_columns(conn, schema, source, target):
+    """Columns present in both the live table and its archive table"""
+    live = [r[1] for r in conn.execute(f"PRAGMA main.table_info({source})")]
+    archived = {r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({target})")}
+    return [c for c in live if c in archived]
+
+
+def _stage(conn, sale_ids, schema, live=True):
+    """Fill temp tables with one batch of sales and the child rows that belong to them"""
+    suffix = '' if live else '_archive'
+    prefix = 'main' if live else schema
+    conn.execute("DELETE FROM temp.batch_sales")
+    conn.execute("DELETE FROM temp.batch_children")
+    conn.executemany("INSERT INTO temp.batch_sales (id) VALUES (?)", [(i,) for i in sale_ids])
+    conn.execute(f'''
+        UPDATE temp.batch_sales SET order_id = (
+            SELECT order_id FROM {prefix}.sales{suffix} s WHERE s.id = temp.batch_sales.id
+        )
+    ''')
+    # Children link by sale_id, or only by order_id in rows written by the Excel importers
+    for table in ('sale_items', 'payment_history'):
+        conn.execute(f'''
+            INSERT OR IGNORE INTO temp.batch_children (tbl, id)
+            SELECT '{table}', c.id FROM {prefix}.{table}{suffix} c
+            WHERE c.sale_id IN (SELECT id FROM temp.batch_sales)
+            UNION
+            SELECT '{table}', c.id FROM {prefix}.{table}{suffix} c
+            WHERE c.order_id IN (SELECT order_id FROM temp.batch_sales)
+        ''')
+
+
+def _fold_summaries(conn, sign, schema, live=True):
+    """Add (sign=1) or remove (sign=-1) the staged batch's totals in the summary tables"""
+    suffix = '' if live else '_archive'
+    prefix = 'main' if live else schema
+    conn.execute(f'''
+        INSERT INTO main.sales_archive_monthly (
+            month, employee_name, sale_count, with_bill_count, subtotal,
+            gst_amount, courier_cost, total_amount, amount_received
+        )
+        SELECT substr(s.sale_date, 1, 7), s.employee_name,
+               {sign} * COUNT(*), {sign} * SUM(s.sale_type = 'With'), {sign} * SUM(s.subtotal),
+               {sign} * SUM(s.gst_amount), {sign} * SUM(COALESCE(s.courier_cost, 0)),
+               {sign} * SUM(s.total_amount), {sign} * SUM(COALESCE(s.amount_received, 0))
+        FROM {prefix}.sales{suffix} s
+        WHERE s.id IN (SELECT id FROM temp.batch_sales)
+        GROUP BY 1, 2
+        ON CONFLICT(month, employee_name) DO UPDATE SET
+            sale_count = sale_count + excluded.sale_count,
+            with_bill_count = with_bill_count + excluded.with_bill_count,
+            subtotal = subtotal + excluded.subtotal,
+            gst_amount = gst_amount + excluded.gst_amount,
+            courier_cost = courier_cost + excluded.courier_cost,
+            total_amount = total_amount + excluded.total_amount,
+            amount_received = amount_received + excluded.amount_received
+    ''')
+    conn.execute(f'''
+        INSERT INTO main.sales_archive_products (month, product_key, product_code, product_name, quantity, revenue)
+        SELECT substr(s.sale_date, 1, 7),
+               COALESCE(NULLIF(i.product_code, ''), i.product_name),
+               NULLIF(i.product_code, ''), MAX(i.product_name),
+               {sign} * SUM(i.quantity), {sign} * SUM(i.total_price)
+        FROM {prefix}.sale_items{suffix} i
+        JOIN temp.batch_children b ON b.tbl = 'sale_items' AND b.id = i.id
+        JOIN temp.batch_sales bs ON bs.id = i.sale_id OR bs.order_id = i.order_id
+        JOIN {prefix}.sales{suffix} s ON s.id = bs.id
+        GROUP BY 1, 2
+        ON CONFLICT(month, product_key) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue
+    ''')
+    if sign < 0:
+        conn.execute("DELETE FROM main.sales_archive_monthly WHERE sale_count <= 0")
+        conn.execute("DELETE FROM main.sales_archive_products WHERE ABS(quantity) < 1e-9 AND ABS(revenue) < 1e-6")
+
+
+def _move(conn, schema, to_archive=True):
+    """Copy the staged rows to the other tier, then delete them from this one"""
+    moved = {}
+    for live, archived in TIERS:
+        columns = ', '.join(shared_columns(conn, schema, live, archived))
+        source, target = (f"main.{live}", f"{schema}.{archived}") if to_archive else (f"{schema}.{archived}", f"main.{live}")
+        if live == 'sales':
+            where = "id IN (SELECT id FROM temp.batch_sales)"
+        else:
+            where = f"id IN (SELECT id FROM temp.batch_children WHERE tbl = '{live}')"
+        conn.execute(f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {source} WHERE {where}")
+        moved[live] = conn.execute(f"DELETE FROM {source} WHERE {where}").rowcount
+    return moved
+
+
+def _prepare(conn, archive_db=None):
+    """Apply the migration (and attach the cold file); returns the archive schema name"""
+    apply_migration(conn)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_sales (id INTEGER PRIMARY KEY, order_id TEXT)")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_children (tbl TEXT, id INTEGER, PRIMARY KEY (tbl, id))")
+    conn.execute("CREATE INDEX IF NOT EXISTS temp.idx_batch_sales_order ON batch_sales(order_id)")
+    if not archive_db:
+        return 'main'
+    cold = sqlite3.connect(archive_db)
+    try:
+        apply_migration(cold)
+    finally:
+        cold.close()
+    if 'cold' not in {r[1] for r in conn.execute("PRAGMA database_list")}:
+        conn.execute("ATTACH DATABASE ? AS cold", (archive_db,))
+    return 'cold'
+
+
+def archive_sales(conn, cutoff, archive_db=None, dry_run=False, batch_size=BATCH_SIZE):
+    """
+    Archive fully paid sales dated before cutoff (a date or 'YYYY-MM-DD').
+
+    Orders already in the archive (re-imported by import-full-sales-db.py)
+    are dropped from the live tables without being counted twice.
+    """
+    schema = _prepare(conn, archive_db)
+    cutoff = str(cutoff)
+    rows = conn.execute(f'''
+        SELECT s.id, EXISTS (SELECT 1 FROM {schema}.sales_archive a WHERE a.order_id = s.order_id)
+        FROM sales s
+        WHERE s.sale_date < ? AND {PAID}
+        ORDER BY s.id
+    ''', (cutoff,)).fetchall()
+    fresh = [sale_id for sale_id, archived in rows if not archived]
+    duplicates = [sale_id for sale_id, archived in rows if archived]
+    summary = {'cutoff': cutoff, 'sales': len(fresh), 'duplicates': len(duplicates),
+               'sale_items': 0, 'payment_history': 0, 'schema': schema, 'dry_run': dry_run}
+    if dry_run:
+        return summary
+
+    for start in range(0, len(fresh), batch_size):
+        with conn:
+            _stage(conn, fresh[start:start + batch_size], schema)
+            _fold_summaries(conn, 1, schema)
+            moved = _move(conn, schema)
+        summary['sale_items'] += moved['sale_items']
+        summary['payment_history'] += moved['payment_history']
+
+    for start in range(0, len(duplicates), batch_size):
+        with conn:
+            _stage(conn, duplicates[start:start + batch_size], schema)
+            for live, _ in TIERS:
+                where = ("id IN (SELECT id FROM temp.batch_sales)" if live == 'sales'
+                         else f"id IN (SELECT id FROM temp.batch_children WHERE tbl = '{live}')")
+                conn.execute(f"DELETE FROM main.{live} WHERE {where}")
+    return summary
+
+
+def restore_orders(conn, order_ids, archive_db=None):
+    """Move archived orders back to the live tables (e.g. for a refund or correction)"""
+    schema = _prepare(conn, archive_db)
+    placeholders = ','.join('?' * len(order_ids))
+    sale_ids = [r[0] for r in conn.execute(
+        f"SELECT id FROM {schema}.sales_archive WHERE order_id IN ({placeholders})", list(order_ids)
+    )]
+    if not sale_ids:
+        return 0
+    with conn:
+        _stage(conn, sale_ids, schema, live=False)
+        _fold_summaries(conn, -1, schema, live=False)
+        _move(conn, schema, to_archive=False)
+    return len(sale_ids)
+
+
+def find_order(conn, order_id, archive_db=None):
+    """('hot' | 'archive', sale row as dict) or (None, None)"""
+    schema = _prepare(conn, archive_db)
+    conn.row_factory = sqlite3.Row
+    try:
+        for tier, table in (('hot', 'main.sales'), ('archive', f'{schema}.sales_archive')):
+            row = conn.execute(f"SELECT * FROM {table} WHERE order_id = ?", (order_id,)).fetchone()
+            if row:
+                return tier, dict(row)
+    finally:
+        conn.row_factory = None
+    return None, None
+
+
+def tier_counts(conn, schema='main'):
+    """Row counts per tier"""
+    counts = {}
+    for live, archived in TIERS:
+        counts[live] = (
+            conn.execute(f"SELECT COUNT(*) FROM main.{live}").fetchone()[0],
+            conn.execute(f"SELECT COUNT(*) FROM {schema}.{archived}").fetchone()[0],
+        )
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old, fully paid sales to the archive tier")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--before', help="Archive sales dated before this day (YYYY-MM-DD)")
+    parser.add_argument('--keep-months', type=int, default=DEFAULT_KEEP_MONTHS,
+                        help="Without --before: keep this many whole months plus the current one live")
+    parser.add_argument('--archive-db',
+                        help="Store archived rows in this SQLite file instead of the *_archive tables "
+                             "(the dashboard cannot see orders moved there; use --find/--restore)")
+    parser.add_argument('--dry-run', action='store_true', help="Only count what would move")
+    parser.add_argument('--restore', help="Comma-separated order ids to move back to the live tables")
+    parser.add_argument('--find', metavar='ORDER_ID', help="Show which tier an order is in")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.find:
+            tier, sale = find_order(conn, args.find, args.archive_db)
+            if not sale:
+                print(f"❌ Order {args.find} not found in either tier")
+                sys.exit(1)
+            print(f"✅ {args.find}: {tier} tier — {sale['sale_date']} {sale['employee_name']} "
+                  f"₹{sale['total_amount']:,.2f} (balance ₹{sale['balance_amount']:,.2f})")
+            return
+
+        if args.restore:
+            restored = restore_orders(conn, [o.strip() for o in args.restore.split(',') if o.strip()], args.archive_db)
+            print(f"✅ Restored {restored} orders to the live tables")
+            return
+
+        started = time.perf_counter()
+        cutoff = args.before or cutoff_for(args.keep_months).isoformat()
+        summary = archive_sales(conn, cutoff, args.archive_db, args.dry_run)
+
+        print("\n" + "="*60)
+        print(f"🗄️  SALES ARCHIVE{' (dry run)' if args.dry_run else ''}")
+        print("="*60)
+        print(f"   • Cutoff: sales before {summary['cutoff']} with no balance due")
+        print(f"   • Sales {'to archive' if args.dry_run else 'archived'}: {summary['sales']}")
+        if not args.dry_run:
+            print(f"   • Sale items moved: {summary['sale_items']}")
+            print(f"   • Payments moved: {summary['payment_history']}")
+        if summary['duplicates']:
+            print(f"   • Re-imported copies of archived orders {'to drop' if args.dry_run else 'dropped'}: {summary['duplicates']}")
+        print(f"   • Archive location: {args.archive_db or 'archive tables in the D1 file'}")
+        print(f"\n📊 Rows per tier (live / archive):")
+        for table, (hot, cold) in tier_counts(conn, summary['schema']).items():
+            print(f"   • {table}: {hot} / {cold}")
+        print(f"   • Time: {time.perf_counter() - started:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
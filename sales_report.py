@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Sales Reports for AxelGuard Dashboard
+The dashboard's Reports & Analytics figures (summary, employee comparison,
+product analysis, monthly totals) computed from the D1 file with the same
+SQL as the /api/reports routes. Queries go through query_cache.QueryCache,
+so regenerating a report costs nothing until the sales tables change.
+Monthly totals include archived months from migration 0027's summaries.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from query_cache import QueryCache, install_version_table
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+
+
+def month_bounds(today):
+    """(current month start, previous month start, previous month end)"""
+    current = today.replace(day=1)
+    previous_end = current - timedelta(days=1)
+    return current, previous_end.replace(day=1), previous_end
+
+
+def report_summary(cache, today):
+    """Current month, previous month, quarter and year-to-date sales (/api/reports/summary)"""
+    current, previous_start, previous_end = month_bounds(today)
+    quarter = date(today.year, (today.month - 1) // 3 * 3 + 1, 1)
+    since = "SELECT SUM(total_amount) FROM sales WHERE DATE(sale_date) >= DATE(?)"
+    between = "SELECT SUM(total_amount) FROM sales WHERE DATE(sale_date) >= DATE(?) AND DATE(sale_date) <= DATE(?)"
+    return {
+        'currentMonth': cache.query_one(since, (current.isoformat(),))[0] or 0,
+        'previousMonth': cache.query_one(between, (previous_start.isoformat(), previous_end.isoformat()))[0] or 0,
+        'quarterly': cache.query_one(since, (quarter.isoformat(),))[0] or 0,
+        'ytd': cache.query_one(since, (date(today.year, 1, 1).isoformat(),))[0] or 0,
+    }
+
+
+def employee_comparison(cache, today):
+    """Per-employee revenue this month vs last month (/api/reports/employee-comparison)"""
+    current, previous_start, previous_end = month_bounds(today)
+    current_rows = cache.query('''
+        SELECT employee_name, COUNT(*) as total_sales, SUM(total_amount) as total_revenue,
+               ROUND(AVG(total_amount), 2) as avg_sale_value
+        FROM sales
+        WHERE DATE(sale_date) >= DATE(?)
+        GROUP BY employee_name
+    ''', (current.isoformat(),))
+    previous = dict(cache.query('''
+        SELECT employee_name, SUM(total_amount) as total_revenue
+        FROM sales
+        WHERE DATE(sale_date) >= DATE(?) AND DATE(sale_date) <= DATE(?)
+        GROUP BY employee_name
+    ''', (previous_start.isoformat(), previous_end.isoformat())))
+    result = []
+    for name, count, revenue, average in current_rows:
+        previous_revenue = previous.get(name) or 0
+        if previous_revenue > 0:
+            growth = round((revenue - previous_revenue) / previous_revenue * 100, 2)
+        else:
+            growth = 100 if revenue > 0 else 0
+        result.append({
+            'employee_name': name,
+            'current_month_sales': revenue or 0,
+            'previous_month_sales': previous_revenue,
+            'growth_percentage': growth,
+            'total_sales_count': count,
+            'avg_sale_value': average or 0,
+        })
+    return result
+
+
+def product_analysis(cache, today):
+    """Top products this month (/api/reports/product-analysis)"""
+    current, _, _ = month_bounds(today)
+    rows = cache.query('''
+        SELECT si.product_name, SUM(si.quantity) as total_quantity,
+               SUM(si.quantity * si.unit_price) as total_revenue,
+               ROUND(AVG(si.unit_price), 2) as average_price,
+               COUNT(DISTINCT s.order_id) as order_count
+        FROM sale_items si
+        JOIN sales s ON si.order_id = s.order_id
+        WHERE DATE(s.sale_date) >= DATE(?)
+        GROUP BY si.product_name
+        ORDER BY total_revenue DESC
+        LIMIT 50
+    ''', (current.isoformat(),))
+    keys = ['product_name', 'total_quantity', 'total_revenue', 'average_price', 'order_count']
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def monthly_totals(cache, months=12, today=None):
+    """Revenue and sale count per month, live sales plus archived summaries"""
+    today = today or date.today()
+    first = today.replace(day=1)
+    for _ in range(months - 1):
+        first = (first - timedelta(days=1)).replace(day=1)
+    start = first.strftime('%Y-%m')
+    has_archive = cache.query_one(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'sales_archive_monthly'"
+    )[0]
+    sql = '''
+        SELECT substr(sale_date, 1, 7) AS month, COUNT(*) AS sale_count, SUM(total_amount) AS total
+        FROM sales WHERE substr(sale_date, 1, 7) >= ?
+        GROUP BY 1
+    '''
+    params = [start]
+    if has_archive:
+        sql = f'''
+            SELECT month, SUM(sale_count), SUM(total) FROM (
+                {sql}
+                UNION ALL
+                SELECT month, SUM(sale_count), SUM(total_amount) FROM sales_archive_monthly
+                WHERE month >= ? GROUP BY month
+            ) GROUP BY month
+        '''
+        params.append(start)
+    return [{'month': m, 'sale_count': n, 'total': t or 0}
+            for m, n, t in cache.query(sql + " ORDER BY 1", params)]
+
+
+def build_report(cache, today=None, months=12):
+    today = today or date.today()
+    return {
+        'summary': report_summary(cache, today),
+        'employee_comparison': employee_comparison(cache, today),
+        'product_analysis': product_analysis(cache, today),
+        'monthly_totals': monthly_totals(cache, months, today),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reports & Analytics figures from the D1 file")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--date', help="Report as of this day (YYYY-MM-DD, default today)")
+    parser.add_argument('--months', type=int, default=12, help="Months of monthly totals")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore and do not save the on-disk query cache")
+    parser.add_argument('--track-versions', action='store_true',
+                        help="Install the per-table change counters (local_table_versions.sql) in this local "
+                             "file so the cache survives across runs; not for production D1")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    if args.track_versions:
+        install_version_table(args.db)
+
+    today = date.fromisoformat(args.date) if args.date else date.today()
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        cache = QueryCache(conn, persist=not args.no_cache, db_path=args.db)
+        started = time.perf_counter()
+        report = build_report(cache, today, args.months)
+        elapsed = time.perf_counter() - started
+        cache.save()
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return
+
+    summary = report['summary']
+    print("\n" + "="*60)
+    print(f"📊 SALES REPORT (as of {today.isoformat()})")
+    print("="*60)
+    print(f"   • Current month: ₹{summary['currentMonth']:,.2f}")
+    print(f"   • Previous month: ₹{summary['previousMonth']:,.2f}")
+    print(f"   • Quarter: ₹{summary['quarterly']:,.2f}")
+    print(f"   • Year to date: ₹{summary['ytd']:,.2f}")
+
+    print(f"\n👥 Employee comparison:")
+    for row in report['employee_comparison']:
+        print(f"   • {row['employee_name']}: ₹{row['current_month_sales']:,.2f} "
+              f"({row['total_sales_count']} sales, {row['growth_percentage']:+.2f}% vs last month)")
+
+    print(f"\n📦 Top products this month:")
+    for row in report['product_analysis'][:10]:
+        print(f"   • {row['product_name']}: {row['total_quantity']:g} units, ₹{row['total_revenue']:,.2f}")
+
+    print(f"\n📅 Monthly totals:")
+    for row in report['monthly_totals']:
+        print(f"   • {row['month']}: {row['sale_count']} sales, ₹{row['total']:,.2f}")
+
+    stats = cache.stats()
+    print(f"\n   • Query cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"({'table versions' if stats['tracked'] else 'data_version only'})")
+    print(f"   • Time: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Serial Number Index Builder for AxelGuard Dashboard
+Compiles inventory serials with their status, latest QC result and model
+into a front-coded, sorted binary file that the dispatch scanner loads once
+to validate scans and search partial serials locally
+(public/static/serial-index.js decodes it). Serials are sorted by their
+ASCII-uppercased bytes, so a case-insensitive prefix is one block range;
+exact lookups still compare the stored bytes.
+
+File layout (little-endian):
+    b'AGSI'  u16 format  u16 block_size  u32 count  u32 blocks  8s data_version
+    status table:  u8 n,  n x (varint len, utf-8)
+    QC table:      u8 n,  n x (varint len, utf-8)
+    model table:   varint n,  n x (varint len, utf-8)
+    block offsets: blocks x u32 (relative to the start of the entry data)
+    entries, grouped in blocks of block_size serials:
+        first entry of a block:  varint len, bytes
+        following entries:       varint shared_prefix, varint suffix_len, suffix
+        every entry then:        u8 status index, u8 QC index, varint model index
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+OUT_DIR = Path(__file__).resolve().parent / 'public' / 'static'
+INDEX_FILE = 'serial-index.bin'
+MANIFEST_FILE = 'serial-index.json'
+
+MAGIC = b'AGSI'
+FORMAT_VERSION = 3
+BLOCK_SIZE = 16
+
+# Same rules as /api/devices/:serialNo/validate: a customer or dispatch date
+# means dispatched, and the QC status is the latest check's pass_fail
+# ('Pending' when empty, 'NO_QC' when the device has never been checked)
+INDEX_QUERY = '''
+    SELECT i.device_serial_no,
+           CASE
+               WHEN i.status = 'Dispatched'
+                 OR COALESCE(NULLIF(NULLIF(i.customer_name, ''), '-'), '') != ''
+                 OR COALESCE(NULLIF(NULLIF(i.dispatch_date, ''), '-'), '') != ''
+               THEN 'Dispatched'
+               ELSE COALESCE(i.status, 'In Stock')
+           END,
+           COALESCE(i.model_name, ''),
+           CASE WHEN q.device_serial_no IS NULL THEN 'NO_QC'
+                ELSE COALESCE(NULLIF(q.pass_fail, ''), 'Pending') END
+    FROM inventory i
+    LEFT JOIN (
+        SELECT device_serial_no, pass_fail,
+               ROW_NUMBER() OVER (PARTITION BY device_serial_no ORDER BY check_date DESC, id DESC) AS latest
+        FROM quality_check
+    ) q ON q.device_serial_no = i.device_serial_no AND q.latest = 1
+    WHERE i.device_serial_no IS NOT NULL AND TRIM(i.device_serial_no) != ''
+'''
+
+
+def varint(value):
+    """Unsigned LEB128"""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def encoded_string(text):
+    """Length-prefixed UTF-8"""
+    data = text.encode('utf-8')
+    return varint(len(data)) + data
+
+
+def shared_prefix(a, b):
+    """Length of the common prefix of two byte strings"""
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def sort_key(serial):
+    """Index order: ASCII-uppercased bytes first (what search folds to), then the bytes themselves"""
+    return serial.upper(), serial
+
+
+def load_records(conn):
+    """(serial bytes, status, model, qc) in index order, one row per serial"""
+    records = {}
+    for serial, status, model, qc in conn.execute(INDEX_QUERY):
+        key = str(serial).strip().encode('utf-8')
+        records[key] = (status, model.strip(), qc)
+    return sorted(((serial,) + values for serial, values in records.items()), key=lambda r: sort_key(r[0]))
+
+
+def data_version(records):
+    """Content hash of the indexed rows; changes whenever any serial, status, model or QC result does"""
+    digest = hashlib.sha256()
+    for serial, status, model, qc in records:
+        digest.update(serial + b'\0' + '\0'.join((status, model, qc)).encode('utf-8') + b'\n')
+    return digest.digest()[:8]
+
+
+def build_index(records, block_size=BLOCK_SIZE):
+    """Encode sorted records into the front-coded binary layout described above"""
+    statuses = sorted({status for _, status, _, _ in records})
+    models = sorted({model for _, _, model, _ in records})
+    qc_results = sorted({qc for _, _, _, qc in records})
+    for name, table in (('statuses', statuses), ('QC results', qc_results)):
+        if len(table) > 255:
+            raise ValueError(f"Too many distinct {name} for a u8 index: {len(table)}")
+    status_ids = {status: i for i, status in enumerate(statuses)}
+    qc_ids = {qc: i for i, qc in enumerate(qc_results)}
+    model_ids = {model: i for i, model in enumerate(models)}
+
+    entries = bytearray()
+    offsets = []
+    previous = b''
+    for i, (serial, status, model, qc) in enumerate(records):
+        if i % block_size == 0:
+            offsets.append(len(entries))
+            entries += varint(len(serial)) + serial
+        else:
+            shared = shared_prefix(previous, serial)
+            suffix = serial[shared:]
+            entries += varint(shared) + varint(len(suffix)) + suffix
+        entries.append(status_ids[status])
+        entries.append(qc_ids[qc])
+        entries += varint(model_ids[model])
+        previous = serial
+
+    version = data_version(records)
+    out = bytearray(MAGIC)
+    out += struct.pack('<HHII8s', FORMAT_VERSION, block_size, len(records), len(offsets), version)
+    for table in (statuses, qc_results):
+        out.append(len(table))
+        for text in table:
+            out += encoded_string(text)
+    out += varint(len(models))
+    for model in models:
+        out += encoded_string(model)
+    out += struct.pack(f'<{len(offsets)}I', *offsets)
+    out += entries
+    return bytes(out), version.hex()
+
+
+def write_index(db_path, out_dir=OUT_DIR, block_size=BLOCK_SIZE, force=False):
+    """Build the index and manifest; skips writing when the data version is unchanged"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        records = load_records(conn)
+    finally:
+        conn.close()
+
+    out_dir = Path(out_dir)
+    manifest_path = out_dir / MANIFEST_FILE
+    index_path = out_dir / INDEX_FILE
+    version = data_version(records).hex()
+    if not force and index_path.exists() and manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if (manifest.get('format') == FORMAT_VERSION and manifest.get('version') == version
+                and manifest.get('block_size') == block_size):
+            return manifest, False
+
+    data, version = build_index(records, block_size)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_suffix('.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, index_path)
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'version': version,
+        'count': len(records),
+        'block_size': block_size,
+        'bytes': len(data),
+        'raw_bytes': sum(len(record[0]) for record in records),
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'url': f"/static/{INDEX_FILE}?v={version}",
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the scanner's compact serial-number index")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--out-dir', default=str(OUT_DIR), help="Directory served as /static")
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                        help="Serials per front-coded block (restart interval)")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the data version is unchanged")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    manifest, rebuilt = write_index(args.db, args.out_dir, args.block_size, args.force)
+    elapsed = time.perf_counter() - started
+
+    if not rebuilt:
+        print(f"✅ Serial index already current (version {manifest['version']})")
+        return
+
+    print(f"\n✅ Serial Index Built in {elapsed:.2f}s:")
+    print(f"   • Serials: {manifest['count']}")
+    print(f"   • Version: {manifest['version']}")
+    print(f"   • Size: {manifest['bytes'] / 1024:.1f} KB (serials alone: {manifest['raw_bytes'] / 1024:.1f} KB)")
+    print(f"   • Output: {Path(args.out_dir) / INDEX_FILE}")
+
+
+if __name__ == '__main__':
+    main()
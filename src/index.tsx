@@ -1031,13 +1031,14 @@ app.get('/api/sales/export-all', async (c) => {
     console.log('[API /api/sales/export-all] Starting export...');
     
     // Fetch recent sales with full details (limit to 100 to avoid subrequest limits)
+    // sales_all / *_all also cover orders moved to the archive by sales_archive.py
     const sales = await env.DB.prepare(`
       SELECT 
         s.*,
         COALESCE(s.customer_code, l.customer_code) as customer_code,
         COALESCE(l.customer_name, s.customer_name) as customer_name,
         l.company_name
-      FROM sales s
+      FROM sales_all s
       LEFT JOIN leads l ON (
         s.customer_contact = l.mobile_number 
         OR s.customer_contact = l.alternate_mobile
@@ -1056,11 +1057,11 @@ app.get('/api/sales/export-all', async (c) => {
       const batch = sales.results.slice(i, i + batchSize);
       const batchResults = await Promise.all(batch.map(async (sale: any) => {
         const items = await env.DB.prepare(`
-          SELECT * FROM sale_items WHERE order_id = ?
+          SELECT * FROM sale_items_all WHERE order_id = ?
         `).bind(sale.order_id).all();
         
         const payments = await env.DB.prepare(`
-          SELECT * FROM payment_history WHERE order_id = ? ORDER BY payment_date DESC
+          SELECT * FROM payment_history_all WHERE order_id = ? ORDER BY payment_date DESC
         `).bind(sale.order_id).all();
         
         return {
@@ -1145,11 +1146,12 @@ app.get('/api/sales/order/:orderId', async (c) => {
   
   try {
     // Fetch sale with customer_code from leads table (lookup by customer_contact)
+    // sales_all / *_all also cover orders moved to the archive by sales_archive.py
     const sale = await env.DB.prepare(`
       SELECT 
         s.*,
         COALESCE(s.customer_code, l.customer_code) as customer_code
-      FROM sales s
+      FROM sales_all s
       LEFT JOIN leads l ON (
         s.customer_contact = l.mobile_number 
         OR s.customer_contact = l.alternate_mobile
@@ -1166,13 +1168,13 @@ app.get('/api/sales/order/:orderId', async (c) => {
         si.*,
         COALESCE(p.product_name, si.product_name) as product_name,
         COALESCE(p.product_code, si.product_code) as product_code
-      FROM sale_items si
+      FROM sale_items_all si
       LEFT JOIN products p ON si.product_code = p.product_code
       WHERE si.order_id = ?
     `).bind(orderId).all();
     
     const payments = await env.DB.prepare(`
-      SELECT * FROM payment_history WHERE order_id = ? ORDER BY payment_date DESC
+      SELECT * FROM payment_history_all WHERE order_id = ? ORDER BY payment_date DESC
     `).bind(orderId).all();
     
     return c.json({ 
@@ -2023,7 +2025,7 @@ app.get('/api/customer-details/history/:query', async (c) => {
           NULL as email,
           NULL as complete_address,
           'Existing Customer' as status
-        FROM sales 
+        FROM sales_all 
         WHERE customer_code = ? OR customer_contact = ?
         LIMIT 1
       `).bind(query, query).first();
@@ -2045,8 +2047,8 @@ app.get('/api/customer-details/history/:query', async (c) => {
     const sales = await env.DB.prepare(`
       SELECT s.*, 
         (SELECT GROUP_CONCAT(si.product_name || ' (x' || si.quantity || ')', ', ')
-         FROM sale_items si WHERE si.sale_id = s.id) as products
-      FROM sales s
+         FROM sale_items_all si WHERE si.sale_id = s.id) as products
+      FROM sales_all s
       WHERE s.customer_code = ? OR s.customer_contact = ?
       ORDER BY s.sale_date DESC
     `).bind(searchCode, searchMobile).all();
@@ -2054,8 +2056,8 @@ app.get('/api/customer-details/history/:query', async (c) => {
     // Get all payments for this customer
     const payments = await env.DB.prepare(`
       SELECT ph.*, s.customer_name, s.company_name
-      FROM payment_history ph
-      LEFT JOIN sales s ON ph.order_id = s.order_id
+      FROM payment_history_all ph
+      LEFT JOIN sales_all s ON ph.order_id = s.order_id
       WHERE s.customer_code = ? OR s.customer_contact = ?
       ORDER BY ph.payment_date DESC
     `).bind(searchCode, searchMobile).all();
@@ -2125,7 +2127,7 @@ app.get('/api/customer-details/orders/:query', async (c) => {
     if (!customer) {
       const sale = await env.DB.prepare(`
         SELECT DISTINCT customer_code, customer_contact as mobile_number 
-        FROM sales 
+        FROM sales_all 
         WHERE customer_code = ? OR customer_contact = ?
         LIMIT 1
       `).bind(query, query).first();
@@ -2141,7 +2143,7 @@ app.get('/api/customer-details/orders/:query', async (c) => {
     
     // Get all sales with items
     const sales = await env.DB.prepare(`
-      SELECT * FROM sales 
+      SELECT * FROM sales_all 
       WHERE customer_code = ? OR customer_contact = ?
       ORDER BY sale_date DESC
     `).bind(customer.customer_code, customer.mobile_number).all();
@@ -2150,7 +2152,7 @@ app.get('/api/customer-details/orders/:query', async (c) => {
     const salesWithItems = [];
     for (const sale of (sales.results || [])) {
       const items = await env.DB.prepare(`
-        SELECT * FROM sale_items WHERE sale_id = ?
+        SELECT * FROM sale_items_all WHERE sale_id = ?
       `).bind(sale.id).all();
       
       salesWithItems.push({
@@ -2190,7 +2192,7 @@ app.get('/api/customer-details/ledger/:query', async (c) => {
           customer_code, 
           customer_contact as mobile_number, 
           customer_name 
-        FROM sales 
+        FROM sales_all 
         WHERE customer_code = ? OR customer_contact = ?
         LIMIT 1
       `).bind(query, query).first();
@@ -2211,7 +2213,7 @@ app.get('/api/customer-details/ledger/:query', async (c) => {
     // Get all sales for this customer to calculate total due
     const sales = await env.DB.prepare(`
       SELECT order_id, sale_date, total_amount, balance_amount, amount_received
-      FROM sales 
+      FROM sales_all 
       WHERE customer_code = ? OR customer_contact = ?
       ORDER BY sale_date ASC
     `).bind(searchCode, searchMobile).all();
@@ -2219,8 +2221,8 @@ app.get('/api/customer-details/ledger/:query', async (c) => {
     // Get all payments
     const payments = await env.DB.prepare(`
       SELECT ph.*, s.customer_name
-      FROM payment_history ph
-      LEFT JOIN sales s ON ph.order_id = s.order_id
+      FROM payment_history_all ph
+      LEFT JOIN sales_all s ON ph.order_id = s.order_id
       WHERE s.customer_code = ? OR s.customer_contact = ?
       ORDER BY ph.payment_date ASC
     `).bind(searchCode, searchMobile).all();
@@ -2358,7 +2360,7 @@ app.get('/api/sales/:orderId', async (c) => {
   
   try {
     const sale = await env.DB.prepare(`
-      SELECT * FROM sales WHERE order_id = ?
+      SELECT * FROM sales_all WHERE order_id = ?
     `).bind(orderId).first();
     
     if (!sale) {
@@ -2378,7 +2380,7 @@ app.get('/api/sales/:orderId/items', async (c) => {
   
   try {
     const items = await env.DB.prepare(`
-      SELECT * FROM sale_items WHERE order_id = ?
+      SELECT * FROM sale_items_all WHERE order_id = ?
     `).bind(orderId).all();
     
     return c.json({ success: true, data: items.results });
@@ -5440,6 +5442,40 @@ app.get('/api/renewals', async (c) => {
   }
 });
 
+// Devices due for warranty end / account expiry / license renewal in the next N days
+// Reads the precomputed renewal_due_queue (maintained by renewal_queue.py)
+app.get('/api/renewals/due', async (c) => {
+  const { env } = c;
+  
+  try {
+    const requestedDays = parseInt(c.req.query('days') || '30');
+    const days = Math.min(Math.max(Number.isNaN(requestedDays) ? 30 : requestedDays, 0), 366);
+    const dueType = c.req.query('type');
+    const today = new Date().toISOString().split('T')[0];
+    const until = new Date(Date.now() + days * 86400000).toISOString().split('T')[0];
+    
+    let query = `
+      SELECT due_date, week_start, due_type, device_serial_no, model_name,
+             customer_name, cust_code, order_id, warranty_months
+      FROM renewal_due_queue
+      WHERE due_date BETWEEN ? AND ?
+    `;
+    const params: any[] = [today, until];
+    if (dueType) {
+      query += ' AND due_type = ?';
+      params.push(dueType);
+    }
+    query += ' ORDER BY due_date, device_serial_no';
+    
+    const due = await env.DB.prepare(query).bind(...params).all();
+    
+    return c.json({ success: true, data: due.results || [] });
+  } catch (error) {
+    console.error('Renewals due error:', error);
+    return c.json({ success: false, error: 'Failed to fetch due renewals: ' + error.message }, 500);
+  }
+});
+
 // Get single device by serial number (for barcode scanning) - MUST BE LAST
 // Search inventory by serial number (MUST come before /:serialNo route)
 app.get('/api/inventory/search', async (c) => {
@@ -11020,11 +11056,13 @@ Prices are subject to change without prior notice.</textarea>
                         </h3>
                         <div class="form-group">
                             <label>Scan Device Serial Number</label>
-                            <input type="text" id="scanDeviceInput" 
+                            <input type="text" id="scanDeviceInput" list="scanSerialSuggestions" autocomplete="off"
                                 placeholder="Scan barcode or type serial number..." 
+                                oninput="suggestScanSerials(this.value)"
                                 onkeypress="if(event.key==='Enter') { event.preventDefault(); scanDevice(); return false; }"
                                 autofocus
                                 style="width: 100%; padding: 16px; border: 3px solid #10b981; border-radius: 8px; font-size: 18px; font-weight: 600;">
+                            <datalist id="scanSerialSuggestions"></datalist>
                         </div>
                         <div style="display: flex; gap: 10px; margin-bottom: 15px;">
                             <button type="button" onclick="scanDevice()" class="btn-primary" style="flex: 1; background: #10b981; padding: 12px;">
@@ -11275,6 +11313,7 @@ Prices are subject to change without prior notice.</textarea>
         </div>
 
         <script src="https://cdn.jsdelivr.net/npm/axios@1.6.0/dist/axios.min.js"></script>
+        <script src="/static/serial-index.js"></script>
         <script>
             let currentPage = 'dashboard'; // Track current page
             let paymentChart = null;
@@ -19464,6 +19503,9 @@ Prices are subject to change without prior notice.</textarea>
                     // Focus on scan input
                     setTimeout(() => document.getElementById('scanDeviceInput').focus(), 100);
                     
+                    // Preload the local serial index so scans can be checked without a round trip
+                    if (window.getSerialIndex) window.getSerialIndex();
+                    
                 } catch (error) {
                     alert('Error loading order: ' + error.message);
                 }
@@ -19647,6 +19689,19 @@ Prices are subject to change without prior notice.</textarea>
                 }
             }
             
+            // Suggest dispatchable devices for a partially typed serial from the local index
+            async function suggestScanSerials(fragment) {
+                const list = document.getElementById('scanSerialSuggestions');
+                if (!list) return;
+                const serialIndex = fragment.trim().length >= 4 && window.getSerialIndex ? await window.getSerialIndex() : null;
+                const matches = serialIndex ? serialIndex.search(fragment, 50)
+                    .filter(d => d.status !== 'Dispatched' && d.status !== 'Defective')
+                    .slice(0, 10) : [];
+                list.innerHTML = matches.map(d =>
+                    \`<option value="\${d.serial}">\${d.model} · \${d.status} · QC \${d.qc}</option>\`
+                ).join('');
+            }
+            
             // Scan Device
             async function scanDevice() {
                 const scanInputEl = document.getElementById('scanDeviceInput');
@@ -19679,25 +19734,51 @@ Prices are subject to change without prior notice.</textarea>
                     return;
                 }
                 
+                // Devices in the local serial index are validated without a server round
+                // trip (same dispatched / QC rules as /api/devices/:serialNo/validate);
+                // serials it does not know yet are still checked by the server.
+                // /api/dispatch/create re-checks dispatched status on submit.
+                const serialIndex = window.getSerialIndex ? await window.getSerialIndex() : null;
+                const indexed = serialIndex ? serialIndex.lookup(serialNo) : null;
+                if (indexed && (indexed.status === 'Dispatched' || indexed.status === 'Defective')) {
+                    statusDiv.style.display = 'block';
+                    statusDiv.style.background = '#fee2e2';
+                    statusDiv.style.color = '#991b1b';
+                    statusDiv.innerHTML = indexed.status === 'Dispatched'
+                        ? '<i class="fas fa-times-circle"></i> Device already dispatched'
+                        : '<i class="fas fa-times-circle"></i> Device is marked Defective';
+                    setTimeout(() => clearScanInput(), 3000);
+                    return;
+                }
+                
                 statusDiv.style.display = 'block';
                 statusDiv.style.background = '#dbeafe';
                 statusDiv.style.color = '#1e40af';
                 statusDiv.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Validating device...';
                 
                 try {
-                    // Validate device and check QC
-                    const response = await axios.get(\`/api/devices/\${serialNo}/validate\`);
-                    
-                    if (!response.data.success) {
-                        statusDiv.style.background = '#fee2e2';
-                        statusDiv.style.color = '#991b1b';
-                        statusDiv.innerHTML = \`<i class="fas fa-times-circle"></i> \${response.data.error}\`;
-                        setTimeout(() => clearScanInput(), 3000);
-                        return;
+                    let deviceData;
+                    if (indexed) {
+                        deviceData = {
+                            device: { device_serial_no: indexed.serial, model_name: indexed.model, status: indexed.status },
+                            qcStatus: indexed.qc,
+                            qcPassed: indexed.qc.toLowerCase().includes('pass')
+                        };
+                    } else {
+                        // Validate device and check QC
+                        const response = await axios.get(\`/api/devices/\${serialNo}/validate\`);
+                        
+                        if (!response.data.success) {
+                            statusDiv.style.background = '#fee2e2';
+                            statusDiv.style.color = '#991b1b';
+                            statusDiv.innerHTML = \`<i class="fas fa-times-circle"></i> \${response.data.error}\`;
+                            setTimeout(() => clearScanInput(), 3000);
+                            return;
+                        }
+                        
+                        deviceData = response.data.data;
                     }
                     
-                    const deviceData = response.data.data;
-                    
                     // Check QC status
                     if (!deviceData.qcPassed) {
                         const qcStatus = deviceData.qcStatus;
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Status History Compaction for AxelGuard Dashboard
+Folds inventory_status_history into the span and transition tables from
+migration 0029: one row per stay of a device in a status (entered_at →
+left_at) and per-model totals of how long devices sit in each status
+before moving on. Each run starts after the last history id it folded,
+so only new rows are read. Raw rows older than the retention window are
+then moved to inventory_status_history_archive (or a separate SQLite
+file), or deleted with --prune; the spans keep everything lifecycle
+reports need.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+MIGRATION_FILE = Path(__file__).resolve().parent / 'migrations' / '0029_status_history_spans.sql'
+
+DEFAULT_RETENTION_DAYS = 365
+BATCH_SIZE = 5000
+
+HISTORY_COLUMNS = "id, inventory_id, device_serial_no, old_status, new_status, changed_by, change_reason, changed_at"
+
+# Upper bound (hours) of each dwell bucket in inventory_status_transitions
+DWELL_BUCKETS = [
+    ('within_1h', 1),
+    ('within_1d', 24),
+    ('within_7d', 24 * 7),
+    ('within_30d', 24 * 30),
+    ('over_30d', None),
+]
+
+
+def apply_migration(conn):
+    """Create the span, transition and archive tables if missing"""
+    with open(MIGRATION_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+
+def _prepare(conn, archive_db=None):
+    """Apply the migration (and attach the archive file); returns the archive schema name"""
+    apply_migration(conn)
+    if not archive_db:
+        return 'main'
+    cold = sqlite3.connect(archive_db)
+    try:
+        apply_migration(cold)
+    finally:
+        cold.close()
+    if 'cold' not in {r[1] for r in conn.execute("PRAGMA database_list")}:
+        conn.execute("ATTACH DATABASE ? AS cold", (archive_db,))
+    return 'cold'
+
+
+def high_water_mark(conn):
+    return conn.execute("SELECT last_history_id FROM status_history_compaction WHERE id = 1").fetchone()[0]
+
+
+def _bucket(hours):
+    for column, limit in DWELL_BUCKETS:
+        if limit is None or hours <= limit:
+            return column
+
+
+class _Folder:
+    """Applies history rows to the open spans of their devices, collecting transition totals"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.open = {}  # inventory_id → [span id, status, julianday entered, model]
+        self.transitions = {}
+        self.spans_opened = 0
+        self.spans_closed = 0
+
+    def load_open(self, inventory_ids):
+        missing = [i for i in inventory_ids if i not in self.open]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            for span_id, inventory_id, status, entered, model in self.conn.execute(f'''
+                SELECT id, inventory_id, status, julianday(entered_at), model_name
+                FROM inventory_status_spans
+                WHERE left_at IS NULL AND inventory_id IN ({','.join('?' * len(chunk))})
+            ''', chunk):
+                self.open[inventory_id] = [span_id, status, entered, model]
+
+    def _open_span(self, inventory_id, serial, model, status, entered_at, entered_jd, history_id):
+        cursor = self.conn.execute('''
+            INSERT INTO inventory_status_spans (
+                inventory_id, device_serial_no, model_name, status, entered_at, entered_history_id
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        ''', (inventory_id, serial, model, status, entered_at, history_id))
+        self.open[inventory_id] = [cursor.lastrowid, status, entered_jd, model]
+        self.spans_opened += 1
+
+    def apply(self, row):
+        (history_id, inventory_id, serial, old_status, new_status, changed_at, changed_jd,
+         model, created_at, created_jd) = row
+        model = model or 'Unknown'
+        span = self.open.get(inventory_id)
+        if span is None and old_status and created_jd is not None:
+            # No history row is written when a device is added; its first status starts at created_at
+            self._open_span(inventory_id, serial, model, old_status, created_at, min(created_jd, changed_jd), None)
+            span = self.open[inventory_id]
+        if not new_status or changed_jd is None:
+            return
+        if span is not None and span[1] == new_status:
+            self.conn.execute("UPDATE inventory_status_spans SET events = events + 1 WHERE id = ?", (span[0],))
+            return
+        if span is not None:
+            # Rows reach the table in id order; one stamped before its span started counts as no time spent
+            hours = max(0.0, (changed_jd - span[2]) * 24)
+            self.conn.execute('''
+                UPDATE inventory_status_spans
+                SET left_at = ?, next_status = ?, duration_hours = ?, left_history_id = ?
+                WHERE id = ?
+            ''', (changed_at, new_status, round(hours, 4), history_id, span[0]))
+            self.spans_closed += 1
+            totals = self.transitions.setdefault((span[3], span[1], new_status), {
+                'transitions': 0, 'total_hours': 0.0, 'min_hours': hours, 'max_hours': hours,
+                'last_at': changed_at, **{column: 0 for column, _ in DWELL_BUCKETS}})
+            totals['transitions'] += 1
+            totals['total_hours'] += hours
+            totals['min_hours'] = min(totals['min_hours'], hours)
+            totals['max_hours'] = max(totals['max_hours'], hours)
+            totals['last_at'] = max(totals['last_at'], changed_at)
+            totals[_bucket(hours)] += 1
+        self._open_span(inventory_id, serial, model, new_status, changed_at, changed_jd, history_id)
+
+    def flush(self):
+        """Add the collected transition totals to inventory_status_transitions"""
+        buckets = [column for column, _ in DWELL_BUCKETS]
+        self.conn.executemany(f'''
+            INSERT INTO inventory_status_transitions (
+                model_name, from_status, to_status, transitions, total_hours, min_hours, max_hours,
+                last_at, {', '.join(buckets)}
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, {', '.join('?' * len(buckets))})
+            ON CONFLICT(model_name, from_status, to_status) DO UPDATE SET
+                transitions = transitions + excluded.transitions,
+                total_hours = total_hours + excluded.total_hours,
+                min_hours = MIN(COALESCE(min_hours, excluded.min_hours), excluded.min_hours),
+                max_hours = MAX(COALESCE(max_hours, excluded.max_hours), excluded.max_hours),
+                last_at = MAX(COALESCE(last_at, excluded.last_at), excluded.last_at),
+                {', '.join(f'{c} = {c} + excluded.{c}' for c in buckets)}
+        ''', [(model, old, new, t['transitions'], round(t['total_hours'], 4), round(t['min_hours'], 4),
+               round(t['max_hours'], 4), t['last_at'], *(t[c] for c in buckets))
+              for (model, old, new), t in self.transitions.items()])
+        self.transitions = {}
+
+
+def compact(conn, source='main.inventory_status_history', batch_size=BATCH_SIZE):
+    """Fold history rows past the high-water mark into spans; one transaction per batch of ids"""
+    folder = _Folder(conn)
+    last = high_water_mark(conn)
+    top = conn.execute(f"SELECT MAX(id) FROM {source}").fetchone()[0] or 0
+    folded = 0
+    while last < top:
+        end = last + batch_size
+        with conn:
+            rows = conn.execute(f'''
+                SELECT h.id, h.inventory_id, h.device_serial_no, h.old_status, h.new_status,
+                       h.changed_at, julianday(h.changed_at),
+                       i.model_name, COALESCE(i.created_at, i.in_date), julianday(COALESCE(i.created_at, i.in_date))
+                FROM {source} h
+                LEFT JOIN main.inventory i ON i.id = h.inventory_id
+                WHERE h.id > ? AND h.id <= ?
+                ORDER BY h.inventory_id, julianday(h.changed_at), h.id
+            ''', (last, end)).fetchall()
+            folder.load_open(sorted({row[1] for row in rows}))
+            for row in rows:
+                folder.apply(row)
+            folder.flush()
+            conn.execute('''
+                UPDATE status_history_compaction SET last_history_id = ?, last_run_at = CURRENT_TIMESTAMP WHERE id = 1
+            ''', (min(end, top),))
+        folded += len(rows)
+        last = min(end, top)
+    return {'rows': folded, 'spans_opened': folder.spans_opened, 'spans_closed': folder.spans_closed,
+            'high_water_mark': last}
+
+
+def rebuild(conn, schema='main', batch_size=BATCH_SIZE):
+    """Recompute spans and transitions from scratch over live and archived history"""
+    with conn:
+        conn.execute("DELETE FROM inventory_status_spans")
+        conn.execute("DELETE FROM inventory_status_transitions")
+        conn.execute("UPDATE status_history_compaction SET last_history_id = 0 WHERE id = 1")
+    source = f'''(
+        SELECT {HISTORY_COLUMNS} FROM main.inventory_status_history
+        UNION ALL
+        SELECT {HISTORY_COLUMNS} FROM {schema}.inventory_status_history_archive
+    )'''
+    return compact(conn, source, batch_size)
+
+
+def apply_retention(conn, cutoff, schema='main', prune=False, dry_run=False, batch_size=BATCH_SIZE):
+    """Archive (or delete) folded history rows changed before cutoff; returns the row count"""
+    where = "id <= ? AND changed_at < ?"
+    params = (high_water_mark(conn), str(cutoff))
+    if dry_run:
+        return conn.execute(f"SELECT COUNT(*) FROM main.inventory_status_history WHERE {where}", params).fetchone()[0]
+    moved = 0
+    while True:
+        with conn:
+            ids = [r[0] for r in conn.execute(
+                f"SELECT id FROM main.inventory_status_history WHERE {where} ORDER BY id LIMIT ?", (*params, batch_size))]
+            if not ids:
+                break
+            batch = f"id IN ({','.join('?' * len(ids))})"
+            if not prune:
+                conn.execute(f'''
+                    INSERT OR IGNORE INTO {schema}.inventory_status_history_archive ({HISTORY_COLUMNS})
+                    SELECT {HISTORY_COLUMNS} FROM main.inventory_status_history WHERE {batch}
+                ''', ids)
+            moved += conn.execute(f"DELETE FROM main.inventory_status_history WHERE {batch}", ids).rowcount
+    return moved
+
+
+def dwell_report(conn, status=None, model=None):
+    """Per model and status: transitions out, mean/min/max hours, dwell buckets, devices currently in it"""
+    filters, params = [], []
+    if status:
+        filters.append("from_status = ?")
+        params.append(status)
+    if model:
+        filters.append("model_name = ?")
+        params.append(model)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ''
+    buckets = ', '.join(f'SUM({c})' for c, _ in DWELL_BUCKETS)
+    report = {}
+    for row in conn.execute(f'''
+        SELECT model_name, from_status, SUM(transitions), SUM(total_hours), MIN(min_hours), MAX(max_hours), {buckets}
+        FROM inventory_status_transitions {where}
+        GROUP BY 1, 2 ORDER BY 2, 3 DESC
+    ''', params):
+        report[(row[0], row[1])] = {
+            'left': row[2], 'mean_hours': row[3] / row[2] if row[2] else None,
+            'min_hours': row[4], 'max_hours': row[5],
+            'buckets': dict(zip((c for c, _ in DWELL_BUCKETS), row[6:])), 'current': 0, 'oldest': None,
+        }
+    span_where = where.replace('from_status', 'status')
+    for model_name, span_status, current, oldest in conn.execute(f'''
+        SELECT model_name, status, COUNT(*), MIN(entered_at)
+        FROM inventory_status_spans
+        {span_where + ' AND' if span_where else 'WHERE'} left_at IS NULL
+        GROUP BY 1, 2
+    ''', params):
+        entry = report.setdefault((model_name, span_status), {
+            'left': 0, 'mean_hours': None, 'min_hours': None, 'max_hours': None,
+            'buckets': {c: 0 for c, _ in DWELL_BUCKETS}, 'current': 0, 'oldest': None})
+        entry['current'], entry['oldest'] = current, oldest
+    return report
+
+
+def fmt_hours(hours):
+    if hours is None:
+        return 'n/a'
+    return f"{hours:.1f}h" if hours < 48 else f"{hours / 24:.1f}d"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact inventory_status_history into status spans and transition totals")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--retention-days', type=int, default=DEFAULT_RETENTION_DAYS,
+                        help="Keep raw history rows this many days (0: keep all)")
+    parser.add_argument('--prune', action='store_true', help="Delete raw rows past retention instead of archiving them")
+    parser.add_argument('--archive-db', help="Archive raw rows to this SQLite file instead of the archive table")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute spans from live and archived history")
+    parser.add_argument('--dry-run', action='store_true', help="Fold new rows but only count what retention would remove")
+    parser.add_argument('--report', nargs='?', const='', metavar='STATUS',
+                        help="Print dwell times per model (optionally for one status, e.g. 'Quality Check')")
+    parser.add_argument('--model', help="With --report: only this model")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        started = time.perf_counter()
+        schema = _prepare(conn, args.archive_db)
+        if args.report is not None:
+            compact(conn)
+            report = dwell_report(conn, args.report or None, args.model)
+            print("\n" + "="*60)
+            print(f"⏳ TIME IN STATUS{' — ' + args.report if args.report else ''}")
+            print("="*60)
+            print(f"   {'model':<28} {'status':<16} {'left':>6} {'mean':>7} {'max':>7}  "
+                  f"{'≤1h':>5} {'≤1d':>5} {'≤7d':>5} {'≤30d':>5} {'>30d':>5}  {'now':>5}  oldest")
+            for (model, status), entry in report.items():
+                b = entry['buckets']
+                print(f"   {model[:28]:<28} {status[:16]:<16} {entry['left']:>6} {fmt_hours(entry['mean_hours']):>7} "
+                      f"{fmt_hours(entry['max_hours']):>7}  {b['within_1h']:>5} {b['within_1d']:>5} {b['within_7d']:>5} "
+                      f"{b['within_30d']:>5} {b['over_30d']:>5}  {entry['current']:>5}  {entry['oldest'] or ''}")
+            return
+
+        summary = rebuild(conn, schema) if args.rebuild else compact(conn)
+        removed = None
+        if args.retention_days > 0:
+            cutoff = (date.today() - timedelta(days=args.retention_days)).isoformat()
+            removed = apply_retention(conn, cutoff, schema, args.prune, args.dry_run)
+
+        print("\n" + "="*60)
+        print(f"🗜️  STATUS HISTORY COMPACTION{' (rebuild)' if args.rebuild else ''}")
+        print("="*60)
+        print(f"   • History rows folded: {summary['rows']:,} (through id {summary['high_water_mark']})")
+        print(f"   • Spans opened / closed: {summary['spans_opened']:,} / {summary['spans_closed']:,}")
+        if removed is not None:
+            action = 'to remove' if args.dry_run else 'deleted' if args.prune else 'archived'
+            print(f"   • Raw rows before {cutoff} {action}: {removed:,}")
+        counts = {
+            'raw history': conn.execute("SELECT COUNT(*) FROM main.inventory_status_history").fetchone()[0],
+            'archived history': conn.execute(f"SELECT COUNT(*) FROM {schema}.inventory_status_history_archive").fetchone()[0],
+            'spans': conn.execute("SELECT COUNT(*) FROM inventory_status_spans").fetchone()[0],
+            'transition rows': conn.execute("SELECT COUNT(*) FROM inventory_status_transitions").fetchone()[0],
+        }
+        for name, count in counts.items():
+            print(f"   • {name}: {count:,}")
+        print(f"   • Time: {time.perf_counter() - started:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
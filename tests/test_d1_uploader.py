@@ -0,0 +1,121 @@
+"""End-to-end uploads through d1_uploader.py --serve (the local D1 stand-in)"""
+
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from d1_uploader import replay_safe  # noqa: E402
+from synthetic_data import generate_database  # noqa: E402
+
+TABLES = ['inventory', 'dispatch_records', 'quality_check']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def uploader(*args):
+    return subprocess.run([sys.executable, str(ROOT / 'd1_uploader.py'), *args],
+                          capture_output=True, text=True, timeout=120)
+
+
+def rows(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """(source, target): a synthetic database and a stale copy of it behind the stand-in"""
+    source = tmp_path / 'source.sqlite'
+    target = tmp_path / 'target.sqlite'
+    generate_database(source, scale=0.05, seed=7)
+    shutil.copy(source, target)
+    conn = sqlite3.connect(source)
+    with conn:
+        # The new import drops some devices and changes others
+        conn.execute("DELETE FROM quality_check WHERE id % 3 = 0")
+        conn.execute("DELETE FROM dispatch_records WHERE id % 4 = 0")
+        conn.execute("UPDATE inventory SET status = 'Defective' WHERE id % 5 = 0")
+    conn.close()
+    return source, target
+
+
+@pytest.fixture
+def endpoint(databases):
+    """URL of a --serve stand-in wrapping the target database"""
+    _, target = databases
+    port = free_port()
+    server = subprocess.Popen([sys.executable, str(ROOT / 'd1_uploader.py'), '--serve', str(target),
+                               '--port', str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    pytest.fail("stand-in server did not start")
+                time.sleep(0.1)
+        yield f"http://127.0.0.1:{port}/query"
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def test_from_db_copy_replaces_tables_with_foreign_keys_enforced(databases, endpoint):
+    source, target = databases
+    result = uploader('--from-db', str(source), '--tables', ','.join(TABLES),
+                      '--endpoint', endpoint, '--batch-size', '50')
+    assert result.returncode == 0, result.stdout + result.stderr
+    for table in TABLES:
+        assert rows(target, table) == rows(source, table)
+
+
+def test_sql_file_upload_and_journal_resume(databases, endpoint, tmp_path):
+    _, target = databases
+    sql_file = tmp_path / 'leads.sql'
+    sql_file.write_text(
+        "INSERT OR IGNORE INTO leads (customer_code, customer_name, mobile_number, status) "
+        "VALUES ('LEADT1', 'O''Brien Ltd', '9876543210', 'New');\n"
+        "INSERT OR IGNORE INTO leads (customer_code, customer_name, mobile_number, status) "
+        "VALUES ('LEADT2', 'Test Two', '9876500000', 'New');\n"
+        "UPDATE leads SET status = 'Contacted' WHERE customer_code = 'LEADT2';\n",
+        encoding='utf-8',
+    )
+    journal = tmp_path / 'leads.pushed'
+    for _ in range(2):
+        result = uploader(str(sql_file), '--endpoint', endpoint, '--journal', str(journal))
+        assert result.returncode == 0, result.stdout + result.stderr
+    assert 'Skipped (already applied): 2' in result.stdout
+
+    conn = sqlite3.connect(target)
+    try:
+        leads = conn.execute(
+            "SELECT customer_code, customer_name, status FROM leads WHERE customer_code LIKE 'LEADT%' ORDER BY 1"
+        ).fetchall()
+    finally:
+        conn.close()
+    assert leads == [('LEADT1', "O'Brien Ltd", 'New'), ('LEADT2', 'Test Two', 'Contacted')]
+
+
+def test_only_replayable_batches_count_as_safe():
+    assert replay_safe(["INSERT OR IGNORE INTO sales (order_id) VALUES ('1')", "DELETE FROM sales"])
+    assert replay_safe(["INSERT INTO t (a) VALUES (1) ON CONFLICT(a) DO NOTHING"])
+    assert not replay_safe(["INSERT INTO sale_items (order_id) VALUES ('1')"])
+    assert not replay_safe(["UPDATE sales SET amount_received = amount_received + 100"])
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Courier Tracking Sync for AxelGuard Dashboard
+Polls courier tracking APIs for the shipments in tracking_details and
+stores each one's latest status, location and status time in
+tracking_status (migration 0030). Shipments already delivered, or checked
+more recently than --max-age-hours, are skipped.
+
+Every courier has its own adapter, session, concurrency limit and request
+rate. The session's pooled connections are reused for all of that
+courier's requests; 429/5xx answers are retried after Retry-After or a
+backoff. Adapters are configured in a JSON file (--couriers), keyed by the
+courier_partner name used in tracking_details:
+
+  {
+    "Delhivery": {
+      "url": "https://tracking.example/api?waybill={tracking_id}",
+      "headers": {"Authorization": "Token ${DELHIVERY_TOKEN}"},
+      "rate": 5, "concurrency": 4,
+      "status": "ShipmentData.0.Shipment.Status.Status",
+      "timestamp": "ShipmentData.0.Shipment.Status.StatusDateTime",
+      "location": "ShipmentData.0.Shipment.Status.StatusLocation"
+    }
+  }
+
+"status" / "timestamp" / "location" are dotted paths into the JSON answer.
+For couriers that need more than that, "type": "module:Class" loads a
+CourierAdapter subclass. `stub` serves a fake courier API on localhost and
+`sync --stub-url` points every courier at it.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+
+# Database path (local D1 database)
+DB_PATH = os.environ.get(
+    'AXELGUARD_DB_PATH',
+    "/home/user/webapp/.wrangler/state/v3/d1/miniflare-D1DatabaseObject/a4cbf95b06cc05ac18912e42ea1dd3c229ea877895f964b2fcd2b1a46ff17dbc.sqlite"
+)
+COURIERS_FILE = os.environ.get('AXELGUARD_COURIERS_FILE', str(Path(__file__).resolve().parent / 'couriers.json'))
+MIGRATION_FILE = Path(__file__).resolve().parent / 'migrations' / '0030_tracking_status.sql'
+
+DEFAULT_MAX_AGE_HOURS = 6
+DEFAULT_MAX_DAYS = 60        # stop polling shipments booked longer ago than this
+MAX_FAILURES = 5             # give up on a tracking number after this many failed checks in a row
+REQUEST_TIMEOUT = 20
+MAX_ATTEMPTS = 3
+WRITE_BATCH = 50
+
+# Normalized statuses, matched against the courier's wording in this order
+STATUS_KEYWORDS = [
+    ('Returned', ('rto', 'return')),
+    ('Delivered', ('delivered',)),
+    ('Out for Delivery', ('out for delivery', 'ofd')),
+    ('Exception', ('exception', 'failed', 'lost', 'damaged', 'cancel', 'hold')),
+    ('In Transit', ('transit', 'dispatched', 'picked', 'shipped', 'arrived', 'departed', 'reached')),
+    ('Booked', ('booked', 'manifest', 'pending', 'created', 'soft data')),
+]
+STUB_SEQUENCE = ['Booked', 'Picked Up', 'In Transit', 'Reached Destination Hub', 'Out for Delivery', 'Delivered']
+
+
+def apply_migration(conn):
+    """Create tracking_status and the tracking_details_status view if missing"""
+    with open(MIGRATION_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+
+def normalize_status(raw):
+    """Courier wording → one of the STATUS_KEYWORDS statuses (None if unrecognized)"""
+    text = (raw or '').strip().lower()
+    if text.startswith('not ') or ('undelivered' in text and 'return' not in text):
+        return 'Exception'
+    for status, keywords in STATUS_KEYWORDS:
+        if any(k in text for k in keywords):
+            return status
+    return None
+
+
+def normalize_timestamp(value):
+    """ISO-ish courier timestamps → 'YYYY-MM-DD HH:MM:SS' (UTC offsets dropped); other text is kept"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000 if value > 1e11 else value).strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return str(value)
+
+
+def dig(payload, path):
+    """Value at a dotted path ('a.0.b') in decoded JSON, or None"""
+    for key in path.split('.') if path else []:
+        if isinstance(payload, list) and key.lstrip('-').isdigit() and -len(payload) <= int(key) < len(payload):
+            payload = payload[int(key)]
+        elif isinstance(payload, dict) and key in payload:
+            payload = payload[key]
+        else:
+            return None
+    return payload
+
+
+class CourierError(Exception):
+    """A tracking lookup that failed; retryable errors are tried again"""
+
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Spaces requests 1/rate seconds apart; a Retry-After pushes the next slot back"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def back_off(self, seconds):
+        self.next_slot = max(self.next_slot, time.monotonic() + seconds)
+
+
+class CourierAdapter:
+    """
+    One courier's tracking API. Subclasses implement request() and parse();
+    fetch() handles rate limiting, retries and errors.
+    """
+
+    def __init__(self, name, rate=2.0, concurrency=4, **options):
+        self.name = name
+        self.rate = float(rate)
+        self.concurrency = int(concurrency)
+        self.options = options
+        self.limiter = RateLimiter(self.rate)
+
+    def request(self, tracking_id):
+        """(url, headers) for one tracking number"""
+        raise NotImplementedError
+
+    def parse(self, payload):
+        """{'raw_status', 'status_at', 'location'} from the decoded answer"""
+        raise NotImplementedError
+
+    async def fetch(self, session, tracking_id):
+        url, headers = self.request(tracking_id)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            await self.limiter.wait()
+            try:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 429 or response.status >= 500:
+                        retry_after = response.headers.get('Retry-After')
+                        raise CourierError(f"HTTP {response.status}", retryable=True,
+                                           retry_after=float(retry_after) if retry_after and retry_after.replace('.', '', 1).isdigit() else None)
+                    if response.status == 404:
+                        raise CourierError("tracking number not found")
+                    if response.status >= 400:
+                        raise CourierError(f"HTTP {response.status}")
+                    payload = await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = CourierError(f"{type(e).__name__}: {e}" if str(e) else type(e).__name__, retryable=True)
+            except CourierError as e:
+                error = e
+            except ValueError:
+                error = CourierError("answer is not JSON")
+            else:
+                result = self.parse(payload)
+                if not result.get('raw_status'):
+                    raise CourierError("no status in answer")
+                return result
+            if not error.retryable or attempt == MAX_ATTEMPTS:
+                raise error
+            delay = error.retry_after if error.retry_after is not None else 0.5 * 2 ** (attempt - 1)
+            self.limiter.back_off(delay)
+
+
+class JsonTrackingAdapter(CourierAdapter):
+    """GET a URL template and read status / timestamp / location from dotted JSON paths"""
+
+    def request(self, tracking_id):
+        url = self.options['url'].format(tracking_id=tracking_id, courier=self.name.replace(' ', '-'))
+        headers = {k: os.path.expandvars(v) for k, v in self.options.get('headers', {}).items()}
+        return url, headers
+
+    def parse(self, payload):
+        fields = {'raw_status': 'status', 'status_at': 'timestamp', 'location': 'location'}
+        return {field: dig(payload, self.options.get(key, key)) for field, key in fields.items()}
+
+
+ADAPTER_TYPES = {'json': JsonTrackingAdapter}
+
+
+def adapter_class(type_name):
+    """Built-in adapter type, or 'module:Class' imported from the Python path"""
+    if type_name in ADAPTER_TYPES:
+        return ADAPTER_TYPES[type_name]
+    module, _, name = type_name.partition(':')
+    if not name:
+        raise ValueError(f"unknown adapter type {type_name!r} (use 'json' or 'module:Class')")
+    return getattr(importlib.import_module(module), name)
+
+
+def courier_key(name):
+    return ' '.join((name or '').lower().split())
+
+
+def load_adapters(couriers_file=None, stub_url=None, couriers=()):
+    """{courier key: adapter} from the JSON config, or every courier pointed at the stub server"""
+    if stub_url:
+        return {courier_key(name): JsonTrackingAdapter(name, rate=20, concurrency=8,
+                                                        url=stub_url.rstrip('/') + '/track/{courier}/{tracking_id}')
+                for name in couriers}
+    with open(couriers_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    adapters = {}
+    for name, options in config.items():
+        options = dict(options)
+        adapters[courier_key(name)] = adapter_class(options.pop('type', 'json'))(name, **options)
+    return adapters
+
+
+def due_shipments(conn, max_age_hours=DEFAULT_MAX_AGE_HOURS, max_days=DEFAULT_MAX_DAYS, retry_failed=False, limit=None):
+    """tracking_details rows to check: never checked, tracking number changed, or undelivered and stale"""
+    rows = conn.execute(f'''
+        SELECT td.id, td.courier_partner, td.tracking_id
+        FROM tracking_details td
+        LEFT JOIN tracking_status ts ON ts.tracking_detail_id = td.id
+        WHERE TRIM(COALESCE(td.tracking_id, '')) <> ''
+          AND td.created_at >= datetime('now', ?)
+          AND (
+            ts.tracking_detail_id IS NULL
+            OR ts.tracking_id <> td.tracking_id
+            OR (ts.delivered = 0 AND ts.checked_at < datetime('now', ?) AND (? OR ts.failures < {MAX_FAILURES}))
+          )
+        ORDER BY ts.checked_at IS NOT NULL, ts.checked_at, td.id
+        {'LIMIT ?' if limit else ''}
+    ''', (f'-{max_days} days', f'-{max_age_hours} hours', int(retry_failed), *([limit] if limit else []))).fetchall()
+    return rows
+
+
+def save_results(conn, results):
+    """Upsert a batch of (tracking_detail_id, courier, tracking_id, result | CourierError)"""
+    ok = [(detail_id, courier, tracking_id, normalize_status(r['raw_status']), str(r['raw_status']),
+           r.get('location'), normalize_timestamp(r.get('status_at')),
+           int(normalize_status(r['raw_status']) == 'Delivered'))
+          for detail_id, courier, tracking_id, r in results if not isinstance(r, Exception)]
+    failed = [(detail_id, courier, tracking_id, str(r))
+              for detail_id, courier, tracking_id, r in results if isinstance(r, Exception)]
+    with conn:
+        conn.executemany('''
+            INSERT INTO tracking_status (
+                tracking_detail_id, courier_partner, tracking_id, status, raw_status, location, status_at,
+                delivered, checked_at, error, failures
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, NULL, 0)
+            ON CONFLICT(tracking_detail_id) DO UPDATE SET
+                courier_partner = excluded.courier_partner, tracking_id = excluded.tracking_id,
+                status = excluded.status, raw_status = excluded.raw_status, location = excluded.location,
+                status_at = excluded.status_at, delivered = excluded.delivered,
+                checked_at = excluded.checked_at, error = NULL, failures = 0
+        ''', ok)
+        conn.executemany('''
+            INSERT INTO tracking_status (tracking_detail_id, courier_partner, tracking_id, checked_at, error, failures)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?, 1)
+            ON CONFLICT(tracking_detail_id) DO UPDATE SET
+                status = CASE WHEN tracking_id = excluded.tracking_id THEN status END,
+                raw_status = CASE WHEN tracking_id = excluded.tracking_id THEN raw_status END,
+                location = CASE WHEN tracking_id = excluded.tracking_id THEN location END,
+                status_at = CASE WHEN tracking_id = excluded.tracking_id THEN status_at END,
+                delivered = 0,
+                failures = CASE WHEN tracking_id = excluded.tracking_id THEN failures + 1 ELSE 1 END,
+                courier_partner = excluded.courier_partner, tracking_id = excluded.tracking_id,
+                checked_at = excluded.checked_at, error = excluded.error
+        ''', failed)
+
+
+async def sync_tracking(conn, shipments, adapters, progress=None):
+    """Check shipments concurrently, per-courier limits applied; returns per-courier Counters"""
+    by_courier = {}
+    summary = {}
+    for detail_id, courier, tracking_id in shipments:
+        key = courier_key(courier)
+        if key in adapters:
+            by_courier.setdefault(key, []).append((detail_id, courier, tracking_id))
+        else:
+            summary.setdefault(courier, Counter())['no adapter'] += 1
+
+    pending = []
+
+    def flush():
+        if pending:
+            save_results(conn, pending)
+            pending.clear()
+
+    async def check(session, adapter, semaphore, shipment):
+        async with semaphore:
+            try:
+                result = await adapter.fetch(session, shipment[2])
+            except CourierError as e:
+                result = e
+        counts = summary.setdefault(shipment[1], Counter())
+        counts['error' if isinstance(result, Exception) else normalize_status(result['raw_status']) or 'unrecognized'] += 1
+        pending.append((*shipment, result))
+        if len(pending) >= WRITE_BATCH:
+            flush()
+        if progress:
+            progress(shipment, result)
+
+    async def run_courier(key, items):
+        adapter = adapters[key]
+        connector = aiohttp.TCPConnector(limit=adapter.concurrency)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        semaphore = asyncio.Semaphore(adapter.concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await asyncio.gather(*(check(session, adapter, semaphore, item) for item in items))
+
+    try:
+        await asyncio.gather(*(run_courier(key, items) for key, items in by_courier.items()))
+    finally:
+        flush()
+    return summary
+
+
+# ----- stub courier server -----
+
+def stub_status(tracking_id, started, step_seconds):
+    """Deterministic progress through STUB_SEQUENCE, a step every step_seconds since the server started"""
+    seed = zlib.crc32(tracking_id.encode('utf-8'))
+    if seed % 23 == 0:
+        return 'Not found', None
+    step = min(seed % 4 + int((time.time() - started) / step_seconds), len(STUB_SEQUENCE) - 1)
+    return STUB_SEQUENCE[step], ('Delhi Hub', 'Mumbai Hub', 'Bengaluru Hub', 'Kolkata Hub')[seed % 4]
+
+
+def run_stub(host, port, latency_ms, error_rate, step_seconds):
+    """Fake courier API: GET /track/{courier}/{tracking_id}; GET /stats shows request counts and peak concurrency"""
+    from aiohttp import web
+
+    started = time.time()
+    stats = {'requests': Counter(), 'throttled': Counter(), 'in_flight': Counter(), 'peak': Counter()}
+    rng = random.Random(7)
+
+    async def track(request):
+        courier = request.match_info['courier']
+        stats['requests'][courier] += 1
+        stats['in_flight'][courier] += 1
+        stats['peak'][courier] = max(stats['peak'][courier], stats['in_flight'][courier])
+        try:
+            await asyncio.sleep(latency_ms / 1000 * (0.5 + rng.random()))
+            if rng.random() < error_rate:
+                stats['throttled'][courier] += 1
+                return web.json_response({'error': 'rate limited'}, status=429, headers={'Retry-After': '1'})
+            status, location = stub_status(request.match_info['tracking_id'], started, step_seconds)
+            if location is None:
+                return web.json_response({'error': 'not found'}, status=404)
+            return web.json_response({'tracking_id': request.match_info['tracking_id'], 'status': status,
+                                      'timestamp': datetime.now().isoformat(timespec='seconds'), 'location': location})
+        finally:
+            stats['in_flight'][courier] -= 1
+
+    async def show_stats(request):
+        return web.json_response({name: dict(counter) for name, counter in stats.items() if name != 'in_flight'})
+
+    app = web.Application()
+    app.router.add_get('/track/{courier}/{tracking_id}', track)
+    app.router.add_get('/stats', show_stats)
+    print(f"🚚 Stub courier API on http://{host}:{port}/track/<courier>/<tracking_id> (Ctrl+C to stop)")
+    web.run_app(app, host=host, port=port, print=None)
+
+
+def print_summary(conn):
+    print(f"\n📊 Latest status per courier:")
+    for courier, status, count, oldest in conn.execute('''
+        SELECT td.courier_partner, COALESCE(ts.status, CASE WHEN ts.error IS NOT NULL THEN 'error' ELSE 'unchecked' END),
+               COUNT(*), MIN(ts.checked_at)
+        FROM tracking_details td
+        LEFT JOIN tracking_status ts ON ts.tracking_detail_id = td.id AND ts.tracking_id = td.tracking_id
+        GROUP BY 1, 2 ORDER BY 1, 3 DESC
+    '''):
+        print(f"   • {courier}: {status} {count}" + (f" (oldest check {oldest})" if oldest else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh courier tracking status for tracking_details")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sync = sub.add_parser('sync', help="Poll couriers for due shipments and store their latest status")
+    sync.add_argument('--couriers', default=COURIERS_FILE, help="Courier adapter config (JSON)")
+    sync.add_argument('--stub-url', help="Send every courier's lookups to a stub server (see `stub`)")
+    sync.add_argument('--max-age-hours', type=float, default=DEFAULT_MAX_AGE_HOURS, help="Re-check undelivered shipments checked longer ago than this")
+    sync.add_argument('--max-days', type=int, default=DEFAULT_MAX_DAYS, help="Ignore shipments booked more than this many days ago")
+    sync.add_argument('--retry-failed', action='store_true', help=f"Also retry tracking numbers that failed {MAX_FAILURES} times in a row")
+    sync.add_argument('--limit', type=int, help="Check at most this many shipments")
+    sync.add_argument('--dry-run', action='store_true', help="Only list how many shipments are due per courier")
+
+    stub = sub.add_parser('stub', help="Serve a fake courier tracking API for testing")
+    stub.add_argument('--host', default='127.0.0.1')
+    stub.add_argument('--port', type=int, default=8765)
+    stub.add_argument('--latency-ms', type=float, default=80, help="Mean response delay")
+    stub.add_argument('--error-rate', type=float, default=0.05, help="Share of requests answered 429")
+    stub.add_argument('--step-seconds', type=float, default=60, help="Seconds between status steps of each shipment")
+
+    sub.add_parser('status', help="Show the stored status counts per courier")
+    args = parser.parse_args()
+
+    if args.command == 'stub':
+        run_stub(args.host, args.port, args.latency_ms, args.error_rate, args.step_seconds)
+        return
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: Database file not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        apply_migration(conn)
+        if args.command == 'status':
+            print_summary(conn)
+            return
+
+        shipments = due_shipments(conn, args.max_age_hours, args.max_days, args.retry_failed, args.limit)
+        couriers = sorted({courier for _, courier, _ in shipments})
+        try:
+            adapters = load_adapters(args.couriers, args.stub_url, couriers)
+        except FileNotFoundError:
+            print(f"❌ Error: Courier config not found at {args.couriers} (or use --stub-url)")
+            sys.exit(1)
+        except (ValueError, ImportError, AttributeError, TypeError, KeyError) as e:
+            print(f"❌ Error: Invalid courier config: {e}")
+            sys.exit(1)
+
+        if args.dry_run:
+            due = Counter(courier for _, courier, _ in shipments)
+            print(f"\n🔍 {len(shipments)} shipments due:")
+            for courier, count in due.most_common():
+                print(f"   • {courier}: {count}" + ('' if courier_key(courier) in adapters else ' (no adapter configured)'))
+            return
+
+        started = time.perf_counter()
+        summary = asyncio.run(sync_tracking(conn, shipments, adapters))
+        elapsed = time.perf_counter() - started
+
+        print("\n" + "="*60)
+        print(f"🚚 TRACKING SYNC: {len(shipments)} shipments due, checked in {elapsed:.1f}s")
+        print("="*60)
+        for courier, counts in sorted(summary.items()):
+            print(f"   • {courier}: " + ', '.join(f"{status} {count}" for status, count in counts.most_common()))
+        print_summary(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
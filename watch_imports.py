@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Watch-Folder Auto-Import for AxelGuard Dashboard
+Watches the upload folder (inotify, or polling where inotify is missing) and
+imports Inventory QC workbooks as they arrive. Files are picked up once the
+folder has been quiet for the debounce window and each is a complete .xlsx
+archive.
+Sheets are fingerprinted, and only sheets whose content changed since the
+last import are reloaded. All loads go through one writer thread, which
+drains the queue before each run so a burst of uploads becomes one load
+(the newest workbook wins for each sheet).
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import json
+import os
+import pickle
+import queue
+import select
+import signal
+import sqlite3
+import struct
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+from dispatch_reconcile import reconcile_orders, print_summary
+from import_excel_data import import_inventory_sheet, import_dispatch_sheet, import_qc_sheet
+from import_pipeline import DB_PATH, require_file
+from renewal_queue import refresh_due_queue, print_refresh_summary
+from workbook_cache import file_digest, load_workbook_rows
+
+WATCH_DIR = os.environ.get('AXELGUARD_WATCH_DIR', "/home/user/uploaded_files")
+STATE_DIR = os.environ.get(
+    'AXELGUARD_WATCH_STATE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'axelguard', 'watch')
+)
+
+# Import order matters: Inventory is rebuilt first and the other two link to it
+SHEETS = ['Inventory', 'Dispatch', 'QC Status']
+# Reloading Inventory renumbers inventory ids, so the linked sheets reload with it
+DEPENDENTS = {'Inventory': ['Dispatch', 'QC Status']}
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Directory watch through the libc inotify calls"""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+        self.directory = directory
+
+    def read(self, timeout):
+        """File names with events, waiting at most timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names, offset = [], 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            start = offset + EVENT_HEADER.size
+            name = data[start:start + length].rstrip(b'\0')
+            offset = start + length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback: compare (size, mtime) of the directory entries"""
+
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        self.interval = interval
+        self.seen = self._scan()
+
+    def _scan(self):
+        entries = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return entries
+
+    def read(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = [name for name, sig in current.items() if self.seen.get(name) != sig]
+        self.seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(directory, poll=False):
+    if not poll:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"  ⚠️  inotify unavailable ({e}); polling instead")
+    return PollingWatcher(directory)
+
+
+def wanted(name, pattern):
+    """Workbook names to import; skips Office lock files and hidden/temp files"""
+    return fnmatch.fnmatch(name, pattern) and not name.startswith(('~$', '.'))
+
+
+def settled(path):
+    """A complete workbook: non-empty and a readable zip archive"""
+    try:
+        return os.path.getsize(path) > 0 and zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+
+def sheet_fingerprint(rows):
+    """Hash of a sheet's parsed rows"""
+    return hashlib.sha256(pickle.dumps(rows, protocol=4)).hexdigest()
+
+
+def state_path(db_path, state_dir=STATE_DIR):
+    """One state file per database path"""
+    digest = hashlib.sha256(str(Path(db_path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return Path(state_dir) / f"{digest}.json"
+
+
+def load_state(db_path, state_dir=STATE_DIR):
+    path = state_path(db_path, state_dir)
+    if not path.exists():
+        return {'files': {}, 'sheets': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(db_path, state, state_dir=STATE_DIR):
+    path = state_path(db_path, state_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def plan_batch(paths, state):
+    """
+    Decide which sheets to reload for a batch of workbook paths.
+
+    Returns ({sheet: (path, rows, fingerprint)}, {path: digest}) for the
+    sheets to import and the files read.
+    """
+    existing = [p for p in paths if os.path.exists(p)]
+    latest = {}
+    digests = {}
+    for path in sorted(existing, key=lambda p: os.stat(p).st_mtime_ns):
+        digest = file_digest(path)
+        digests[path] = digest
+        if state['files'].get(path) == digest:
+            print(f"   • {Path(path).name}: unchanged since last import")
+            continue
+        sheets = load_workbook_rows(path)['sheets']
+        found = [name for name in SHEETS if name in sheets]
+        if not found:
+            print(f"   • {Path(path).name}: no {', '.join(SHEETS)} sheet; ignored")
+            continue
+        for name in found:
+            latest[name] = (path, sheets[name])
+
+    plan = {}
+    for name, (path, rows) in latest.items():
+        digest = sheet_fingerprint(rows)
+        if state['sheets'].get(name, {}).get('fingerprint') != digest:
+            plan[name] = (path, rows, digest)
+        else:
+            print(f"   • {name}: content unchanged")
+
+    for name in list(plan):
+        for dependent in DEPENDENTS.get(name, []):
+            if dependent in plan:
+                continue
+            if dependent in latest:
+                path, rows = latest[dependent]
+                plan[dependent] = (path, rows, sheet_fingerprint(rows))
+                continue
+            # Reload from the workbook it last came from, if that is still around
+            previous = state['sheets'].get(dependent)
+            if previous and os.path.exists(previous['source']):
+                rows = load_workbook_rows(previous['source'])['sheets'].get(dependent)
+                if rows is not None:
+                    plan[dependent] = (previous['source'], rows, sheet_fingerprint(rows))
+                    continue
+            if previous:
+                print(f"  ⚠️  {dependent} links to Inventory but its source workbook is gone; "
+                      f"its inventory links will be stale until it is uploaded again")
+    return plan, digests
+
+
+def run_imports(plan, conn):
+    """Import the planned sheets in dependency order, then reconcile and refresh"""
+    sheets = {name: rows for name, (_, rows, _) in plan.items()}
+    counts = {}
+    touched_orders = set()
+    if 'Inventory' in sheets:
+        counts['Inventory'] = import_inventory_sheet(sheets, conn)
+    if 'Dispatch' in sheets:
+        counts['Dispatch'] = import_dispatch_sheet(sheets, conn, touched_orders)
+    if 'QC Status' in sheets:
+        counts['QC Status'] = import_qc_sheet(sheets, conn)
+    if touched_orders:
+        print_summary(reconcile_orders(conn, touched_orders))
+    print_refresh_summary(refresh_due_queue(conn))
+    return counts
+
+
+def process_batch(paths, db_path, state_dir=STATE_DIR):
+    """Import one drained batch of workbook paths; returns the per-sheet counts"""
+    print("\n" + "="*60)
+    print(f"📥 AUTO-IMPORT: {len(paths)} workbook(s) at {datetime.now():%Y-%m-%d %H:%M:%S}")
+    print("="*60)
+    state = load_state(db_path, state_dir)
+    plan, digests = plan_batch(paths, state)
+    if not plan:
+        state['files'].update(digests)
+        save_state(db_path, state, state_dir)
+        print("✅ Nothing to import")
+        return {}
+
+    for name in SHEETS:
+        if name in plan:
+            print(f"   • {name} ← {Path(plan[name][0]).name}")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = run_imports(plan, conn)
+    finally:
+        conn.close()
+
+    state['files'].update(digests)
+    for name, (path, _, digest) in plan.items():
+        state['sheets'][name] = {'source': path, 'fingerprint': digest,
+                                 'imported_at': datetime.now().isoformat(timespec='seconds')}
+    save_state(db_path, state, state_dir)
+    print(f"\n✅ Auto-Import Complete: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    return counts
+
+
+def import_folder(directory, db_path, pattern='*.xlsx'):
+    """One-shot: import every complete workbook currently in the folder"""
+    paths = sorted(str(p) for p in Path(directory).iterdir()
+                   if p.is_file() and wanted(p.name, pattern) and settled(p))
+    return process_batch(paths, db_path)
+
+
+def writer_loop(jobs, db_path, state_dir=STATE_DIR):
+    """Single writer: take every queued batch of paths, import them as one load, repeat"""
+    while True:
+        paths = jobs.get()
+        if paths is None:
+            return
+        batch = set(paths)
+        stop = False
+        while True:
+            try:
+                more = jobs.get_nowait()
+            except queue.Empty:
+                break
+            if more is None:
+                stop = True
+            else:
+                batch.update(more)
+        try:
+            process_batch(sorted(batch), db_path, state_dir)
+        except Exception as e:
+            print(f"\n❌ Auto-import failed: {e}")
+            import traceback
+            traceback.print_exc()
+        if stop:
+            return
+
+
+def watch(directory, db_path, pattern='*.xlsx', debounce=2.0, poll=False, stop_event=None):
+    """Watch directory until stop_event is set, feeding settled workbooks to the writer"""
+    stop_event = stop_event or threading.Event()
+    jobs = queue.Queue()
+    writer = threading.Thread(target=writer_loop, args=(jobs, db_path), name='axelguard-writer', daemon=True)
+    writer.start()
+    watcher = make_watcher(directory, poll)
+    print(f"👀 Watching {directory} ({type(watcher).__name__}, debounce {debounce:.1f}s) → {db_path}")
+
+    pending = {}
+    try:
+        while not stop_event.is_set():
+            for name in watcher.read(timeout=min(0.5, debounce)):
+                if wanted(name, pattern):
+                    pending[os.path.join(directory, name)] = time.monotonic()
+            # Wait for the whole folder to go quiet so a burst is queued together
+            if not pending or time.monotonic() - max(pending.values()) < debounce:
+                continue
+            ready = []
+            for path in list(pending):
+                if not os.path.exists(path):
+                    del pending[path]
+                elif settled(path):
+                    del pending[path]
+                    ready.append(path)
+            if ready:
+                jobs.put(ready)
+    finally:
+        watcher.close()
+        jobs.put(None)
+        writer.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auto-import workbooks dropped into the upload folder")
+    parser.add_argument('--dir', default=WATCH_DIR, help="Folder to watch (default: AXELGUARD_WATCH_DIR)")
+    parser.add_argument('--db', default=DB_PATH, help="D1 SQLite file")
+    parser.add_argument('--pattern', default='*.xlsx', help="Workbook file pattern")
+    parser.add_argument('--debounce', type=float, default=2.0, help="Seconds the folder must be quiet before import")
+    parser.add_argument('--poll', action='store_true', help="Poll instead of using inotify")
+    parser.add_argument('--once', action='store_true', help="Import what is in the folder now and exit")
+    args = parser.parse_args()
+
+    require_file(args.dir, "Watch folder")
+    require_file(args.db, "Database file", "Run: npm run dev first to create the database")
+
+    if args.once:
+        import_folder(args.dir, args.db, args.pattern)
+        return
+
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+    watch(args.dir, args.db, args.pattern, args.debounce, args.poll, stop_event)
+    print("\n🛑 Watcher stopped")
+
+
+if __name__ == '__main__':
+    main()
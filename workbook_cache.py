@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Workbook Parse Cache for AxelGuard import scripts
+Stores the normalized row tuples of every sheet, keyed by the workbook's
+content hash plus the parser version, so reruns against an unchanged .xlsx
+skip openpyxl entirely. Old entries are evicted once the cache exceeds its
+size budget.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import zipfile
+import zlib
+from pathlib import Path
+from xml.etree.ElementTree import iterparse
+
+# Bump whenever the row normalization below changes
+PARSER_VERSION = 1
+
+CACHE_DIR = os.environ.get(
+    'AXELGUARD_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'axelguard', 'workbooks')
+)
+CACHE_MAX_BYTES = int(float(os.environ.get('AXELGUARD_CACHE_MAX_MB', '256')) * 1024 * 1024)
+CACHE_SUFFIX = '.rows'
+
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 of the file contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(digest, cache_dir=None):
+    """Cache file for a workbook digest at the current parser version"""
+    return Path(cache_dir or CACHE_DIR) / f"{digest}-v{PARSER_VERSION}{CACHE_SUFFIX}"
+
+
+def normalize_rows(rows):
+    """Materialize sheet rows as tuples padded to the sheet width"""
+    rows = [tuple(row) for row in rows]
+    width = max((len(row) for row in rows), default=0)
+    return [row + (None,) * (width - len(row)) if len(row) < width else row for row in rows]
+
+
+def parse_workbook(path):
+    """Parse every sheet with openpyxl (read-only, values only)"""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = {ws.title: normalize_rows(ws.iter_rows(values_only=True)) for ws in wb.worksheets}
+        active = wb.active.title if wb.active is not None else (wb.sheetnames[0] if wb.sheetnames else None)
+    finally:
+        wb.close()
+    return {'active': active, 'sheets': sheets}
+
+
+def _read_entry(path):
+    with open(path, 'rb') as f:
+        return pickle.loads(zlib.decompress(f.read()))
+
+
+def _write_entry(path, entry):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), 6)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def evict(cache_dir=None, max_bytes=CACHE_MAX_BYTES, keep=None):
+    """Delete least recently used entries until the cache fits in max_bytes"""
+    root = Path(cache_dir or CACHE_DIR)
+    if not root.exists():
+        return 0
+    entries = []
+    for entry in root.glob(f"*{CACHE_SUFFIX}"):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and entry == keep:
+            continue
+        try:
+            entry.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def load_workbook_rows(path, cache_dir=None, use_cache=None):
+    """
+    Return {'active': sheet_name, 'sheets': {sheet_name: [row tuples]}} for a workbook.
+
+    Rows include the header row, exactly as openpyxl's iter_rows(values_only=True)
+    yields them, padded to the sheet width. Set AXELGUARD_NO_CACHE=1 to bypass.
+    """
+    if use_cache is None:
+        use_cache = os.environ.get('AXELGUARD_NO_CACHE', '') in ('', '0')
+    if not use_cache:
+        entry = parse_workbook(path)
+        entry['cached'] = False
+        return entry
+
+    target = cache_path(file_digest(path), cache_dir)
+    if target.exists():
+        try:
+            entry = _read_entry(target)
+            os.utime(target)  # mark as recently used
+            entry['cached'] = True
+            return entry
+        except (OSError, EOFError, zlib.error, pickle.UnpicklingError):
+            target.unlink(missing_ok=True)
+
+    entry = parse_workbook(path)
+    try:
+        _write_entry(target, entry)
+        evict(cache_dir, keep=target)
+    except OSError as e:
+        print(f"  ⚠️  Could not write parse cache: {e}", file=sys.stderr)
+    entry['cached'] = False
+    return entry
+
+
+def load_sheet_rows(path, sheet_name=None, cache_dir=None):
+    """Rows for one sheet (the active sheet when sheet_name is None)"""
+    entry = load_workbook_rows(path, cache_dir)
+    return entry['sheets'][sheet_name or entry['active']]
+
+
+def iter_sheet_rows(path, sheet_name, cache_dir=None):
+    """
+    Yield one sheet's rows as tuples, without materializing the sheet.
+
+    Reads from the parse cache when it already holds the workbook; otherwise
+    streams the sheet XML with _stream_sheet and writes nothing. Streamed
+    rows are padded (and cut) to the sheet's <dimension> and stop at its
+    last row, as openpyxl does, so they match load_workbook_rows(). Sheets
+    saved without a <dimension> (openpyxl's write-only mode) have no known
+    width up front: their rows are padded to the header width but keep any
+    cells beyond it, so rows can differ in length.
+    """
+    if os.environ.get('AXELGUARD_NO_CACHE', '') in ('', '0'):
+        target = cache_path(file_digest(path), cache_dir)
+        if target.exists():
+            try:
+                yield from _read_entry(target)['sheets'][sheet_name]
+                return
+            except (OSError, EOFError, zlib.error, pickle.UnpicklingError):
+                pass
+
+    width, last_row = _sheet_bounds(path, sheet_name) or (None, None)
+    sized = width is not None
+    expected = 1
+    for number, row in _stream_sheet(path, sheet_name):
+        if last_row is not None and number > last_row:
+            break
+        for _ in range(expected, number):  # rows absent from the XML are empty
+            yield (None,) * (width or 0)
+        expected = number + 1
+        width = width if width is not None else len(row)
+        if len(row) < width:
+            yield row + (None,) * (width - len(row))
+        else:
+            yield row[:width] if sized else row
+
+
+def _sheet_bounds(path, sheet_name):
+    """(last column, last row) of the sheet's <dimension>, or None when it has none"""
+    from openpyxl.utils.cell import range_boundaries
+
+    with zipfile.ZipFile(path) as archive:
+        _, part = _sheet_part(archive, sheet_name)
+        with archive.open(part) as source:
+            # <dimension> precedes <sheetData>; stop at whichever comes first
+            for _, elem in iterparse(source, events=('start',)):
+                if elem.tag == f'{SHEET_NS}sheetData':
+                    return None
+                if elem.tag == f'{SHEET_NS}dimension':
+                    try:
+                        _, _, last_column, last_row = range_boundaries(elem.get('ref', ''))
+                    except (TypeError, ValueError):
+                        return None
+                    return (last_column, last_row) if last_column is not None else None
+    return None
+
+
+def _cell_styles(archive):
+    """(date style ids, timedelta style ids), classified the way openpyxl does"""
+    from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+
+    if 'xl/styles.xml' not in archive.namelist():
+        return set(), set()
+    custom, formats = {}, []
+    in_cell_xfs = False
+    for event, elem in iterparse(archive.open('xl/styles.xml'), events=('start', 'end')):
+        if elem.tag == f'{SHEET_NS}cellXfs':
+            in_cell_xfs = event == 'start'
+        elif event == 'end' and elem.tag == f'{SHEET_NS}numFmt':
+            custom[int(elem.get('numFmtId'))] = elem.get('formatCode')
+        elif event == 'end' and elem.tag == f'{SHEET_NS}xf' and in_cell_xfs:
+            formats.append(int(elem.get('numFmtId', 0)))
+    dates, timedeltas = set(), set()
+    for index, fmt_id in enumerate(formats):
+        fmt = custom.get(fmt_id) or builtin_format_code(fmt_id)
+        if fmt and is_date_format(fmt):
+            dates.add(index)
+        if fmt and is_timedelta_format(fmt):
+            timedeltas.add(index)
+    return dates, timedeltas
+
+
+def _all_shared_strings(archive):
+    """Every shared string (plain or rich text, phonetic runs left out)"""
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    for _, elem in iterparse(archive.open('xl/sharedStrings.xml')):
+        if elem.tag == f'{SHEET_NS}si':
+            text = elem.find(f'{SHEET_NS}t')
+            if text is not None:
+                strings.append(text.text or '')
+            else:
+                strings.append(''.join(r.findtext(f'{SHEET_NS}t') or '' for r in elem.findall(f'{SHEET_NS}r')))
+            elem.clear()
+    return strings
+
+
+def _stream_sheet(path, sheet_name):
+    """
+    (row number, values) for each <row> of a sheet, with the values
+    openpyxl's values-only reader would give (data_only: cached formula
+    results), straight from the sheet XML -- several times faster than
+    openpyxl's read-only mode on large sheets
+    """
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+    with zipfile.ZipFile(path) as archive:
+        _, part = _sheet_part(archive, sheet_name)
+        epoch = CALENDAR_WINDOWS_1900
+        for _, elem in iterparse(archive.open('xl/workbook.xml')):
+            if elem.tag == f'{SHEET_NS}workbookPr' and elem.get('date1904') in ('1', 'true'):
+                epoch = CALENDAR_MAC_1904
+        dates, timedeltas = _cell_styles(archive)
+        strings = _all_shared_strings(archive)
+
+        number = 0
+        for _, elem in iterparse(archive.open(part)):
+            if elem.tag != f'{SHEET_NS}row':
+                continue
+            number = int(elem.get('r', number + 1))
+            values, column = [], 0
+            for cell in elem.iter(f'{SHEET_NS}c'):
+                ref = cell.get('r')
+                column = _column_index(ref) if ref else column + 1 if values else 0
+                kind = cell.get('t', 'n')
+                if kind == 'inlineStr':
+                    inline = cell.find(f'{SHEET_NS}is')
+                    value = None
+                    if inline is not None:
+                        text = inline.find(f'{SHEET_NS}t')
+                        value = text.text or '' if text is not None else ''.join(
+                            r.findtext(f'{SHEET_NS}t') or '' for r in inline.findall(f'{SHEET_NS}r'))
+                else:
+                    value = cell.findtext(f'{SHEET_NS}v') or None
+                    if value is not None:
+                        if kind == 'n':
+                            value = float(value) if '.' in value or 'E' in value or 'e' in value else int(value)
+                            style = int(cell.get('s', 0))
+                            if style in dates:
+                                try:
+                                    value = from_excel(value, epoch, timedelta=style in timedeltas)
+                                except (OverflowError, ValueError):
+                                    value = '#VALUE!'
+                        elif kind == 's':
+                            value = strings[int(value)]
+                        elif kind == 'b':
+                            value = bool(int(value))
+                        elif kind == 'd':
+                            value = from_ISO8601(value)
+                values.extend([None] * (column - len(values)))
+                values.append(value)
+            elem.clear()
+            yield number, tuple(values)
+
+
+def _column_index(ref):
+    """'C1' → 2"""
+    index = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        index = index * 26 + ord(ch.upper()) - 64
+    return index - 1
+
+
+def _sheet_part(archive, sheet_name=None):
+    """(sheet name, zip member) of the named sheet, or the active one"""
+    root = iterparse(archive.open('xl/workbook.xml'))
+    sheets, active = [], 0
+    for _, elem in root:
+        if elem.tag == f'{SHEET_NS}workbookView':
+            active = int(elem.get('activeTab', 0))
+        elif elem.tag == f'{SHEET_NS}sheet':
+            sheets.append((elem.get('name'), elem.get(f'{REL_NS}id')))
+    targets = {}
+    for _, elem in iterparse(archive.open('xl/_rels/workbook.xml.rels')):
+        if elem.tag == f'{PKG_REL_NS}Relationship':
+            target = elem.get('Target')
+            targets[elem.get('Id')] = target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+    if sheet_name is None:
+        name, rel = sheets[min(active, len(sheets) - 1)]
+    else:
+        name, rel = next((n, r) for n, r in sheets if n == sheet_name)
+    return name, targets[rel]
+
+
+def _shared_strings(archive, wanted):
+    """Shared strings at the requested indexes, reading no further than the last one"""
+    if not wanted or 'xl/sharedStrings.xml' not in archive.namelist():
+        return {}
+    found, index, last = {}, 0, max(wanted)
+    for _, elem in iterparse(archive.open('xl/sharedStrings.xml')):
+        if elem.tag == f'{SHEET_NS}si':
+            if index in wanted:
+                found[index] = ''.join(t.text or '' for t in elem.iter(f'{SHEET_NS}t'))
+            index += 1
+            elem.clear()
+            if index > last:
+                break
+    return found
+
+
+def read_header(path, sheet_name=None, cache_dir=None):
+    """
+    First row of a sheet without parsing the workbook.
+
+    Uses the parse cache when it already holds the workbook; otherwise
+    streams only the first <row> of the sheet XML (and the shared strings
+    it references), so it stays fast on large files.
+    """
+    if os.environ.get('AXELGUARD_NO_CACHE', '') in ('', '0'):
+        target = cache_path(file_digest(path), cache_dir)
+        if target.exists():
+            try:
+                entry = _read_entry(target)
+                rows = entry['sheets'][sheet_name or entry['active']]
+                return list(rows[0]) if rows else []
+            except (OSError, EOFError, KeyError, zlib.error, pickle.UnpicklingError):
+                pass
+
+    with zipfile.ZipFile(path) as archive:
+        _, part = _sheet_part(archive, sheet_name)
+        cells = []
+        for event, elem in iterparse(archive.open(part), events=('end',)):
+            if elem.tag == f'{SHEET_NS}c':
+                kind = elem.get('t')
+                value = elem.find(f'{SHEET_NS}v')
+                if kind == 'inlineStr':
+                    text = ''.join(t.text or '' for t in elem.iter(f'{SHEET_NS}t'))
+                else:
+                    text = value.text if value is not None else None
+                cells.append((_column_index(elem.get('r', 'A')), kind, text))
+            elif elem.tag == f'{SHEET_NS}row':
+                break
+        strings = _shared_strings(archive, {int(text) for _, kind, text in cells if kind == 's' and text})
+
+    header = [None] * (max((col for col, _, _ in cells), default=-1) + 1)
+    for col, kind, text in cells:
+        if kind == 's' and text is not None:
+            header[col] = strings.get(int(text))
+        elif kind in (None, 'n') and text is not None:
+            number = float(text)
+            header[col] = int(number) if number.is_integer() else number
+        else:
+            header[col] = text
+    return header
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: workbook_cache.py <workbook.xlsx> | --evict | --clear")
+        sys.exit(1)
+    if sys.argv[1] == '--evict':
+        print(f"🧹 Evicted {evict()} entries from {CACHE_DIR}")
+        return
+    if sys.argv[1] == '--clear':
+        print(f"🧹 Removed {evict(max_bytes=0)} entries from {CACHE_DIR}")
+        return
+    entry = load_workbook_rows(sys.argv[1])
+    source = 'cache' if entry['cached'] else 'openpyxl'
+    print(f"✅ Loaded {len(entry['sheets'])} sheets from {source}:")
+    for name, rows in entry['sheets'].items():
+        print(f"   • {name}: {len(rows)} rows")
+
+
+if __name__ == '__main__':
+    main()